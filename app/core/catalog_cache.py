@@ -1,19 +1,33 @@
 from __future__ import annotations
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from threading import RLock
 from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+import json
+import os
 import time
 
 @dataclass
 class _CacheEntry:
     data: Any
     ts: float = field(default_factory=time.time)
+    ttl: Optional[float] = None
+    version: Optional[int] = None
+
+    def expired(self, margin: float = 0.0) -> bool:
+        return self.ttl is not None and time.time() + margin >= self.ts + self.ttl
 
 class CatalogCache:
     """
     Caché de catálogos a nivel aplicación.
     - Thread-safe (lock)
-    - Sin TTL por defecto; podés invalidar por evento (alta/edición)
+    - TTL opcional por clave: una entrada vencida se trata como ausente
+    - Cada entrada guarda la versión de catalog_versions con la que se
+      cargó; el poller de catálogos recarga sólo las que cambiaron
+    - También se puede invalidar por evento (alta/edición)
+    - save_snapshot()/load_snapshot() lo persisten en disco para arrancar
+      sin esperar a la base
     """
     _instance: "CatalogCache" = None
     _lock = RLock()
@@ -29,19 +43,97 @@ class CatalogCache:
                 cls._instance = CatalogCache()
             return cls._instance
 
-    def set(self, key: str, value: Any):
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, version: Optional[int] = None):
         with self._lock:
-            self._data[key] = _CacheEntry(value)
+            self._data[key] = _CacheEntry(value, ttl=ttl, version=version)
             self._loaded_once = True
 
     def get_value(self, key: str) -> Optional[Any]:
         with self._lock:
             entry = self._data.get(key)
-            return entry.data if entry else None
+            if entry is None or entry.expired():
+                return None
+            return entry.data
 
     def has_all(self, keys: list[str]) -> bool:
         with self._lock:
-            return all(k in self._data for k in keys)
+            return all(k in self._data and not self._data[k].expired() for k in keys)
+
+    def missing(self, keys: list[str]) -> List[str]:
+        """Claves que no están o ya vencieron."""
+        with self._lock:
+            return [k for k in keys if k not in self._data or self._data[k].expired()]
+
+    def loaded_keys(self) -> List[str]:
+        with self._lock:
+            return list(self._data)
+
+    def version(self, key: str) -> Optional[int]:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry.version if entry else None
+
+    def expiring(self, margin: float) -> List[str]:
+        """Claves cargadas que vencen dentro de `margin` segundos."""
+        with self._lock:
+            return [k for k, e in self._data.items() if e.expired(margin)]
+
+    # -------------------- Snapshot en disco --------------------
+
+    SNAPSHOT_FORMATO = 1
+
+    def save_snapshot(self, path: Path, keys: List[str], origen: str) -> bool:
+        """
+        Guarda en `path` (JSON, escritura atómica) las claves vigentes de
+        `keys` con su versión. `origen` identifica la base de la que salieron.
+        """
+        with self._lock:
+            catalogos = {
+                k: {"data": [dict(r) for r in e.data], "version": e.version}
+                for k, e in self._data.items()
+                if k in keys and not e.expired()
+            }
+        if not catalogos:
+            return False
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        payload = {
+            "formato": self.SNAPSHOT_FORMATO,
+            "origen": origen,
+            "guardado": datetime.now().isoformat(timespec="seconds"),
+            "catalogos": catalogos,
+        }
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, default=str)
+        os.replace(tmp, path)
+        return True
+
+    def load_snapshot(self, path: Path, origen: str, ttl: Optional[float] = None) -> List[str]:
+        """
+        Carga un snapshot guardado con save_snapshot(). Ignora el archivo si
+        no existe, está dañado o es de otra base. No pisa claves ya cargadas.
+        Devuelve las claves cargadas.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return []
+        if payload.get("formato") != self.SNAPSHOT_FORMATO or payload.get("origen") != origen:
+            return []
+
+        cargadas = []
+        with self._lock:
+            for k, item in (payload.get("catalogos") or {}).items():
+                if k in self._data or not isinstance(item, dict):
+                    continue
+                self._data[k] = _CacheEntry(item.get("data") or [], ttl=ttl, version=item.get("version"))
+                cargadas.append(k)
+            if cargadas:
+                self._loaded_once = True
+        return cargadas
 
     def mark_loaded(self):
         with self._lock:
@@ -8,6 +8,9 @@ from app.shared.paths import user_data_path
 _cfg = load_config()
 
 _db = _cfg.get("db", {})
+_db_replica = _cfg.get("db_replica", {})
+_catalogos = _cfg.get("catalogos", {})
+_busqueda = _cfg.get("busqueda", {})
 _arca = _cfg.get("arca", {})
 _arca_homo = _cfg.get("arca_homo", {})
 
@@ -23,6 +26,14 @@ def _int(v, default):
         return default
 
 
+def _bool(v, default: bool) -> bool:
+    if isinstance(v, bool):
+        return v
+    if isinstance(v, str) and v.strip():
+        return v.strip().lower() in ("1", "true", "si", "sí", "yes")
+    return default
+
+
 def _path(rel_path: str) -> str:
     """
     Convierte rutas relativas (certificados/xxx.crt)
@@ -42,6 +53,28 @@ class Settings:
     DB_POOL_SIZE: int = _int(_db.get("pool_size"), 5)
     DB_POOL_TIMEOUT: int = _int(_db.get("pool_timeout"), 30)
     DB_SSL_CA: str = _path(_str(_db.get("ssl_ca")))
+    # pymysql | mysqlclient | mysqlconnector | auto (el primero en C instalado);
+    # si el configurado no está instalado se usa pymysql
+    DB_DRIVER: str = _str(_db.get("driver"), "pymysql").lower()
+    # Perfil de consultas (pantalla Diagnóstico SQL + logs/sql_profile_*.jsonl)
+    DB_PROFILER: bool = _bool(_db.get("profiler"), True)
+    # Umbral en ms del log de consultas lentas con EXPLAIN (0 = desactivado)
+    DB_SLOW_QUERY_MS: int = _int(_db.get("slow_query_ms"), 0)
+    # Segundos entre chequeos de conexiones ociosas (0 = pool_pre_ping en cada checkout)
+    DB_HEALTH_INTERVAL: int = _int(_db.get("health_interval"), 60)
+
+    # ============ DB réplica (opcional, sólo lectura) ============
+    # Sin host no hay réplica: reportes y listados leen de la principal
+    DB_REPLICA_HOST: str = _str(_db_replica.get("host"))
+    DB_REPLICA_PORT: int = _int(_db_replica.get("port"), 3306)
+    DB_REPLICA_USER: str = _str(_db_replica.get("user"), _str(_db.get("user")))
+    DB_REPLICA_PASSWORD: str = _str(_db_replica.get("password"), _str(_db.get("password")))
+    DB_REPLICA_NAME: str = _str(_db_replica.get("name"), _str(_db.get("name")))
+    # Segundos después de una escritura en que las lecturas siguen yendo a la principal
+    # (el router usa como mínimo DB_REPLICA_MAX_LAG)
+    DB_REPLICA_STALE_S: int = _int(_db_replica.get("stale_seconds"), 5)
+    # Atraso máximo de replicación admitido antes de volver a la principal
+    DB_REPLICA_MAX_LAG: int = _int(_db_replica.get("max_lag"), 30)
 
     # =============== ARCA =================
     # ÚNICA bandera de entorno
@@ -59,6 +92,35 @@ class Settings:
     ARCA_HOMO_KEY_PATH: str = _path(_str(_arca_homo.get("key_path")))
     ARCA_HOMO_KEY_PASSWORD: str = _str(_arca_homo.get("key_password"))
 
+    # --- Sincronización ---
+    # Requests por segundo a WSFE (sumando todos los hilos) y workers en paralelo
+    ARCA_MAX_RPS: int = _int(_arca.get("max_rps"), 5)
+    ARCA_SYNC_WORKERS: int = _int(_arca.get("sync_workers"), 3)
+
+    # --- Ticket de acceso WSAA ---
+    # Segundos después del vencimiento en que se renueva el TA en segundo plano
+    # (WSAA no emite uno nuevo mientras el anterior siga vigente)
+    ARCA_TA_RENEW_SKEW: int = _int(_arca.get("ta_renew_skew"), 5)
+
+    # --- Cola de autorizaciones en segundo plano ---
+    ARCA_OUTBOX_POLL: int = _int(_arca.get("outbox_poll"), 15)
+    ARCA_OUTBOX_MAX_INTENTOS: int = _int(_arca.get("outbox_max_intentos"), 8)
+
+    # =============== Catálogos ==================
+    # Vencimiento de cada catálogo en caché (0 = sin vencimiento)
+    CATALOG_TTL: int = _int(_catalogos.get("ttl"), 900)
+    # Segundos entre consultas a catalog_versions (0 = sin poller)
+    CATALOG_POLL: int = _int(_catalogos.get("poll"), 30)
+    # Vigencia del total de los listados paginados; vencido, se muestra el
+    # anterior y se recalcula en segundo plano
+    LIST_COUNT_TTL: int = _int(_catalogos.get("list_count_ttl"), 60)
+
+    # =============== Búsqueda local ==================
+    # Segundos entre deltas del índice de clientes/vehículos (0 = sin índice local)
+    SEARCH_INDEX_POLL: int = _int(_busqueda.get("poll"), 20)
+    # Reconstrucción completa (recoge bajas y cambios sin updated_at)
+    SEARCH_INDEX_REBUILD: int = _int(_busqueda.get("rebuild"), 3600)
+
     # =============== APP ==================
     APP_NAME: str = "MotoAgency Desk"
     APP_DATA_DIR: str = str(user_data_path())
@@ -0,0 +1,149 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+from threading import RLock, Thread
+from dataclasses import dataclass, field
+from weakref import WeakSet
+import re
+import time
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# INSERT/UPDATE/DELETE/REPLACE -> tabla escrita
+_ESCRITURA = re.compile(
+    r"^\s*(?:INSERT(?:\s+IGNORE)?\s+INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM)\s+`?(\w+)`?",
+    re.IGNORECASE,
+)
+
+def tabla_escrita(statement: str) -> Optional[str]:
+    """Tabla que modifica una sentencia INSERT/UPDATE/DELETE/REPLACE (None si es lectura)."""
+    m = _ESCRITURA.match(statement)
+    return m.group(1).lower() if m else None
+
+
+# Tabla escrita -> listados cuyo total puede cambiar (facturas filtra por cliente)
+LISTADOS_POR_TABLA: Dict[str, Tuple[str, ...]] = {
+    "facturas": ("facturas",),
+    "clientes": ("clientes", "facturas"),
+    "vehiculos": ("vehiculos",),
+}
+
+
+@dataclass
+class _CountEntry:
+    total: int
+    ts: float = field(default_factory=time.time)
+
+
+class CountCache:
+    """
+    Totales de los listados paginados (facturas, clientes, vehículos).
+    - El COUNT(*) sobre los joins de la búsqueda se hace una vez por
+      combinación de filtros y no en cada cambio de página
+    - Vencido el TTL se devuelve el total anterior y se recalcula en
+      segundo plano (un solo hilo por clave)
+    - install(engine) invalida solo los listados afectados cuando se
+      confirma una escritura local (altas, ediciones, bajas, cambios de
+      estado) sin importar desde qué servicio o pantalla se hizo
+    - Lo que graban otras PCs no se ve acá: la primera página de un listado
+      pide refrescar=True y el total se recalcula en segundo plano
+    """
+    _instance: "CountCache" = None
+    _lock = RLock()
+
+    # Un total más nuevo que esto no se vuelve a contar aunque se pida refrescar
+    REFRESCO_MINIMO = 5.0
+
+    def __init__(self):
+        self._data: Dict[Tuple[str, Hashable], _CountEntry] = {}
+        self._refrescando: Set[Tuple[str, Hashable]] = set()
+        self._engines: "WeakSet[Engine]" = WeakSet()
+
+    @classmethod
+    def get(cls) -> "CountCache":
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = CountCache()
+            return cls._instance
+
+    @staticmethod
+    def clave(nombre: str, filtros: Optional[Dict[str, Any]]) -> Tuple[str, Hashable]:
+        """Clave estable para un listado y sus filtros (ignora los vacíos)."""
+        activos = tuple(sorted(
+            (str(k), str(v)) for k, v in (filtros or {}).items() if v not in (None, "")
+        ))
+        return (nombre, activos)
+
+    def total(
+        self,
+        clave: Tuple[str, Hashable],
+        contar: Callable[[], int],
+        ttl: Optional[float] = None,
+        refrescar: bool = False,
+    ) -> int:
+        """
+        Total para `clave`. Si no hay, se cuenta ahora con `contar`; si está
+        vencido (o se pide `refrescar`), se devuelve el anterior y se
+        recalcula en segundo plano.
+        """
+        with self._lock:
+            entry = self._data.get(clave)
+            if entry is not None:
+                edad = time.time() - entry.ts
+                vencido = bool(ttl) and edad >= ttl
+                pedido = refrescar and edad >= self.REFRESCO_MINIMO
+                if (vencido or pedido) and clave not in self._refrescando:
+                    self._refrescando.add(clave)
+                    Thread(target=self._refrescar, args=(clave, contar), daemon=True).start()
+                return entry.total
+
+        total = int(contar())
+        with self._lock:
+            self._data[clave] = _CountEntry(total)
+        return total
+
+    def _refrescar(self, clave: Tuple[str, Hashable], contar: Callable[[], int]) -> None:
+        try:
+            total = int(contar())
+            with self._lock:
+                self._data[clave] = _CountEntry(total)
+        except Exception:
+            logger.exception(f"No se pudo recalcular el total de {clave[0]}")
+        finally:
+            with self._lock:
+                self._refrescando.discard(clave)
+
+    # -------------------- Escrituras locales --------------------
+
+    def install(self, engine: Engine) -> None:
+        """Escucha las escrituras de `engine` e invalida al confirmar la transacción."""
+        with self._lock:
+            if engine in self._engines:
+                return
+            self._engines.add(engine)
+            event.listen(engine, "after_cursor_execute", self._after_execute)
+            event.listen(engine, "commit", self._on_commit)
+            event.listen(engine, "rollback", self._on_rollback)
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        listados = LISTADOS_POR_TABLA.get(tabla_escrita(statement) or "")
+        if listados:
+            conn.info.setdefault("_count_cache_listados", set()).update(listados)
+
+    def _on_commit(self, conn) -> None:
+        listados = conn.info.pop("_count_cache_listados", None)
+        if listados:
+            self.invalidate(*listados)
+
+    def _on_rollback(self, conn) -> None:
+        conn.info.pop("_count_cache_listados", None)
+
+    def invalidate(self, *nombres: str):
+        with self._lock:
+            if not nombres:
+                self._data.clear()
+            else:
+                for k in [k for k in self._data if k[0] in nombres]:
+                    self._data.pop(k, None)
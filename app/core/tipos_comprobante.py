@@ -0,0 +1,72 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# Clave en CatalogCache: todos los tipos (activos e inactivos), con índices
+TIPOS_COMPROBANTE_KEY = "tipos_comprobante_todos"
+
+
+class TiposComprobanteCatalogo:
+    """
+    Catálogo de tipos de comprobante con índices en memoria.
+
+    Se arma una vez con todas las filas de tipos_comprobante y responde las
+    búsquedas por id, código y (letra, es_nota_credito) sin ir a la base.
+    Devuelve copias: quien llama puede modificar el dict sin tocar el caché.
+    Iterar devuelve las filas, así el snapshot de catálogos lo guarda igual
+    que a una lista.
+    """
+
+    def __init__(self, rows: Iterable[Any]):
+        self._rows: List[Dict[str, Any]] = sorted((dict(r) for r in rows), key=lambda r: int(r["id"]))
+        self._por_id: Dict[int, Dict[str, Any]] = {}
+        self._por_codigo: Dict[str, Dict[str, Any]] = {}
+        self._por_letra: Dict[Tuple[str, bool], Dict[str, Any]] = {}
+
+        for r in self._rows:
+            self._por_id[int(r["id"])] = r
+            if r.get("codigo"):
+                self._por_codigo.setdefault(str(r["codigo"]).strip().upper(), r)
+            if r.get("letra") and r.get("activo"):
+                clave = (str(r["letra"]).strip().upper(), bool(r.get("es_nota_credito")))
+                self._por_letra.setdefault(clave, r)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # -------------------- Búsquedas --------------------
+
+    def by_id(self, tipo_id: Any) -> Optional[Dict[str, Any]]:
+        try:
+            row = self._por_id.get(int(tipo_id))
+        except (TypeError, ValueError):
+            return None
+        return dict(row) if row else None
+
+    def by_codigo(self, codigo: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not codigo:
+            return None
+        row = self._por_codigo.get(str(codigo).strip().upper())
+        return dict(row) if row else None
+
+    def codigo(self, tipo_id: Any) -> Optional[str]:
+        row = self.by_id(tipo_id)
+        return row["codigo"] if row else None
+
+    def es_nota_credito(self, tipo_id: Any) -> bool:
+        row = self.by_id(tipo_id)
+        return bool(row and row.get("es_nota_credito"))
+
+    def por_letra(self, letra: Optional[str], es_nota_credito: bool = False) -> Optional[Dict[str, Any]]:
+        """Tipo activo de esa letra (A/B/C...), factura o nota de crédito."""
+        if not letra:
+            return None
+        row = self._por_letra.get((str(letra).strip().upper(), bool(es_nota_credito)))
+        return dict(row) if row else None
+
+    def activos(self) -> List[Dict[str, Any]]:
+        """Tipos activos ordenados por nombre (lo que muestran los combos)."""
+        return [dict(r) for r in sorted(self._rows, key=lambda r: str(r.get("nombre") or "")) if r.get("activo")]
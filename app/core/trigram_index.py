@@ -0,0 +1,124 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from collections import Counter
+from threading import RLock
+import unicodedata
+
+
+def normalizar(texto: Any) -> str:
+    """Minúsculas, sin acentos, sólo letras/dígitos separados por un espacio."""
+    s = unicodedata.normalize("NFKD", str(texto or "").lower())
+    s = "".join(ch if ch.isalnum() else " " for ch in s if not unicodedata.combining(ch))
+    return " ".join(s.split())
+
+
+def trigramas(palabra: str) -> Set[str]:
+    """
+    Trigramas de una palabra con dos espacios adelante (como pg_trgm, pero
+    sin el de atrás): así "jua" tiene todos sus trigramas en "juan" y los
+    prefijos puntúan completo.
+    """
+    p = f"  {palabra}"
+    return {p[i:i + 3] for i in range(len(p) - 2)}
+
+
+class _Entry:
+    __slots__ = ("texto", "palabras", "grams", "data")
+
+    def __init__(self, texto: str, palabras: Tuple[str, ...], grams: Set[str], data: Dict[str, Any]):
+        self.texto = texto
+        self.palabras = palabras
+        self.grams = grams
+        self.data = data
+
+
+class TrigramIndex:
+    """
+    Índice de búsqueda en memoria por trigramas.
+    - upsert()/remove() por id: se alimenta con deltas
+    - search() rankea sin ir a la base: primero las filas donde cada palabra
+      buscada es prefijo de una palabra indexada, después las que la contienen
+      y al final las parecidas (tolera un error de tipeo)
+    - Thread-safe (lock); devuelve copias de los dicts
+    """
+
+    # Fracción mínima de trigramas de la consulta que tiene que tener una fila
+    SIMILITUD_MINIMA = 0.6
+
+    def __init__(self) -> None:
+        self._entries: Dict[Any, _Entry] = {}
+        self._postings: Dict[str, Set[Any]] = {}
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def upsert(self, id_: Any, textos: Iterable[Any], data: Dict[str, Any]) -> None:
+        """Indexa (o reindexa) la fila `id_` con los textos buscables y su dict."""
+        texto = normalizar(" ".join(str(t) for t in textos if t not in (None, "")))
+        palabras = tuple(dict.fromkeys(texto.split()))
+        grams: Set[str] = set()
+        for p in palabras:
+            grams |= trigramas(p)
+
+        with self._lock:
+            self._quitar(id_)
+            self._entries[id_] = _Entry(texto, palabras, grams, dict(data))
+            for g in grams:
+                self._postings.setdefault(g, set()).add(id_)
+
+    def remove(self, id_: Any) -> None:
+        with self._lock:
+            self._quitar(id_)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+
+    def search(
+        self,
+        q: Any,
+        limit: int = 20,
+        filtro: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> List[Dict[str, Any]]:
+        palabras = normalizar(q).split()
+        if not palabras:
+            return []
+        grams: Set[str] = set()
+        for p in palabras:
+            grams |= trigramas(p)
+
+        with self._lock:
+            conteo: Counter = Counter()
+            for g in grams:
+                conteo.update(self._postings.get(g, ()))
+
+            ranking = []
+            for id_, n in conteo.items():
+                similitud = n / len(grams)
+                if similitud < self.SIMILITUD_MINIMA:
+                    continue
+                e = self._entries[id_]
+                if filtro and not filtro(e.data):
+                    continue
+                prefijos = all(any(w.startswith(p) for w in e.palabras) for p in palabras)
+                contiene = prefijos or all(p in e.texto for p in palabras)
+                ranking.append(((prefijos, contiene, similitud, -len(e.texto)), id_, e.data))
+
+        ranking.sort(key=lambda r: r[0], reverse=True)
+        return [dict(data) for _score, _id, data in ranking[: max(int(limit), 0)]]
+
+    # -------------------- Internos --------------------
+
+    def _quitar(self, id_: Any) -> None:
+        e = self._entries.pop(id_, None)
+        if e is None:
+            return
+        for g in e.grams:
+            ids = self._postings.get(g)
+            if ids is not None:
+                ids.discard(id_)
+                if not ids:
+                    del self._postings[g]
@@ -1,39 +1,294 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import importlib.util
+import threading
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import settings
+from app.core.count_cache import CountCache
+from app.data.pool_monitor import PoolHealthMonitor, ReconnectingSession
+from app.data.replica import ReplicaRouter
 from loguru import logger
 
 
-def _mysql_url() -> str:
-    return (
-        f"mysql+pymysql://{settings.DB_USER}:{settings.DB_PASSWORD}"
-        f"@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
-        f"?charset=utf8mb4"
+# driver en config.json -> (dialecto SQLAlchemy, módulo que tiene que poder importarse)
+_DRIVERS: Dict[str, Tuple[str, str]] = {
+    "mysqlclient": ("mysqldb", "MySQLdb"),
+    "mysqlconnector": ("mysqlconnector", "mysql.connector"),
+    "pymysql": ("pymysql", "pymysql"),
+}
+# Sólo con driver "auto" (explícito) se prueba en este orden: primero los que decodifican filas en C
+_ORDEN_AUTO = ("mysqlclient", "mysqlconnector", "pymysql")
+
+
+def _driver_disponible(nombre: str) -> bool:
+    try:
+        if importlib.util.find_spec(_DRIVERS[nombre][1]) is None:
+            return False
+    except (ImportError, ValueError):
+        return False
+    if nombre == "mysqlconnector":
+        # Sin la extensión C (o si no carga), mysql-connector es tan lento como pymysql
+        try:
+            from mysql.connector import HAVE_CEXT
+        except Exception:
+            return False
+        return bool(HAVE_CEXT)
+    return True
+
+
+def resolver_driver(preferido: Optional[str] = None) -> str:
+    """
+    Driver MySQL a usar: el de config.json (db.driver), pymysql por defecto.
+    Los drivers en C cambian conversión de tipos, clases de error y
+    decodificación, así que sólo se usan si se configuran explícitamente
+    (por nombre o con "auto", que elige el primero instalado de _ORDEN_AUTO).
+    Si el configurado no está instalado se vuelve a pymysql, que viene en
+    requirements.
+    """
+    preferido = (preferido or settings.DB_DRIVER or "pymysql").strip().lower()
+    if preferido == "auto":
+        for nombre in _ORDEN_AUTO:
+            if _driver_disponible(nombre):
+                return nombre
+        return "pymysql"
+
+    if preferido in _DRIVERS and _driver_disponible(preferido):
+        return preferido
+    logger.warning("Driver MySQL '{}' no disponible; se usa pymysql.", preferido)
+    return "pymysql"
+
+
+def _mysql_url(driver: Optional[str] = None, replica: bool = False) -> str:
+    dialecto = _DRIVERS[driver or resolver_driver()][0]
+    if replica:
+        user, password = settings.DB_REPLICA_USER, settings.DB_REPLICA_PASSWORD
+        host, port, name = settings.DB_REPLICA_HOST, settings.DB_REPLICA_PORT, settings.DB_REPLICA_NAME
+    else:
+        user, password = settings.DB_USER, settings.DB_PASSWORD
+        host, port, name = settings.DB_HOST, settings.DB_PORT, settings.DB_NAME
+    return f"mysql+{dialecto}://{user}:{password}@{host}:{port}/{name}?charset=utf8mb4"
+
+
+def make_engine(driver: Optional[str] = None, replica: bool = False, **overrides: Any) -> Engine:
+    """
+    Crea un engine MySQL con la configuración de la app y el driver elegido.
+    Con replica=True apunta a la réplica de lectura (db_replica en config.json).
+    """
+    driver = driver or resolver_driver()
+    connect_args: Dict[str, Any] = {}
+    if driver == "mysqlconnector":
+        connect_args["use_pure"] = False
+
+    opciones: Dict[str, Any] = dict(
+        pool_size=settings.DB_POOL_SIZE,
+        # Con el monitor de salud activo no hace falta un ping en cada checkout
+        pool_pre_ping=settings.DB_HEALTH_INTERVAL <= 0,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        isolation_level="READ COMMITTED",
+        echo=False,
+        future=True,
+        connect_args=connect_args,
     )
+    opciones.update(overrides)
+    logger.debug("Engine MySQL con driver {}", driver)
+    return create_engine(_mysql_url(driver, replica=replica), **opciones)
 
 
-engine = create_engine(
-    _mysql_url(),
-    pool_size=settings.DB_POOL_SIZE,
-    pool_pre_ping=True,
-    pool_timeout=settings.DB_POOL_TIMEOUT,
-    isolation_level="READ COMMITTED",
-    echo=False,
-    future=True,
-)
+engine = make_engine()
+
+# Los totales cacheados de los listados se invalidan con cada escritura confirmada
+CountCache.get().install(engine)
+
+if settings.DB_PROFILER:
+    from app.data.query_profiler import QueryProfiler
+
+    QueryProfiler.get().install(engine)
 
-SessionLocal = sessionmaker(
+if settings.DB_SLOW_QUERY_MS > 0:
+    from app.data.slow_query_log import SlowQueryLog
+
+    SlowQueryLog.get().install(engine, settings.DB_SLOW_QUERY_MS)
+
+if settings.DB_HEALTH_INTERVAL > 0:
+    PoolHealthMonitor.get().install(engine, settings.DB_HEALTH_INTERVAL)
+
+_session_factory = sessionmaker(
     bind=engine,
+    class_=ReconnectingSession,
     autoflush=False,
     autocommit=False,
     future=True,
 )
 
 
+# -------------------- Unidad de trabajo --------------------
+
+_sesion_actual: ContextVar[Optional[Session]] = ContextVar("unidad_de_trabajo", default=None)
+
+
+class _SesionCompartida:
+    """
+    Vista de la sesión de la unidad de trabajo activa para un servicio que
+    se suma a ella.
+
+    - close() y el `with` no cierran: la sesión es de la unidad de trabajo.
+    - commit() sólo hace flush; el commit real lo hace unit_of_work() al
+      terminar, así toda la acción corre en una transacción.
+    - rollback() sí deshace la transacción compartida.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self._session = session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+    def __enter__(self) -> "_SesionCompartida":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+    def commit(self) -> None:
+        self._session.flush()
+
+
+class ScopedSessionFactory:
+    """
+    sessionmaker que se suma a la unidad de trabajo activa del hilo.
+
+    Sin unidad de trabajo se comporta igual que el sessionmaker original
+    (una sesión nueva por llamada). Con unit_of_work() activo devuelve la
+    sesión compartida, así los servicios no necesitan cambios.
+    """
+
+    def __init__(self, maker: sessionmaker) -> None:
+        self._maker = maker
+
+    def __call__(self, **kw: Any) -> Any:
+        actual = _sesion_actual.get()
+        if actual is not None and not kw:
+            return _SesionCompartida(actual)
+        return self._maker(**kw)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._maker, name)
+
+
+SessionLocal = ScopedSessionFactory(_session_factory)
+
+
+# -------------------- Réplica de lectura --------------------
+
+replica_engine: Optional[Engine] = None
+if settings.DB_REPLICA_HOST:
+    # La réplica no lleva monitor de salud propio: pre-ping y listo
+    replica_engine = make_engine(replica=True, pool_pre_ping=True)
+    if settings.DB_PROFILER:
+        from app.data.query_profiler import QueryProfiler
+
+        QueryProfiler.get().install(replica_engine)
+
+# Para reportes, dashboard y búsquedas de listados. Sin réplica (o caída,
+# atrasada o recién escrita la principal) devuelve lo mismo que SessionLocal.
+ReadSessionLocal = ReplicaRouter(
+    # Se lee en cada llamada: respeta un SessionLocal reemplazado (tests)
+    primary=lambda **kw: SessionLocal(**kw),
+    primary_engine=engine,
+    replica_engine=replica_engine,
+    replica_factory=(
+        sessionmaker(bind=replica_engine, class_=ReconnectingSession, autoflush=False, future=True)
+        if replica_engine is not None
+        else None
+    ),
+    stale_s=settings.DB_REPLICA_STALE_S,
+    max_lag=settings.DB_REPLICA_MAX_LAG,
+)
+
+
+@contextmanager
+def unit_of_work(
+    session_factory: Optional[Callable[[], Session]] = None,
+    snapshot: bool = True,
+) -> Iterator[Session]:
+    """
+    Corre un bloque (típicamente la carga de una pantalla) en una sola
+    sesión, conexión y transacción. Todo SessionLocal() que se llame dentro,
+    en este hilo, devuelve esa misma sesión.
+
+    Con snapshot=True en MySQL la transacción usa REPEATABLE READ: todas las
+    lecturas ven la misma foto de la base. Si ya hay una unidad de trabajo
+    activa, se reutiliza. Al salir hace commit (o rollback si hubo excepción).
+    """
+    actual = _sesion_actual.get()
+    if actual is not None:
+        yield actual
+        return
+
+    if session_factory is None:
+        # Se lee en cada llamada: respeta un SessionLocal reemplazado (tests)
+        session_factory = getattr(SessionLocal, "_maker", SessionLocal)
+    session: Session = session_factory()
+    if snapshot and session.get_bind().dialect.name == "mysql":
+        session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    token = _sesion_actual.set(session)
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        _sesion_actual.reset(token)
+        session.close()
+
+
+def warm_up_pool(size: Optional[int] = None, timeout: float = 15.0) -> int:
+    """
+    Abre `size` conexiones del pool en paralelo (por defecto DB_POOL_SIZE) y
+    las devuelve, así el handshake TCP / auth / charset ya está pagado
+    cuando llega la primera consulta real. Devuelve cuántas quedaron listas.
+    """
+    size = max(int(size or settings.DB_POOL_SIZE), 1)
+    # Cada hilo retiene su conexión hasta que abrieron todas: si no, el pool
+    # devolvería siempre la misma en vez de crear `size` distintas.
+    barrera = threading.Barrier(size, timeout=timeout)
+
+    def abrir(_i: int) -> bool:
+        try:
+            with engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+                try:
+                    barrera.wait()
+                except threading.BrokenBarrierError:
+                    pass
+            return True
+        except Exception as e:
+            barrera.abort()
+            logger.warning("No se pudo precalentar una conexión a la base: {}", e)
+            return False
+
+    with ThreadPoolExecutor(max_workers=size, thread_name_prefix="db-warmup") as pool:
+        listas = sum(pool.map(abrir, range(size)))
+
+    logger.debug("Pool de conexiones precalentado: {}/{}", listas, size)
+    return listas
+
+
 def get_session():
     try:
         db = SessionLocal()
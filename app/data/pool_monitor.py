@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+from threading import Event, RLock, Thread, local
+from typing import Any, Dict, List, Optional
+
+import time
+
+from loguru import logger
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+
+# Códigos MySQL de conexión perdida: "server has gone away" / "lost connection"
+CODIGOS_DESCONEXION = (2006, 2013)
+
+
+def es_desconexion(error: BaseException) -> bool:
+    """True si el error es una conexión caída (no un error de la consulta)."""
+    if getattr(error, "connection_invalidated", False):
+        return True
+    orig = getattr(error, "orig", None)
+    args = getattr(orig, "args", None) or ()
+    return bool(args) and args[0] in CODIGOS_DESCONEXION
+
+
+class PoolHealthMonitor:
+    """
+    Reemplaza el pool_pre_ping (un SELECT 1 en cada checkout) por un chequeo
+    en segundo plano.
+
+    - Cada `interval` segundos toma hasta LOTE_REVISION conexiones ociosas
+      del pool, les hace ping y descarta las muertas: la próxima consulta ya
+      no se las encuentra.
+    - En el checkout sólo se hace ping si la conexión lleva más de
+      `max_idle` segundos sin uso ni chequeo (monitor frenado, equipo que
+      volvió de suspensión, etc.). Si falla, el pool la reemplaza solo.
+    - Si igual se cae una conexión, ReconnectingSession reintenta una vez la
+      primera sentencia de la transacción (ver abajo).
+    - stats() alimenta la pantalla de diagnóstico. Los contadores se tocan
+      desde cualquier hilo (checkout, sesiones, monitor): siempre con lock.
+    """
+    _instance: "PoolHealthMonitor" = None
+    _lock = RLock()
+
+    # Conexiones ociosas que se revisan por pasada: si se tomaran todas, los
+    # checkouts de la app de ese momento irían al overflow mientras duran los
+    # pings. El pool las devuelve en orden FIFO, así que las pasadas
+    # siguientes revisan las demás.
+    LOTE_REVISION = 2
+
+    def __init__(self) -> None:
+        self._engine: Optional[Engine] = None
+        self._interval = 60.0
+        self._max_idle = 120.0
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self._local = local()
+        self._contadores: Dict[str, int] = {
+            "revisiones": 0,
+            "pings": 0,
+            "expulsadas": 0,
+            "pings_checkout": 0,
+            "reemplazadas_checkout": 0,
+            "reintentos": 0,
+        }
+
+    @classmethod
+    def get(cls) -> "PoolHealthMonitor":
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = PoolHealthMonitor()
+            return cls._instance
+
+    # -------------------- Engine --------------------
+
+    def install(
+        self,
+        engine: Engine,
+        interval: float,
+        max_idle: Optional[float] = None,
+        start: bool = True,
+    ) -> None:
+        with self._lock:
+            if self._engine is not None:
+                return
+            self._engine = engine
+            self._interval = float(interval)
+            self._max_idle = float(max_idle if max_idle is not None else interval * 2)
+            event.listen(engine, "checkin", self._on_checkin)
+            event.listen(engine, "checkout", self._on_checkout)
+            if start:
+                self._stop.clear()
+                self._thread = Thread(target=self._run, name="db-pool-monitor", daemon=True)
+                self._thread.start()
+        logger.debug("Monitor del pool activo (cada {} s)", self._interval)
+
+    def uninstall(self, timeout: Optional[float] = 2.0) -> None:
+        with self._lock:
+            engine, self._engine = self._engine, None
+            thread, self._thread = self._thread, None
+        if engine is None:
+            return
+        self._stop.set()
+        event.remove(engine, "checkin", self._on_checkin)
+        event.remove(engine, "checkout", self._on_checkout)
+        if thread:
+            thread.join(timeout)
+
+    # -------------------- Eventos del pool --------------------
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        if dbapi_connection is not None:
+            connection_record.info["_health_ok"] = time.monotonic()
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        if getattr(self._local, "revisando", False):
+            return
+        ultimo = connection_record.info.get("_health_ok")
+        if ultimo is None or time.monotonic() - ultimo < self._max_idle:
+            # Recién creada o usada/chequeada hace poco: se confía en ella
+            return
+
+        self._sumar("pings_checkout")
+        if self._ping(dbapi_connection):
+            connection_record.info["_health_ok"] = time.monotonic()
+            return
+        self._sumar("reemplazadas_checkout")
+        # El pool descarta esta conexión y reintenta con una nueva
+        raise exc.DisconnectionError("Conexión ociosa caída; se reemplaza")
+
+    def _ping(self, dbapi_connection) -> bool:
+        engine = self._engine
+        if engine is None:
+            return True
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+            return True
+        except Exception:
+            return False
+
+    # -------------------- Hilo de chequeo --------------------
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self.revisar()
+            except Exception as e:
+                logger.warning("Monitor del pool: falló la revisión: {}", e)
+
+    def revisar(self) -> int:
+        """
+        Hace ping a las conexiones ociosas y descarta las caídas.
+        Devuelve cuántas se descartaron.
+        """
+        engine = self._engine
+        if engine is None:
+            return 0
+        pool = engine.pool
+        checkedin = getattr(pool, "checkedin", None)
+        ociosas = checkedin() if callable(checkedin) else 0
+        lote = min(ociosas, max(int(self.LOTE_REVISION), 1))
+
+        self._sumar("revisiones")
+        self._local.revisando = True
+        tomadas: List[Any] = []
+        expulsadas = 0
+        try:
+            # Se toma el lote entero antes de hacer ping: si se devolvieran de
+            # a una, el pool entregaría siempre la misma
+            for _ in range(lote):
+                try:
+                    tomadas.append(pool.connect())
+                except Exception:
+                    break
+            for conn in tomadas:
+                self._sumar("pings")
+                if not self._ping(conn.dbapi_connection):
+                    conn.invalidate()
+                    expulsadas += 1
+        finally:
+            self._local.revisando = False
+            for conn in tomadas:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+        if expulsadas:
+            self._sumar("expulsadas", expulsadas)
+            logger.info("Monitor del pool: {} conexiones caídas descartadas", expulsadas)
+        return expulsadas
+
+    # -------------------- Diagnóstico --------------------
+
+    def _sumar(self, contador: str, n: int = 1) -> None:
+        with self._lock:
+            self._contadores[contador] += n
+
+    def registrar_reintento(self) -> None:
+        self._sumar("reintentos")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._contadores)
+        engine = self._engine
+        out["activo"] = engine is not None
+        out["intervalo_s"] = self._interval
+        if engine is not None:
+            for nombre in ("size", "checkedin", "checkedout", "overflow"):
+                fn = getattr(engine.pool, nombre, None)
+                if callable(fn):
+                    out[nombre] = fn()
+        return out
+
+
+class ReconnectingSession(Session):
+    """
+    Session que reintenta una vez la primera sentencia de una transacción si
+    la conexión estaba caída (MySQL 2006/2013).
+
+    Sólo se reintenta cuando la sentencia es la que abre la transacción: no
+    hubo nada antes que se pueda perder, así que repetirla es seguro. Para
+    el patrón de una sesión por llamada es justamente el caso habitual.
+    """
+
+    def execute(self, statement, params=None, **kw):
+        reintentable = not self.in_transaction()
+        try:
+            return super().execute(statement, params, **kw)
+        except exc.DBAPIError as e:
+            if not (reintentable and es_desconexion(e)):
+                raise
+            logger.warning("Conexión a la base caída; se reintenta con una nueva")
+            PoolHealthMonitor.get().registrar_reintento()
+            self.rollback()
+            return super().execute(statement, params, **kw)
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from collections import Counter, deque
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from threading import RLock
+from typing import Any, Deque, Dict, List, Optional
+
+import json
+import re
+import sys
+import time
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+
+_RE_COMENTARIO = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_RE_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_RE_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|:\w+|\?")
+_RE_NUMERO = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_RE_ESPACIOS = re.compile(r"\s+")
+_RE_LISTA = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+@lru_cache(maxsize=2048)
+def normalizar_sql(statement: str) -> str:
+    """
+    Forma canónica de una sentencia para agrupar: sin comentarios, literales
+    y parámetros reemplazados por ?, listas IN (?, ?, ...) colapsadas y
+    espacios unificados.
+    """
+    sql = _RE_COMENTARIO.sub(" ", statement)
+    sql = _RE_STRING.sub("?", sql)
+    sql = _RE_PLACEHOLDER.sub("?", sql)
+    sql = _RE_NUMERO.sub("?", sql)
+    sql = _RE_LISTA.sub("(?)", sql)
+    return _RE_ESPACIOS.sub(" ", sql).strip()
+
+
+def _llamador() -> str:
+    """
+    Primer frame de la app fuera de la capa de datos (servicio / repositorio /
+    reporte). Si la consulta no viene de app.*, el primero fuera de SQLAlchemy.
+    """
+    frame = sys._getframe(2)
+    profundidad = 0
+    externo = None
+    while frame is not None and profundidad < 60:
+        modulo = frame.f_globals.get("__name__", "")
+        if not modulo.startswith(("sqlalchemy.", "app.data.")):
+            if modulo.startswith("app."):
+                return f"{modulo}.{frame.f_code.co_qualname}"
+            if externo is None:
+                externo = f"{modulo}.{frame.f_code.co_qualname}"
+        frame = frame.f_back
+        profundidad += 1
+    return externo or "?"
+
+
+class _StatementStats:
+    MUESTRAS = 512
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.muestras: Deque[float] = deque(maxlen=self.MUESTRAS)
+        self.llamadores: Counter[str] = Counter()
+
+    def registrar(self, ms: float, rows: int, llamador: str) -> None:
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.rows += max(rows, 0)
+        self.muestras.append(ms)
+        self.llamadores[llamador] += 1
+
+    @staticmethod
+    def _percentil(ordenadas: List[float], p: float) -> float:
+        if not ordenadas:
+            return 0.0
+        idx = min(int(round(p * (len(ordenadas) - 1))), len(ordenadas) - 1)
+        return ordenadas[idx]
+
+    def to_dict(self, sql: str) -> Dict[str, Any]:
+        ordenadas = sorted(self.muestras)
+        return {
+            "sql": sql,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "p50_ms": round(self._percentil(ordenadas, 0.50), 3),
+            "p95_ms": round(self._percentil(ordenadas, 0.95), 3),
+            "max_ms": round(self.max_ms, 3),
+            "rows": self.rows,
+            "llamadores": [{"metodo": m, "count": n} for m, n in self.llamadores.most_common(5)],
+        }
+
+
+class QueryProfiler:
+    """
+    Perfilador de consultas a nivel aplicación, colgado de los eventos
+    before/after_cursor_execute del engine.
+
+    - Agrupa por sentencia normalizada: cantidad, p50/p95/máx de latencia,
+      filas devueltas y qué método de servicio/repositorio la dispara.
+    - snapshot() alimenta la pantalla de diagnóstico; dump_jsonl() baja el
+      acumulado a logs/ en AppData para comparar entre puestos.
+    - Las latencias por sentencia se guardan en una ventana de las últimas
+      _StatementStats.MUESTRAS ejecuciones, así la memoria queda acotada.
+    """
+    _instance: "QueryProfiler" = None
+    _lock = RLock()
+
+    def __init__(self) -> None:
+        self._stats: Dict[str, _StatementStats] = {}
+        self._desde = datetime.now()
+        self._engines: List[Engine] = []
+
+    @classmethod
+    def get(cls) -> "QueryProfiler":
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = QueryProfiler()
+            return cls._instance
+
+    # -------------------- Engine --------------------
+
+    def install(self, engine: Engine) -> None:
+        with self._lock:
+            if engine in self._engines:
+                return
+            event.listen(engine, "before_cursor_execute", self._before)
+            event.listen(engine, "after_cursor_execute", self._after)
+            self._engines.append(engine)
+
+    def uninstall(self, engine: Engine) -> None:
+        with self._lock:
+            if engine not in self._engines:
+                return
+            event.remove(engine, "before_cursor_execute", self._before)
+            event.remove(engine, "after_cursor_execute", self._after)
+            self._engines.remove(engine)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        # Los EXPLAIN del log de consultas lentas no son carga de la app
+        if conn.info.get("_slow_explain"):
+            return
+        conn.info.setdefault("_profiler_t0", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if conn.info.get("_slow_explain"):
+            return
+        inicios = conn.info.get("_profiler_t0")
+        if not inicios:
+            return
+        ms = (time.perf_counter() - inicios.pop()) * 1000.0
+        try:
+            rows = int(cursor.rowcount)
+        except Exception:
+            rows = 0
+        self.registrar(statement, ms, rows, _llamador())
+
+    # -------------------- API --------------------
+
+    def registrar(self, statement: str, ms: float, rows: int = 0, llamador: str = "?") -> None:
+        sql = normalizar_sql(statement)
+        with self._lock:
+            stats = self._stats.get(sql)
+            if stats is None:
+                stats = self._stats[sql] = _StatementStats()
+            stats.registrar(ms, rows, llamador)
+
+    def snapshot(self, orden: str = "total_ms") -> List[Dict[str, Any]]:
+        """Estadísticas por sentencia, de la más costosa a la menos."""
+        with self._lock:
+            filas = [stats.to_dict(sql) for sql, stats in self._stats.items()]
+        return sorted(filas, key=lambda f: f.get(orden) or 0, reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._desde = datetime.now()
+
+    def dump_jsonl(self, path: Optional[Path] = None) -> Optional[Path]:
+        """
+        Agrega el acumulado actual a un JSONL (una línea por sentencia) en
+        logs/sql_profile_AAAAMMDD.jsonl. Devuelve la ruta, o None si no hay datos.
+        """
+        filas = self.snapshot()
+        if not filas:
+            return None
+
+        ahora = datetime.now()
+        path = Path(path or Path(settings.APP_DATA_DIR) / "logs" / f"sql_profile_{ahora:%Y%m%d}.jsonl")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            desde = self._desde
+
+        with open(path, "a", encoding="utf-8") as f:
+            for fila in filas:
+                fila = {"ts": ahora.isoformat(timespec="seconds"), "desde": desde.isoformat(timespec="seconds"), **fila}
+                f.write(json.dumps(fila, ensure_ascii=False) + "\n")
+
+        logger.info("Perfil SQL: {} sentencias guardadas en {}", len(filas), path)
+        return path
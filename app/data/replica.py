@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from threading import RLock
+from typing import Any, Callable, Optional
+
+import time
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+
+_ESCRITURAS = ("INSERT", "UPDATE", "DELETE", "REPLAC")
+
+
+class ReplicaRouter:
+    """
+    sessionmaker para lecturas que pueden ir a la réplica (reportes,
+    dashboard, búsquedas de listados).
+
+    Usa la base principal (`primary`) cuando:
+    - no hay réplica configurada,
+    - la réplica no responde o va más de `max_lag` segundos atrasada
+      (se vuelve a probar cada PROBE_TTL segundos),
+    - hubo una escritura en la principal hace menos de `stale_s` segundos
+      (nunca menos que `max_lag`: una réplica "sana" puede ir hasta ese
+      atraso): quien lee después de grabar tiene que ver lo que grabó,
+    - hay una unidad de trabajo activa (la lectura se suma a su transacción).
+    """
+
+    PROBE_TTL = 30.0
+
+    def __init__(
+        self,
+        primary: Callable[..., Session],
+        primary_engine: Optional[Engine] = None,
+        replica_engine: Optional[Engine] = None,
+        replica_factory: Optional[Callable[[], Session]] = None,
+        stale_s: float = 5.0,
+        max_lag: float = 30.0,
+    ) -> None:
+        self._primary = primary
+        self._replica_engine = replica_engine
+        self._replica_factory = replica_factory
+        if replica_engine is not None and replica_factory is None:
+            self._replica_factory = sessionmaker(bind=replica_engine, autoflush=False, future=True)
+        self.stale_s = float(stale_s)
+        self.max_lag = float(max_lag)
+
+        self._lock = RLock()
+        self._ultima_escritura = 0.0
+        self._probado = 0.0
+        self._ok = False
+        self.lecturas_replica = 0
+        self.lecturas_principal = 0
+
+        if primary_engine is not None and replica_engine is not None:
+            event.listen(primary_engine, "after_cursor_execute", self._after_execute)
+
+    # -------------------- Ruteo --------------------
+
+    def __call__(self, **kw: Any) -> Any:
+        if self.usar_replica():
+            self.lecturas_replica += 1
+            return self._replica_factory(**kw)
+        self.lecturas_principal += 1
+        return self._primary(**kw)
+
+    def usar_replica(self) -> bool:
+        if self._replica_factory is None:
+            return False
+        from app.data.database import _sesion_actual  # lazy import: evita el ciclo
+
+        if _sesion_actual.get() is not None:
+            return False
+        if time.monotonic() - self._ultima_escritura < self.ventana_escritura():
+            return False
+        return self.disponible()
+
+    def ventana_escritura(self) -> float:
+        """Segundos después de una escritura en que se sigue leyendo de la principal."""
+        return max(self.stale_s, self.max_lag)
+
+    def registrar_escritura(self) -> None:
+        self._ultima_escritura = time.monotonic()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.lstrip()[:6].upper() in _ESCRITURAS:
+            self.registrar_escritura()
+
+    # -------------------- Estado de la réplica --------------------
+
+    def disponible(self) -> bool:
+        if time.monotonic() - self._probado < self.PROBE_TTL:
+            return self._ok
+        with self._lock:
+            if time.monotonic() - self._probado < self.PROBE_TTL:
+                return self._ok
+            ok = self._probar()
+            if ok != self._ok:
+                if ok:
+                    logger.info("Réplica de lectura disponible; reportes y listados van a la réplica")
+                else:
+                    logger.warning("Réplica de lectura no disponible; se lee de la base principal")
+            self._ok = ok
+            self._probado = time.monotonic()
+            return ok
+
+    def invalidar(self) -> None:
+        """Fuerza a volver a probar la réplica en la próxima lectura."""
+        self._probado = 0.0
+
+    def _probar(self) -> bool:
+        engine = self._replica_engine
+        if engine is None:
+            return self._replica_factory is not None
+        try:
+            with engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+                if engine.dialect.name != "mysql":
+                    return True
+                lag = self._atraso(conn)
+        except Exception as e:
+            logger.debug("Réplica de lectura: no responde: {}", e)
+            return False
+        if lag is None:
+            logger.warning("Réplica de lectura: replicación detenida o estado ilegible")
+            return False
+        if lag > self.max_lag:
+            logger.warning("Réplica de lectura: {} s de atraso (máximo {})", lag, self.max_lag)
+            return False
+        return True
+
+    @staticmethod
+    def _atraso(conn) -> Optional[float]:
+        """
+        Segundos de atraso de la réplica; 0 si no es una réplica (copia local).
+        None si la replicación está detenida o no se puede leer su estado
+        (p. ej. falta el privilegio REPLICATION CLIENT): no hay forma de
+        saber cuán atrasada está, así que no se usa.
+        """
+        error: Optional[Exception] = None
+        for sql in ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS"):
+            try:
+                fila = conn.exec_driver_sql(sql).mappings().first()
+            except Exception as e:
+                error = e
+                continue
+            if fila is None:
+                return 0.0
+            lag = fila.get("Seconds_Behind_Source", fila.get("Seconds_Behind_Master"))
+            return None if lag is None else float(lag)
+
+        logger.warning("Réplica de lectura: no se puede leer el estado de la replicación: {}", error)
+        return None
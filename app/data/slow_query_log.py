@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+from threading import RLock, Thread
+from typing import Any, Dict, Optional, Tuple
+
+import json
+import queue
+import time
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.data.query_profiler import _llamador, normalizar_sql
+
+
+class SlowQueryLog:
+    """
+    Registro de consultas lentas con su plan de ejecución (opt-in).
+
+    - Toda sentencia que supere `threshold_ms` se anota con sus parámetros,
+      la duración y el método que la disparó.
+    - Para SELECT / UPDATE / DELETE se corre EXPLAIN FORMAT=JSON en una
+      conexión aparte, desde un hilo propio: la consulta original no espera
+      al EXPLAIN. El plan de una misma sentencia normalizada se reutiliza
+      durante PLAN_TTL segundos para no cargar la base con EXPLAIN repetidos.
+    - Se escribe en logs/slow_queries_AAAAMMDD.jsonl (una línea por consulta).
+    - Si la cola se llena (base muy cargada) se descartan entradas en vez
+      de frenar a la app.
+    """
+    _instance: "SlowQueryLog" = None
+    _lock = RLock()
+
+    PLAN_TTL = 600.0
+    COLA_MAX = 200
+    EXPLICABLES = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+    def __init__(self) -> None:
+        self._engine: Optional[Engine] = None
+        self._threshold_ms = 0.0
+        self._dir = Path(settings.APP_DATA_DIR) / "logs"
+        self._cola: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=self.COLA_MAX)
+        self._planes: Dict[str, Tuple[float, Any, Optional[str]]] = {}
+        self._thread: Optional[Thread] = None
+        self.descartadas = 0
+
+    @classmethod
+    def get(cls) -> "SlowQueryLog":
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = SlowQueryLog()
+            return cls._instance
+
+    # -------------------- Engine --------------------
+
+    def install(self, engine: Engine, threshold_ms: float, log_dir: Optional[Path] = None) -> None:
+        with self._lock:
+            if self._engine is not None:
+                return
+            self._engine = engine
+            self._threshold_ms = float(threshold_ms)
+            if log_dir is not None:
+                self._dir = Path(log_dir)
+            event.listen(engine, "before_cursor_execute", self._before)
+            event.listen(engine, "after_cursor_execute", self._after)
+            self._thread = Thread(target=self._run, name="slow-query-log", daemon=True)
+            self._thread.start()
+        logger.info("Log de consultas lentas activo (>= {} ms)", self._threshold_ms)
+
+    def uninstall(self, timeout: Optional[float] = 2.0) -> None:
+        with self._lock:
+            engine, self._engine = self._engine, None
+            thread, self._thread = self._thread, None
+        if engine is None:
+            return
+        event.remove(engine, "before_cursor_execute", self._before)
+        event.remove(engine, "after_cursor_execute", self._after)
+        self._cola.put(None)
+        if thread:
+            thread.join(timeout)
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Espera a que se escriban las entradas encoladas (tests / cierre)."""
+        limite = time.monotonic() + timeout
+        while self._cola.unfinished_tasks and time.monotonic() < limite:
+            time.sleep(0.01)
+
+    # -------------------- Eventos --------------------
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if conn.info.get("_slow_explain"):
+            return
+        conn.info.setdefault("_slow_t0", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if conn.info.get("_slow_explain"):
+            return
+        inicios = conn.info.get("_slow_t0")
+        if not inicios:
+            return
+        ms = (time.perf_counter() - inicios.pop()) * 1000.0
+        if ms < self._threshold_ms:
+            return
+
+        entrada = {
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "ms": round(ms, 3),
+            "llamador": _llamador(),
+            "sql": statement,
+            "params": None if executemany else parameters,
+        }
+        try:
+            self._cola.put_nowait(entrada)
+        except queue.Full:
+            self.descartadas += 1
+
+    # -------------------- Hilo de escritura --------------------
+
+    def _run(self) -> None:
+        while True:
+            entrada = self._cola.get()
+            try:
+                if entrada is None:
+                    return
+                self._escribir(entrada)
+            except Exception as e:
+                logger.warning("Log de consultas lentas: no se pudo registrar una entrada: {}", e)
+            finally:
+                self._cola.task_done()
+
+    def _escribir(self, entrada: Dict[str, Any]) -> None:
+        normalizada = normalizar_sql(entrada["sql"])
+        plan, error = self._plan(normalizada, entrada["sql"], entrada["params"])
+
+        linea = {**entrada, "sql_normalizada": normalizada, "plan": plan}
+        if error:
+            linea["plan_error"] = error
+
+        self._dir.mkdir(parents=True, exist_ok=True)
+        path = self._dir / f"slow_queries_{datetime.now():%Y%m%d}.jsonl"
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(linea, ensure_ascii=False, default=str) + "\n")
+
+    def _plan(self, normalizada: str, statement: str, params: Any) -> Tuple[Any, Optional[str]]:
+        if not statement.lstrip().upper().startswith(self.EXPLICABLES):
+            return None, None
+
+        cacheado = self._planes.get(normalizada)
+        if cacheado and time.monotonic() - cacheado[0] < self.PLAN_TTL:
+            return cacheado[1], cacheado[2]
+
+        plan, error = self._explain(statement, params)
+        self._planes[normalizada] = (time.monotonic(), plan, error)
+        return plan, error
+
+    def _explain(self, statement: str, params: Any) -> Tuple[Any, Optional[str]]:
+        engine = self._engine
+        if engine is None:
+            return None, "engine no disponible"
+
+        if engine.dialect.name == "mysql":
+            prefijo = "EXPLAIN FORMAT=JSON "
+        else:
+            prefijo = "EXPLAIN QUERY PLAN "
+
+        try:
+            with engine.connect() as conn:
+                conn.info["_slow_explain"] = True
+                try:
+                    filas = conn.exec_driver_sql(prefijo + statement, params or ()).all()
+                finally:
+                    conn.info.pop("_slow_explain", None)
+                    conn.rollback()
+        except Exception as e:
+            return None, str(e)
+
+        if engine.dialect.name == "mysql" and filas:
+            try:
+                return json.loads(filas[0][0]), None
+            except (TypeError, ValueError):
+                return filas[0][0], None
+        return [list(f) for f in filas], None
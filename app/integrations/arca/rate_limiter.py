@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, Optional
+
+import threading
+import time
+
+from app.core.config import settings
+
+
+class TokenBucket:
+    """
+    Limitador token-bucket thread-safe.
+
+    - rate: tokens que se reponen por segundo
+    - capacity: ráfaga máxima permitida
+
+    acquire() bloquea hasta que haya un token disponible (o vence el timeout).
+    Se comparte entre hilos para que varios workers no superen, sumados, el
+    límite de requests de AFIP.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("El rate del limitador debe ser mayor a cero.")
+        self._rate = float(rate)
+        self._capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self._capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else self._clock() + timeout
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self._rate
+
+            if deadline is not None:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+
+            self._sleep(wait)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._last
+        if elapsed > 0:
+            self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+            self._last = now
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str = "wsfe") -> TokenBucket:
+    """Limitador compartido por proceso para un servicio de AFIP."""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            rate = max(float(settings.ARCA_MAX_RPS), 0.1)
+            limiter = TokenBucket(rate=rate, capacity=rate)
+            _limiters[name] = limiter
+        return limiter
+
+
+def set_rate_limit(name: str, rate: float, capacity: Optional[float] = None) -> TokenBucket:
+    """Reemplaza el limitador de `name` (benchmarks, cambio de configuración)."""
+    limiter = TokenBucket(rate=rate, capacity=capacity)
+    with _limiters_lock:
+        _limiters[name] = limiter
+    return limiter
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import http.client
+import select
+import socket
+import ssl
+import threading
+import time
+
+from loguru import logger
+
+
+# -------------------- Políticas por operación --------------------
+
+
+@dataclass(frozen=True)
+class OperationPolicy:
+    """
+    Timeout y reintentos de una operación SOAP.
+
+    - timeout: segundos para conectar / leer la respuesta
+    - retries: reintentos ante fallas de red (0 = un solo intento)
+    - idempotent: si es False, sólo se reintenta cuando el request no llegó
+      a enviarse (conexión keep-alive vencida); nunca después de enviarlo.
+    """
+    timeout: float = 30.0
+    retries: int = 0
+    idempotent: bool = True
+
+
+# FECAESolicitar no es idempotente: reenviarlo tras un timeout puede
+# autorizar dos veces o disparar 10016. loginCms tampoco: WSAA rechaza un
+# segundo TA mientras el primero siga vigente. Las consultas sí se reintentan.
+DEFAULT_POLICIES: Dict[str, OperationPolicy] = {
+    "FECAESolicitar": OperationPolicy(timeout=45.0, retries=0, idempotent=False),
+    "FECompUltimoAutorizado": OperationPolicy(timeout=15.0, retries=2),
+    "FECompConsultar": OperationPolicy(timeout=15.0, retries=2),
+    "loginCms": OperationPolicy(timeout=30.0, retries=0, idempotent=False),
+}
+
+_FALLBACK_POLICY = OperationPolicy()
+
+# Errores que indican que la conexión reutilizada ya estaba muerta o que la
+# red falló; cualquier otro error se propaga sin reintentar. ssl.SSLError
+# también es OSError, pero se trata aparte (ver post): un certificado
+# inválido o un handshake rechazado no se arreglan reintentando.
+_NETWORK_ERRORS: Tuple[type, ...] = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    http.client.IncompleteRead,
+    ConnectionError,
+    socket.timeout,
+    TimeoutError,
+    OSError,
+)
+
+
+def build_ssl_context(legacy_ciphers: bool = False) -> ssl.SSLContext:
+    """
+    Contexto TLS para AFIP. WSFE todavía negocia con claves DH cortas, por
+    eso necesita SECLEVEL=1; WSAA funciona con el contexto por defecto.
+    """
+    context = ssl.create_default_context()
+    if legacy_ciphers:
+        context.set_ciphers("DEFAULT@SECLEVEL=1")
+    return context
+
+
+# -------------------- Pool por endpoint --------------------
+
+
+class _PooledConnection:
+    def __init__(self, conn: http.client.HTTPConnection) -> None:
+        self.conn = conn
+        self.last_used = time.monotonic()
+
+
+class HttpConnectionPool:
+    """
+    Pool de conexiones HTTP/1.1 keep-alive hacia un único host.
+
+    Thread-safe: cada hilo toma una conexión libre (o abre una nueva) y la
+    devuelve al terminar. Las conexiones ociosas más de `idle_timeout`
+    segundos se descartan antes de reutilizarlas, porque AFIP corta los
+    keep-alive del lado del servidor.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        max_idle: int = 4,
+        idle_timeout: float = 50.0,
+        policies: Optional[Dict[str, OperationPolicy]] = None,
+    ) -> None:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Esquema no soportado para ARCA: {url}")
+
+        self.url = url
+        self.scheme = parts.scheme
+        self.host = parts.hostname or ""
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.path = parts.path or "/"
+        if parts.query:
+            self.path += "?" + parts.query
+
+        self._ssl_context = ssl_context if self.scheme == "https" else None
+        self._max_idle = max(int(max_idle), 0)
+        self._idle_timeout = float(idle_timeout)
+        self._policies = dict(DEFAULT_POLICIES)
+        if policies:
+            self._policies.update(policies)
+
+        self._idle: List[_PooledConnection] = []
+        self._lock = threading.Lock()
+        self._stats = {"conexiones_abiertas": 0, "reutilizadas": 0, "reintentos": 0}
+
+    # -------- API --------
+
+    def policy_for(self, operation: str) -> OperationPolicy:
+        return self._policies.get(operation, _FALLBACK_POLICY)
+
+    def post(
+        self,
+        body: bytes,
+        headers: Dict[str, str],
+        *,
+        operation: str,
+        timeout: Optional[float] = None,
+    ) -> Tuple[int, bytes]:
+        """
+        Envía un POST al path del endpoint y devuelve (status, body).
+
+        Ante fallas de red reintenta según la política de la operación;
+        si se agotan los intentos propaga la última excepción.
+        """
+        policy = self.policy_for(operation)
+        effective_timeout = float(timeout if timeout is not None else policy.timeout)
+        attempts = max(int(policy.retries), 0) + 1
+        attempt = 0
+
+        while True:
+            attempt += 1
+            pooled, reused = self._acquire(effective_timeout)
+            sent = False
+            try:
+                pooled.conn.request("POST", self.path, body=body, headers=headers)
+                sent = True
+                resp = pooled.conn.getresponse()
+                data = resp.read()
+            except ssl.SSLError as ex:
+                self._discard(pooled)
+                # Sesión TLS cerrada del otro lado en una conexión reutilizada:
+                # keep-alive vencido, se reintenta sin consumir intentos
+                if reused and not sent and isinstance(ex, (ssl.SSLEOFError, ssl.SSLZeroReturnError)):
+                    attempt -= 1
+                    continue
+                raise
+            except _NETWORK_ERRORS as ex:
+                self._discard(pooled)
+
+                # Una conexión reutilizada que falla antes de enviar estaba
+                # vencida: se reintenta siempre, sin consumir intentos.
+                if reused and not sent:
+                    attempt -= 1
+                    continue
+
+                if not policy.idempotent or attempt >= attempts:
+                    raise
+
+                with self._lock:
+                    self._stats["reintentos"] += 1
+                logger.warning(
+                    "Reintentando {} contra {} ({}/{}): {}",
+                    operation,
+                    self.host,
+                    attempt,
+                    attempts - 1,
+                    ex,
+                )
+                time.sleep(min(0.5 * attempt, 2.0))
+                continue
+            except Exception:
+                self._discard(pooled)
+                raise
+
+            if resp.will_close:
+                self._discard(pooled)
+            else:
+                self._release(pooled)
+            return resp.status, data
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            self._close_quietly(pooled)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "ociosas": len(self._idle)}
+
+    # -------- Internos --------
+
+    def _acquire(self, timeout: float) -> Tuple[_PooledConnection, bool]:
+        now = time.monotonic()
+        stale: List[_PooledConnection] = []
+        pooled: Optional[_PooledConnection] = None
+
+        with self._lock:
+            while self._idle:
+                candidate = self._idle.pop()
+                if now - candidate.last_used > self._idle_timeout or self._is_dropped(candidate):
+                    stale.append(candidate)
+                    continue
+                pooled = candidate
+                self._stats["reutilizadas"] += 1
+                break
+
+        for s in stale:
+            self._close_quietly(s)
+
+        if pooled is not None:
+            pooled.conn.timeout = timeout
+            if pooled.conn.sock is not None:
+                pooled.conn.sock.settimeout(timeout)
+            return pooled, True
+
+        if self.scheme == "https":
+            conn: http.client.HTTPConnection = http.client.HTTPSConnection(
+                self.host, self.port, timeout=timeout, context=self._ssl_context
+            )
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+
+        with self._lock:
+            self._stats["conexiones_abiertas"] += 1
+        return _PooledConnection(conn), False
+
+    @staticmethod
+    def _is_dropped(pooled: _PooledConnection) -> bool:
+        """Una conexión ociosa legible significa que el servidor la cerró."""
+        sock = pooled.conn.sock
+        if sock is None:
+            return True
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(readable)
+
+    def _release(self, pooled: _PooledConnection) -> None:
+        pooled.last_used = time.monotonic()
+        with self._lock:
+            if len(self._idle) < self._max_idle:
+                self._idle.append(pooled)
+                return
+        self._close_quietly(pooled)
+
+    def _discard(self, pooled: _PooledConnection) -> None:
+        self._close_quietly(pooled)
+
+    @staticmethod
+    def _close_quietly(pooled: _PooledConnection) -> None:
+        try:
+            pooled.conn.close()
+        except Exception:
+            pass
+
+
+# -------------------- Registro de pools --------------------
+
+
+_pools: Dict[Tuple[str, str], HttpConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(
+    url: str,
+    *,
+    profile: str = "default",
+    ssl_context_factory: Callable[[], ssl.SSLContext] = build_ssl_context,
+) -> HttpConnectionPool:
+    """
+    Devuelve el pool compartido para `url`. El contexto SSL se construye una
+    sola vez por endpoint; `profile` separa endpoints que requieren
+    contextos distintos (p. ej. WSFE con SECLEVEL=1).
+    """
+    key = (url, profile)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            context = ssl_context_factory() if url.lower().startswith("https") else None
+            pool = HttpConnectionPool(url, ssl_context=context)
+            _pools[key] = pool
+        return pool
+
+
+def close_all_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
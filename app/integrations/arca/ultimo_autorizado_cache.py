@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from threading import RLock
+from typing import Dict, Optional, Tuple
+import time
+
+_Key = Tuple[int, int, str]
+
+
+@dataclass
+class _Entry:
+    numero: int
+    ts: float = field(default_factory=time.monotonic)
+
+
+class UltimoAutorizadoCache:
+    """
+    Caché de FECompUltimoAutorizado por (cbte_tipo, pto_vta, ambiente).
+
+    - TTL corto: otra PC puede autorizar en el mismo punto de venta.
+    - Write-through: una autorización propia exitosa deja el número nuevo
+      como último; un rechazo o error de comunicación borra la entrada para
+      que la próxima consulta vaya a AFIP.
+    """
+
+    DEFAULT_TTL = 60.0
+
+    _instance: "UltimoAutorizadoCache" = None
+    _lock = RLock()
+
+    def __init__(self, ttl: float = DEFAULT_TTL) -> None:
+        self._ttl = float(ttl)
+        self._data: Dict[_Key, _Entry] = {}
+
+    @classmethod
+    def get(cls) -> "UltimoAutorizadoCache":
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = UltimoAutorizadoCache()
+            return cls._instance
+
+    @staticmethod
+    def _key(cbte_tipo: int, pto_vta: int, ambiente: str) -> _Key:
+        return int(cbte_tipo), int(pto_vta), str(ambiente or "").upper()
+
+    def get_numero(self, cbte_tipo: int, pto_vta: int, ambiente: str) -> Optional[int]:
+        key = self._key(cbte_tipo, pto_vta, ambiente)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry.ts > self._ttl:
+                self._data.pop(key, None)
+                return None
+            return entry.numero
+
+    def set_numero(self, cbte_tipo: int, pto_vta: int, ambiente: str, numero: int) -> None:
+        with self._lock:
+            self._data[self._key(cbte_tipo, pto_vta, ambiente)] = _Entry(int(numero))
+
+    def registrar_autorizado(self, cbte_tipo: int, pto_vta: int, ambiente: str, numero: int) -> None:
+        """AFIP sólo autoriza el siguiente correlativo: numero pasa a ser el último."""
+        key = self._key(cbte_tipo, pto_vta, ambiente)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or int(numero) >= entry.numero:
+                self._data[key] = _Entry(int(numero))
+
+    def invalidate(self, cbte_tipo: Optional[int] = None, pto_vta: Optional[int] = None, ambiente: Optional[str] = None) -> None:
+        with self._lock:
+            if cbte_tipo is None:
+                self._data.clear()
+                return
+            self._data.pop(self._key(cbte_tipo, pto_vta or 0, ambiente or ""), None)
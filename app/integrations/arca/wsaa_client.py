@@ -3,13 +3,17 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 import base64
-import urllib.request
-import urllib.error
+import http.client
+import os
+import threading
 import xml.etree.ElementTree as ET
 
+from loguru import logger
+
 from app.core.config import settings
+from app.integrations.arca.transport import get_pool
 
 ARG = timezone(timedelta(hours=-3))
 
@@ -86,10 +90,83 @@ def _build_pkcs7_signed_data(
     return seq(_der_oid('1.2.840.113549.1.7.2'), ctx(0, signed_data))
 
 
+class _Pkcs7Signer:
+    """
+    Certificado y clave ya cargados para firmar loginTicketRequest.
+
+    Se construye una vez por (cert, key) y se descarta cuando cambia el
+    mtime de alguno de los archivos; firmar queda en la operación RSA más
+    el armado DER.
+    """
+
+    def __init__(self, cert_path: Path, key_path: Path, key_password: Optional[str]) -> None:
+        from cryptography.hazmat.primitives.serialization import load_pem_private_key, Encoding
+        from cryptography.x509 import load_pem_x509_certificate
+
+        if not cert_path.exists():
+            raise FileNotFoundError(f"Certificado ARCA no encontrado: {cert_path}")
+        if not key_path.exists():
+            raise FileNotFoundError(f"Clave privada ARCA no encontrada: {key_path}")
+
+        self.mtimes = _mtimes(cert_path, key_path)
+
+        cert = load_pem_x509_certificate(cert_path.read_bytes())
+        password = key_password.encode() if key_password else None
+        self._private_key = load_pem_private_key(key_path.read_bytes(), password=password)
+
+        self._cert_der = cert.public_bytes(Encoding.DER)
+        self._issuer_der = cert.issuer.public_bytes()
+        sn = cert.serial_number
+        sn_bytes = sn.to_bytes(max(1, (sn.bit_length() + 7) // 8), 'big')
+        if sn_bytes[0] & 0x80:
+            sn_bytes = b'\x00' + sn_bytes
+        self._serial_bytes = sn_bytes
+
+    def sign(self, xml: str) -> str:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding as asym_padding
+
+        data = xml.encode("utf-8")
+
+        # Sign raw data — no signed attributes (like smime -noattr)
+        signature = self._private_key.sign(data, asym_padding.PKCS1v15(), hashes.SHA256())
+
+        pkcs7_der = _build_pkcs7_signed_data(
+            data, self._cert_der, self._issuer_der, self._serial_bytes, signature
+        )
+        return base64.b64encode(pkcs7_der).decode()
+
+
+def _mtimes(*paths: Path) -> tuple:
+    return tuple(p.stat().st_mtime_ns for p in paths)
+
+
+_signers: Dict[tuple, _Pkcs7Signer] = {}
+_signers_lock = threading.Lock()
+
+
+def _get_signer(config: "ArcaConfig") -> _Pkcs7Signer:
+    key = (str(config.cert_path), str(config.key_path), config.key_password or "")
+    with _signers_lock:
+        signer = _signers.get(key)
+        try:
+            vigente = signer is not None and signer.mtimes == _mtimes(config.cert_path, config.key_path)
+        except OSError:
+            vigente = False
+        if not vigente:
+            signer = _Pkcs7Signer(config.cert_path, config.key_path, config.key_password)
+            _signers[key] = signer
+        return signer
+
+
 # ======================================================================
 # MODELO DE DATOS
 # ======================================================================
 
+class WsaaAlreadyAuthenticated(RuntimeError):
+    """WSAA rechazó el loginCms porque el TA anterior sigue vigente."""
+
+
 @dataclass
 class ArcaAuthData:
     """
@@ -140,31 +217,88 @@ class ArcaConfig:
 # CLIENTE WSAA
 # ======================================================================
 
+class _TicketStore:
+    """
+    TA compartido por todos los clientes que usan el mismo archivo.
+    El lock hace de single-flight: mientras un hilo renueva, los demás
+    esperan y después reutilizan el TA nuevo en vez de pedir otro.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.RLock()
+        self.auth: Optional[ArcaAuthData] = None
+
+
+_stores: Dict[Path, _TicketStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _store_for(path: Path) -> _TicketStore:
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _TicketStore()
+            _stores[path] = store
+        return store
+
+
 class ArcaWSAAClient:
     SERVICE_NAME = "wsfe"
 
-    def __init__(self, config: Optional[ArcaConfig] = None) -> None:
+    def __init__(self, config: Optional[ArcaConfig] = None, ta_path: Optional[Path] = None) -> None:
         self._config = config or ArcaConfig()
-        self._cached_auth: Optional[ArcaAuthData] = None
         suffix = "prod" if self._config.mode == "PRODUCCION" else "homo"
-        self.TA_PATH = Path(settings.APP_DATA_DIR) / f"arca_ta_{suffix}.xml"
+        self.TA_PATH = Path(ta_path) if ta_path else Path(settings.APP_DATA_DIR) / f"arca_ta_{suffix}.xml"
+        self._store = _store_for(self.TA_PATH)
 
     # ------------------------------------------------------------------
     # API pública
     # ------------------------------------------------------------------
 
     def get_auth(self, force_renew: bool = False) -> ArcaAuthData:
-        if not force_renew and self._cached_auth and not self._cached_auth.is_expired():
-            return self._cached_auth
-
         if not force_renew:
-            ta_disk = self._load_ta_from_disk()
-            if ta_disk and not ta_disk.is_expired():
-                self._cached_auth = ta_disk
-                return ta_disk
+            cached = self._store.auth
+            if cached and not cached.is_expired():
+                return cached
 
-        auth = self._request_new_ticket()
-        self._cached_auth = auth
+        with self._store.lock:
+            # Otro hilo pudo haber renovado mientras esperábamos el lock
+            if not force_renew:
+                cached = self._store.auth
+                if cached and not cached.is_expired():
+                    return cached
+
+                ta_disk = self._load_ta_from_disk()
+                if ta_disk and not ta_disk.is_expired():
+                    self._store.auth = ta_disk
+                    return ta_disk
+
+            return self._renew_locked()
+
+    def renew_if_needed(self, margin_seconds: int = 0) -> ArcaAuthData:
+        """
+        Renueva el TA si vence dentro de `margin_seconds`. Lo usa el
+        renovador en segundo plano; comparte el single-flight con get_auth.
+        """
+        with self._store.lock:
+            current = self._store.auth or self._load_ta_from_disk()
+            if current and not current.is_expired(margin_seconds=margin_seconds):
+                self._store.auth = current
+                return current
+            return self._renew_locked()
+
+    def _renew_locked(self) -> ArcaAuthData:
+        try:
+            auth = self._request_new_ticket()
+        except WsaaAlreadyAuthenticated:
+            # WSAA no emite otro TA mientras el actual siga vigente: se sigue
+            # usando hasta su vencimiento real
+            current = self._store.auth or self._load_ta_from_disk()
+            if current and not current.is_expired(margin_seconds=0):
+                self._store.auth = current
+                return current
+            raise
+        self._store.auth = auth
         self._save_ta_to_disk(auth)
         return auth
 
@@ -202,7 +336,18 @@ class ArcaWSAAClient:
 </TA>
 """
         self.TA_PATH.parent.mkdir(parents=True, exist_ok=True)
-        self.TA_PATH.write_text(xml, encoding="utf-8")
+
+        # Escritura atómica: si el proceso muere a mitad, queda el TA anterior
+        tmp_path = self.TA_PATH.with_name(f"{self.TA_PATH.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                fh.write(xml)
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp_path, self.TA_PATH)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink(missing_ok=True)
 
     # ------------------------------------------------------------------
     # Flujo WSAA
@@ -238,34 +383,7 @@ class ArcaWSAAClient:
         Builds a PKCS7 SignedData forcing IssuerAndSerialNumber (v1 signerInfo).
         Pure Python ASN.1 construction — avoids OpenSSL 3.x SubjectKeyIdentifier default.
         """
-        from cryptography.hazmat.primitives import hashes
-        from cryptography.hazmat.primitives.asymmetric import padding as asym_padding
-        from cryptography.hazmat.primitives.serialization import load_pem_private_key, Encoding
-        from cryptography.x509 import load_pem_x509_certificate
-
-        if not self._config.cert_path.exists():
-            raise FileNotFoundError(f"Certificado ARCA no encontrado: {self._config.cert_path}")
-        if not self._config.key_path.exists():
-            raise FileNotFoundError(f"Clave privada ARCA no encontrada: {self._config.key_path}")
-
-        cert = load_pem_x509_certificate(self._config.cert_path.read_bytes())
-        password = self._config.key_password.encode() if self._config.key_password else None
-        private_key = load_pem_private_key(self._config.key_path.read_bytes(), password=password)
-
-        data = xml.encode("utf-8")
-        cert_der = cert.public_bytes(Encoding.DER)
-
-        # Sign raw data — no signed attributes (like smime -noattr)
-        signature = private_key.sign(data, asym_padding.PKCS1v15(), hashes.SHA256())
-
-        issuer_der = cert.issuer.public_bytes()
-        sn = cert.serial_number
-        sn_bytes = sn.to_bytes(max(1, (sn.bit_length() + 7) // 8), 'big')
-        if sn_bytes[0] & 0x80:
-            sn_bytes = b'\x00' + sn_bytes
-
-        pkcs7_der = _build_pkcs7_signed_data(data, cert_der, issuer_der, sn_bytes, signature)
-        return base64.b64encode(pkcs7_der).decode()
+        return _get_signer(self._config).sign(xml)
 
     def _call_wsaa(self, cms_b64: str) -> str:
         soap = f"""<?xml version="1.0" encoding="UTF-8"?>
@@ -278,25 +396,24 @@ class ArcaWSAAClient:
   </soapenv:Body>
 </soapenv:Envelope>
 """
-        req = urllib.request.Request(
-            self._config.wsaa_url,
-            data=soap.encode("utf-8"),
-            headers={
-                "Content-Type": "text/xml; charset=utf-8",
-                "SOAPAction": "\"loginCms\"",
-            },
-            method="POST",
-        )
-        
+        headers = {
+            "Content-Type": "text/xml; charset=utf-8",
+            "SOAPAction": "\"loginCms\"",
+        }
+        pool = get_pool(self._config.wsaa_url, profile="wsaa")
 
         try:
-            with urllib.request.urlopen(req, timeout=30) as r:
-                return r.read().decode()
-        except urllib.error.HTTPError as e:
-            raise RuntimeError(f"Error WSAA HTTP {e.code}: {e.read().decode(errors='ignore')}") from e
-        except urllib.error.URLError as e:
+            status, body = pool.post(soap.encode("utf-8"), headers, operation="loginCms")
+        except (OSError, http.client.HTTPException) as e:
             raise RuntimeError(f"No se pudo conectar al WSAA: {e}") from e
 
+        if status >= 400:
+            detalle = body.decode(errors="ignore")
+            if "alreadyAuthenticated" in detalle:
+                raise WsaaAlreadyAuthenticated(f"Error WSAA HTTP {status}: {detalle}")
+            raise RuntimeError(f"Error WSAA HTTP {status}: {detalle}")
+        return body.decode()
+
     def _parse_login_ticket_response(self, xml: str) -> ArcaAuthData:
         root = ET.fromstring(xml)
 
@@ -327,3 +444,85 @@ class ArcaWSAAClient:
             cuit=self._config.cuit,
             expires_at=datetime.fromisoformat(exp),
         )
+
+
+# ======================================================================
+# RENOVACIÓN EN SEGUNDO PLANO
+# ======================================================================
+
+class TicketRenewer:
+    """
+    Hilo daemon que renueva el TA apenas vence (`skew_seconds` después),
+    para que ninguna factura pague la firma + loginCms.
+
+    WSAA rechaza un TA nuevo mientras el anterior siga vigente
+    (alreadyAuthenticated), así que no tiene sentido renovar antes: el hilo
+    duerme hasta el vencimiento. Si igual lo rechaza (reloj local adelantado
+    respecto de AFIP) o falla, se reintenta cada `retry_seconds`.
+    """
+
+    def __init__(
+        self,
+        client: ArcaWSAAClient,
+        skew_seconds: float = 5.0,
+        retry_seconds: float = 60.0,
+    ) -> None:
+        self._client = client
+        self._skew = max(float(skew_seconds), 0.0)
+        self._retry = max(float(retry_seconds), 1.0)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="arca-ta-renewer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def run_once(self) -> float:
+        """Renueva si hace falta y devuelve cuántos segundos esperar."""
+        try:
+            auth = self._client.renew_if_needed()
+        except Exception as e:
+            logger.warning("No se pudo renovar el TA de ARCA en segundo plano: {}", e)
+            return self._retry
+
+        now = datetime.now(auth.expires_at.tzinfo)
+        restante = (auth.expires_at - now).total_seconds()
+        return restante + self._skew if restante > 0 else self._retry
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            espera = self.run_once()
+            self._stop.wait(espera)
+
+
+_renewer: Optional[TicketRenewer] = None
+_renewer_lock = threading.Lock()
+
+
+def start_ticket_renewer(client: Optional[ArcaWSAAClient] = None) -> TicketRenewer:
+    """Arranca (una sola vez por proceso) el renovador del TA."""
+    global _renewer
+    with _renewer_lock:
+        if _renewer is None:
+            _renewer = TicketRenewer(
+                client or ArcaWSAAClient(),
+                skew_seconds=settings.ARCA_TA_RENEW_SKEW,
+            )
+        _renewer.start()
+        return _renewer
+
+
+def stop_ticket_renewer() -> None:
+    global _renewer
+    with _renewer_lock:
+        renewer, _renewer = _renewer, None
+    if renewer:
+        renewer.stop(timeout=2.0)
@@ -1,18 +1,20 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
-import urllib.request
-import urllib.error
+import http.client
+import io
 import xml.etree.ElementTree as ET
 from app.core.config import settings
 
+from app.integrations.arca.rate_limiter import get_rate_limiter
+from app.integrations.arca.transport import HttpConnectionPool, build_ssl_context, get_pool
+from app.integrations.arca.ultimo_autorizado_cache import UltimoAutorizadoCache
 from app.services.catalogos_service import CatalogosService
 from loguru import logger
 
-import ssl
 # -------------------- Resultado WSFE --------------------
 
 
@@ -40,6 +42,97 @@ class ArcaWSFEResult:
     mensaje: str
 
 
+# -------------------- Parser FECAESolicitar --------------------
+
+
+@dataclass
+class _DetalleCAE:
+    """Datos de un FECAEDetResponse."""
+    cbte_desde: Optional[int] = None
+    resultado: Optional[str] = None
+    cae: Optional[str] = None
+    vto_cae: Optional[str] = None
+    fch_proceso: Optional[str] = None
+    observaciones: List[str] = field(default_factory=list)
+
+
+@dataclass
+class _RespuestaCAE:
+    """FECAESolicitarResult ya recorrido: cabecera, errores y un detalle por comprobante."""
+    encontrado: bool = False
+    fch_proceso: Optional[str] = None
+    errores: List[str] = field(default_factory=list)
+    detalles: List[_DetalleCAE] = field(default_factory=list)
+
+
+def _parse_fe_cae_solicitar_xml(soap_xml: str) -> _RespuestaCAE:
+    """
+    Recorre la respuesta de FECAESolicitar una sola vez (iterparse) y junta
+    todo lo que usa el cliente. El costo crece lineal con la cantidad de
+    comprobantes, sin volver a escanear el árbol por cada tag.
+
+    Levanta ET.ParseError si la respuesta no es XML (p. ej. página HTML).
+    """
+    respuesta = _RespuestaCAE()
+    pila: List[str] = []
+    detalle: Optional[_DetalleCAE] = None
+    code = ""
+    msg = ""
+
+    for evento, elem in ET.iterparse(io.BytesIO(soap_xml.encode("utf-8")), events=("start", "end")):
+        tag = elem.tag.rsplit("}", 1)[-1]
+
+        if evento == "start":
+            pila.append(tag)
+            if tag == "FECAESolicitarResult":
+                respuesta.encontrado = True
+            elif tag == "FECAEDetResponse":
+                detalle = _DetalleCAE()
+            elif tag in ("Err", "Obs"):
+                code = msg = ""
+            continue
+
+        pila.pop()
+        padre = pila[-1] if pila else ""
+        texto = elem.text.strip() if elem.text else ""
+
+        if tag in ("Code", "Msg") and padre in ("Err", "Obs"):
+            if tag == "Code":
+                code = texto or code
+            else:
+                msg = texto or msg
+        elif tag == "Err" and pila[-2:] == ["FECAESolicitarResult", "Errors"]:
+            if code or msg:
+                respuesta.errores.append(f"{code} - {msg}".strip(" -"))
+        elif tag == "Obs" and detalle is not None:
+            if code or msg:
+                detalle.observaciones.append(f"{code} - {msg}".strip(" -"))
+        elif tag == "FECAEDetResponse" and detalle is not None:
+            respuesta.detalles.append(detalle)
+            detalle = None
+        elif detalle is not None and texto:
+            if tag == "CbteDesde" and detalle.cbte_desde is None:
+                try:
+                    detalle.cbte_desde = int(texto)
+                except ValueError:
+                    pass
+            elif tag == "Resultado" and detalle.resultado is None:
+                detalle.resultado = texto
+            elif tag == "CAE" and detalle.cae is None:
+                detalle.cae = texto
+            elif tag == "CAEFchVto" and detalle.vto_cae is None:
+                detalle.vto_cae = texto
+            elif tag == "FchProceso" and detalle.fch_proceso is None:
+                detalle.fch_proceso = texto
+        elif tag == "FchProceso" and padre == "FeCabResp" and texto:
+            respuesta.fch_proceso = texto
+
+        # Lo ya procesado no hace falta: mantiene acotada la memoria en lotes grandes
+        elem.clear()
+
+    return respuesta
+
+
 # -------------------- Configuración WSFE --------------------
 
 
@@ -69,6 +162,10 @@ class ArcaWSFEClient:
       - items: detalle de la factura (facturas_detalle)
     """
 
+    # Tope de comprobantes por FECAESolicitar. AFIP admite más (FECompTotXRequest),
+    # pero lotes chicos acotan el daño si un timeout deja el lote en duda.
+    MAX_REGISTROS_LOTE = 50
+
     def __init__(self, config: Optional[ArcaWSFEConfig] = None) -> None:
         self._config = config or ArcaWSFEConfig()
 
@@ -93,8 +190,70 @@ class ArcaWSFEClient:
             raise ValueError("No se puede autorizar una factura sin ítems.")
 
         soap_xml = self._build_fe_cae_solicitar_request(auth, factura, items)
-        response_xml = self._call_wsfe(soap_xml)
-        return self._parse_fe_cae_solicitar_response(response_xml)
+        cbte_tipo, pto_vta = self._clave_numeracion(factura)
+        try:
+            response_xml = self._call_wsfe(soap_xml)
+        except Exception:
+            self.invalidar_ultimo_autorizado(cbte_tipo, pto_vta)
+            raise
+        result = self._parse_fe_cae_solicitar_response(response_xml)
+        self._actualizar_ultimo_autorizado(cbte_tipo, pto_vta, [int(factura.get("numero") or 0)], [result])
+        return result
+
+    def solicitar_cae_lote(
+        self,
+        auth: Any,
+        comprobantes: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]],
+    ) -> List[ArcaWSFEResult]:
+        """
+        Autoriza varios comprobantes en un único FECAESolicitar.
+
+        - comprobantes: lista de (factura, items) del mismo tipo y punto de
+          venta, con números consecutivos y ordenados.
+        - Devuelve un ArcaWSFEResult por comprobante, en el mismo orden.
+        """
+        if not comprobantes:
+            return []
+        if len(comprobantes) > self.MAX_REGISTROS_LOTE:
+            raise ValueError(
+                f"El lote supera el máximo de {self.MAX_REGISTROS_LOTE} comprobantes por solicitud."
+            )
+        for _factura, items in comprobantes:
+            if not items:
+                raise ValueError("No se puede autorizar una factura sin ítems.")
+
+        soap_xml = self._build_fe_cae_solicitar_lote_request(auth, comprobantes)
+        cbte_tipo, pto_vta = self._clave_numeracion(comprobantes[0][0])
+        try:
+            response_xml = self._call_wsfe(soap_xml)
+        except Exception:
+            self.invalidar_ultimo_autorizado(cbte_tipo, pto_vta)
+            raise
+        numeros = [int(factura.get("numero") or 0) for factura, _items in comprobantes]
+        resultados = self._parse_fe_cae_solicitar_lote_response(response_xml, numeros)
+        self._actualizar_ultimo_autorizado(cbte_tipo, pto_vta, numeros, resultados)
+        return resultados
+
+    def invalidar_ultimo_autorizado(self, cbte_tipo: int, pto_vta: int) -> None:
+        """Descarta el último autorizado cacheado para forzar la consulta a AFIP."""
+        UltimoAutorizadoCache.get().invalidate(cbte_tipo, pto_vta, self._config.mode)
+
+    def _actualizar_ultimo_autorizado(
+        self,
+        cbte_tipo: int,
+        pto_vta: int,
+        numeros: List[int],
+        resultados: List[ArcaWSFEResult],
+    ) -> None:
+        # Sólo si AFIP aprobó todo sabemos con certeza cuál es el último;
+        # ante cualquier rechazo o respuesta dudosa se vuelve a consultar.
+        if resultados and all(r.aprobada for r in resultados):
+            UltimoAutorizadoCache.get().registrar_autorizado(
+                cbte_tipo, pto_vta, self._config.mode, max(numeros)
+            )
+        else:
+            self.invalidar_ultimo_autorizado(cbte_tipo, pto_vta)
+
     def fe_comp_consultar(
         self,
         auth,
@@ -159,6 +318,9 @@ class ArcaWSFEClient:
             "fecha_cae": self._find_text_anywhere(result, "FchProceso"),
             "vto_cae": self._find_text_anywhere(result, "FchVto"),
             "imp_total": self._find_text_anywhere(result, "ImpTotal"),
+            "doc_tipo": self._find_text_anywhere(result, "DocTipo"),
+            "doc_nro": self._find_text_anywhere(result, "DocNro"),
+            "cbte_fch": self._find_text_anywhere(result, "CbteFch"),
             "errores": self._collect_errors(result),
             "observaciones": self._collect_observaciones(result),
             "raw_xml": response_xml,
@@ -184,7 +346,15 @@ class ArcaWSFEClient:
 
         Si algo raro pasa, levanta RuntimeError para que la capa de servicio
         decida si cae a BD.
+
+        El resultado se cachea unos segundos por (cbte_tipo, pto_vta, ambiente)
+        en UltimoAutorizadoCache; las autorizaciones propias lo mantienen al día.
         """
+        cache = UltimoAutorizadoCache.get()
+        cacheado = cache.get_numero(cbte_tipo, pto_vta, self._config.mode)
+        if cacheado is not None:
+            return {"cbte_tipo": int(cbte_tipo), "pto_vta": int(pto_vta), "cbte_nro": cacheado, "errores": []}
+
         soap = f"""<?xml version="1.0" encoding="utf-8"?>
 <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
                   xmlns:ar="http://ar.gov.afip.dif.FEV1/">
@@ -245,6 +415,9 @@ class ArcaWSFEClient:
         except Exception:
             nro_int = 0
 
+        if not errores and nro_resp is not None:
+            cache.set_numero(cbte_tipo, pto_vta, self._config.mode, nro_int)
+
         return {"cbte_tipo": tipo_int, "pto_vta": pto_int, "cbte_nro": nro_int, "errores": errores}
 
     # -------- Construcción FECAESolicitar --------
@@ -258,19 +431,82 @@ class ArcaWSFEClient:
         """
         Construye el Envelope SOAP de FECAESolicitar.
         """
+        return self._build_fe_cae_solicitar_lote_request(auth, [(factura, items)])
 
-        tipo_id = factura.get("tipo_comprobante_id")
-        if not tipo_id:
-            raise ValueError("Factura sin tipo_comprobante_id.")
+    def _build_fe_cae_solicitar_lote_request(
+        self,
+        auth: Any,
+        comprobantes: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]],
+    ) -> str:
+        """
+        Construye el Envelope SOAP de FECAESolicitar con uno o más FECAEDetRequest.
 
+        Todos los comprobantes deben compartir tipo y punto de venta y tener
+        números consecutivos (requisito de AFIP para CantReg > 1).
+        """
+        if not comprobantes:
+            raise ValueError("No hay comprobantes para autorizar.")
 
-        catalogos = CatalogosService()
-        tipo_data = catalogos.get_tipo_comprobante_by_id(int(tipo_id))
+        detalles_xml: List[str] = []
+        cbte_tipo: Optional[int] = None
+        pto_vta: Optional[int] = None
+        numero_anterior: Optional[int] = None
 
-        if not tipo_data:
-            raise ValueError(f"No se encontró tipo_comprobante_id {tipo_id} en catálogo.")
+        for factura, items in comprobantes:
+            det_tipo, det_pto, numero, det_xml = self._build_fe_det_request(factura, items)
+
+            if cbte_tipo is None:
+                cbte_tipo, pto_vta = det_tipo, det_pto
+            elif (det_tipo, det_pto) != (cbte_tipo, pto_vta):
+                raise ValueError("Todos los comprobantes del lote deben tener el mismo tipo y punto de venta.")
+
+            if numero_anterior is not None and numero != numero_anterior + 1:
+                raise ValueError(
+                    f"Los comprobantes del lote deben ser consecutivos ({numero_anterior} -> {numero})."
+                )
+            numero_anterior = numero
+            detalles_xml.append(det_xml)
+
+        soap = f"""<?xml version="1.0" encoding="utf-8"?>
+<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
+                  xmlns:ar="http://ar.gov.afip.dif.FEV1/">
+   <soapenv:Header/>
+   <soapenv:Body>
+      <ar:FECAESolicitar>
+         <ar:Auth>
+            <ar:Token>{self._escape(auth.token)}</ar:Token>
+            <ar:Sign>{self._escape(auth.sign)}</ar:Sign>
+            <ar:Cuit>{self._escape(str(auth.cuit))}</ar:Cuit>
+         </ar:Auth>
+         <ar:FeCAEReq>
+            <ar:FeCabReq>
+               <ar:CantReg>{len(detalles_xml)}</ar:CantReg>
+               <ar:PtoVta>{pto_vta}</ar:PtoVta>
+               <ar:CbteTipo>{cbte_tipo}</ar:CbteTipo>
+            </ar:FeCabReq>
+            <ar:FeDetReq>
+{chr(10).join(detalles_xml)}
+            </ar:FeDetReq>
+         </ar:FeCAEReq>
+      </ar:FECAESolicitar>
+   </soapenv:Body>
+</soapenv:Envelope>
+"""
+        return soap
 
-        tipo_cbte_str = tipo_data["codigo"]
+    def _build_fe_det_request(
+        self,
+        factura: Dict[str, Any],
+        items: List[Dict[str, Any]],
+    ) -> Tuple[int, int, int, str]:
+        """
+        Construye un bloque FECAEDetRequest.
+
+        Devuelve (cbte_tipo, pto_vta, numero, xml) para que el armado del
+        lote pueda validar que todos comparten cabecera.
+        """
+
+        tipo_cbte_str = self._codigo_tipo_comprobante(factura)
 
         pto_vta = int(factura.get("punto_venta") or 0)
         numero = int(factura.get("numero") or 0)
@@ -321,25 +557,7 @@ class ArcaWSFEClient:
         cbte_desde = numero
         cbte_hasta = numero
 
-        soap = f"""<?xml version="1.0" encoding="utf-8"?>
-<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                  xmlns:ar="http://ar.gov.afip.dif.FEV1/">
-   <soapenv:Header/>
-   <soapenv:Body>
-      <ar:FECAESolicitar>
-         <ar:Auth>
-            <ar:Token>{self._escape(auth.token)}</ar:Token>
-            <ar:Sign>{self._escape(auth.sign)}</ar:Sign>
-            <ar:Cuit>{self._escape(str(auth.cuit))}</ar:Cuit>
-         </ar:Auth>
-         <ar:FeCAEReq>
-            <ar:FeCabReq>
-               <ar:CantReg>1</ar:CantReg>
-               <ar:PtoVta>{pto_vta}</ar:PtoVta>
-               <ar:CbteTipo>{cbte_tipo}</ar:CbteTipo>
-            </ar:FeCabReq>
-            <ar:FeDetReq>
-               <ar:FECAEDetRequest>
+        det_xml = f"""               <ar:FECAEDetRequest>
                   <ar:Concepto>{concepto}</ar:Concepto>
                   <ar:DocTipo>{doc_tipo}</ar:DocTipo>
                   <ar:DocNro>{doc_nro}</ar:DocNro>
@@ -361,14 +579,28 @@ class ArcaWSFEClient:
                         <ar:Importe>{importe_iva:.2f}</ar:Importe>
                      </ar:AlicIva>
                   </ar:Iva>
-               </ar:FECAEDetRequest>
-            </ar:FeDetReq>
-         </ar:FeCAEReq>
-      </ar:FECAESolicitar>
-   </soapenv:Body>
-</soapenv:Envelope>
-"""
-        return soap
+               </ar:FECAEDetRequest>"""
+        return cbte_tipo, pto_vta, numero, det_xml
+
+    @staticmethod
+    def _codigo_tipo_comprobante(factura: Dict[str, Any]) -> str:
+        tipo_id = factura.get("tipo_comprobante_id")
+        if not tipo_id:
+            raise ValueError("Factura sin tipo_comprobante_id.")
+
+
+        catalogos = CatalogosService()
+        tipo_data = catalogos.get_tipo_comprobante_by_id(int(tipo_id))
+
+        if not tipo_data:
+            raise ValueError(f"No se encontró tipo_comprobante_id {tipo_id} en catálogo.")
+
+        return tipo_data["codigo"]
+
+    def _clave_numeracion(self, factura: Dict[str, Any]) -> Tuple[int, int]:
+        """(cbte_tipo AFIP, pto_vta) de la factura, clave del último autorizado."""
+        cbte_tipo = self._map_tipo_comprobante_to_afip_code(self._codigo_tipo_comprobante(factura))
+        return cbte_tipo, int(factura.get("punto_venta") or 0)
 
     # -------- Llamada HTTP --------
 
@@ -379,34 +611,35 @@ class ArcaWSFEClient:
         data = soap_xml.encode("utf-8")
 
         soap_action = f"http://ar.gov.afip.dif.FEV1/{action}"
-    
-        req = urllib.request.Request(
-            self._config.wsfe_url,
-            data=data,
-            headers={
-                "Content-Type": "text/xml; charset=utf-8",
-                "SOAPAction": soap_action,  # ✅ BIEN
-            },
-            method="POST",
-        )
-
-        try:
-            context = ssl.create_default_context()
-            context.set_ciphers("DEFAULT@SECLEVEL=1")
+        headers = {
+            "Content-Type": "text/xml; charset=utf-8",
+            "SOAPAction": soap_action,
+        }
 
-            with urllib.request.urlopen(req, timeout=30, context=context) as resp:
-                return resp.read().decode("utf-8", errors="ignore")
+        # Límite de requests compartido por todos los hilos que hablan con WSFE
+        get_rate_limiter("wsfe").acquire()
 
-        except urllib.error.HTTPError as e:
-            body = e.read().decode(errors="ignore")
+        try:
+            status, body = self._pool().post(data, headers, operation=action)
+        except (OSError, http.client.HTTPException) as e:
             raise RuntimeError(
-                f"Error WSFE HTTP {e.code} ({action}): {body}"
+                f"No se pudo conectar a WSFE ({action}): {e}"
             ) from e
 
-        except urllib.error.URLError as e:
+        if status >= 400:
             raise RuntimeError(
-                f"No se pudo conectar a WSFE ({action}): {e}"
-            ) from e
+                f"Error WSFE HTTP {status} ({action}): {body.decode(errors='ignore')}"
+            )
+
+        return body.decode("utf-8", errors="ignore")
+
+    def _pool(self) -> HttpConnectionPool:
+        # Un pool por endpoint, compartido entre instancias del cliente.
+        return get_pool(
+            self._config.wsfe_url,
+            profile="wsfe",
+            ssl_context_factory=lambda: build_ssl_context(legacy_ciphers=True),
+        )
 
 
     # -------- Parseo respuesta FECAESolicitar --------
@@ -417,80 +650,98 @@ class ArcaWSFEClient:
         Maneja también el caso en que AFIP devuelva HTML en vez de XML.
         """
         try:
-            root = ET.fromstring(soap_xml)
+            respuesta = _parse_fe_cae_solicitar_xml(soap_xml)
         except ET.ParseError as ex:
             msg = f"Respuesta WSFE no es XML válido: {ex}. Respuesta cruda: {soap_xml[:500]}"
-            return ArcaWSFEResult(
-                aprobada=False,
-                rechazada=False,
-                cae=None,
-                fecha_cae=None,
-                vto_cae=None,
-                errores=[],
-                observaciones=[],
-                mensaje=msg,
-            )
+            return self._resultado_sin_respuesta([], msg)
 
-        ns = {"soapenv": "http://schemas.xmlsoap.org/soap/envelope/", "ar": "http://ar.gov.afip.dif.FEV1/"}
-
-        fe_result = root.find(".//ar:FECAESolicitarResult", ns)
-        if fe_result is None:
-            for elem in root.iter():
-                if elem.tag.endswith("FECAESolicitarResult"):
-                    fe_result = elem
-                    break
-
-        if fe_result is None:
+        if not respuesta.encontrado:
             msg = "No se encontró FECAESolicitarResult en la respuesta del WSFE."
-            return ArcaWSFEResult(
-                aprobada=False,
-                rechazada=False,
-                cae=None,
-                fecha_cae=None,
-                vto_cae=None,
-                errores=[msg],
-                observaciones=[],
-                mensaje=msg,
-            )
+            return self._resultado_sin_respuesta([msg], msg)
 
-        errores: List[str] = []
-        observaciones: List[str] = []
-
-        errores.extend(self._collect_errors(fe_result))
-
-        det_resp = None
-        for elem in fe_result.iter():
-            if elem.tag.endswith("FECAEDetResponse"):
-                det_resp = elem
-                break
-
-        cae = None
-        vto_cae = None
-        fecha_cae = None
-        resultado = None
-
-        if det_resp is not None:
-            resultado = self._find_text_anywhere(det_resp, "Resultado")
-            cae = self._find_text_anywhere(det_resp, "CAE")
-            vto_cae = self._find_text_anywhere(det_resp, "CAEFchVto")
-            # AFIP suele devolver FchProceso (YYYYMMDD) cuando procesa el CAE
-            fecha_cae = self._find_text_anywhere(det_resp, "FchProceso")
-            observaciones.extend(self._collect_observaciones(det_resp))
-        else:
+        errores: List[str] = list(respuesta.errores)
+        det = respuesta.detalles[0] if respuesta.detalles else None
+
+        if det is None:
             if not errores:
                 errores.append("No se encontró FECAEDetResponse en la respuesta de WSFE.")
+            det = _DetalleCAE()
+
+        # AFIP suele devolver FchProceso (YYYYMMDD) cuando procesa el CAE
+        return self._resultado_desde_detalle(det, det.fch_proceso, errores)
 
-        mensaje = self._build_result_message(resultado, cae, vto_cae, fecha_cae, errores, observaciones)
+    def _parse_fe_cae_solicitar_lote_response(
+        self,
+        soap_xml: str,
+        numeros: List[int],
+    ) -> List[ArcaWSFEResult]:
+        """
+        Parsea la respuesta de un FECAESolicitar con varios comprobantes.
 
-        aprobada = (resultado or "").upper() == "A"
-        rechazada = (resultado or "").upper() == "R"
+        Cada FECAEDetResponse se asocia a su comprobante por CbteDesde. Los
+        errores de cabecera (FECAESolicitarResult/Errors) se informan en todos
+        los comprobantes; si uno no aparece en la respuesta queda sin aprobar
+        ni rechazar, igual que un error de comunicación.
+        """
+        try:
+            respuesta = _parse_fe_cae_solicitar_xml(soap_xml)
+        except ET.ParseError as ex:
+            msg = f"Respuesta WSFE no es XML válido: {ex}. Respuesta cruda: {soap_xml[:500]}"
+            return [self._resultado_sin_respuesta([], msg) for _ in numeros]
+
+        if not respuesta.encontrado:
+            msg = "No se encontró FECAESolicitarResult en la respuesta del WSFE."
+            return [self._resultado_sin_respuesta([msg], msg) for _ in numeros]
+
+        por_numero: Dict[int, _DetalleCAE] = {}
+        for det in respuesta.detalles:
+            if det.cbte_desde is not None:
+                por_numero.setdefault(det.cbte_desde, det)
+
+        resultados: List[ArcaWSFEResult] = []
+        for numero in numeros:
+            det = por_numero.get(int(numero))
+            if det is None:
+                errores = respuesta.errores or [
+                    f"No se encontró FECAEDetResponse para el comprobante {numero} en la respuesta de WSFE."
+                ]
+                mensaje = self._build_result_message(None, None, None, None, errores, [])
+                resultados.append(self._resultado_sin_respuesta(errores, mensaje))
+                continue
+
+            resultados.append(
+                self._resultado_desde_detalle(det, det.fch_proceso or respuesta.fch_proceso, list(respuesta.errores))
+            )
 
+        return resultados
+
+    @staticmethod
+    def _resultado_sin_respuesta(errores: List[str], mensaje: str) -> ArcaWSFEResult:
+        return ArcaWSFEResult(
+            aprobada=False,
+            rechazada=False,
+            cae=None,
+            fecha_cae=None,
+            vto_cae=None,
+            errores=list(errores),
+            observaciones=[],
+            mensaje=mensaje,
+        )
+
+    def _resultado_desde_detalle(
+        self,
+        det: _DetalleCAE,
+        fecha_cae: Optional[str],
+        errores: List[str],
+    ) -> ArcaWSFEResult:
+        observaciones = list(det.observaciones)
+        mensaje = self._build_result_message(det.resultado, det.cae, det.vto_cae, fecha_cae, errores, observaciones)
         return ArcaWSFEResult(
-            aprobada=aprobada,
-            rechazada=rechazada,
-            cae=cae,
+            aprobada=(det.resultado or "").upper() == "A",
+            rechazada=(det.resultado or "").upper() == "R",
+            cae=det.cae,
             fecha_cae=fecha_cae,
-            vto_cae=vto_cae,
+            vto_cae=det.vto_cae,
             errores=errores,
             observaciones=observaciones,
             mensaje=mensaje,
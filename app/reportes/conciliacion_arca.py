@@ -0,0 +1,119 @@
+# app/reportes/conciliacion_arca.py
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict
+
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill
+
+
+CAMPOS = {
+    "no_registrada": "No registrada en AFIP",
+    "cae": "CAE distinto",
+    "vto_cae": "Vencimiento CAE distinto",
+    "total": "Importe distinto",
+    "estado": "Estado local sin CAE",
+}
+
+
+# =========================================================
+# Generador principal
+# =========================================================
+
+def generar_xlsx_conciliacion_arca(
+    resultado: Dict[str, Any],
+    path_override: str | None = None,
+) -> str:
+    """
+    Escribe el resultado de ArcaConciliacionService.conciliar en un XLSX
+    (hoja Resumen + hoja Diferencias) y devuelve la ruta del archivo.
+    """
+    base = Path(path_override) if path_override else Path.home() / "Downloads"
+    base.mkdir(parents=True, exist_ok=True)
+
+    desde = resultado["desde"]
+    hasta = resultado["hasta"]
+    path = base / f"Conciliacion_ARCA_{desde:%Y%m%d}_{hasta:%Y%m%d}.xlsx"
+
+    wb = Workbook()
+    bold = Font(bold=True)
+    header_fill = PatternFill("solid", fgColor="DDDDDD")
+
+    # =====================================================
+    # RESUMEN
+    # =====================================================
+    ws = wb.active
+    ws.title = "Resumen"
+    filas = [
+        ("Período", f"{desde:%d/%m/%Y} - {hasta:%d/%m/%Y}"),
+        ("Comprobantes con CAE", resultado["total"]),
+        ("Revisados contra AFIP", resultado["revisadas"]),
+        ("Coincidentes", resultado["coincidentes"]),
+        ("Con diferencias", len(resultado["diferencias"])),
+        ("Sin respuesta de AFIP", len(resultado["errores"])),
+        ("Conciliación completa", "Sí" if resultado["completa"] else "No"),
+    ]
+    for etiqueta, valor in filas:
+        ws.append([etiqueta, valor])
+        ws.cell(row=ws.max_row, column=1).font = bold
+
+    if resultado["errores"]:
+        ws.append([])
+        ws.append(["Errores de comunicación"])
+        ws.cell(row=ws.max_row, column=1).font = bold
+        for err in resultado["errores"]:
+            ws.append([err])
+
+    ws.column_dimensions["A"].width = 28
+    ws.column_dimensions["B"].width = 30
+
+    # =====================================================
+    # DIFERENCIAS
+    # =====================================================
+    ws = wb.create_sheet("Diferencias")
+    headers = [
+        "Factura ID",
+        "Comprobante",
+        "Diferencias",
+        "CAE local",
+        "CAE AFIP",
+        "Vto CAE local",
+        "Vto CAE AFIP",
+        "Total local",
+        "Total AFIP",
+        "Estado local",
+        "Resultado AFIP",
+        "Errores AFIP",
+    ]
+    ws.append(headers)
+    for cell in ws[1]:
+        cell.font = bold
+        cell.fill = header_fill
+
+    for d in resultado["diferencias"]:
+        local = d.get("local") or {}
+        afip = d.get("afip") or {}
+        ws.append(
+            [
+                d["factura_id"],
+                d["comprobante"],
+                ", ".join(CAMPOS.get(c, c) for c in d["campos"]),
+                local.get("cae"),
+                afip.get("cae"),
+                local.get("vto_cae"),
+                afip.get("vto_cae"),
+                local.get("total"),
+                afip.get("total"),
+                local.get("estado_id"),
+                afip.get("resultado"),
+                "; ".join(afip.get("errores") or []),
+            ]
+        )
+
+    for col, width in zip("ABCDEFGHIJKL", (10, 20, 40, 16, 16, 12, 12, 14, 14, 10, 10, 50)):
+        ws.column_dimensions[col].width = width
+
+    wb.save(path)
+    return str(path)
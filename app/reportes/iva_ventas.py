@@ -7,7 +7,7 @@ from pathlib import Path
 from typing import Dict
 
 from sqlalchemy import text
-from app.data.database import SessionLocal
+from app.data.database import ReadSessionLocal
 
 
 # =========================================================
@@ -146,7 +146,7 @@ def generar_txt_iva_ventas(
     path_cbte = base / "LIBRO_IVA_DIGITAL_VENTAS_CBTE.txt"
     path_alic = base / "LIBRO_IVA_DIGITAL_VENTAS_ALICUOTAS.txt"
 
-    session = SessionLocal()
+    session = ReadSessionLocal()
     try:
         cbtes = session.execute(
             text(QUERY_CBTE),
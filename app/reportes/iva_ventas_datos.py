@@ -6,7 +6,7 @@ from pathlib import Path
 from typing import Optional
 from sqlalchemy import text
 
-from app.data.database import SessionLocal
+from app.data.database import ReadSessionLocal
 
 
 # =========================================================
@@ -63,7 +63,7 @@ def generar_txt_iva_ventas_datos(
 
     periodo = f"{anio}{mes:02d}"
 
-    session = SessionLocal()
+    session = ReadSessionLocal()
     try:
         row = session.execute(
             text(QUERY_RESUMEN),
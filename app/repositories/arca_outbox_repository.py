@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+class ArcaOutboxRepository:
+    """Consultas a 'arca_outbox' (cola persistente de autorizaciones ARCA)."""
+
+    PENDIENTE = "PENDIENTE"
+    PROCESANDO = "PROCESANDO"
+    COMPLETADA = "COMPLETADA"
+    FALLIDA = "FALLIDA"
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def encolar(self, factura_id: int, ahora: datetime) -> None:
+        """Agrega la factura a la cola o la reactiva si ya tenía una fila."""
+        existente = self.db.execute(
+            text("SELECT id FROM arca_outbox WHERE factura_id = :factura_id"),
+            {"factura_id": factura_id},
+        ).first()
+
+        if existente:
+            self.db.execute(
+                text(
+                    """
+                    UPDATE arca_outbox
+                    SET estado = :estado,
+                        intentos = 0,
+                        proximo_intento = :ahora,
+                        ultimo_error = NULL,
+                        updated_at = :ahora
+                    WHERE id = :id
+                    """
+                ),
+                {"estado": self.PENDIENTE, "ahora": ahora, "id": existente[0]},
+            )
+            return
+
+        self.db.execute(
+            text(
+                """
+                INSERT INTO arca_outbox (
+                    factura_id, estado, intentos, proximo_intento, created_at, updated_at
+                ) VALUES (
+                    :factura_id, :estado, 0, :ahora, :ahora, :ahora
+                )
+                """
+            ),
+            {"factura_id": factura_id, "estado": self.PENDIENTE, "ahora": ahora},
+        )
+
+    def list_vencidas(self, ahora: datetime, limite: int) -> List[Dict[str, Any]]:
+        """
+        Filas vencidas que encabezan su numeración (tipo + punto de venta).
+
+        AFIP exige autorizar en orden: si una factura anterior del mismo
+        tipo y punto de venta sigue en cola (en backoff o en proceso), las
+        siguientes esperan; enviarlas antes termina en rechazo 10016.
+        """
+        rows = self.db.execute(
+            text(
+                """
+                SELECT o.id, o.factura_id, o.intentos
+                FROM arca_outbox o
+                JOIN facturas f ON f.id = o.factura_id
+                WHERE o.estado = :pendiente
+                  AND o.proximo_intento <= :ahora
+                  AND NOT EXISTS (
+                      SELECT 1
+                      FROM arca_outbox o2
+                      JOIN facturas f2 ON f2.id = o2.factura_id
+                      WHERE o2.estado IN (:pendiente, :procesando)
+                        AND f2.tipo_comprobante_id = f.tipo_comprobante_id
+                        AND f2.punto_venta = f.punto_venta
+                        AND (f2.numero < f.numero OR (f2.numero = f.numero AND o2.id < o.id))
+                  )
+                ORDER BY o.proximo_intento, o.id
+                LIMIT :limite
+                """
+            ),
+            {
+                "pendiente": self.PENDIENTE,
+                "procesando": self.PROCESANDO,
+                "ahora": ahora,
+                "limite": int(limite),
+            },
+        ).mappings().all()
+        return [dict(r) for r in rows]
+
+    def reclamar(self, outbox_id: int, ahora: datetime) -> bool:
+        """Pasa la fila a PROCESANDO si nadie la tomó antes (otra PC, otro hilo)."""
+        result = self.db.execute(
+            text(
+                """
+                UPDATE arca_outbox
+                SET estado = :procesando, updated_at = :ahora
+                WHERE id = :id AND estado = :pendiente
+                """
+            ),
+            {"procesando": self.PROCESANDO, "pendiente": self.PENDIENTE, "ahora": ahora, "id": outbox_id},
+        )
+        return result.rowcount == 1
+
+    def reprogramar(
+        self,
+        outbox_id: int,
+        *,
+        intentos: int,
+        proximo_intento: datetime,
+        error: Optional[str],
+        ahora: datetime,
+    ) -> None:
+        self.db.execute(
+            text(
+                """
+                UPDATE arca_outbox
+                SET estado = :estado,
+                    intentos = :intentos,
+                    proximo_intento = :proximo,
+                    ultimo_error = :error,
+                    updated_at = :ahora
+                WHERE id = :id
+                """
+            ),
+            {
+                "estado": self.PENDIENTE,
+                "intentos": intentos,
+                "proximo": proximo_intento,
+                "error": error,
+                "ahora": ahora,
+                "id": outbox_id,
+            },
+        )
+
+    def finalizar(
+        self,
+        outbox_id: int,
+        *,
+        estado: str,
+        intentos: int,
+        error: Optional[str],
+        ahora: datetime,
+    ) -> None:
+        self.db.execute(
+            text(
+                """
+                UPDATE arca_outbox
+                SET estado = :estado,
+                    intentos = :intentos,
+                    ultimo_error = :error,
+                    updated_at = :ahora
+                WHERE id = :id
+                """
+            ),
+            {"estado": estado, "intentos": intentos, "error": error, "ahora": ahora, "id": outbox_id},
+        )
+
+    def liberar_procesando(self, ahora: datetime, tomadas_antes_de: datetime) -> int:
+        """
+        Devuelve a PENDIENTE las filas que quedaron tomadas por un proceso
+        caído. Sólo las viejas: otra PC puede estar procesando las recientes.
+        El intento interrumpido cuenta: el FECAESolicitar pudo haber salido,
+        así que el reintento pasa primero por el conciliador.
+        """
+        result = self.db.execute(
+            text(
+                """
+                UPDATE arca_outbox
+                SET estado = :pendiente,
+                    intentos = intentos + 1,
+                    proximo_intento = :ahora,
+                    updated_at = :ahora
+                WHERE estado = :procesando
+                  AND updated_at < :limite
+                """
+            ),
+            {
+                "pendiente": self.PENDIENTE,
+                "procesando": self.PROCESANDO,
+                "ahora": ahora,
+                "limite": tomadas_antes_de,
+            },
+        )
+        return int(result.rowcount or 0)
+
+    def factura_ids_en_curso(self) -> Set[int]:
+        rows = self.db.execute(
+            text(
+                """
+                SELECT factura_id
+                FROM arca_outbox
+                WHERE estado IN (:pendiente, :procesando)
+                """
+            ),
+            {"pendiente": self.PENDIENTE, "procesando": self.PROCESANDO},
+        ).scalars().all()
+        return {int(r) for r in rows}
+
+    def ultimo_numero_en_cola(self, tipo_comprobante_id: int, punto_venta: int) -> Optional[int]:
+        """Número más alto todavía en cola (sin CAE) para ese tipo y punto de venta."""
+        numero = self.db.execute(
+            text(
+                """
+                SELECT MAX(f.numero)
+                FROM arca_outbox o
+                JOIN facturas f ON f.id = o.factura_id
+                WHERE o.estado IN (:pendiente, :procesando)
+                  AND f.tipo_comprobante_id = :tipo
+                  AND f.punto_venta = :pto
+                """
+            ),
+            {
+                "pendiente": self.PENDIENTE,
+                "procesando": self.PROCESANDO,
+                "tipo": tipo_comprobante_id,
+                "pto": int(punto_venta),
+            },
+        ).scalar()
+        return int(numero) if numero is not None else None
+
+    def get_by_factura(self, factura_id: int) -> Optional[Dict[str, Any]]:
+        row = self.db.execute(
+            text("SELECT * FROM arca_outbox WHERE factura_id = :factura_id"),
+            {"factura_id": factura_id},
+        ).mappings().first()
+        return dict(row) if row else None
@@ -4,10 +4,169 @@ from loguru import logger
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.repositories.statements import SeekPage, StatementRegistry, seek
+
+
+# -------------------- Búsqueda normalizada --------------------
+# Columnas generadas de clientes (migración 2026_10_17_04), todas indexadas:
+#   nro_doc_digitos       -> nro_doc sólo con dígitos
+#   nro_doc_dni           -> el DNI dentro de un CUIT/CUIL (o nro_doc_digitos)
+#   nombre_completo_norm  -> "nombre apellido" en minúsculas
+#   apellido_nombre_norm  -> "apellido nombre" en minúsculas
+
+_SEPARADORES_DOC = set(" .-/")
+
+
+def solo_digitos(texto: Any) -> str:
+    return "".join(ch for ch in str(texto or "") if ch.isdigit())
+
+
+def es_documento(texto: Any) -> bool:
+    """True si el texto es un número de documento (dígitos con . - / o espacios)."""
+    s = str(texto or "").strip()
+    return bool(s) and any(ch.isdigit() for ch in s) and all(ch.isdigit() or ch in _SEPARADORES_DOC for ch in s)
+
+
+def normalizar_nombre(texto: Any) -> str:
+    """Minúsculas y un solo espacio entre palabras, como las columnas *_norm."""
+    return " ".join(str(texto or "").lower().split())
+
+
+def filtros_nombre(texto: Any, clave: str = "q") -> Dict[str, str]:
+    """
+    Parámetros de la búsqueda por nombre sobre las columnas normalizadas:
+    la primera palabra es un prefijo de "nombre apellido" o de "apellido
+    nombre" (rango en el índice) y el resto tiene que aparecer, en orden,
+    en el nombre completo ("perez ju", "juan perez", "perez juan carlos").
+    """
+    palabras = normalizar_nombre(texto).split(" ")
+    params = {f"{clave}_nombre": f"{palabras[0]}%"}
+    if len(palabras) > 1:
+        params[f"{clave}_resto"] = "%" + "%".join(palabras[1:]) + "%"
+    return params
+
+
+# -------------------- Sentencias --------------------
+
+_SQL = StatementRegistry("clientes")
+
+_SQL.add("list_estados", "SELECT id, nombre FROM estados where tipo = 'clientes' ORDER BY id ASC")
+
+_SQL.add(
+    "exists_by_doc",
+    "SELECT 1 FROM clientes WHERE tipo_doc_id = :tipo_doc_id AND nro_doc = :nro_doc LIMIT 1",
+)
+
+_SQL.add("last_insert_id", "SELECT LAST_INSERT_ID()")
+
+_SQL.add(
+    "get_by_id",
+    """
+    SELECT
+        c.*,
+        td.codigo AS tipo_doc_codigo,
+        td.descripcion AS tipo_doc_descripcion,
+        COALESCE(
+            ec.nombre,
+            CASE c.estado_id
+                WHEN 10 THEN 'Activo'
+                WHEN 11 THEN 'Inactivo'
+            END
+        ) AS estado_nombre
+
+    FROM clientes c
+    LEFT JOIN tipos_documento td ON td.id = c.tipo_doc_id
+    LEFT JOIN estados ec ON ec.id = c.estado_id
+    WHERE c.id = :id
+    """,
+)
+
+# Búsqueda: una cláusula fija por filtro, los valores siempre como parámetros
+_SEARCH_FROM = """
+    FROM clientes c
+    LEFT JOIN tipos_documento td ON td.id = c.tipo_doc_id
+    LEFT JOIN estados ec ON ec.id = c.estado_id
+    WHERE {where}
+"""
+
+_SEARCH_SELECT = """
+    SELECT
+        c.id,
+        c.tipo_doc_id, td.codigo AS tipo_doc_codigo, c.nro_doc,
+        c.nombre, c.apellido,
+        c.telefono, c.email, c.direccion,
+        c.estado_id,
+        COALESCE(
+            ec.nombre,
+            CASE c.estado_id
+                WHEN 10 THEN 'Activo'
+                WHEN 11 THEN 'Inactivo'
+            END
+        ) AS estado_nombre,
+
+        c.observaciones
+"""
+
+_SEARCH = _SQL.dynamic(
+    "search",
+    filtros={
+        "q": (
+            "("
+            "LOWER(c.nombre) LIKE :q "
+            "OR LOWER(c.apellido) LIKE :q "
+            "OR LOWER(CONCAT_WS(' ', c.nombre, c.apellido)) LIKE :q "
+            "OR REPLACE(COALESCE(c.nro_doc, ''), '-', '') LIKE :q_digits "
+            ")"
+        ),
+        "nombre": "LOWER(c.nombre) LIKE :nombre",
+        "apellido": "LOWER(c.apellido) LIKE :apellido",
+        "tipo_doc_id": "c.tipo_doc_id = :tipo_doc_id",
+        "nro_doc": "c.nro_doc LIKE :nro_doc",
+        "email": "LOWER(c.email) LIKE :email",
+        "direccion": "LOWER(c.direccion) LIKE :direccion",
+        "estado_id": "c.estado_id = :estado_id",
+        # Búsqueda general sobre columnas normalizadas (prefijos indexados)
+        "q_doc": "(c.nro_doc_digitos LIKE :q_doc OR c.nro_doc_dni LIKE :q_doc)",
+        "q_nombre": "(c.nombre_completo_norm LIKE :q_nombre OR c.apellido_nombre_norm LIKE :q_nombre)",
+        "q_resto": "c.nombre_completo_norm LIKE :q_resto",
+        # Deltas para el índice de búsqueda local
+        "cambiados_desde": "c.updated_at >= :cambiados_desde",
+        "id_desde": "c.id > :id_desde",
+        # Paginación por clave sobre id
+        "seek_after": "c.id < :seek_id",
+        "seek_before": "c.id > :seek_id",
+    },
+    count="SELECT COUNT(*) " + _SEARCH_FROM,
+    page=_SEARCH_SELECT + _SEARCH_FROM + """
+    ORDER BY c.id DESC
+    LIMIT :limit OFFSET :offset
+    """,
+    seek=_SEARCH_SELECT + _SEARCH_FROM + """
+    ORDER BY c.id DESC
+    LIMIT :limit
+    """,
+    seek_prev=_SEARCH_SELECT + _SEARCH_FROM + """
+    ORDER BY c.id ASC
+    LIMIT :limit
+    """,
+    indice=_SEARCH_SELECT + _SEARCH_FROM + """
+    ORDER BY c.id ASC
+    """,
+    indice_wm=_SEARCH_SELECT.rstrip() + """,
+        c.updated_at AS actualizado
+    """ + _SEARCH_FROM + """
+    ORDER BY c.updated_at ASC, c.id ASC
+    """,
+)
+
 
 class ClientesRepository:
     """Consultas a 'clientes' + alta/edición y catálogos auxiliares."""
 
+    # Columnas generadas de búsqueda; None = todavía sin verificar
+    _busqueda_normalizada: Optional[bool] = None
+
     def __init__(self, db: Session):
         self.db = db
 
@@ -18,9 +177,7 @@ class ClientesRepository:
         Estados de cliente (activo/inactivo). Si no hay tabla, devuelve defaults.
         """
         try:
-            rows = self.db.execute(
-                text("SELECT id, nombre FROM estados where tipo = 'clientes' ORDER BY id ASC")
-            ).mappings().all()
+            rows = self.db.execute(_SQL["list_estados"]).mappings().all()
             out = [{"id": r["id"], "nombre": r["nombre"]} for r in rows]
             if out:
                 return out
@@ -36,10 +193,7 @@ class ClientesRepository:
         """
         if not nro_doc or not tipo_doc_id:
             return False
-        sql = text(
-            "SELECT 1 FROM clientes WHERE tipo_doc_id = :tipo_doc_id AND nro_doc = :nro_doc LIMIT 1"
-        )
-        return self.db.execute(sql, {"tipo_doc_id": tipo_doc_id, "nro_doc": nro_doc}).first() is not None
+        return self.db.execute(_SQL["exists_by_doc"], {"tipo_doc_id": tipo_doc_id, "nro_doc": nro_doc}).first() is not None
 
     # -------------------- Alta --------------------
 
@@ -82,7 +236,7 @@ class ClientesRepository:
         new_id = getattr(res, "lastrowid", None)
         if not new_id:
             try:
-                new_id = self.db.execute(text("SELECT LAST_INSERT_ID()")).scalar_one()
+                new_id = self.db.execute(_SQL["last_insert_id"]).scalar_one()
             except Exception as e:
                 logger.warning("No se pudo obtener LAST_INSERT_ID: {}", e)
 
@@ -132,120 +286,168 @@ class ClientesRepository:
             q = filtros.get("q", q)
             nombre = filtros.get("nombre")
 
-        where = ["(1=1)"]
+        activos, params = self._search_filters(
+            nombre=nombre, apellido=apellido, tipo_doc_id=tipo_doc_id, nro_doc=nro_doc,
+            email=email, direccion=direccion, estado_id=estado_id, q=q,
+        )
+
+        offset = (max(page, 1) - 1) * max(page_size, 1)
+
+        # Si existe una tabla de estados, mostrar el nombre; si no, inferir
+        total = self.db.execute(_SEARCH.get("count", activos), params).scalar_one()
+
+        rows = self.db.execute(
+            _SEARCH.get("page", activos),
+            {**params, "limit": page_size, "offset": offset},
+        ).mappings().all()
+
+        return [dict(r) for r in rows], int(total)
+
+    def list_para_indice(
+        self,
+        cambiados_desde: Any = None,
+        id_desde: Optional[int] = None,
+        con_watermark: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Filas (mismas columnas que search()) para el índice de búsqueda local.
+        con_watermark=True agrega 'actualizado' (clientes.updated_at) y permite
+        pedir sólo las modificadas desde `cambiados_desde`; sin updated_at,
+        `id_desde` trae sólo las altas.
+        """
+        activos: List[str] = []
+        params: Dict[str, Any] = {}
+        if con_watermark and cambiados_desde is not None:
+            activos.append("cambiados_desde")
+            params["cambiados_desde"] = cambiados_desde
+        if id_desde is not None:
+            activos.append("id_desde")
+            params["id_desde"] = int(id_desde)
+        stmt = _SEARCH.get("indice_wm" if con_watermark else "indice", activos)
+        return [dict(r) for r in self.db.execute(stmt, params).mappings().all()]
+
+    def _has_busqueda_normalizada(self) -> bool:
+        """True si clientes ya tiene las columnas generadas de búsqueda (se verifica una vez)."""
+        if ClientesRepository._busqueda_normalizada is not None:
+            return ClientesRepository._busqueda_normalizada
+
+        try:
+            exists = self.db.execute(
+                text(
+                    """
+                    SELECT 1
+                    FROM information_schema.columns
+                    WHERE table_schema = :schema
+                      AND table_name = 'clientes'
+                      AND column_name = 'nombre_completo_norm'
+                    LIMIT 1
+                    """
+                ),
+                {"schema": settings.DB_NAME},
+            ).first()
+        except Exception as e:
+            logger.debug("No se pudieron verificar las columnas de búsqueda de clientes: {}", e)
+            return False
+
+        ClientesRepository._busqueda_normalizada = bool(exists)
+        return ClientesRepository._busqueda_normalizada
+
+    def _search_filters(
+        self,
+        nombre: Optional[str] = None,
+        apellido: Optional[str] = None,
+        tipo_doc_id: Optional[int] = None,
+        nro_doc: Optional[str] = None,
+        email: Optional[str] = None,
+        direccion: Optional[str] = None,
+        estado_id: Optional[int] = None,
+        q: Optional[str] = None,
+    ) -> Tuple[List[str], Dict[str, Any]]:
+        """Filtros activos y parámetros de la búsqueda (ver search())."""
+        activos: List[str] = []
         params: Dict[str, Any] = {}
 
         # ---- NUEVO: búsqueda general 'q' (para combo de facturas) ----
-        if q:
-            q_str = str(q).strip()
+        q_str = str(q or "").strip()
+        if q_str and self._has_busqueda_normalizada():
+            # Con columnas normalizadas: documento o nombre por prefijo (indexado)
+            if es_documento(q_str):
+                activos.append("q_doc")
+                params["q_doc"] = f"{solo_digitos(q_str)}%"
+            else:
+                params.update(filtros_nombre(q_str))
+                activos.extend(k for k in ("q_nombre", "q_resto") if k in params)
+        elif q:
             if q_str:
                 q_lower = q_str.lower()
-                where.append(
-                    "("
-                    "LOWER(c.nombre) LIKE :q "
-                    "OR LOWER(c.apellido) LIKE :q "
-                    "OR LOWER(CONCAT_WS(' ', c.nombre, c.apellido)) LIKE :q "
-                    "OR REPLACE(COALESCE(c.nro_doc, ''), '-', '') LIKE :q_digits "
-                    ")"
-                )
+                activos.append("q")
                 params["q"] = f"%{q_lower}%"
                 q_digits = "".join(ch for ch in q_str if ch.isdigit())
                 params["q_digits"] = f"%{q_digits}%" if q_digits else params["q"]
 
         # ---- filtros tradicionales (no se tocan, mantiene página Clientes igual) ----
         if nombre:
-            where.append("LOWER(c.nombre) LIKE :nombre")
+            activos.append("nombre")
             params["nombre"] = f"%{nombre.lower()}%"
         if apellido:
-            where.append("LOWER(c.apellido) LIKE :apellido")
+            activos.append("apellido")
             params["apellido"] = f"%{apellido.lower()}%"
         if tipo_doc_id is not None:
-            where.append("c.tipo_doc_id = :tipo_doc_id")
+            activos.append("tipo_doc_id")
             params["tipo_doc_id"] = tipo_doc_id
 
 
         if nro_doc:
-            where.append("c.nro_doc LIKE :nro_doc")
+            activos.append("nro_doc")
             params["nro_doc"] = f"{nro_doc}%"
         if email:
-            where.append("LOWER(c.email) LIKE :email")
+            activos.append("email")
             params["email"] = f"%{email.lower()}%"
         if direccion:
-            where.append("LOWER(c.direccion) LIKE :direccion")
+            activos.append("direccion")
             params["direccion"] = f"%{direccion.lower()}%"
         if estado_id is not None and str(estado_id) != "":
-            where.append("c.estado_id = :estado_id")
+            activos.append("estado_id")
             try:
                 params["estado_id"] = int(estado_id)
             except Exception:
                 params["estado_id"] = 1 if str(estado_id).lower() in ("activo", "true", "1") else 0
 
-        where_sql = " AND ".join(where)
-        offset = (max(page, 1) - 1) * max(page_size, 1)
+        return activos, params
 
-        # Si existe una tabla de estados, mostrar el nombre; si no, inferir
-        sql_base = f"""
-            FROM clientes c
-            LEFT JOIN tipos_documento td ON td.id = c.tipo_doc_id
-            LEFT JOIN estados ec ON ec.id = c.estado_id
-            WHERE {where_sql}
+    def search_seek(
+        self,
+        filtros: Optional[Dict[str, Any]] = None,
+        cursor: Optional[Dict[str, Any]] = None,
+        atras: bool = False,
+        page_size: int = 25,
+    ) -> SeekPage:
         """
+        Igual que search() pero paginando por id: `cursor` es SeekPage.ultimo
+        para la página siguiente o SeekPage.primero (con atras=True) para la
+        anterior. No cuenta el total (ver count()).
+        """
+        activos, params = self._search_filters(**self._filtros_kwargs(filtros))
+        return seek(
+            self.db, _SEARCH, activos, params,
+            cursor_de=lambda r: {"seek_id": r["id"]},
+            cursor=cursor, atras=atras, page_size=page_size,
+        )
 
-        total = self.db.execute(text(f"SELECT COUNT(*) {sql_base}"), params).scalar_one()
-
-        rows = self.db.execute(
-            text(
-                f"""
-                SELECT
-                    c.id,
-                    c.tipo_doc_id, td.codigo AS tipo_doc_codigo, c.nro_doc,
-                    c.nombre, c.apellido,
-                    c.telefono, c.email, c.direccion,
-                    c.estado_id,
-                    COALESCE(
-                        ec.nombre,
-                        CASE c.estado_id
-                            WHEN 10 THEN 'Activo'
-                            WHEN 11 THEN 'Inactivo'
-                        END
-                    ) AS estado_nombre,
-
-                    c.observaciones
-                {sql_base}
-                ORDER BY c.id DESC
-                LIMIT :limit OFFSET :offset
-                """
-            ),
-            {**params, "limit": page_size, "offset": offset},
-        ).mappings().all()
+    def count(self, filtros: Optional[Dict[str, Any]] = None) -> int:
+        activos, params = self._search_filters(**self._filtros_kwargs(filtros))
+        return int(self.db.execute(_SEARCH.get("count", activos), params).scalar_one())
 
-        return [dict(r) for r in rows], int(total)
+    @staticmethod
+    def _filtros_kwargs(filtros: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        f = filtros or {}
+        return {
+            k: f.get(k)
+            for k in ("nombre", "apellido", "tipo_doc_id", "nro_doc", "email", "direccion", "estado_id", "q")
+        }
 
     def get_by_id(self, cliente_id: int) -> Optional[Dict[str, Any]]:
-        row = self.db.execute(
-            text(
-                """
-                SELECT
-                    c.*,
-                    td.codigo AS tipo_doc_codigo,
-                    td.descripcion AS tipo_doc_descripcion,
-                    COALESCE(
-                        ec.nombre,
-                        CASE c.estado_id
-                            WHEN 10 THEN 'Activo'
-                            WHEN 11 THEN 'Inactivo'
-                        END
-                    ) AS estado_nombre
-
-                FROM clientes c
-                LEFT JOIN tipos_documento td ON td.id = c.tipo_doc_id
-                LEFT JOIN estados ec ON ec.id = c.estado_id
-                WHERE c.id = :id
-
-                """
-            ),
-            {"id": cliente_id},
-        ).mappings().first()
+        row = self.db.execute(_SQL["get_by_id"], {"id": cliente_id}).mappings().first()
         return dict(row) if row else None
 
     def update(self, cliente_id: int, data: Dict[str, Any]) -> int:
@@ -7,6 +7,111 @@ from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 
+from app.core.catalog_cache import CatalogCache
+from app.core.config import settings
+from app.core.tipos_comprobante import TIPOS_COMPROBANTE_KEY, TiposComprobanteCatalogo
+from app.repositories.clientes_repository import ClientesRepository, es_documento, filtros_nombre, solo_digitos
+from app.repositories.statements import SeekPage, StatementRegistry, seek
+
+
+# -------------------- Sentencias --------------------
+
+_SQL = StatementRegistry("facturas")
+
+_TIPOS_COMPROBANTE_SELECT = """
+    SELECT
+        id,
+        codigo,
+        nombre,
+        letra,
+        es_nota_credito,
+        es_nota_debito,
+        activo
+    FROM tipos_comprobante
+"""
+
+# Todos los tipos (también inactivos): de acá sale el catálogo indexado en memoria
+_SQL.add("list_tipos_comprobante_todos", _TIPOS_COMPROBANTE_SELECT + "    ORDER BY id\n")
+_SQL.add(
+    "list_estados_facturas",
+    """
+    SELECT id, nombre, descripcion
+    FROM estados
+    WHERE tipo = 'facturas'
+    ORDER BY id
+    """,
+)
+
+# Búsqueda: una cláusula fija por filtro, los valores siempre como parámetros
+_SEARCH_FROM = """
+    FROM facturas f
+    LEFT JOIN clientes c ON c.id = f.cliente_id
+    LEFT JOIN tipos_documento td ON td.id = c.tipo_doc_id
+    LEFT JOIN estados  e ON e.id = f.estado_id
+    LEFT JOIN tipos_comprobante tc ON tc.id = f.tipo_comprobante_id
+
+    WHERE {where}
+"""
+
+_SEARCH_SELECT = """
+    SELECT
+        f.id,
+        f.fecha_emision AS fecha,
+        tc.codigo AS tipo_codigo,
+        f.punto_venta AS pto_vta,
+        f.numero,
+        CONCAT_WS(' ', c.nombre, c.apellido) AS cliente,
+        c.nro_doc AS documento,
+
+        f.total,
+        f.estado_id,
+        e.nombre AS estado,
+        f.cae,
+        f.vto_cae,
+        f.observaciones
+"""
+
+_SEARCH = _SQL.dynamic(
+    "search",
+    filtros={
+        "tipo": "f.tipo_comprobante_id = :tipo",
+        "pto_vta": "f.punto_venta = :pto_vta",
+        "numero": "CAST(f.numero AS CHAR) LIKE :numero",
+        "cliente": "LOWER(CONCAT_WS(' ', c.nombre, c.apellido)) LIKE :cliente",
+        "doc": "REPLACE(COALESCE(c.nro_doc, ''), '-', '') LIKE :doc",
+        # Cliente sobre las columnas normalizadas de clientes (prefijos indexados)
+        "cliente_nombre": "(c.nombre_completo_norm LIKE :cliente_nombre OR c.apellido_nombre_norm LIKE :cliente_nombre)",
+        "cliente_resto": "c.nombre_completo_norm LIKE :cliente_resto",
+        "doc_prefijo": "(c.nro_doc_digitos LIKE :doc_prefijo OR c.nro_doc_dni LIKE :doc_prefijo)",
+        "estado_id": "f.estado_id = :estado_id",
+        "fd": "f.fecha_emision >= :fd",
+        "fh": "f.fecha_emision <= :fh",
+        # Paginación por clave sobre (fecha_emision, id)
+        "seek_after": (
+            "(f.fecha_emision < :seek_fecha "
+            "OR (f.fecha_emision = :seek_fecha AND f.id < :seek_id))"
+        ),
+        "seek_before": (
+            "(f.fecha_emision > :seek_fecha "
+            "OR (f.fecha_emision = :seek_fecha AND f.id > :seek_id))"
+        ),
+    },
+    count="SELECT COUNT(*) " + _SEARCH_FROM,
+    page=_SEARCH_SELECT + _SEARCH_FROM + """
+    ORDER BY f.fecha_emision DESC, f.id DESC
+    LIMIT :limit OFFSET :offset
+    """,
+    seek=_SEARCH_SELECT + _SEARCH_FROM + """
+    ORDER BY f.fecha_emision DESC, f.id DESC
+    LIMIT :limit
+    """,
+    seek_prev=_SEARCH_SELECT + _SEARCH_FROM + """
+    ORDER BY f.fecha_emision ASC, f.id ASC
+    LIMIT :limit
+    """,
+)
+
+
 class FacturasRepository:
     """Consultas a 'facturas' y catálogos auxiliares para facturación."""
 
@@ -14,24 +119,29 @@ class FacturasRepository:
         self.db = db
 
     # -------------------- Lookups --------------------
-    def list_tipos_comprobante(self):
-        rows = self.db.execute(
-            text("""
-                SELECT
-                    id,
-                    codigo,
-                    nombre,
-                    letra,
-                    es_nota_credito,
-                    es_nota_debito,
-                    activo
-                FROM tipos_comprobante
-                WHERE activo = 1
-                ORDER BY nombre
-            """)
-        ).mappings().all()
+    def tipos_comprobante(self) -> TiposComprobanteCatalogo:
+        """
+        Catálogo indexado de tipos de comprobante, desde CatalogCache.
+        Si no está cargado se lee una sola vez con la sesión de este repo.
+        """
+        cache = CatalogCache.get()
+        catalogo = cache.get_value(TIPOS_COMPROBANTE_KEY)
+        if isinstance(catalogo, TiposComprobanteCatalogo):
+            return catalogo
+
+        version = None
+        if catalogo:
+            # Filas planas (snapshot en disco): sólo falta armar los índices
+            version = cache.version(TIPOS_COMPROBANTE_KEY)
+            catalogo = TiposComprobanteCatalogo(catalogo)
+        else:
+            rows = self.db.execute(_SQL["list_tipos_comprobante_todos"]).mappings().all()
+            catalogo = TiposComprobanteCatalogo(rows)
+        cache.set(TIPOS_COMPROBANTE_KEY, catalogo, ttl=settings.CATALOG_TTL or None, version=version)
+        return catalogo
 
-        return [dict(r) for r in rows]
+    def list_tipos_comprobante(self):
+        return self.tipos_comprobante().activos()
 
 
     def get_by_id_con_venta(self, factura_id: int) -> dict | None:
@@ -299,6 +409,13 @@ class FacturasRepository:
                 params,
             )
 
+    def actualizar_numero(self, factura_id: int, numero: int) -> None:
+        """Renumera una factura todavía sin CAE (conflicto de numeración con ARCA)."""
+        self.db.execute(
+            text("UPDATE facturas SET numero = :numero WHERE id = :id AND cae IS NULL"),
+            {"id": factura_id, "numero": int(numero)},
+        )
+
     def actualizar_cae_y_estado(
         self,
         factura_id: int,
@@ -360,9 +477,7 @@ class FacturasRepository:
           - estado_id
           - fecha_desde (YYYY-MM-DD), fecha_hasta (YYYY-MM-DD)
         """
-        f: Dict[str, Any] = filters or {}
-        where = ["(1=1)"]
-        params: Dict[str, Any] = {}
+        activos, params = self._search_filters(filters)
 
         # sanitizar paginación
         try:
@@ -378,15 +493,53 @@ class FacturasRepository:
         page_size_i = max(page_size_i, 1)
         offset = (page_i - 1) * page_size_i
 
+        total = self.db.execute(_SEARCH.get("count", activos), params).scalar_one()
+
+        rows = self.db.execute(
+            _SEARCH.get("page", activos),
+            {**params, "limit": page_size_i, "offset": offset},
+        ).mappings().all()
+
+        return [dict(r) for r in rows], int(total)
+
+    def search_seek(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        cursor: Optional[Dict[str, Any]] = None,
+        atras: bool = False,
+        page_size: int = 25,
+    ) -> SeekPage:
+        """
+        Igual que search() pero paginando por (fecha_emision, id): `cursor` es
+        SeekPage.ultimo para la página siguiente o SeekPage.primero (con
+        atras=True) para la anterior. No cuenta el total (ver count()).
+        """
+        activos, params = self._search_filters(filters)
+        return seek(
+            self.db, _SEARCH, activos, params,
+            cursor_de=lambda r: {"seek_fecha": r["fecha"], "seek_id": r["id"]},
+            cursor=cursor, atras=atras, page_size=page_size,
+        )
+
+    def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        activos, params = self._search_filters(filters)
+        return int(self.db.execute(_SEARCH.get("count", activos), params).scalar_one())
+
+    def _search_filters(self, filters: Optional[Dict[str, Any]]) -> Tuple[List[str], Dict[str, Any]]:
+        """Filtros activos y parámetros de la búsqueda (ver search())."""
+        f: Dict[str, Any] = filters or {}
+        activos: List[str] = []
+        params: Dict[str, Any] = {}
+
         # tipo comprobante
         if f.get("tipo_comprobante_id"):
-            where.append("f.tipo_comprobante_id = :tipo")
+            activos.append("tipo")
             params["tipo"] = f["tipo_comprobante_id"]
 
 
         # punto de venta
         if f.get("pto_vta"):
-            where.append("f.punto_venta = :pto_vta")
+            activos.append("pto_vta")
             try:
                 params["pto_vta"] = int(f["pto_vta"])
             except Exception:
@@ -394,24 +547,36 @@ class FacturasRepository:
 
         # número (like)
         if f.get("numero"):
-            where.append("CAST(f.numero AS CHAR) LIKE :numero")
+            activos.append("numero")
             params["numero"] = f"%{f['numero']}%"
 
+        normalizada = bool(f.get("cliente") or f.get("documento")) and ClientesRepository(self.db)._has_busqueda_normalizada()
+
         # cliente por nombre/apellido
         if f.get("cliente"):
-            where.append("LOWER(CONCAT_WS(' ', c.nombre, c.apellido)) LIKE :cliente")
-            params["cliente"] = f"%{str(f['cliente']).lower()}%"
+            if normalizada and es_documento(f["cliente"]):
+                activos.append("doc_prefijo")
+                params["doc_prefijo"] = f"{solo_digitos(f['cliente'])}%"
+            elif normalizada:
+                params.update(filtros_nombre(f["cliente"], clave="cliente"))
+                activos.extend(k for k in ("cliente_nombre", "cliente_resto") if k in params)
+            else:
+                activos.append("cliente")
+                params["cliente"] = f"%{str(f['cliente']).lower()}%"
 
         # documento -> usamos nro_doc
         if f.get("documento"):
-            doc_digits = "".join(ch for ch in str(f["documento"]) if ch.isdigit())
-            if doc_digits:
-                where.append("REPLACE(COALESCE(c.nro_doc, ''), '-', '') LIKE :doc")
+            doc_digits = solo_digitos(f["documento"])
+            if doc_digits and normalizada:
+                activos.append("doc_prefijo")
+                params["doc_prefijo"] = f"{doc_digits}%"
+            elif doc_digits:
+                activos.append("doc")
                 params["doc"] = f"%{doc_digits}%"
 
         # estado
         if f.get("estado_id") not in (None, "", "null"):
-            where.append("f.estado_id = :estado_id")
+            activos.append("estado_id")
             try:
                 params["estado_id"] = int(f["estado_id"])
             except Exception:
@@ -420,7 +585,7 @@ class FacturasRepository:
         # fechas
         # Nota: fecha_emision es datetime, así que fecha_hasta conviene llevarla a fin de día.
         if f.get("fecha_desde"):
-            where.append("f.fecha_emision >= :fd")
+            activos.append("fd")
             params["fd"] = f["fecha_desde"]
 
         if f.get("fecha_hasta"):
@@ -432,50 +597,11 @@ class FacturasRepository:
             except Exception:
                 # si ya viene con hora, o viene algo raro, lo pasamos tal cual
                 fh = fh_raw
-            where.append("f.fecha_emision <= :fh")
+            activos.append("fh")
             params["fh"] = fh
 
-        where_sql = " AND ".join(where)
-
-        sql_base = f"""
-            FROM facturas f
-            LEFT JOIN clientes c ON c.id = f.cliente_id
-            LEFT JOIN tipos_documento td ON td.id = c.tipo_doc_id
-            LEFT JOIN estados  e ON e.id = f.estado_id
-            LEFT JOIN tipos_comprobante tc ON tc.id = f.tipo_comprobante_id
-
-            WHERE {where_sql}
-        """
-
-        total = self.db.execute(text(f"SELECT COUNT(*) {sql_base}"), params).scalar_one()
-
-        rows = self.db.execute(
-            text(
-                f"""
-                SELECT
-                    f.id,
-                    f.fecha_emision AS fecha,
-                    tc.codigo AS tipo_codigo,
-                    f.punto_venta AS pto_vta,
-                    f.numero,
-                    CONCAT_WS(' ', c.nombre, c.apellido) AS cliente,
-                    c.nro_doc AS documento,
-                    
-                    f.total,
-                    f.estado_id,
-                    e.nombre AS estado,
-                    f.cae,
-                    f.vto_cae,
-                    f.observaciones
-                {sql_base}
-                ORDER BY f.fecha_emision DESC, f.id DESC
-                LIMIT :limit OFFSET :offset
-                """
-            ),
-            {**params, "limit": page_size_i, "offset": offset},
-        ).mappings().all()
+        return activos, params
 
-        return [dict(r) for r in rows], int(total)
     def get_tipo_comprobante_by_id(
         self,
         tipo_id: int
@@ -484,23 +610,7 @@ class FacturasRepository:
         Devuelve un tipo de comprobante por ID.
         """
 
-        row = self.db.execute(
-            text("""
-                SELECT
-                    id,
-                    codigo,
-                    nombre,
-                    letra,
-                    es_nota_credito,
-                    es_nota_debito,
-                    activo
-                FROM tipos_comprobante
-                WHERE id = :id
-            """),
-            {"id": tipo_id}
-        ).mappings().first()
-
-        return dict(row) if row else None
+        return self.tipos_comprobante().by_id(tipo_id)
     def get_tipo_comprobante_by_codigo(
         self,
         codigo: str
@@ -509,23 +619,7 @@ class FacturasRepository:
         Devuelve un tipo de comprobante por código (FA, FB, NCA, etc.).
         """
 
-        row = self.db.execute(
-            text("""
-                SELECT
-                    id,
-                    codigo,
-                    nombre,
-                    letra,
-                    es_nota_credito,
-                    es_nota_debito,
-                    activo
-                FROM tipos_comprobante
-                WHERE codigo = :codigo
-            """),
-            {"codigo": codigo}
-        ).mappings().first()
-
-        return dict(row) if row else None
+        return self.tipos_comprobante().by_codigo(codigo)
     def get_tipo_nota_credito_por_letra(
         self,
         letra: str
@@ -535,38 +629,10 @@ class FacturasRepository:
         correspondiente a la letra indicada.
         """
 
-        row = self.db.execute(
-            text("""
-                SELECT
-                    id,
-                    codigo,
-                    nombre,
-                    letra,
-                    es_nota_credito,
-                    es_nota_debito,
-                    activo
-                FROM tipos_comprobante
-                WHERE letra = :letra
-                AND es_nota_credito = 1
-                AND activo = 1
-                LIMIT 1
-            """),
-            {"letra": letra}
-        ).mappings().first()
-
-        return dict(row) if row else None
+        return self.tipos_comprobante().por_letra(letra, es_nota_credito=True)
 
     def list_estados_facturas(self) -> List[Dict[str, Any]]:
-        rows = self.db.execute(
-            text(
-                """
-                SELECT id, nombre, descripcion
-                FROM estados
-                WHERE tipo = 'facturas'
-                ORDER BY id
-                """
-            )
-        ).mappings().all()
+        rows = self.db.execute(_SQL["list_estados_facturas"]).mappings().all()
         return [dict(row) for row in rows]
 
     def get_codigo_tipo_comprobante(
@@ -577,19 +643,7 @@ class FacturasRepository:
         Devuelve solo el código (FA, FB, NCA, etc.)
         """
 
-        row = self.db.execute(
-            text("""
-                SELECT codigo
-                FROM tipos_comprobante
-                WHERE id = :id
-            """),
-            {"id": tipo_id}
-        ).mappings().first()
-
-        if not row:
-            return None
-
-        return row["codigo"]
+        return self.tipos_comprobante().codigo(tipo_id)
     def get_next_numero(
         self,
         tipo_comprobante_id: int,
@@ -616,16 +670,7 @@ class FacturasRepository:
 
         return int(ultimo) + 1
     def es_nota_credito(self, tipo_id: int) -> bool:
-        row = self.db.execute(
-            text("""
-                SELECT es_nota_credito
-                FROM tipos_comprobante
-                WHERE id = :id
-            """),
-            {"id": tipo_id}
-        ).mappings().first()
-
-        return bool(row["es_nota_credito"]) if row else False
+        return self.tipos_comprobante().es_nota_credito(tipo_id)
 
     def get_by_id(self, factura_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from threading import RLock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+
+class DynamicStatement:
+    """
+    Sentencia con filtros opcionales (búsquedas de páginas y combos).
+
+    Cada filtro es una cláusula fija con sus propios :parámetros; sólo varía
+    cuáles están activos. Así el text() de cada combinación se arma una vez y
+    la caché de compilación de SQLAlchemy ve siempre el mismo objeto: hay a
+    lo sumo 2^n claves posibles (una por combinación de filtros activos), no
+    una por cada valor buscado.
+
+    Las plantillas llevan {where} donde va el WHERE ya armado.
+    """
+
+    def __init__(self, nombre: str, filtros: Dict[str, str], plantillas: Dict[str, str]) -> None:
+        self.nombre = nombre
+        self._filtros = dict(filtros)
+        self._orden = {clave: i for i, clave in enumerate(self._filtros)}
+        self._plantillas = dict(plantillas)
+        self._cache: Dict[Tuple[str, Tuple[str, ...]], TextClause] = {}
+        self._lock = RLock()
+
+    def _clave(self, activos: Iterable[str]) -> Tuple[str, ...]:
+        activos = set(activos)
+        desconocidos = activos - self._filtros.keys()
+        if desconocidos:
+            raise KeyError(f"{self.nombre}: filtros desconocidos {sorted(desconocidos)}")
+        return tuple(sorted(activos, key=self._orden.__getitem__))
+
+    def get(self, plantilla: str, activos: Iterable[str] = ()) -> TextClause:
+        clave = (plantilla, self._clave(activos))
+        stmt = self._cache.get(clave)
+        if stmt is not None:
+            return stmt
+
+        with self._lock:
+            stmt = self._cache.get(clave)
+            if stmt is None:
+                where = " AND ".join(["(1=1)", *(self._filtros[f] for f in clave[1])])
+                stmt = text(self._plantillas[plantilla].format(where=where))
+                self._cache[clave] = stmt
+            return stmt
+
+    def cache_size(self) -> int:
+        return len(self._cache)
+
+
+class StatementRegistry:
+    """
+    Sentencias de un módulo de repositorio, construidas una sola vez al
+    importarlo en vez de en cada llamada.
+
+        _SQL = StatementRegistry("clientes")
+        _SQL.add("get_by_id", "SELECT ... WHERE c.id = :id")
+        ...
+        self.db.execute(_SQL["get_by_id"], {"id": cliente_id})
+    """
+
+    def __init__(self, modulo: str) -> None:
+        self.modulo = modulo
+        self._estaticas: Dict[str, TextClause] = {}
+        self._dinamicas: Dict[str, DynamicStatement] = {}
+
+    def add(self, nombre: str, sql: str) -> TextClause:
+        if nombre in self._estaticas:
+            raise KeyError(f"{self.modulo}: la sentencia '{nombre}' ya está registrada")
+        stmt = self._estaticas[nombre] = text(sql)
+        return stmt
+
+    def dynamic(self, nombre: str, filtros: Dict[str, str], **plantillas: str) -> DynamicStatement:
+        if nombre in self._dinamicas:
+            raise KeyError(f"{self.modulo}: la sentencia '{nombre}' ya está registrada")
+        stmt = self._dinamicas[nombre] = DynamicStatement(f"{self.modulo}.{nombre}", filtros, plantillas)
+        return stmt
+
+    def __getitem__(self, nombre: str) -> TextClause:
+        return self._estaticas[nombre]
+
+    def __contains__(self, nombre: str) -> bool:
+        return nombre in self._estaticas or nombre in self._dinamicas
+
+
+@dataclass
+class SeekPage:
+    """Página de un listado paginado por clave (keyset) en vez de OFFSET."""
+
+    rows: List[Dict[str, Any]]
+    primero: Optional[Dict[str, Any]]  # cursor para ir a la página anterior
+    ultimo: Optional[Dict[str, Any]]  # cursor para ir a la página siguiente
+    hay_anterior: bool
+    hay_siguiente: bool
+
+
+def seek(
+    db: Session,
+    stmt: DynamicStatement,
+    activos: Iterable[str],
+    params: Dict[str, Any],
+    cursor_de: Callable[[Dict[str, Any]], Dict[str, Any]],
+    cursor: Optional[Dict[str, Any]] = None,
+    atras: bool = False,
+    page_size: int = 25,
+) -> SeekPage:
+    """
+    Paginación por clave sobre una DynamicStatement.
+
+    La sentencia tiene que definir los filtros 'seek_after' / 'seek_before'
+    (filas posteriores / anteriores al cursor en el orden del listado) y las
+    plantillas 'seek' (orden del listado) y 'seek_prev' (orden inverso), ambas
+    con LIMIT :limit. `cursor_de(row)` arma los parámetros del cursor de una
+    fila. El costo es el mismo en la página 1 que en la 200: se busca desde
+    la clave en el índice en vez de saltear filas.
+    """
+    page_size = max(int(page_size), 1)
+    base = list(activos)
+    activos = list(base)
+    if not cursor:
+        atras = False
+    else:
+        activos.append("seek_before" if atras else "seek_after")
+        params = {**params, **cursor}
+
+    # Una fila de más en el sentido de avance dice si hay otra página en ese sentido
+    rows = db.execute(
+        stmt.get("seek_prev" if atras else "seek", activos),
+        {**params, "limit": page_size + 1},
+    ).mappings().all()
+
+    hay_mas = len(rows) > page_size
+    rows = [dict(r) for r in rows[:page_size]]
+    if atras:
+        rows.reverse()
+
+    # Para el otro sentido se busca una fila del otro lado de la página. Con
+    # la página vacía (borrados, filtros que cambiaron bajo el cursor) todo
+    # lo que cumpla los filtros queda de ese lado: alcanza con que haya una.
+    if atras:
+        hay_anterior = hay_mas
+        hay_siguiente = _hay_filas(db, stmt, base, params, "seek_after", cursor_de(rows[-1]) if rows else None)
+    else:
+        hay_siguiente = hay_mas
+        hay_anterior = bool(cursor) and _hay_filas(
+            db, stmt, base, params, "seek_before", cursor_de(rows[0]) if rows else None
+        )
+
+    return SeekPage(
+        rows=rows,
+        primero=cursor_de(rows[0]) if rows else None,
+        ultimo=cursor_de(rows[-1]) if rows else None,
+        hay_anterior=hay_anterior,
+        hay_siguiente=hay_siguiente,
+    )
+
+
+def _hay_filas(
+    db: Session,
+    stmt: DynamicStatement,
+    activos: List[str],
+    params: Dict[str, Any],
+    lado: str,
+    cursor: Optional[Dict[str, Any]],
+) -> bool:
+    """True si hay al menos una fila del lado `lado` del cursor (o alguna, sin cursor)."""
+    if cursor:
+        activos = [*activos, lado]
+        params = {**params, **cursor}
+    return db.execute(stmt.get("seek", activos), {**params, "limit": 1}).first() is not None
@@ -5,6 +5,101 @@ from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 
+from app.repositories.statements import SeekPage, StatementRegistry, seek
+
+
+# -------------------- Sentencias --------------------
+
+_SQL = StatementRegistry("vehiculos")
+
+_SQL.add("list_colores", "SELECT id, nombre FROM colores ORDER BY nombre ASC")
+
+# Búsqueda: una cláusula fija por filtro, los valores siempre como parámetros
+_SEARCH_FROM = """
+    FROM vehiculos v
+    LEFT JOIN colores c       ON c.id = v.color_id
+    LEFT JOIN estados_stock es ON es.id = v.estado_stock_id
+    LEFT JOIN estados em  ON em.id = v.estado_moto_id
+    LEFT JOIN proveedores p    ON p.id = v.proveedor_id
+    WHERE {where}
+"""
+
+_SEARCH_SELECT = """
+    SELECT
+        v.id, v.marca, v.modelo, v.anio,
+        v.nro_certificado, v.nro_dnrpa, v.lca,
+        v.numero_cuadro, v.numero_motor,
+        v.precio_lista,
+        v.observaciones,
+        v.color_id,         c.nombre AS color,
+        v.estado_stock_id,  es.nombre AS estado_stock,
+        v.estado_moto_id,
+        COALESCE(em.nombre,
+            CASE v.estado_moto_id WHEN 1 THEN 'Nueva'
+                                  WHEN 2 THEN 'Usada'
+                                  ELSE NULL END) AS estado_moto,
+        p.razon_social AS proveedor
+"""
+
+_SEARCH = _SQL.dynamic(
+    "search",
+    filtros={
+        "q": (
+            "("
+            "LOWER(v.marca) LIKE :q "
+            "OR LOWER(v.modelo) LIKE :q "
+            "OR LOWER(COALESCE(v.numero_motor, '')) LIKE :q "
+            "OR LOWER(COALESCE(v.numero_cuadro, '')) LIKE :q "
+            "OR LOWER(COALESCE(v.nro_certificado, '')) LIKE :q "
+            "OR LOWER(COALESCE(v.nro_dnrpa, '')) LIKE :q "
+            "OR LOWER(COALESCE(v.lca, '')) LIKE :q "
+            "OR LOWER(COALESCE(v.observaciones, '')) LIKE :q "
+            ")"
+        ),
+        "marca": "v.marca LIKE :marca",
+        "modelo": "v.modelo LIKE :modelo",
+        "anio": "v.anio = :anio",
+        "nro_cuadro": "v.numero_cuadro LIKE :nro_cuadro",
+        "nro_motor": "v.numero_motor LIKE :nro_motor",
+        "nro_certificado": "v.nro_certificado LIKE :nro_certificado",
+        "nro_dnrpa": "v.nro_dnrpa LIKE :nro_dnrpa",
+        "lca": "v.lca LIKE :lca",
+        "observaciones": "COALESCE(v.observaciones, '') LIKE :observaciones",
+        "color_id": "v.color_id = :color_id",
+        "color": "LOWER(c.nombre) LIKE :color",
+        "estado_stock_id": "v.estado_stock_id = :estado_stock_id",
+        "estado_moto_id": "v.estado_moto_id = :estado_moto_id",
+        # Deltas para el índice de búsqueda local
+        "cambiados_desde": "v.updated_at >= :cambiados_desde",
+        "id_desde": "v.id > :id_desde",
+        # Paginación por clave sobre id
+        "seek_after": "v.id < :seek_id",
+        "seek_before": "v.id > :seek_id",
+    },
+    count="SELECT COUNT(*) " + _SEARCH_FROM,
+    page=_SEARCH_SELECT + _SEARCH_FROM + """
+    ORDER BY v.id DESC
+    LIMIT :limit OFFSET :offset
+    """,
+    seek=_SEARCH_SELECT + _SEARCH_FROM + """
+    ORDER BY v.id DESC
+    LIMIT :limit
+    """,
+    seek_prev=_SEARCH_SELECT + _SEARCH_FROM + """
+    ORDER BY v.id ASC
+    LIMIT :limit
+    """,
+    indice=_SEARCH_SELECT + _SEARCH_FROM + """
+    ORDER BY v.id ASC
+    """,
+    indice_wm=_SEARCH_SELECT.rstrip() + """,
+        v.updated_at AS actualizado
+    """ + _SEARCH_FROM + """
+    ORDER BY v.updated_at ASC, v.id ASC
+    """,
+)
+
+
 class VehiculosRepository:
     """Consultas a 'vehiculos' y tablas auxiliares (colores, estados) + alta."""
 
@@ -16,8 +111,7 @@ class VehiculosRepository:
     # ==================================================
 
     def list_colores(self) -> List[Dict[str, Any]]:
-        sql = text("SELECT id, nombre FROM colores ORDER BY nombre ASC")
-        rows = self.db.execute(sql).mappings().all()
+        rows = self.db.execute(_SQL["list_colores"]).mappings().all()
         return [dict(r) for r in rows]
 
     def list_estados_stock(self) -> List[Dict[str, Any]]:
@@ -215,7 +309,101 @@ class VehiculosRepository:
             q = filtros.get("q", q)   # <-- NUEVO
             marca = filtros.get("marca")
 
-        where = ["(1=1)"]
+        activos, params = self._search_filters(
+            marca=marca, modelo=modelo, anio=anio, nro_cuadro=nro_cuadro, nro_motor=nro_motor,
+            color=color, color_id=color_id, estado_stock_id=estado_stock_id,
+            estado_moto_id=estado_moto_id, nro_certificado=nro_certificado, nro_dnrpa=nro_dnrpa,
+            lca=lca, observaciones=observaciones, q=q,
+        )
+
+        offset = (max(page, 1) - 1) * max(page_size, 1)
+
+        total = self.db.execute(_SEARCH.get("count", activos), params).scalar_one()
+
+        rows = self.db.execute(
+            _SEARCH.get("page", activos),
+            {**params, "limit": page_size, "offset": offset},
+        ).mappings().all()
+
+        return [dict(r) for r in rows], int(total)
+
+    def search_seek(
+        self,
+        filtros: Optional[Dict[str, Any]] = None,
+        cursor: Optional[Dict[str, Any]] = None,
+        atras: bool = False,
+        page_size: int = 25,
+    ) -> SeekPage:
+        """
+        Igual que search() pero paginando por id: `cursor` es SeekPage.ultimo
+        para la página siguiente o SeekPage.primero (con atras=True) para la
+        anterior. No cuenta el total (ver count()).
+        """
+        activos, params = self._search_filters(**self._filtros_kwargs(filtros))
+        return seek(
+            self.db, _SEARCH, activos, params,
+            cursor_de=lambda r: {"seek_id": r["id"]},
+            cursor=cursor, atras=atras, page_size=page_size,
+        )
+
+    def count(self, filtros: Optional[Dict[str, Any]] = None) -> int:
+        activos, params = self._search_filters(**self._filtros_kwargs(filtros))
+        return int(self.db.execute(_SEARCH.get("count", activos), params).scalar_one())
+
+    def list_para_indice(
+        self,
+        cambiados_desde: Any = None,
+        id_desde: Optional[int] = None,
+        con_watermark: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Filas (mismas columnas que search()) para el índice de búsqueda local.
+        con_watermark=True agrega 'actualizado' (vehiculos.updated_at) y permite
+        pedir sólo las modificadas desde `cambiados_desde`; sin updated_at,
+        `id_desde` trae sólo las altas.
+        """
+        activos: List[str] = []
+        params: Dict[str, Any] = {}
+        if con_watermark and cambiados_desde is not None:
+            activos.append("cambiados_desde")
+            params["cambiados_desde"] = cambiados_desde
+        if id_desde is not None:
+            activos.append("id_desde")
+            params["id_desde"] = int(id_desde)
+        stmt = _SEARCH.get("indice_wm" if con_watermark else "indice", activos)
+        return [dict(r) for r in self.db.execute(stmt, params).mappings().all()]
+
+    @staticmethod
+    def _filtros_kwargs(filtros: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        f = filtros or {}
+        return {
+            k: f.get(k)
+            for k in (
+                "marca", "modelo", "anio", "nro_cuadro", "nro_motor", "color", "color_id",
+                "estado_stock_id", "estado_moto_id", "nro_certificado", "nro_dnrpa", "lca",
+                "observaciones", "q",
+            )
+        }
+
+    def _search_filters(
+        self,
+        marca: Optional[str] = None,
+        modelo: Optional[str] = None,
+        anio: Optional[int] = None,
+        nro_cuadro: Optional[str] = None,
+        nro_motor: Optional[str] = None,
+        color: Optional[str] = None,
+        color_id: Optional[int] = None,
+        estado_stock_id: Optional[int] = None,
+        estado_moto_id: Optional[int] = None,
+        nro_certificado: Optional[str] = None,
+        nro_dnrpa: Optional[str] = None,
+        lca: Optional[str] = None,
+        observaciones: Optional[str] = None,
+        q: Optional[str] = None,
+    ) -> Tuple[List[str], Dict[str, Any]]:
+        """Filtros activos y parámetros de la búsqueda (ver search())."""
+        activos: List[str] = []
         params: Dict[str, Any] = {}
 
         # ---- NUEVO: búsqueda general 'q' (para combos) ----
@@ -223,108 +411,58 @@ class VehiculosRepository:
             q_str = str(q).strip()
             if q_str:
                 q_lower = q_str.lower()
-                where.append(
-                    "("
-                    "LOWER(v.marca) LIKE :q "
-                    "OR LOWER(v.modelo) LIKE :q "
-                    "OR LOWER(COALESCE(v.numero_motor, '')) LIKE :q "
-                    "OR LOWER(COALESCE(v.numero_cuadro, '')) LIKE :q "
-                    "OR LOWER(COALESCE(v.nro_certificado, '')) LIKE :q "
-                    "OR LOWER(COALESCE(v.nro_dnrpa, '')) LIKE :q "
-                    "OR LOWER(COALESCE(v.lca, '')) LIKE :q "
-                    "OR LOWER(COALESCE(v.observaciones, '')) LIKE :q "
-                    ")"
-                )
+                activos.append("q")
                 params["q"] = f"%{q_lower}%"
 
         # ---- filtros específicos (se mantienen como estaban) ----
         if marca:
-            where.append("v.marca LIKE :marca")
+            activos.append("marca")
             params["marca"] = f"%{marca}%"
         if modelo:
-            where.append("v.modelo LIKE :modelo")
+            activos.append("modelo")
             params["modelo"] = f"%{modelo}%"
         if anio:
-            where.append("v.anio = :anio")
+            activos.append("anio")
             params["anio"] = int(anio)
         if nro_cuadro:
-            where.append("v.numero_cuadro LIKE :nro_cuadro")
+            activos.append("nro_cuadro")
             params["nro_cuadro"] = f"%{nro_cuadro}%"
         if nro_motor:
-            where.append("v.numero_motor LIKE :nro_motor")
+            activos.append("nro_motor")
             params["nro_motor"] = f"%{nro_motor}%"
 
         # NUEVOS filtros
         if nro_certificado:
-            where.append("v.nro_certificado LIKE :nro_certificado")
+            activos.append("nro_certificado")
             params["nro_certificado"] = f"%{nro_certificado}%"
         if nro_dnrpa:
-            where.append("v.nro_dnrpa LIKE :nro_dnrpa")
+            activos.append("nro_dnrpa")
             params["nro_dnrpa"] = f"%{nro_dnrpa}%"
         if lca:
-            where.append("v.lca LIKE :lca")
+            activos.append("lca")
             params["lca"] = f"%{lca}%"
         if observaciones:
             # evitar NULL: COALESCE
-            where.append("COALESCE(v.observaciones, '') LIKE :observaciones")
+            activos.append("observaciones")
             params["observaciones"] = f"%{observaciones}%"
 
         # Filtro de color por id tiene prioridad; si no hay id, admitimos por nombre
         if color_id:
-            where.append("v.color_id = :color_id")
+            activos.append("color_id")
             params["color_id"] = int(color_id)
         elif color and color.strip().lower() not in ("todos", "color (todos)"):
-            where.append("LOWER(c.nombre) LIKE :color")
+            activos.append("color")
             params["color"] = f"%{color.lower()}%"
 
         if estado_stock_id:
-            where.append("v.estado_stock_id = :estado_stock_id")
+            activos.append("estado_stock_id")
             params["estado_stock_id"] = int(estado_stock_id)
 
         if estado_moto_id:
-            where.append("v.estado_moto_id = :estado_moto_id")
+            activos.append("estado_moto_id")
             params["estado_moto_id"] = int(estado_moto_id)
 
-        where_sql = " AND ".join(where)
-        offset = (max(page, 1) - 1) * max(page_size, 1)
-
-        sql_base = f"""
-            FROM vehiculos v
-            LEFT JOIN colores c       ON c.id = v.color_id
-            LEFT JOIN estados_stock es ON es.id = v.estado_stock_id
-            LEFT JOIN estados em  ON em.id = v.estado_moto_id
-            LEFT JOIN proveedores p    ON p.id = v.proveedor_id
-            WHERE {where_sql}
-        """
-
-        total = self.db.execute(text(f"SELECT COUNT(*) {sql_base}"), params).scalar_one()
-
-        rows = self.db.execute(
-            text(
-                f"""
-                SELECT
-                    v.id, v.marca, v.modelo, v.anio,
-                    v.nro_certificado, v.nro_dnrpa, v.lca,
-                    v.numero_cuadro, v.numero_motor,
-                    v.precio_lista,
-                    v.observaciones,
-                    v.color_id,         c.nombre AS color,
-                    v.estado_stock_id,  es.nombre AS estado_stock,
-                    v.estado_moto_id,
-                    COALESCE(em.nombre,
-                        CASE v.estado_moto_id WHEN 1 THEN 'Nueva'
-                                              WHEN 2 THEN 'Usada'
-                                              ELSE NULL END) AS estado_moto,
-                    p.razon_social AS proveedor
-                {sql_base}
-                ORDER BY v.id DESC
-                LIMIT :limit OFFSET :offset
-                """
-            ),
-            {**params, "limit": page_size, "offset": offset},
-        ).mappings().all()
-
-        return [dict(r) for r in rows], int(total)
+        return activos, params
 
 
     def get_by_id(self, vehiculo_id: int) -> Optional[Dict[str, Any]]:
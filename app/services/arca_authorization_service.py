@@ -43,7 +43,14 @@ class ArcaAuthorizationService:
         self._rejected_effects_processor = rejected_effects_processor
         self._audit = AuditLogService()
 
-    def autorizar_factura(self, factura_id: int) -> Dict[str, Any]:
+    def autorizar_factura(self, factura_id: int, diferir_error_comunicacion: bool = False) -> Dict[str, Any]:
+        """
+        Pide el CAE de una factura y persiste el resultado.
+
+        Con diferir_error_comunicacion=True (cola en segundo plano) un error
+        de comunicación no toca la factura: se devuelve con "reintentar" para
+        que el llamador vuelva a intentar más tarde.
+        """
         db = SessionLocal()
         factura = None
         try:
@@ -80,148 +87,461 @@ class ArcaAuthorizationService:
             if not items:
                 raise ValueError("La factura no tiene items en el detalle.")
 
-            auth: ArcaAuthData = self._wsaa.get_auth()
-
             try:
+                # WSAA también es comunicación: una falla acá se trata igual que en WSFE
+                auth: ArcaAuthData = self._wsaa.get_auth()
                 wsfe_result: ArcaWSFEResult = self._wsfe.solicitar_cae(
                     auth=auth,
                     factura=factura,
                     items=items,
                 )
             except Exception as e:
-                logger.exception("Error al invocar WSFE.solicitar_cae para factura {}", factura_id)
+                logger.exception("Error de comunicación con ARCA (WSAA/WSFE) para factura {}", factura_id)
                 db.rollback()
-                estado_error = self._estado_error_getter()
-
-                try:
-                    repo = self._repo_factory(db)
-                    repo.actualizar_cae_y_estado(
-                        factura_id=factura_id,
-                        cae=None,
-                        fecha_cae=None,
-                        vto_cae=None,
-                        estado_id=estado_error,
-                    )
-                    self._observaciones_updater(
-                        db,
-                        factura_id,
-                        f"[ARCA] Error de comunicacion: {e}",
-                    )
-                    if self._rejected_effects_processor:
-                        self._rejected_effects_processor(
-                            db,
-                            factura_id,
-                            motivo="Error de comunicacion ARCA",
-                        )
-                    self._audit.registrar(
-                        db,
-                        entidad="facturas",
-                        entidad_id=factura_id,
-                        accion="ARCA_ERROR_COMUNICACION",
-                        datos_previos={"estado_id": factura.get("estado_id") if factura else None},
-                        datos_nuevos={"estado_id": estado_error, "cae": None},
-                        contexto={"mensaje": str(e), "efectos_revertidos": bool(self._rejected_effects_processor)},
+                if diferir_error_comunicacion:
+                    resultado = self._resultado_no_enviado(
+                        factura_id, factura.get("estado_id"), self._error_cleaner(e)
                     )
+                    resultado["reintentar"] = True
+                    return resultado
+                resultado = self._registrar_error_comunicacion(db, factura_id, factura, e)
+                try:
                     db.commit()
                 except Exception:
                     logger.exception("Error revirtiendo efectos por fallo ARCA para factura {}", factura_id)
                     db.rollback()
+                return resultado
 
-                return {
-                    "factura_id": factura_id,
-                    "aprobada": False,
-                    "rechazada": False,
-                    "cae": None,
-                    "fecha_cae": None,
-                    "vto_cae": None,
-                    "estado_id": estado_error,
-                    "errores": [],
-                    "observaciones": [],
-                    "mensaje": self._error_cleaner(e),
-                }
+            resultado = self._aplicar_resultado_wsfe(db, repo, factura_id, factura, wsfe_result)
+            db.commit()
+            self._log_resultado(factura_id, wsfe_result)
+            return resultado
 
-            if wsfe_result.aprobada:
-                nuevo_estado = self._estado_autorizada_getter()
-            elif wsfe_result.rechazada:
-                nuevo_estado = self._estado_rechazada_getter()
-            else:
-                nuevo_estado = self._estado_error_getter()
-            logger.debug("Factura {} -> nuevo estado {}", factura_id, nuevo_estado)
+        except Exception as ex:
+            logger.exception("Error en autorizar_factura para factura {}", factura_id)
+            db.rollback()
+            return {
+                "factura_id": factura_id,
+                "aprobada": False,
+                "rechazada": False,
+                "cae": None,
+                "fecha_cae": None,
+                "vto_cae": None,
+                "estado_id": factura.get("estado_id") if factura else None,
+                "errores": [],
+                "observaciones": [],
+                "mensaje": self._error_cleaner(ex),
+            }
+        finally:
+            db.close()
 
-            repo.actualizar_cae_y_estado(
-                factura_id=factura_id,
-                cae=wsfe_result.cae,
-                fecha_cae=wsfe_result.fecha_cae,
-                vto_cae=wsfe_result.vto_cae,
-                estado_id=nuevo_estado,
+    def recuperar_autorizacion(self, factura_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Consulta la factura en AFIP (FECompConsultar) y, si ya figura
+        autorizada, registra ese CAE. Sirve para no reenviar un comprobante
+        cuyo FECAESolicitar anterior llegó pero no tuvo respuesta.
+
+        Antes de registrar el CAE se verifica que el comprobante de AFIP sea
+        esta factura (importe, documento del receptor y fecha): durante el
+        backoff otra PC pudo haber autorizado ese mismo número. En ese caso
+        se renumera la factura al próximo de AFIP y se devuelve None para
+        que el llamador la reenvíe; si no se puede renumerar, queda en ERROR.
+        Devuelve None si AFIP no lo tiene autorizado.
+        """
+        fe_cons = getattr(self._wsfe, "fe_comp_consultar", None)
+        if not callable(fe_cons):
+            return None
+
+        db = SessionLocal()
+        try:
+            repo = self._repo_factory(db)
+            factura = repo.get_by_id(factura_id)
+            if not factura or not factura.get("numero"):
+                return None
+
+            codigo_tipo = repo.get_codigo_tipo_comprobante(factura.get("tipo_comprobante_id"))
+            if not codigo_tipo:
+                return None
+
+            auth: ArcaAuthData = self._wsaa.get_auth()
+            cbte_tipo = ArcaWSFEClient._map_tipo_comprobante_to_afip_code(codigo_tipo)
+            pto_vta = int(factura.get("punto_venta") or 0)
+            raw = fe_cons(
+                auth=auth,
+                cbte_tipo=cbte_tipo,
+                pto_vta=pto_vta,
+                cbte_nro=int(factura["numero"]),
             )
-            logger.debug("Factura {} cabecera actualizada con CAE/estado", factura_id)
+            if str(raw.get("resultado") or "").upper() != "A" or not raw.get("cae"):
+                return None
 
-            if not wsfe_result.aprobada:
-                texto_obs = self._build_rechazo_observaciones(wsfe_result)
-                if texto_obs:
-                    self._observaciones_updater(db, factura_id, texto_obs)
+            diferencias = self._diferencias_con_afip(factura, raw)
+            if diferencias:
+                resultado = self._resolver_conflicto_numeracion(
+                    db, repo, auth, factura_id, factura, cbte_tipo, pto_vta, diferencias
+                )
+                db.commit()
+                return resultado
+
+            wsfe_result = ArcaWSFEResult(
+                aprobada=True,
+                rechazada=False,
+                cae=raw.get("cae"),
+                fecha_cae=raw.get("fecha_cae"),
+                vto_cae=raw.get("vto_cae"),
+                errores=[],
+                observaciones=raw.get("observaciones") or [],
+                mensaje="Comprobante ya autorizado en ARCA (recuperado con FECompConsultar).",
+            )
+            resultado = self._aplicar_resultado_wsfe(db, repo, factura_id, factura, wsfe_result)
+            db.commit()
+            self._log_resultado(factura_id, wsfe_result)
+            return resultado
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
 
-            if wsfe_result.rechazada and self._rejected_effects_processor:
-                self._rejected_effects_processor(db, factura_id)
+    def _resolver_conflicto_numeracion(
+        self,
+        db: Session,
+        repo: FacturasRepository,
+        auth: ArcaAuthData,
+        factura_id: int,
+        factura: Dict[str, Any],
+        cbte_tipo: int,
+        pto_vta: int,
+        diferencias: List[str],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        El número de la factura ya lo usó otro comprobante en AFIP. Renumera
+        al próximo de AFIP (None: el llamador reenvía) o, si no se puede
+        consultar, deja la factura en ERROR (sin commit).
+        """
+        numero_anterior = int(factura["numero"])
+        detalle = "; ".join(diferencias)
+        logger.warning(
+            "Factura {}: el comprobante {} en ARCA es de otra factura ({})",
+            factura_id,
+            numero_anterior,
+            detalle,
+        )
+
+        proximo: Optional[int] = None
+        fe_ult = getattr(self._wsfe, "fe_comp_ultimo_autorizado", None)
+        if callable(fe_ult):
+            invalidar = getattr(self._wsfe, "invalidar_ultimo_autorizado", None)
+            if callable(invalidar):
+                invalidar(cbte_tipo, pto_vta)
+            try:
+                proximo = self._parse_ultimo_autorizado(
+                    fe_ult(auth=auth, cbte_tipo=cbte_tipo, pto_vta=pto_vta)
+                ) + 1
+            except Exception as e:
+                logger.warning("Error consultando FECompUltimoAutorizado: {}", e)
 
+        if proximo is not None and proximo > numero_anterior:
+            repo.actualizar_numero(factura_id, proximo)
             self._audit.registrar(
                 db,
                 entidad="facturas",
                 entidad_id=factura_id,
-                accion="ARCA_AUTORIZACION",
-                datos_previos={"estado_id": factura.get("estado_id")},
-                datos_nuevos={
-                    "estado_id": nuevo_estado,
-                    "aprobada": wsfe_result.aprobada,
-                    "rechazada": wsfe_result.rechazada,
-                    "cae": wsfe_result.cae,
-                },
-                contexto={
-                    "errores": wsfe_result.errores or [],
-                    "observaciones": wsfe_result.observaciones or [],
-                    "mensaje": wsfe_result.mensaje,
-                },
+                accion="ARCA_RENUMERACION",
+                datos_previos={"numero": numero_anterior},
+                datos_nuevos={"numero": proximo},
+                contexto={"motivo": f"Número usado en ARCA por otro comprobante: {detalle}"},
             )
+            return None
+
+        wsfe_result = ArcaWSFEResult(
+            aprobada=False,
+            rechazada=False,
+            cae=None,
+            fecha_cae=None,
+            vto_cae=None,
+            errores=[f"Conflicto de numeración: el comprobante {numero_anterior} en ARCA es de otra factura ({detalle})"],
+            observaciones=[],
+            mensaje="Conflicto de numeración con ARCA; revisar antes de reenviar.",
+        )
+        resultado = self._aplicar_resultado_wsfe(db, repo, factura_id, factura, wsfe_result)
+        resultado["conflicto_numeracion"] = True
+        return resultado
 
-            db.commit()
-            if wsfe_result.aprobada:
-                logger.info("Factura {} autorizada en ARCA. CAE={}", factura_id, wsfe_result.cae)
-            elif wsfe_result.rechazada:
-                logger.warning("Factura {} rechazada por ARCA: {}", factura_id, wsfe_result.mensaje)
-            else:
-                logger.warning("Factura {} sin aprobacion ARCA: {}", factura_id, wsfe_result.mensaje)
+    @staticmethod
+    def _diferencias_con_afip(factura: Dict[str, Any], raw: Dict[str, Any]) -> List[str]:
+        """
+        Compara el comprobante que devolvió FECompConsultar con la factura
+        local. Los datos que AFIP no informa no se comparan.
+        """
+        diferencias: List[str] = []
+
+        if raw.get("imp_total") not in (None, ""):
+            try:
+                total_afip = abs(float(raw["imp_total"]))
+            except (TypeError, ValueError):
+                total_afip = None
+            total_local = abs(float(factura.get("total") or 0.0))
+            if total_afip is None or abs(total_afip - total_local) > 0.01:
+                diferencias.append(f"importe ARCA {raw['imp_total']} / local {total_local:.2f}")
+
+        if raw.get("doc_nro") not in (None, ""):
+            _doc_tipo, doc_local = ArcaWSFEClient._extract_doc_from_factura(factura)
+            doc_afip = "".join(ch for ch in str(raw["doc_nro"]) if ch.isdigit())
+            if int(doc_afip or 0) != doc_local:
+                diferencias.append(f"documento ARCA {raw['doc_nro']} / local {doc_local}")
+
+        if raw.get("cbte_fch") not in (None, ""):
+            fecha_local = ArcaWSFEClient._to_afip_date(factura.get("fecha_emision"))
+            if str(raw["cbte_fch"]).strip() != fecha_local:
+                diferencias.append(f"fecha ARCA {raw['cbte_fch']} / local {fecha_local}")
+
+        return diferencias
+
+    def autorizar_lote(self, factura_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Autoriza varias facturas del mismo tipo y punto de venta en un único
+        FECAESolicitar y aplica todos los resultados en una sola transacción.
+
+        Los números deben ser consecutivos (el llamador los ajusta antes). Si
+        una factura no puede enviarse, el lote se corta ahí: las siguientes
+        quedarían con un hueco de numeración y AFIP las rechazaría (10016).
+        Devuelve un resultado por factura, en el mismo orden recibido.
+        """
+        if not factura_ids:
+            return []
+
+        solicitar_lote = getattr(self._wsfe, "solicitar_cae_lote", None)
+        if not callable(solicitar_lote):
+            return [self.autorizar_factura(fid) for fid in factura_ids]
+
+        resultados: Dict[int, Dict[str, Any]] = {}
+        enviadas: List[Dict[str, Any]] = []
+        db = SessionLocal()
+        try:
+            repo = self._repo_factory(db)
+            comprobantes = []
+            motivo_corte: Optional[str] = None
+
+            for factura_id in factura_ids:
+                if motivo_corte:
+                    resultados[factura_id] = self._resultado_no_enviado(factura_id, None, motivo_corte)
+                    continue
+
+                factura = repo.get_by_id(factura_id)
+                if not factura:
+                    motivo_corte = f"Factura {factura_id} no encontrada; lote interrumpido."
+                    resultados[factura_id] = self._resultado_no_enviado(factura_id, None, motivo_corte)
+                    continue
+
+                if factura.get("cae") and factura.get("estado_id") == self._estado_autorizada_getter():
+                    motivo_corte = f"Factura {factura_id} ya autorizada; lote interrumpido."
+                    resultados[factura_id] = self._resultado_no_enviado(
+                        factura_id, factura.get("estado_id"), "La factura ya se encuentra autorizada."
+                    )
+                    continue
 
-            return {
-                "factura_id": factura_id,
+                items = self._detalle_getter(db, factura_id)
+                if not items:
+                    motivo_corte = f"Factura {factura_id} sin items; lote interrumpido."
+                    resultados[factura_id] = self._resultado_no_enviado(
+                        factura_id, factura.get("estado_id"), "La factura no tiene items en el detalle."
+                    )
+                    continue
+
+                factura["condicion_iva_receptor_id"] = self._condicion_resolver(db, factura)
+                enviadas.append(factura)
+                comprobantes.append((factura, items))
+
+            if comprobantes:
+                auth: ArcaAuthData = self._wsaa.get_auth()
+                try:
+                    wsfe_results: List[ArcaWSFEResult] = solicitar_lote(
+                        auth=auth,
+                        comprobantes=comprobantes,
+                    )
+                except Exception as e:
+                    logger.exception("Error al invocar WSFE.solicitar_cae_lote ({} facturas)", len(comprobantes))
+                    db.rollback()
+                    for factura in enviadas:
+                        resultados[factura["id"]] = self._registrar_error_comunicacion(
+                            db, factura["id"], factura, e
+                        )
+                    db.commit()
+                    return [resultados[fid] for fid in factura_ids]
+
+                for factura, wsfe_result in zip(enviadas, wsfe_results):
+                    resultados[factura["id"]] = self._aplicar_resultado_wsfe(
+                        db, repo, factura["id"], factura, wsfe_result
+                    )
+
+                db.commit()
+                for factura, wsfe_result in zip(enviadas, wsfe_results):
+                    self._log_resultado(factura["id"], wsfe_result)
+
+        except Exception as ex:
+            logger.exception("Error en autorizar_lote para facturas {}", factura_ids)
+            db.rollback()
+            for factura in enviadas:
+                resultados[factura["id"]] = self._resultado_no_enviado(
+                    factura["id"], factura.get("estado_id"), self._error_cleaner(ex)
+                )
+            for factura_id in factura_ids:
+                resultados.setdefault(
+                    factura_id,
+                    self._resultado_no_enviado(factura_id, None, self._error_cleaner(ex)),
+                )
+        finally:
+            db.close()
+
+        return [resultados[fid] for fid in factura_ids]
+
+    def _aplicar_resultado_wsfe(
+        self,
+        db: Session,
+        repo: FacturasRepository,
+        factura_id: int,
+        factura: Dict[str, Any],
+        wsfe_result: ArcaWSFEResult,
+    ) -> Dict[str, Any]:
+        """Persiste CAE/estado, observaciones, efectos de rechazo y auditoría (sin commit)."""
+        if wsfe_result.aprobada:
+            nuevo_estado = self._estado_autorizada_getter()
+        elif wsfe_result.rechazada:
+            nuevo_estado = self._estado_rechazada_getter()
+        else:
+            nuevo_estado = self._estado_error_getter()
+        logger.debug("Factura {} -> nuevo estado {}", factura_id, nuevo_estado)
+
+        repo.actualizar_cae_y_estado(
+            factura_id=factura_id,
+            cae=wsfe_result.cae,
+            fecha_cae=wsfe_result.fecha_cae,
+            vto_cae=wsfe_result.vto_cae,
+            estado_id=nuevo_estado,
+        )
+        logger.debug("Factura {} cabecera actualizada con CAE/estado", factura_id)
+
+        if not wsfe_result.aprobada:
+            texto_obs = self._build_rechazo_observaciones(wsfe_result)
+            if texto_obs:
+                self._observaciones_updater(db, factura_id, texto_obs)
+
+        if wsfe_result.rechazada and self._rejected_effects_processor:
+            self._rejected_effects_processor(db, factura_id)
+
+        self._audit.registrar(
+            db,
+            entidad="facturas",
+            entidad_id=factura_id,
+            accion="ARCA_AUTORIZACION",
+            datos_previos={"estado_id": factura.get("estado_id")},
+            datos_nuevos={
+                "estado_id": nuevo_estado,
                 "aprobada": wsfe_result.aprobada,
                 "rechazada": wsfe_result.rechazada,
                 "cae": wsfe_result.cae,
-                "fecha_cae": wsfe_result.fecha_cae,
-                "vto_cae": wsfe_result.vto_cae,
-                "estado_id": nuevo_estado,
+            },
+            contexto={
                 "errores": wsfe_result.errores or [],
                 "observaciones": wsfe_result.observaciones or [],
                 "mensaje": wsfe_result.mensaje,
-            }
+            },
+        )
+
+        return {
+            "factura_id": factura_id,
+            "aprobada": wsfe_result.aprobada,
+            "rechazada": wsfe_result.rechazada,
+            "cae": wsfe_result.cae,
+            "fecha_cae": wsfe_result.fecha_cae,
+            "vto_cae": wsfe_result.vto_cae,
+            "estado_id": nuevo_estado,
+            "errores": wsfe_result.errores or [],
+            "observaciones": wsfe_result.observaciones or [],
+            "mensaje": wsfe_result.mensaje,
+        }
+
+    def _registrar_error_comunicacion(
+        self,
+        db: Session,
+        factura_id: int,
+        factura: Optional[Dict[str, Any]],
+        error: Exception,
+    ) -> Dict[str, Any]:
+        """Marca la factura en ERROR_COMUNICACION y revierte sus efectos (sin commit)."""
+        estado_error = self._estado_error_getter()
 
-        except Exception as ex:
-            logger.exception("Error en autorizar_factura para factura {}", factura_id)
+        try:
+            repo = self._repo_factory(db)
+            repo.actualizar_cae_y_estado(
+                factura_id=factura_id,
+                cae=None,
+                fecha_cae=None,
+                vto_cae=None,
+                estado_id=estado_error,
+            )
+            self._observaciones_updater(
+                db,
+                factura_id,
+                f"[ARCA] Error de comunicacion: {error}",
+            )
+            if self._rejected_effects_processor:
+                self._rejected_effects_processor(
+                    db,
+                    factura_id,
+                    motivo="Error de comunicacion ARCA",
+                )
+            self._audit.registrar(
+                db,
+                entidad="facturas",
+                entidad_id=factura_id,
+                accion="ARCA_ERROR_COMUNICACION",
+                datos_previos={"estado_id": factura.get("estado_id") if factura else None},
+                datos_nuevos={"estado_id": estado_error, "cae": None},
+                contexto={"mensaje": str(error), "efectos_revertidos": bool(self._rejected_effects_processor)},
+            )
+        except Exception:
+            logger.exception("Error revirtiendo efectos por fallo ARCA para factura {}", factura_id)
             db.rollback()
-            return {
-                "factura_id": factura_id,
-                "aprobada": False,
-                "rechazada": False,
-                "cae": None,
-                "fecha_cae": None,
-                "vto_cae": None,
-                "estado_id": factura.get("estado_id") if factura else None,
-                "errores": [],
-                "observaciones": [],
-                "mensaje": self._error_cleaner(ex),
-            }
-        finally:
-            db.close()
+
+        return {
+            "factura_id": factura_id,
+            "aprobada": False,
+            "rechazada": False,
+            "cae": None,
+            "fecha_cae": None,
+            "vto_cae": None,
+            "estado_id": estado_error,
+            "errores": [],
+            "observaciones": [],
+            "mensaje": self._error_cleaner(error),
+        }
+
+    @staticmethod
+    def _resultado_no_enviado(factura_id: int, estado_id: Optional[int], mensaje: str) -> Dict[str, Any]:
+        return {
+            "factura_id": factura_id,
+            "aprobada": False,
+            "rechazada": False,
+            "no_enviada": True,
+            "cae": None,
+            "fecha_cae": None,
+            "vto_cae": None,
+            "estado_id": estado_id,
+            "errores": [],
+            "observaciones": [],
+            "mensaje": mensaje,
+        }
+
+    @staticmethod
+    def _log_resultado(factura_id: int, wsfe_result: ArcaWSFEResult) -> None:
+        if wsfe_result.aprobada:
+            logger.info("Factura {} autorizada en ARCA. CAE={}", factura_id, wsfe_result.cae)
+        elif wsfe_result.rechazada:
+            logger.warning("Factura {} rechazada por ARCA: {}", factura_id, wsfe_result.mensaje)
+        else:
+            logger.warning("Factura {} sin aprobacion ARCA: {}", factura_id, wsfe_result.mensaje)
 
     def _log_ultimo_autorizado(
         self,
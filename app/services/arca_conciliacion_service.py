@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional
+
+import json
+import os
+
+from loguru import logger
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.data.database import SessionLocal
+from app.integrations.arca.wsfe_client import ArcaWSFEClient
+
+
+class _ProgresoConciliacion:
+    """
+    Avance de una conciliación guardado en disco (JSON en AppData).
+
+    Guarda qué facturas ya se compararon y las diferencias encontradas, así
+    una conciliación cortada (cierre de la app, caída de red) sigue desde
+    donde quedó en vez de volver a consultar todo el período.
+    """
+
+    # Cada cuántas facturas se baja el avance a disco
+    GUARDAR_CADA = 25
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.revisadas: Dict[str, Optional[List[str]]] = {}
+        self.diferencias: List[Dict[str, Any]] = []
+        self._pendientes_guardar = 0
+        self._lock = Lock()
+
+    def cargar(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning("Conciliación ARCA: avance ilegible en {}, se empieza de cero: {}", self.path, e)
+            return
+        self.revisadas = dict(data.get("revisadas") or {})
+        self.diferencias = list(data.get("diferencias") or [])
+
+    def ya_revisada(self, factura_id: int) -> bool:
+        return str(factura_id) in self.revisadas
+
+    def registrar(self, factura_id: int, diferencia: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            self.revisadas[str(factura_id)] = diferencia["campos"] if diferencia else None
+            if diferencia:
+                self.diferencias.append(diferencia)
+            self._pendientes_guardar += 1
+            if self._pendientes_guardar >= self.GUARDAR_CADA:
+                self._guardar_locked()
+
+    def guardar(self) -> None:
+        with self._lock:
+            self._guardar_locked()
+
+    def borrar(self) -> None:
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _guardar_locked(self) -> None:
+        self._pendientes_guardar = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        payload = {
+            "actualizado": datetime.now().isoformat(timespec="seconds"),
+            "revisadas": self.revisadas,
+            "diferencias": self.diferencias,
+        }
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+
+class ArcaConciliacionService:
+    """
+    Compara las facturas autorizadas de un período contra lo que AFIP tiene
+    registrado (FECompConsultar).
+
+    - Las consultas corren en paralelo (settings.ARCA_SYNC_WORKERS hilos);
+      el ritmo real de requests lo fija el limitador compartido del cliente
+      WSFE, igual que en la sincronización.
+    - Por cada comprobante se comparan CAE, vencimiento del CAE, importe
+      total y estado. Las diferencias se devuelven para armar el reporte.
+    - El avance se guarda en disco; si la conciliación se corta, la próxima
+      llamada con el mismo período retoma sin repetir consultas. Los errores
+      de comunicación no se marcan como revisados: se reintentan al reanudar.
+    """
+
+    # Diferencia de importe que se considera redondeo
+    TOLERANCIA_IMPORTE = 0.01
+
+    def __init__(
+        self,
+        *,
+        wsaa,
+        wsfe,
+        estado_autorizada_getter: Callable[[], int],
+        estados_sin_cae_getter: Callable[[], List[int]],
+        progreso_dir: Optional[Path] = None,
+    ) -> None:
+        self._wsaa = wsaa
+        self._wsfe = wsfe
+        self._estado_autorizada_getter = estado_autorizada_getter
+        self._estados_sin_cae_getter = estados_sin_cae_getter
+        self._progreso_dir = Path(progreso_dir or Path(settings.APP_DATA_DIR) / "conciliacion")
+
+    # -------------------- API --------------------
+
+    def conciliar(
+        self,
+        desde: date,
+        hasta: date,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        max_workers: Optional[int] = None,
+        reanudar: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Concilia las facturas con CAE emitidas entre `desde` y `hasta`
+        (inclusive). Devuelve:
+
+          {
+            "desde", "hasta",
+            "total": facturas del período,
+            "revisadas": comparadas contra AFIP (incluye las de corridas previas),
+            "coincidentes": sin diferencias,
+            "diferencias": [{"factura_id", "comprobante", "campos", "local", "afip"}],
+            "errores": ["Factura N: mensaje", ...],
+            "completa": True si no quedó ninguna sin revisar,
+          }
+        """
+        fe_cons = getattr(self._wsfe, "fe_comp_consultar", None)
+        if not callable(fe_cons):
+            raise RuntimeError("WSFE no implementa FECompConsultar")
+
+        facturas = self._facturas_del_periodo(desde, hasta)
+
+        progreso = _ProgresoConciliacion(self._archivo_progreso(desde, hasta))
+        if reanudar:
+            progreso.cargar()
+        else:
+            progreso.borrar()
+
+        pendientes = [f for f in facturas if not progreso.ya_revisada(int(f["id"]))]
+        if len(pendientes) < len(facturas):
+            logger.info(
+                "Conciliación ARCA {} - {}: se retoma, faltan {} de {}",
+                desde,
+                hasta,
+                len(pendientes),
+                len(facturas),
+            )
+
+        errores: List[str] = []
+        errores_lock = Lock()
+        total = len(facturas)
+        hechas = [total - len(pendientes)]
+        avance_lock = Lock()
+
+        auth = self._wsaa.get_auth() if pendientes else None
+
+        def procesar(factura: Dict[str, Any]) -> None:
+            factura_id = int(factura["id"])
+            try:
+                afip = fe_cons(
+                    auth=auth,
+                    cbte_tipo=ArcaWSFEClient._map_tipo_comprobante_to_afip_code(factura["tipo_codigo"]),
+                    pto_vta=int(factura["punto_venta"]),
+                    cbte_nro=int(factura["numero"]),
+                )
+            except Exception as e:
+                with errores_lock:
+                    errores.append(f"Factura {factura_id}: {e}")
+                mensaje = f"{self._etiqueta(factura)} sin respuesta"
+            else:
+                progreso.registrar(factura_id, self._comparar(factura, afip))
+                mensaje = self._etiqueta(factura)
+
+            if progress_callback:
+                with avance_lock:
+                    hechas[0] += 1
+                    n = hechas[0]
+                try:
+                    progress_callback(n, total, mensaje)
+                except Exception:
+                    logger.exception("Error notificando progreso de conciliación ARCA")
+
+        try:
+            workers = max(1, min(len(pendientes), int(max_workers or settings.ARCA_SYNC_WORKERS or 1)))
+            if workers == 1:
+                for factura in pendientes:
+                    procesar(factura)
+            else:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="arca-conciliacion") as pool:
+                    list(pool.map(procesar, pendientes))
+        finally:
+            progreso.guardar()
+
+        vigentes = {str(f["id"]) for f in facturas}
+        revisadas = [k for k in progreso.revisadas if k in vigentes]
+        diferencias = sorted(
+            (d for d in progreso.diferencias if str(d["factura_id"]) in vigentes),
+            key=lambda d: d["comprobante"],
+        )
+
+        return {
+            "desde": desde,
+            "hasta": hasta,
+            "total": total,
+            "revisadas": len(revisadas),
+            "coincidentes": len(revisadas) - len(diferencias),
+            "diferencias": diferencias,
+            "errores": errores,
+            "completa": len(revisadas) == total,
+        }
+
+    # -------------------- Internos --------------------
+
+    def _archivo_progreso(self, desde: date, hasta: date) -> Path:
+        # El avance de homologación (o de otro CUIT) no debe retomarse en producción
+        if settings.ARCA_ENV == "PRODUCCION":
+            cuit = settings.ARCA_PROD_CUIT
+        else:
+            cuit = settings.ARCA_HOMO_CUIT
+        cuit = "".join(ch for ch in str(cuit or "") if ch.isdigit()) or "sin_cuit"
+        return self._progreso_dir / f"arca_{settings.ARCA_ENV.lower()}_{cuit}_{desde:%Y%m%d}_{hasta:%Y%m%d}.json"
+
+    def _facturas_del_periodo(self, desde: date, hasta: date) -> List[Dict[str, Any]]:
+        """
+        Facturas con CAE del período: las autorizadas y las que tuvieron CAE y
+        después cambiaron de estado (p. ej. anuladas por NC), que en AFIP
+        siguen figurando.
+        """
+        with SessionLocal() as db:
+            return [
+                dict(r)
+                for r in db.execute(
+                    text(
+                        """
+                        SELECT f.id, tc.codigo AS tipo_codigo, f.punto_venta, f.numero,
+                               f.cae, f.vto_cae, f.total, f.estado_id
+                        FROM facturas f
+                        JOIN tipos_comprobante tc ON tc.id = f.tipo_comprobante_id
+                        WHERE f.fecha_emision >= :desde
+                          AND f.fecha_emision < :hasta_excl
+                          AND (f.estado_id = :est_aut OR (f.cae IS NOT NULL AND f.cae <> ''))
+                        ORDER BY tc.codigo, f.punto_venta, f.numero
+                        """
+                    ),
+                    {
+                        "desde": desde,
+                        "hasta_excl": hasta + timedelta(days=1),
+                        "est_aut": self._estado_autorizada_getter(),
+                    },
+                ).mappings().all()
+            ]
+
+    def _comparar(self, factura: Dict[str, Any], afip: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Diferencias entre la factura local y la respuesta de FECompConsultar (None si coinciden)."""
+        campos: List[str] = []
+        autorizada_afip = str(afip.get("resultado") or "").upper() == "A"
+
+        if not autorizada_afip:
+            campos.append("no_registrada")
+        else:
+            if str(factura.get("cae") or "").strip() != str(afip.get("cae") or "").strip():
+                campos.append("cae")
+            if self._fecha_afip(factura.get("vto_cae")) != self._fecha_afip(afip.get("vto_cae")):
+                campos.append("vto_cae")
+            if self._importe_distinto(factura.get("total"), afip.get("imp_total")):
+                campos.append("total")
+            if int(factura.get("estado_id") or 0) in self._estados_sin_cae_getter():
+                campos.append("estado")
+
+        if not campos:
+            return None
+
+        return {
+            "factura_id": int(factura["id"]),
+            "comprobante": self._etiqueta(factura),
+            "campos": campos,
+            "local": {
+                "cae": factura.get("cae"),
+                "vto_cae": self._fecha_afip(factura.get("vto_cae")),
+                "total": float(factura.get("total") or 0),
+                "estado_id": factura.get("estado_id"),
+            },
+            "afip": {
+                "resultado": afip.get("resultado"),
+                "cae": afip.get("cae"),
+                "vto_cae": self._fecha_afip(afip.get("vto_cae")),
+                "total": afip.get("imp_total"),
+                "errores": afip.get("errores") or [],
+            },
+        }
+
+    @classmethod
+    def _importe_distinto(cls, local: Any, afip: Any) -> bool:
+        try:
+            # Las NC se guardan en negativo y AFIP las informa en positivo
+            return abs(abs(float(local or 0)) - abs(float(afip or 0))) > cls.TOLERANCIA_IMPORTE
+        except (TypeError, ValueError):
+            return True
+
+    @staticmethod
+    def _fecha_afip(valor: Any) -> str:
+        """Normaliza una fecha (date, 'YYYY-MM-DD' o 'YYYYMMDD') a YYYYMMDD."""
+        if valor is None:
+            return ""
+        if isinstance(valor, (date, datetime)):
+            return valor.strftime("%Y%m%d")
+        return "".join(ch for ch in str(valor) if ch.isdigit())[:8]
+
+    @staticmethod
+    def _etiqueta(factura: Dict[str, Any]) -> str:
+        return f"{factura['tipo_codigo']} {str(factura['punto_venta']).zfill(4)}-{str(factura['numero']).zfill(8)}"
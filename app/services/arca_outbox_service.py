@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.data.database import SessionLocal
+from app.repositories.arca_outbox_repository import ArcaOutboxRepository
+
+
+class ArcaOutboxService:
+    """
+    Cola persistente de autorizaciones ARCA.
+
+    - encolar() se llama dentro de la transacción que crea la factura: si la
+      factura se guarda, su pedido de CAE también.
+    - procesar_pendientes() lo llama el worker en segundo plano. Ante errores
+      de comunicación reprograma con backoff exponencial en vez de dejar la
+      factura en ERROR_COMUNICACION; recién en el último intento se aplica el
+      tratamiento normal de error.
+    - Antes de reintentar consulta a AFIP (conciliador): si el intento
+      anterior llegó y se autorizó, se registra ese CAE en vez de reenviar.
+    - Dentro de cada tipo + punto de venta se respeta el orden de número:
+      mientras una factura anterior siga en cola, las siguientes no salen.
+    """
+
+    BACKOFF_BASE = 30.0
+    BACKOFF_MAX = 1800.0
+    # Una fila PROCESANDO más vieja que esto quedó de un proceso caído
+    PROCESANDO_VENCIDA = timedelta(minutes=10)
+
+    def __init__(
+        self,
+        *,
+        autorizador: Callable[..., Dict[str, Any]],
+        conciliador: Optional[Callable[[int], Optional[Dict[str, Any]]]] = None,
+        max_intentos: Optional[int] = None,
+        clock: Callable[[], datetime] = datetime.now,
+    ) -> None:
+        self._autorizador = autorizador
+        self._conciliador = conciliador
+        self._max_intentos = max(int(max_intentos or settings.ARCA_OUTBOX_MAX_INTENTOS), 1)
+        self._clock = clock
+        self._table_available: Optional[bool] = None
+
+    def _has_outbox(self, db: Session) -> bool:
+        if self._table_available is not None:
+            return self._table_available
+
+        exists = db.execute(
+            text(
+                """
+                SELECT 1
+                FROM information_schema.tables
+                WHERE table_schema = :schema
+                  AND table_name = 'arca_outbox'
+                LIMIT 1
+                """
+            ),
+            {"schema": settings.DB_NAME},
+        ).first()
+        self._table_available = bool(exists)
+        return self._table_available
+
+    # -------------------- API --------------------
+
+    def encolar(self, db: Session, factura_id: int) -> bool:
+        """Encola la factura (sin commit). False si la tabla no existe."""
+        if not self._has_outbox(db):
+            logger.debug("Tabla arca_outbox no disponible; se autoriza en línea.")
+            return False
+        ArcaOutboxRepository(db).encolar(factura_id, self._clock())
+        return True
+
+    def factura_ids_en_curso(self, db: Session) -> Set[int]:
+        """Facturas que todavía le pertenecen al worker (pendientes o en proceso)."""
+        if not self._has_outbox(db):
+            return set()
+        return ArcaOutboxRepository(db).factura_ids_en_curso()
+
+    def ultimo_numero_en_cola(self, db: Session, tipo_comprobante_id: int, punto_venta: int) -> Optional[int]:
+        """Número más alto encolado sin CAE; AFIP todavía no lo conoce."""
+        if not self._has_outbox(db):
+            return None
+        return ArcaOutboxRepository(db).ultimo_numero_en_cola(tipo_comprobante_id, punto_venta)
+
+    def liberar_huerfanas(self) -> int:
+        with SessionLocal() as db:
+            if not self._has_outbox(db):
+                return 0
+            ahora = self._clock()
+            liberadas = ArcaOutboxRepository(db).liberar_procesando(ahora, ahora - self.PROCESANDO_VENCIDA)
+            db.commit()
+        if liberadas:
+            logger.warning("Outbox ARCA: {} autorizaciones huérfanas vuelven a la cola", liberadas)
+        return liberadas
+
+    def procesar_pendientes(self, limite: int = 20) -> List[Dict[str, Any]]:
+        """
+        Procesa hasta `limite` filas vencidas, de a una. El ritmo de requests
+        lo controla el limitador compartido del cliente WSFE.
+        Devuelve el resultado de cada factura procesada.
+
+        Cada consulta trae sólo la primera fila de cada numeración; al
+        terminarla se vuelve a consultar y aparece la siguiente. Si queda
+        reprogramada, su grupo se detiene hasta el próximo intento.
+        """
+        resultados: List[Dict[str, Any]] = []
+        vistas: Set[int] = set()
+        while len(vistas) < limite:
+            with SessionLocal() as db:
+                if not self._has_outbox(db):
+                    return []
+                filas = ArcaOutboxRepository(db).list_vencidas(self._clock(), limite - len(vistas))
+            filas = [f for f in filas if int(f["id"]) not in vistas]
+            if not filas:
+                break
+            for fila in filas:
+                vistas.add(int(fila["id"]))
+                resultado = self._procesar_fila(fila)
+                if resultado is not None:
+                    resultados.append(resultado)
+        return resultados
+
+    @classmethod
+    def backoff(cls, intentos: int) -> float:
+        """Segundos hasta el próximo intento: 30s, 60s, 120s... hasta 30 min."""
+        return min(cls.BACKOFF_BASE * (2 ** max(int(intentos) - 1, 0)), cls.BACKOFF_MAX)
+
+    # -------------------- Internos --------------------
+
+    def _procesar_fila(self, fila: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        outbox_id = int(fila["id"])
+        factura_id = int(fila["factura_id"])
+        intentos = int(fila.get("intentos") or 0) + 1
+        ultimo = intentos >= self._max_intentos
+
+        with SessionLocal() as db:
+            tomada = ArcaOutboxRepository(db).reclamar(outbox_id, self._clock())
+            db.commit()
+        if not tomada:
+            return None
+
+        try:
+            resultado = self._autorizar(factura_id, intentos, ultimo)
+        except Exception as ex:
+            logger.exception("Outbox ARCA: error procesando factura {}", factura_id)
+            resultado = {
+                "factura_id": factura_id,
+                "aprobada": False,
+                "rechazada": False,
+                "mensaje": str(ex),
+            }
+
+        terminada = bool(
+            resultado.get("aprobada") or resultado.get("rechazada") or resultado.get("ya_autorizada")
+        )
+        ahora = self._clock()
+
+        with SessionLocal() as db:
+            repo = ArcaOutboxRepository(db)
+            if terminada:
+                estado = ArcaOutboxRepository.COMPLETADA
+                repo.finalizar(outbox_id, estado=estado, intentos=intentos, error=None, ahora=ahora)
+            elif ultimo:
+                estado = ArcaOutboxRepository.FALLIDA
+                repo.finalizar(
+                    outbox_id, estado=estado, intentos=intentos, error=resultado.get("mensaje"), ahora=ahora
+                )
+            else:
+                estado = ArcaOutboxRepository.PENDIENTE
+                repo.reprogramar(
+                    outbox_id,
+                    intentos=intentos,
+                    proximo_intento=ahora + timedelta(seconds=self.backoff(intentos)),
+                    error=resultado.get("mensaje"),
+                    ahora=ahora,
+                )
+            db.commit()
+
+        if estado == ArcaOutboxRepository.PENDIENTE:
+            logger.warning(
+                "Outbox ARCA: factura {} sin respuesta (intento {}/{}), se reintenta: {}",
+                factura_id,
+                intentos,
+                self._max_intentos,
+                resultado.get("mensaje"),
+            )
+
+        resultado["outbox_estado"] = estado
+        resultado["intentos"] = intentos
+        return resultado
+
+    def _autorizar(self, factura_id: int, intentos: int, ultimo: bool) -> Dict[str, Any]:
+        # Un intento previo pudo haber llegado a AFIP aunque no vimos la respuesta
+        if intentos > 1 and self._conciliador is not None:
+            try:
+                conciliado = self._conciliador(factura_id)
+            except Exception as ex:
+                if not ultimo:
+                    raise
+                logger.warning("Outbox ARCA: no se pudo consultar la factura {}: {}", factura_id, ex)
+                conciliado = None
+            if conciliado is not None:
+                return conciliado
+
+        return self._autorizador(factura_id, diferir_error_comunicacion=not ultimo)
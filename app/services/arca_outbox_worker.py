@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional
+
+import threading
+
+from loguru import logger
+
+from app.core.config import settings
+
+OutboxListener = Callable[[Dict[str, Any]], None]
+
+
+class ArcaOutboxWorker:
+    """
+    Hilo daemon que vacía arca_outbox.
+
+    - Se despierta cada `poll_seconds` o apenas se llama a notify() (factura
+      recién encolada).
+    - Cada resultado se entrega a los listeners registrados; se invocan desde
+      este hilo, la UI tiene que pasarlos a su hilo con una Signal.
+    """
+
+    def __init__(
+        self,
+        procesar: Callable[[], List[Dict[str, Any]]],
+        *,
+        liberar_huerfanas: Optional[Callable[[], int]] = None,
+        poll_seconds: float = 15.0,
+    ) -> None:
+        self._procesar = procesar
+        self._liberar_huerfanas = liberar_huerfanas
+        self._poll = max(float(poll_seconds), 1.0)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._listeners: List[OutboxListener] = []
+        self._listeners_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    # -------- API --------
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="arca-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def add_listener(self, listener: OutboxListener) -> None:
+        with self._listeners_lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: OutboxListener) -> None:
+        with self._listeners_lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def run_once(self) -> int:
+        """Procesa lo que esté vencido en la cola y devuelve cuántas facturas tocó."""
+        try:
+            resultados = self._procesar()
+        except Exception as e:
+            logger.warning("Outbox ARCA: no se pudo procesar la cola: {}", e)
+            return 0
+
+        with self._listeners_lock:
+            listeners = list(self._listeners)
+        for resultado in resultados:
+            for listener in listeners:
+                try:
+                    listener(resultado)
+                except Exception:
+                    logger.exception("Outbox ARCA: error en listener de resultados")
+        return len(resultados)
+
+    # -------- Internos --------
+
+    def _run(self) -> None:
+        if self._liberar_huerfanas is not None:
+            try:
+                self._liberar_huerfanas()
+            except Exception as e:
+                logger.warning("Outbox ARCA: no se pudieron liberar pendientes huérfanas: {}", e)
+
+        while not self._stop.is_set():
+            procesadas = self.run_once()
+            if procesadas:
+                # Puede quedar más trabajo vencido: seguir sin esperar el poll
+                continue
+            self._wake.wait(self._poll)
+            self._wake.clear()
+
+
+_worker: Optional[ArcaOutboxWorker] = None
+_worker_lock = threading.Lock()
+
+
+def start_outbox_worker() -> ArcaOutboxWorker:
+    """Arranca (una sola vez por proceso) el worker de la cola ARCA."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            from app.services.service_registry import ServiceRegistry  # lazy import
+
+            svc = ServiceRegistry.get().facturas()
+            _worker = ArcaOutboxWorker(
+                svc.procesar_outbox_arca,
+                liberar_huerfanas=svc.liberar_outbox_huerfanas,
+                poll_seconds=settings.ARCA_OUTBOX_POLL,
+            )
+        _worker.start()
+        return _worker
+
+
+def get_outbox_worker() -> Optional[ArcaOutboxWorker]:
+    with _worker_lock:
+        return _worker
+
+
+def stop_outbox_worker() -> None:
+    global _worker
+    with _worker_lock:
+        worker, _worker = _worker, None
+    if worker:
+        worker.stop(timeout=2.0)
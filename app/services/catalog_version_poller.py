@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from typing import Callable, List, Optional
+
+import threading
+
+from loguru import logger
+
+from app.core.config import settings
+
+
+class CatalogVersionPoller:
+    """
+    Hilo daemon que mantiene frescos los catálogos en caché.
+
+    Cada `poll_seconds` lee catalog_versions (una consulta chica) y recarga
+    sólo los catálogos que otra terminal modificó, más los que vencen antes
+    del próximo poll: así la UI casi nunca encuentra un catálogo vencido y
+    no paga la consulta al abrir una pantalla.
+    """
+
+    def __init__(
+        self,
+        refrescar: Callable[[float], List[str]],
+        *,
+        poll_seconds: float = 30.0,
+    ) -> None:
+        self._refrescar = refrescar
+        self._poll = max(float(poll_seconds), 1.0)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # -------- API --------
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="catalog-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def run_once(self) -> List[str]:
+        try:
+            return self._refrescar(self._poll)
+        except Exception as e:
+            logger.warning("Catálogos: no se pudieron revisar versiones: {}", e)
+            return []
+
+    # -------- Internos --------
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._poll):
+            self.run_once()
+
+
+_poller: Optional[CatalogVersionPoller] = None
+_poller_lock = threading.Lock()
+
+
+def start_catalog_poller() -> Optional[CatalogVersionPoller]:
+    """Arranca (una sola vez por proceso) el poller de catálogos."""
+    global _poller
+    if settings.CATALOG_POLL <= 0:
+        return None
+    with _poller_lock:
+        if _poller is None:
+            from app.services.catalogos_service import CatalogosService  # lazy import
+
+            _poller = CatalogVersionPoller(
+                CatalogosService().refrescar_cambiados,
+                poll_seconds=settings.CATALOG_POLL,
+            )
+        _poller.start()
+        return _poller
+
+
+def stop_catalog_poller() -> None:
+    global _poller
+    with _poller_lock:
+        poller, _poller = _poller, None
+    if poller:
+        poller.stop(timeout=2.0)
@@ -1,9 +1,14 @@
 from __future__ import annotations
-from typing import Dict, Any
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
 from sqlalchemy import text
+from sqlalchemy.orm import Session
+from loguru import logger
 
+from app.core.config import settings
 from app.data.database import SessionLocal
 from app.core.catalog_cache import CatalogCache
+from app.core.tipos_comprobante import TIPOS_COMPROBANTE_KEY, TiposComprobanteCatalogo
 # 👉 Agregamos forma_pago al listado oficial de catálogos
 CAT_KEYS = [
     "colores",
@@ -18,129 +23,302 @@ CAT_KEYS = [
     "estados_factura",
     "estados_clientes",  
     "tipos_documento",
+    TIPOS_COMPROBANTE_KEY,
 ]
 
+# Tabla de origen de cada catálogo (fila en catalog_versions). None = catálogo fijo.
+CAT_TABLAS: Dict[str, Optional[str]] = {
+    "colores": "colores",
+    "estados_stock": "estados_stock",
+    "condiciones": "estados",
+    "proveedores": "proveedores",
+    "forma_pago": "forma_pago",
+    "tipos_comprobante": "tipos_comprobante",
+    "condicion_iva_receptor": None,
+    "puntos_venta": "puntos_venta",
+    "estados_factura": "estados",
+    "estados_clientes": "estados",
+    "tipos_documento": "tipos_documento",
+    TIPOS_COMPROBANTE_KEY: "tipos_comprobante",
+}
+
+# Catálogos que se guardan en disco para el arranque en frío (los que salen de la base)
+SNAPSHOT_KEYS = [k for k in dict.fromkeys(CAT_KEYS) if CAT_TABLAS.get(k)]
+
+
+def _snapshot_path() -> Path:
+    return Path(settings.APP_DATA_DIR) / "cache" / "catalogos.json"
+
+
+def _snapshot_origen() -> str:
+    # Un snapshot de otra base (p. ej. homologación) no sirve
+    return f"{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+
+
+def _rows(sql: str) -> Callable[[Session], List[Any]]:
+    stmt = text(sql)
+    return lambda s: s.execute(stmt).mappings().all()
+
+
+# ---- catálogos lógicos ----
+_CONDICION_IVA_RECEPTOR = [
+    {"id": 5, "codigo": "CF", "descripcion": "Consumidor Final"},
+    {"id": 1, "codigo": "RI", "descripcion": "Responsable Inscripto"},
+    {"id": 6, "codigo": "MT", "descripcion": "Monotributista"},
+    {"id": 4, "codigo": "EX", "descripcion": "Exento"},
+]
+
+_TIPOS_COMPROBANTE_TODOS = text("""
+    SELECT id, codigo, nombre, letra, es_nota_credito, es_nota_debito, activo
+    FROM tipos_comprobante
+    ORDER BY id
+""")
+
+# Catálogos que en memoria son un objeto con índices y en el snapshot, filas
+_DESDE_SNAPSHOT: Dict[str, Callable[[List[Any]], Any]] = {
+    TIPOS_COMPROBANTE_KEY: TiposComprobanteCatalogo,
+}
+
+_LOADERS: Dict[str, Callable[[Session], Any]] = {
+    "colores": _rows("SELECT id, nombre FROM colores ORDER BY nombre"),
+    "estados_stock": _rows("SELECT id, nombre FROM estados_stock ORDER BY nombre"),
+    "condiciones": _rows("""
+        SELECT id, nombre
+        FROM estados
+        WHERE tipo = 'vehiculos'
+        ORDER BY nombre
+    """),
+    "estados_factura": _rows("""
+        SELECT id, nombre
+        FROM estados
+        WHERE tipo = 'facturas'
+        ORDER BY nombre
+    """),
+    "estados_clientes": _rows("""
+        SELECT id, nombre
+        FROM estados
+        WHERE tipo = 'clientes'
+        ORDER BY nombre
+    """),
+    "tipos_documento": _rows("""
+        SELECT id, codigo, descripcion
+        FROM tipos_documento
+        WHERE activo = 1
+        ORDER BY descripcion
+    """),
+    "proveedores": _rows("""
+        SELECT id, razon_social AS nombre
+        FROM proveedores
+        ORDER BY nombre
+    """),
+    "forma_pago": _rows("SELECT id, nombre FROM forma_pago ORDER BY nombre"),
+    "puntos_venta": _rows("""
+        SELECT punto_venta
+        FROM puntos_venta
+        ORDER BY punto_venta
+    """),
+    "tipos_comprobante": _rows("""
+        SELECT
+            id,
+            codigo,
+            nombre,
+            letra,
+            es_nota_credito,
+            es_nota_debito,
+            activo
+        FROM tipos_comprobante
+        WHERE activo = 1
+        ORDER BY nombre
+    """),
+    "condicion_iva_receptor": lambda s: list(_CONDICION_IVA_RECEPTOR),
+    TIPOS_COMPROBANTE_KEY: lambda s: TiposComprobanteCatalogo(
+        s.execute(_TIPOS_COMPROBANTE_TODOS).mappings().all()
+    ),
+}
+
 
 class CatalogosService:
     """
     Lee catálogos desde DB y los guarda en CatalogCache.
     Usá warmup_all() antes de mostrar páginas que dependan de catálogos.
+
+    Cada catálogo vence a los CATALOG_TTL segundos y guarda la versión de
+    su tabla en catalog_versions. El poller de catálogos (ver
+    catalog_version_poller) recarga en segundo plano sólo los que otra
+    terminal modificó o están por vencer.
     """
 
+    # Disponibilidad de catalog_versions, compartida entre instancias
+    _versions_available: Optional[bool] = None
+
     def warmup_all(self):
         cache = CatalogCache.get()
-        if cache.has_all(CAT_KEYS):
+        faltantes = cache.missing(CAT_KEYS)
+        if not faltantes:
             return {k: cache.get_value(k) for k in CAT_KEYS}
 
+        cargados = self.reload(*faltantes)
+        cache.mark_loaded()
+
+        return {k: cargados[k] if k in cargados else cache.get_value(k) for k in CAT_KEYS}
+
+    def reload(self, *keys: str) -> Dict[str, Any]:
+        """Relee de la base sólo los catálogos pedidos y los deja en caché."""
+        keys = [k for k in dict.fromkeys(keys) if k in _LOADERS]
+        if not keys:
+            return {}
+
+        cache = CatalogCache.get()
+        cargados: Dict[str, Any] = {}
+        versiones: Dict[str, int] = {}
         with SessionLocal() as s:
-            colores = s.execute(
-                text("SELECT id, nombre FROM colores ORDER BY nombre")
-            ).mappings().all()
-
-            estados_stock = s.execute(
-                text("SELECT id, nombre FROM estados_stock ORDER BY nombre")
-            ).mappings().all()
-
-            condiciones = s.execute(
-                text("""
-                    SELECT id, nombre
-                    FROM estados
-                    WHERE tipo = 'vehiculos'
-                    ORDER BY nombre
-                """)
-            ).mappings().all()
-            estados_factura = s.execute(
-                text("""
-                    SELECT id, nombre
-                    FROM estados
-                    WHERE tipo = 'facturas'
-                    ORDER BY nombre
-                """)
-            ).mappings().all()
-            estados_clientes = s.execute(
-                text("""
-                    SELECT id, nombre
-                    FROM estados
-                    WHERE tipo = 'clientes'
-                    ORDER BY nombre
-                """)
-            ).mappings().all()
-
-            tipos_documento = s.execute(
-                text("""
-                    SELECT id, codigo, descripcion
-                    FROM tipos_documento
-                    WHERE activo = 1
-                    ORDER BY descripcion
-                """)
-            ).mappings().all()
-
-            proveedores = s.execute(
-                text("""
-                    SELECT id, razon_social AS nombre
-                    FROM proveedores
-                    ORDER BY nombre
-                """)
-            ).mappings().all()
-
-            forma_pago = s.execute(
-                text("SELECT id, nombre FROM forma_pago ORDER BY nombre")
-            ).mappings().all()
-            puntos_venta = s.execute(
-                text("""
-                    SELECT punto_venta
-                    FROM puntos_venta
-                    ORDER BY punto_venta
-                """)
-            ).mappings().all()
-
-        # ---- catálogos lógicos ----
-
-        tipos_comprobante = s.execute(
-            text("""
-                SELECT
-                    id,
-                    codigo,
-                    nombre,
-                    letra,
-                    es_nota_credito,
-                    es_nota_debito,
-                    activo
-                FROM tipos_comprobante
-                WHERE activo = 1
-                ORDER BY nombre
-            """)
-        ).mappings().all()
-
-
-        condicion_iva_receptor = [
-            {"id": 5, "codigo": "CF", "descripcion": "Consumidor Final"},
-            {"id": 1, "codigo": "RI", "descripcion": "Responsable Inscripto"},
-            {"id": 6, "codigo": "MT", "descripcion": "Monotributista"},
-            {"id": 4, "codigo": "EX", "descripcion": "Exento"},
-        ]
-
-        
-
-
-        # ---- cache ----
-        cache.set("colores", colores)
-        cache.set("estados_stock", estados_stock)
-        cache.set("condiciones", condiciones)
-        cache.set("proveedores", proveedores)
-        cache.set("forma_pago", forma_pago)
-        cache.set("tipos_comprobante", tipos_comprobante)
-        cache.set("condicion_iva_receptor", condicion_iva_receptor)
-        cache.set("puntos_venta", puntos_venta)
-        cache.set("estados_factura", estados_factura)
-        cache.set("tipos_documento", tipos_documento)
-        cache.set("estados_clientes", estados_clientes)
-        
+            # Versiones antes que los datos: un cambio en el medio se ve en el próximo poll.
+            # Los catálogos fijos no van a la base.
+            if any(CAT_TABLAS.get(k) for k in keys):
+                versiones = self._leer_versiones(s)
+            for k in keys:
+                cargados[k] = _LOADERS[k](s)
+
+        for k, data in cargados.items():
+            tabla = CAT_TABLAS.get(k)
+            cache.set(
+                k,
+                data,
+                ttl=settings.CATALOG_TTL or None,
+                version=versiones.get(tabla, 0) if tabla else None,
+            )
+
+        if any(k in SNAPSHOT_KEYS for k in cargados):
+            self.guardar_snapshot()
+        return cargados
 
+    # -------------------------------------------------
+    # Snapshot en disco (arranque en frío)
+    # -------------------------------------------------
+    def guardar_snapshot(self) -> None:
+        try:
+            CatalogCache.get().save_snapshot(_snapshot_path(), SNAPSHOT_KEYS, _snapshot_origen())
+        except Exception as e:
+            logger.warning("No se pudo guardar el snapshot de catálogos: {}", e)
 
-        cache.mark_loaded()
+    def cargar_snapshot(self) -> List[str]:
+        """
+        Carga en caché los catálogos guardados en la última sesión, sin ir a
+        la base. Después hay que llamar a revalidar_snapshot() (en segundo
+        plano) para traer lo que haya cambiado mientras tanto.
+        """
+        cache = CatalogCache.get()
+        cargadas = cache.load_snapshot(
+            _snapshot_path(),
+            _snapshot_origen(),
+            ttl=settings.CATALOG_TTL or None,
+        )
+        for k in cargadas:
+            if k in _DESDE_SNAPSHOT:
+                cache.set(
+                    k,
+                    _DESDE_SNAPSHOT[k](cache.get_value(k) or []),
+                    ttl=settings.CATALOG_TTL or None,
+                    version=cache.version(k),
+                )
+        if cargadas:
+            logger.debug("Catálogos desde snapshot: {}", ", ".join(cargadas))
+        return cargadas
+
+    def revalidar_snapshot(self) -> List[str]:
+        """
+        Compara el snapshot cargado con catalog_versions (una consulta) y
+        recarga sólo lo que cambió. Sin catalog_versions no hay forma barata
+        de saberlo, así que se recargan todos.
+        """
+        with SessionLocal() as s:
+            con_versiones = self._has_catalog_versions(s)
+        if con_versiones:
+            return self.refrescar_cambiados()
+
+        cargadas = [k for k in CatalogCache.get().loaded_keys() if k in SNAPSHOT_KEYS]
+        self.reload(*cargadas)
+        return cargadas
+
+    # -------------------------------------------------
+    # Versiones (catalog_versions)
+    # -------------------------------------------------
+    def _has_catalog_versions(self, db: Session) -> bool:
+        if CatalogosService._versions_available is not None:
+            return CatalogosService._versions_available
+
+        try:
+            exists = db.execute(
+                text(
+                    """
+                    SELECT 1
+                    FROM information_schema.tables
+                    WHERE table_schema = :schema
+                      AND table_name = 'catalog_versions'
+                    LIMIT 1
+                    """
+                ),
+                {"schema": settings.DB_NAME},
+            ).first()
+        except Exception as e:
+            logger.debug("No se pudo verificar catalog_versions: {}", e)
+            exists = None
+        CatalogosService._versions_available = bool(exists)
+        return CatalogosService._versions_available
+
+    def _leer_versiones(self, db: Session) -> Dict[str, int]:
+        if not self._has_catalog_versions(db):
+            return {}
+        rows = db.execute(text("SELECT catalogo, version FROM catalog_versions")).all()
+        return {r[0]: int(r[1]) for r in rows}
+
+    def registrar_cambio(self, db: Session, *tablas: str) -> None:
+        """
+        Sube la versión de las tablas de catálogo modificadas (sin commit,
+        va en la misma transacción que el cambio). Las demás terminales lo
+        ven en su próximo poll.
+        """
+        if not self._has_catalog_versions(db):
+            return
+        if db.get_bind().dialect.name == "mysql":
+            sql = """
+                INSERT INTO catalog_versions (catalogo, version) VALUES (:catalogo, 1)
+                ON DUPLICATE KEY UPDATE version = version + 1
+            """
+        else:
+            sql = """
+                INSERT INTO catalog_versions (catalogo, version) VALUES (:catalogo, 1)
+                ON CONFLICT(catalogo) DO UPDATE SET version = version + 1
+            """
+        for tabla in dict.fromkeys(tablas):
+            db.execute(text(sql), {"catalogo": tabla})
+
+    def refrescar_cambiados(self, margen: float = 0.0) -> List[str]:
+        """
+        Recarga los catálogos en caché cuya versión cambió en la base o que
+        vencen dentro de `margen` segundos. Devuelve las claves recargadas.
+        Pensado para el poller: una sola consulta si no cambió nada.
+        """
+        cache = CatalogCache.get()
+        cargadas = [k for k in cache.loaded_keys() if k in _LOADERS]
+        if not cargadas:
+            return []
 
-        return {k: cache.get_value(k) for k in CAT_KEYS}
+        with SessionLocal() as s:
+            versiones = self._leer_versiones(s)
+
+        cambiados = set(cache.expiring(margen)) & set(cargadas)
+        if versiones:
+            for k in cargadas:
+                tabla = CAT_TABLAS.get(k)
+                if tabla and cache.version(k) != versiones.get(tabla, 0):
+                    cambiados.add(k)
+
+        cambiados_ordenados = [k for k in cargadas if k in cambiados]
+        if cambiados_ordenados:
+            self.reload(*cambiados_ordenados)
+            logger.debug("Catálogos recargados: {}", ", ".join(cambiados_ordenados))
+        return cambiados_ordenados
 
 
 
@@ -205,12 +383,13 @@ class CatalogosService:
         if not tipo_id:
             return None
 
-        tipos = self.get_tipos_comprobante()
-        for t in tipos:
-            if t.get("id") == tipo_id:
-                return t
+        return self.get_tipos_comprobante_catalogo().by_id(tipo_id)
 
-        return None
+    def get_tipos_comprobante_catalogo(self) -> TiposComprobanteCatalogo:
+        """Todos los tipos de comprobante (también inactivos) con índices por id/código/letra."""
+        # Un catálogo vacío es falsy (__len__): comparar con None, no por verdad
+        catalogo = CatalogCache.get().get_value(TIPOS_COMPROBANTE_KEY)
+        return catalogo if catalogo is not None else self.warmup_all()[TIPOS_COMPROBANTE_KEY]
 
     def get_proveedores(self):
         return CatalogCache.get().get_value("proveedores") or self.warmup_all()["proveedores"]
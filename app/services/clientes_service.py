@@ -4,9 +4,13 @@ from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
-from app.data.database import SessionLocal
+from app.core.config import settings
+from app.core.count_cache import CountCache
+from app.data.database import ReadSessionLocal, SessionLocal
 from app.repositories.clientes_repository import ClientesRepository
+from app.repositories.statements import SeekPage
 from app.services.catalogos_service import CatalogosService
+from app.services.search_index_service import SearchIndexService
 
 
 class ClientesService:
@@ -50,28 +54,77 @@ class ClientesService:
         page_size: int,
     ) -> Tuple[List[Dict[str, Any]], int]:
 
-        db = SessionLocal()
+        # Listado: puede leerse de la réplica
+        db = ReadSessionLocal()
         try:
             repo = self._repo(db)
             rows, total = repo.search(filtros, page=page, page_size=page_size)
+            return self._agregar_tipo_doc_label(rows), total
 
-            if not rows:
-                return rows, total
+        finally:
+            db.close()
 
-            # 🔥 Agregamos tipo_doc_label desde catálogo
-            for r in rows:
-                tipo = self._catalogos.get_tipo_doc_by_id(r.get("tipo_doc_id"))
-                if tipo:
-                    r["tipo_doc_label"] = tipo.get("descripcion") or tipo.get("codigo")
-                else:
-                    r["tipo_doc_label"] = ""
+    def search_seek(
+        self,
+        filtros: Dict[str, Any],
+        cursor: Optional[Dict[str, Any]] = None,
+        atras: bool = False,
+        page_size: int = 25,
+    ) -> Tuple[SeekPage, int]:
+        """
+        Página por clave (ver ClientesRepository.search_seek) y total de la
+        búsqueda, cacheado en CountCache en vez de contarlo en cada página.
+        """
+        db = ReadSessionLocal()
+        try:
+            pagina = self._repo(db).search_seek(filtros, cursor=cursor, atras=atras, page_size=page_size)
+        finally:
+            db.close()
 
+        self._agregar_tipo_doc_label(pagina.rows)
+        total = CountCache.get().total(
+            CountCache.clave("clientes", filtros),
+            lambda: self._contar(filtros),
+            ttl=settings.LIST_COUNT_TTL,
+            # Primera página: ver lo que hayan grabado otras PCs
+            refrescar=cursor is None,
+        )
+        return pagina, total
+
+    def buscar(self, q: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Sugerencias para los selectores de cliente: búsqueda general por
+        documento o nombre, sin contar el total. Se responde desde el índice
+        local (SearchIndexService) y sólo va a la base si todavía no está listo.
+        """
+        rows = SearchIndexService.get().buscar_clientes(q, limit=limit)
+        if rows is not None:
+            return self._agregar_tipo_doc_label(rows)
 
-            return rows, total
+        db = ReadSessionLocal()
+        try:
+            pagina = self._repo(db).search_seek({"q": q}, page_size=limit)
+        finally:
+            db.close()
+        return self._agregar_tipo_doc_label(pagina.rows)
 
+    def _contar(self, filtros: Dict[str, Any]) -> int:
+        db = ReadSessionLocal()
+        try:
+            return self._repo(db).count(filtros)
         finally:
             db.close()
 
+    def _agregar_tipo_doc_label(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # 🔥 Agregamos tipo_doc_label desde catálogo
+        for r in rows:
+            tipo = self._catalogos.get_tipo_doc_by_id(r.get("tipo_doc_id"))
+            if tipo:
+                r["tipo_doc_label"] = tipo.get("descripcion") or tipo.get("codigo")
+            else:
+                r["tipo_doc_label"] = ""
+        return rows
+
 
     def get(self, cliente_id: int) -> Optional[Dict[str, Any]]:
         db = SessionLocal()
@@ -26,7 +26,7 @@ from reportlab.graphics.barcode import qr
 from reportlab.graphics.shapes import Drawing
 from reportlab.graphics import renderPDF
 
-from app.services.facturas_service import FacturasService
+from app.services.service_registry import ServiceRegistry
 from app.data.database import SessionLocal
 from sqlalchemy import text
 
@@ -53,9 +53,9 @@ class ComprobantesService:
     FOOTER_H = 40 * mm
 
     def __init__(self, *, empresa: Optional[EmpresaConfig] = None) -> None:
-        self._svc = FacturasService()
+        self._svc = ServiceRegistry.get().facturas()
         self._empresa = empresa or EmpresaConfig()
-        self._remitos_svc = RemitosService()   # 👈 NUEVO
+        self._remitos_svc = ServiceRegistry.get().obtener(RemitosService)
         self.LOGO_GUSSONI_PATH = paths.LOGO_GUSSONI
         self.LOGO_AFIP_PATH   = paths.LOGO_AFIP
     
@@ -3,7 +3,7 @@ from typing import List, Dict, Any
 from sqlalchemy import text
 from datetime import date
 
-from app.data.database import SessionLocal
+from app.data.database import ReadSessionLocal
 from app.core.domain_constants import EstadoVenta
 
 
@@ -20,7 +20,7 @@ class DashboardService:
     # -------------------------
 
     def get_resumen_cobranza(self) -> Dict[str, Any]:
-        db = SessionLocal()
+        db = ReadSessionLocal()
         try:
             deuda_vencida = db.execute(
                 text("""
@@ -67,7 +67,7 @@ class DashboardService:
     # -------------------------
 
     def get_cuotas_proximas(self, limit: int = 5) -> List[Dict[str, Any]]:
-        db = SessionLocal()
+        db = ReadSessionLocal()
         try:
             rows = db.execute(
                 text("""
@@ -93,7 +93,7 @@ class DashboardService:
             db.close()
 
     def get_cuotas_vencidas(self, limit: int = 5) -> List[Dict[str, Any]]:
-        db = SessionLocal()
+        db = ReadSessionLocal()
         try:
             rows = db.execute(
                 text("""
@@ -122,7 +122,7 @@ class DashboardService:
     # -------------------------
 
     def get_unidades_vendidas_por_mes(self, limit: int = 6) -> List[Dict[str, Any]]:
-        db = SessionLocal()
+        db = ReadSessionLocal()
         try:
             rows = db.execute(
                 text("""
@@ -147,7 +147,7 @@ class DashboardService:
             db.close()
 
     def get_facturas_pendientes_mes(self) -> int:
-        db = SessionLocal()
+        db = ReadSessionLocal()
         try:
             return db.execute(
                 text("""
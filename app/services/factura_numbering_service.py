@@ -15,10 +15,20 @@ from app.repositories.facturas_repository import FacturasRepository
 class FacturaNumberingService:
     """Resuelve numeracion de comprobantes sin tocar el flujo de facturacion."""
 
-    def __init__(self, *, wsaa, wsfe, repo_factory: Callable[[Session], FacturasRepository]):
+    def __init__(
+        self,
+        *,
+        wsaa,
+        wsfe,
+        repo_factory: Callable[[Session], FacturasRepository],
+        ultimo_en_cola_getter: Optional[Callable[[Session, int, int], Optional[int]]] = None,
+    ):
         self._wsaa = wsaa
         self._wsfe = wsfe
         self._repo_factory = repo_factory
+        # Facturas encoladas para autorizar: ya tienen número pero AFIP
+        # todavía no las cuenta en FECompUltimoAutorizado
+        self._ultimo_en_cola_getter = ultimo_en_cola_getter
 
     def sugerir_proximo_numero(self, tipo_comprobante_id: str, pto_vta: Any) -> int:
         logger.debug("sugerir_proximo_numero tipo={} pto_vta={}", tipo_comprobante_id, pto_vta)
@@ -101,7 +111,8 @@ class FacturaNumberingService:
                     )
                 if not proximo_local or proximo_local <= 0:
                     proximo_local = 1
-                proximo = proximo_afip
+                en_cola = self._ultimo_en_cola(db, tipo_comprobante_id, pto)
+                proximo = max(proximo_afip, (en_cola or 0) + 1)
                 info["ultimo_afip"] = ultimo_afip
                 info["proximo"] = proximo
                 info["proximo_local"] = proximo_local
@@ -112,6 +123,8 @@ class FacturaNumberingService:
                     f"Proximo a usar: {proximo}. "
                     "La numeracion local queda solo como referencia diagnostica."
                 )
+                if en_cola is not None:
+                    info["mensaje"] += f" Hay facturas en cola de autorizacion hasta el numero {en_cola}."
                 if proximo_local != proximo_afip:
                     info["errores"].append(
                         "La numeracion local no coincide con ARCA. "
@@ -187,6 +200,11 @@ class FacturaNumberingService:
             if not proximo_local or proximo_local <= 0:
                 proximo_local = 1
 
+            en_cola = self._ultimo_en_cola(db, tipo_comprobante_id, pto_vta)
+            if en_cola is not None and en_cola >= proximo_afip:
+                # Las encoladas se autorizan en orden; la nueva va detrás
+                return en_cola + 1
+
             proximo = proximo_afip
             if proximo_local != proximo_afip:
                 logger.warning(
@@ -208,6 +226,15 @@ class FacturaNumberingService:
 
         return proximo_local
 
+    def _ultimo_en_cola(self, db: Session, tipo_comprobante_id: Any, pto_vta: int) -> Optional[int]:
+        if self._ultimo_en_cola_getter is None:
+            return None
+        try:
+            return self._ultimo_en_cola_getter(db, tipo_comprobante_id, pto_vta)
+        except Exception as e:
+            logger.warning("Error consultando numeros en cola ARCA: {}", e)
+            return None
+
     @staticmethod
     def _parse_ultimo_afip(value: Any, errores: list[str]) -> Optional[int]:
         if isinstance(value, dict):
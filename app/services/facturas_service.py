@@ -1,5 +1,8 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 from sqlalchemy import text
@@ -7,10 +10,14 @@ from sqlalchemy import text
 from loguru import logger
 
 from app.core.config import settings
-from app.data.database import SessionLocal
+from app.core.count_cache import CountCache
+from app.data.database import ReadSessionLocal, SessionLocal
 from app.repositories.facturas_repository import FacturasRepository
+from app.repositories.statements import SeekPage
 from app.services.catalogos_service import CatalogosService
 from app.services.arca_authorization_service import ArcaAuthorizationService
+from app.services.arca_conciliacion_service import ArcaConciliacionService
+from app.services.arca_outbox_service import ArcaOutboxService
 from app.services.audit_log_service import AuditLogService
 from app.services.factura_numbering_service import FacturaNumberingService
 from app.services.factura_rejection_service import FacturaRejectionService
@@ -23,6 +30,28 @@ from app.services.venta_creator import VentaCreator
 from app.integrations.arca.wsaa_client import ArcaWSAAClient, ArcaAuthData
 from app.integrations.arca.wsfe_client import ArcaWSFEClient
 
+
+class _SyncProgress:
+    """Contador de avance compartido entre los hilos de la sincronización."""
+
+    def __init__(self, total: int, callback: Optional[Callable[[int, int, str], None]]) -> None:
+        self._total = total
+        self._hechas = 0
+        self._callback = callback
+        self._lock = Lock()
+
+    def avanzar(self, mensaje: str, cantidad: int = 1) -> None:
+        if not self._callback:
+            return
+        with self._lock:
+            self._hechas = min(self._hechas + cantidad, self._total)
+            hechas = self._hechas
+        try:
+            self._callback(hechas, self._total, mensaje)
+        except Exception:
+            logger.exception("Error notificando progreso de sincronización ARCA")
+
+
 class FacturasService:
     """Orquesta casos de uso de Facturación (listado, detalle, alta, ARCA, etc.)."""
 
@@ -72,6 +101,7 @@ class FacturasService:
             wsaa=self._wsaa,
             wsfe=self._wsfe,
             repo_factory=self._repo,
+            ultimo_en_cola_getter=lambda db, tipo, pto: self._outbox.ultimo_numero_en_cola(db, tipo, pto),
         )
         self._arca_authorization = ArcaAuthorizationService(
             wsaa=self._wsaa,
@@ -86,6 +116,21 @@ class FacturasService:
             estado_error_getter=lambda: self.ESTADO_ERROR_COMUNICACION,
             rejected_effects_processor=self._factura_rejection.procesar_rechazo,
         )
+        self._outbox = ArcaOutboxService(
+            autorizador=self.autorizar_en_arca,
+            conciliador=self._arca_authorization.recuperar_autorizacion,
+        )
+        self._conciliacion = ArcaConciliacionService(
+            wsaa=self._wsaa,
+            wsfe=self._wsfe,
+            estado_autorizada_getter=lambda: self.ESTADO_AUTORIZADA,
+            estados_sin_cae_getter=lambda: [
+                self.ESTADO_BORRADOR,
+                self.ESTADO_PENDIENTE_AFIP,
+                self.ESTADO_RECHAZADA,
+                self.ESTADO_ERROR_COMUNICACION,
+            ],
+        )
         self._nota_credito_creator = NotaCreditoCreator(
             wsaa=self._wsaa,
             wsfe=self._wsfe,
@@ -123,16 +168,40 @@ class FacturasService:
         if isinstance(ex, IntegrityError):
             return "Error de integridad en los datos. Verificá que no haya duplicados."
         msg = str(ex)
-        if any(kw in msg for kw in ("[SQL:", "UPDATE ", "INSERT ", "SELECT ", "pymysql")):
+        if any(kw in msg for kw in ("[SQL:", "UPDATE ", "INSERT ", "SELECT ", "pymysql", "MySQLdb", "mysql.connector")):
             return "Error al guardar los datos. Por favor reintentá o contactá al soporte."
         return msg
 
+    # IDs resueltos por nombre: se consultan una vez por proceso y se comparten
+    # entre instancias (atributo -> id)
+    _estado_ids_cache: Optional[Dict[str, int]] = None
+    _estado_ids_lock = Lock()
+
+    @classmethod
+    def invalidar_estado_ids(cls) -> None:
+        """Fuerza a resolver de nuevo los IDs de estados (cambio de base, tests)."""
+        with cls._estado_ids_lock:
+            cls._estado_ids_cache = None
+
     def _init_estado_ids(self) -> None:
-        """Intenta resolver IDs de estados por nombre desde la BD.
+        """Aplica los IDs de estados resueltos por nombre desde la BD.
 
         Esto evita errores cuando los IDs cambian entre instalaciones.
-        Si la tabla/consulta falla, se mantienen los valores por defecto.
+        La consulta se hace una sola vez por proceso; si falla, se mantienen
+        los valores por defecto y se reintenta en la próxima instancia.
         """
+        cls = type(self)
+        with cls._estado_ids_lock:
+            if cls._estado_ids_cache is None:
+                cls._estado_ids_cache = self._resolver_estado_ids()
+            ids = cls._estado_ids_cache or {}
+
+        for attr, estado_id in ids.items():
+            setattr(self, attr, estado_id)
+
+    def _resolver_estado_ids(self) -> Optional[Dict[str, int]]:
+        """Consulta 'estados' y devuelve los IDs encontrados (None si la consulta falla)."""
+        ids: Dict[str, int] = {}
         db = SessionLocal()
         try:
             repo = self._repo(db)
@@ -146,8 +215,8 @@ class FacturasService:
                         return por_nombre[k]
                 return None
 
-            self.ESTADO_ANULADA = pick("Anulada") or self.ESTADO_ANULADA
-            self.ESTADO_ANULADA_POR_NC = pick("Anulada por NC", "Anulada por N/C", "Anulada") or self.ESTADO_ANULADA_POR_NC
+            ids["ESTADO_ANULADA"] = pick("Anulada") or self.ESTADO_ANULADA
+            ids["ESTADO_ANULADA_POR_NC"] = pick("Anulada por NC", "Anulada por N/C", "Anulada") or self.ESTADO_ANULADA_POR_NC
 
             # Resolver estado de ventas
             try:
@@ -155,26 +224,24 @@ class FacturasService:
                     text("SELECT id, nombre FROM estados WHERE tipo = 'ventas'")
                 ).mappings().all()
                 por_nombre_venta = {str(e["nombre"]).strip().lower(): int(e["id"]) for e in estados_venta}
-                self.ESTADO_VENTA_CANCELADA = (
+                ids["ESTADO_VENTA_CANCELADA"] = (
                     por_nombre_venta.get("cancelada")
                     or por_nombre_venta.get("cancelado")
                     or self.ESTADO_VENTA_CANCELADA
                 )
             except Exception:
                 pass
+            return ids
         except Exception:
             logger.warning("No se pudieron resolver IDs de estados desde la BD; usando valores por defecto.")
+            return None
         finally:
             db.close()
 
     # -------------------- Lookups (desde caché) --------------------
 
     def get_tipos_comprobante(self) -> List[Dict[str, Any]]:
-        db = SessionLocal()
-        try:
-            return self._repo(db).list_tipos_comprobante()
-        finally:
-            db.close()
+        return self._catalogos.get_tipos_comprobante()
 
     def get_estados_facturas(self) -> List[Dict[str, Any]]:
         estados = self._catalogos_get_value_safe("estados_facturas")
@@ -286,7 +353,8 @@ class FacturasService:
         page: int,
         page_size: int,
     ) -> Tuple[List[Dict[str, Any]], int]:
-        db = SessionLocal()
+        # Listado: puede leerse de la réplica
+        db = ReadSessionLocal()
         try:
             repo = self._repo(db)
             rows, total = repo.search(filtros, page=page, page_size=page_size)
@@ -294,6 +362,39 @@ class FacturasService:
         finally:
             db.close()
 
+    def search_seek(
+        self,
+        filtros: Dict[str, Any],
+        cursor: Optional[Dict[str, Any]] = None,
+        atras: bool = False,
+        page_size: int = 25,
+    ) -> Tuple[SeekPage, int]:
+        """
+        Página por clave (ver FacturasRepository.search_seek) y total de la
+        búsqueda, cacheado en CountCache en vez de contarlo en cada página.
+        """
+        db = ReadSessionLocal()
+        try:
+            pagina = self._repo(db).search_seek(filtros, cursor=cursor, atras=atras, page_size=page_size)
+        finally:
+            db.close()
+
+        total = CountCache.get().total(
+            CountCache.clave("facturas", filtros),
+            lambda: self._contar(filtros),
+            ttl=settings.LIST_COUNT_TTL,
+            # Primera página: ver lo que hayan grabado otras PCs
+            refrescar=cursor is None,
+        )
+        return pagina, total
+
+    def _contar(self, filtros: Dict[str, Any]) -> int:
+        db = ReadSessionLocal()
+        try:
+            return self._repo(db).count(filtros)
+        finally:
+            db.close()
+
     def get(self, factura_id: int) -> Optional[Dict[str, Any]]:
         """
         Devuelve la cabecera de factura enriquecida con datos de venta
@@ -354,6 +455,7 @@ class FacturasService:
         self,
         cabecera: Dict[str, Any],
         items: List[Dict[str, Any]],
+        encolar_autorizacion: bool = False,
     ) -> int:
         """
         Crea una factura con su detalle.
@@ -361,6 +463,8 @@ class FacturasService:
         - Completa estado inicial (Borrador)
         - Calcula subtotal, IVA y total (por si la UI no lo mandó)
         - Inserta factura + detalle
+        - encolar_autorizacion=True: deja el pedido de CAE en arca_outbox,
+          en la misma transacción, para que lo procese el worker
         - Devuelve el ID de la nueva factura
         """
 
@@ -509,6 +613,9 @@ class FacturasService:
                 },
             )
 
+            if encolar_autorizacion:
+                self._outbox.encolar(db, factura_id)
+
             # ======================================================
 
             db.commit()
@@ -521,10 +628,26 @@ class FacturasService:
 
     # -------------------- Autorización electrónica en ARCA --------------------
 
-    def sincronizar_borradores_con_arca(self) -> Dict[str, Any]:
+    def sincronizar_borradores_con_arca(
+        self,
+        en_lote: bool = False,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, Any]:
         """
         Recorre facturas pendientes (BORRADOR / ERROR_COMUNICACION / RECHAZADA / PENDIENTE_AFIP)
-        y trata de autorizarlas una por una en ARCA, respetando la numeración real.
+        y trata de autorizarlas en ARCA, respetando la numeración real.
+
+        - Los grupos (tipo, punto de venta) se procesan en paralelo, hasta
+          settings.ARCA_SYNC_WORKERS a la vez: la numeración sólo es
+          secuencial dentro de cada grupo. El ritmo de requests a AFIP lo
+          controla el limitador compartido del cliente WSFE.
+        - en_lote=False: una llamada FECAESolicitar por factura.
+        - en_lote=True: numera cada grupo de forma consecutiva y lo envía en
+          lotes de hasta ArcaWSFEClient.MAX_REGISTROS_LOTE comprobantes por
+          llamada, aplicando los resultados en una transacción.
+        - progress_callback(procesadas, total, mensaje) se invoca desde los
+          hilos de trabajo después de cada factura.
 
         FIX:
         - Si una Nota de Crédito queda AUTORIZADA durante la sincronización,
@@ -532,15 +655,7 @@ class FacturasService:
             * anular factura original
             * devolver stock del vehículo
         """
-        import time
-
-        resumen = {
-            "procesadas": 0,
-            "aprobadas": 0,
-            "rechazadas": 0,
-            "error_comunicacion": 0,
-            "detalles": [],
-        }
+        resumen = self._nuevo_resumen_sync()
 
         # 1) Leer facturas pendientes — sesión corta, solo lectura
         with SessionLocal() as db:
@@ -563,6 +678,11 @@ class FacturasService:
                 ).mappings().all()
             ]
 
+            # Las que están en la cola del worker no se tocan: se enviarían dos veces
+            en_cola = self._outbox.factura_ids_en_curso(db)
+            if en_cola:
+                rows = [r for r in rows if int(r["id"]) not in en_cola]
+
         if not rows:
             return resumen
 
@@ -578,93 +698,216 @@ class FacturasService:
             resumen["detalles"].append(f"No se pudo obtener TA de ARCA: {e}")
             return resumen
 
+        progreso = _SyncProgress(len(rows), progress_callback)
+
+        def procesar(key: Tuple[int, int], facturas: List[Dict[str, Any]]) -> Dict[str, Any]:
+            tipo_comprobante_id, pto_vta = key
+            resumen_grupo = self._nuevo_resumen_sync()
+            try:
+                self._sincronizar_grupo(
+                    resumen_grupo, auth, tipo_comprobante_id, pto_vta, facturas, en_lote, progreso
+                )
+            except Exception as e:
+                logger.exception("Error sincronizando grupo {} {}", tipo_comprobante_id, pto_vta)
+                resumen_grupo["detalles"].append(
+                    f"[{tipo_comprobante_id} {pto_vta}] Error inesperado al sincronizar: {self._clean_error_message(e)}"
+                )
+            return resumen_grupo
+
+        workers = max(1, min(len(grupos), int(max_workers or settings.ARCA_SYNC_WORKERS or 1)))
+        if workers == 1:
+            resumenes = [procesar(key, facturas) for key, facturas in grupos.items()]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="arca-sync") as pool:
+                futuros = [pool.submit(procesar, key, facturas) for key, facturas in grupos.items()]
+                resumenes = [f.result() for f in futuros]
+
+        # 3) Unificar en el orden de los grupos, para que el detalle sea estable
+        for parcial in resumenes:
+            for campo in ("procesadas", "aprobadas", "rechazadas", "error_comunicacion"):
+                resumen[campo] += parcial[campo]
+            resumen["detalles"].extend(parcial["detalles"])
+
+        return resumen
+
+    @staticmethod
+    def _nuevo_resumen_sync() -> Dict[str, Any]:
+        return {
+            "procesadas": 0,
+            "aprobadas": 0,
+            "rechazadas": 0,
+            "error_comunicacion": 0,
+            "detalles": [],
+        }
+
+    def _sincronizar_grupo(
+        self,
+        resumen: Dict[str, Any],
+        auth: ArcaAuthData,
+        tipo_comprobante_id: int,
+        pto_vta: int,
+        facturas: List[Dict[str, Any]],
+        en_lote: bool,
+        progreso: "_SyncProgress",
+    ) -> None:
+        proximo_afip = None
         fe_ult = getattr(self._wsfe, "fe_comp_ultimo_autorizado", None)
 
-        for (tipo_comprobante_id, pto_vta), facturas in grupos.items():
-            proximo_afip = None
+        # Consultar último autorizado en AFIP — sesión corta para lookup de tipo
+        if callable(fe_ult):
+            try:
+                with SessionLocal() as db:
+                    tipo_info = self._repo(db).get_tipo_comprobante_by_id(tipo_comprobante_id)
+                codigo_tipo = str(tipo_info["codigo"]) if tipo_info else str(tipo_comprobante_id)
+                cbte_tipo = ArcaWSFEClient._map_tipo_comprobante_to_afip_code(codigo_tipo)
+                # La sincronización renumera: siempre leer el valor real de AFIP
+                invalidar = getattr(self._wsfe, "invalidar_ultimo_autorizado", None)
+                if callable(invalidar):
+                    invalidar(cbte_tipo, pto_vta)
+                ult_raw = fe_ult(auth=auth, cbte_tipo=cbte_tipo, pto_vta=pto_vta)
+                ult_nro = 0
+                if isinstance(ult_raw, dict):
+                    for key in ("cbte_nro", "numero", "CbteNro", "cbtenro"):
+                        if key in ult_raw and ult_raw[key] is not None:
+                            try:
+                                ult_nro = int(ult_raw[key])
+                                break
+                            except Exception:
+                                continue
+                else:
+                    try:
+                        ult_nro = int(ult_raw or 0)
+                    except Exception:
+                        ult_nro = 0
+                proximo_afip = ult_nro + 1
+            except Exception as e:
+                resumen["detalles"].append(
+                    f"[{tipo_comprobante_id} {pto_vta}] Error al consultar FECompUltimoAutorizado: {e}"
+                )
 
-            # 3) Consultar último autorizado en AFIP — sesión corta para lookup de tipo
-            if callable(fe_ult):
-                try:
-                    with SessionLocal() as db:
-                        tipo_info = self._repo(db).get_tipo_comprobante_by_id(tipo_comprobante_id)
-                    codigo_tipo = str(tipo_info["codigo"]) if tipo_info else str(tipo_comprobante_id)
-                    cbte_tipo = ArcaWSFEClient._map_tipo_comprobante_to_afip_code(codigo_tipo)
-                    ult_raw = fe_ult(auth=auth, cbte_tipo=cbte_tipo, pto_vta=pto_vta)
-                    ult_nro = 0
-                    if isinstance(ult_raw, dict):
-                        for key in ("cbte_nro", "numero", "CbteNro", "cbtenro"):
-                            if key in ult_raw and ult_raw[key] is not None:
-                                try:
-                                    ult_nro = int(ult_raw[key])
-                                    break
-                                except Exception:
-                                    continue
-                    else:
-                        try:
-                            ult_nro = int(ult_raw or 0)
-                        except Exception:
-                            ult_nro = 0
-                    proximo_afip = ult_nro + 1
-                except Exception as e:
-                    resumen["detalles"].append(
-                        f"[{tipo_comprobante_id} {pto_vta}] Error al consultar FECompUltimoAutorizado: {e}"
+        # Fallback local
+        if proximo_afip is None:
+            proximo_afip = max((int(f.get("numero") or 0) for f in facturas), default=0) + 1
+
+        if en_lote:
+            self._sincronizar_grupo_en_lote(resumen, tipo_comprobante_id, pto_vta, facturas, proximo_afip, progreso)
+            return
+
+        for f in facturas:
+            factura_id = f["id"]
+            num_local = int(f.get("numero") or 0)
+
+            # Ajustar numeración si hace falta — sesión corta, commit inmediato
+            if num_local != proximo_afip:
+                with SessionLocal() as db:
+                    db.execute(
+                        text("UPDATE facturas SET numero = :num WHERE id = :id"),
+                        {"num": proximo_afip, "id": factura_id},
+                    )
+                    db.commit()
+                f["numero"] = proximo_afip
+                num_local = proximo_afip
+
+            # Autorizar — tiene su propia sesión interna
+            res = self.autorizar_en_arca(factura_id)
+            self._registrar_resultado_sync(resumen, res, tipo_comprobante_id, pto_vta, num_local)
+            progreso.avanzar(resumen["detalles"][-1])
+
+            if res.get("aprobada"):
+                # Efectos NC — sesión corta, commit propio
+                with SessionLocal() as db:
+                    self._procesar_nc_autorizada(db, factura_id)
+                    db.commit()
+                proximo_afip += 1
+            elif res.get("rechazada"):
+                proximo_afip += 1
+
+    def _sincronizar_grupo_en_lote(
+        self,
+        resumen: Dict[str, Any],
+        tipo_comprobante_id: int,
+        pto_vta: int,
+        facturas: List[Dict[str, Any]],
+        proximo_afip: int,
+        progreso: "_SyncProgress",
+    ) -> None:
+        """
+        Numera el grupo de forma consecutiva desde proximo_afip y lo autoriza
+        en lotes. Si un lote termina con error de comunicación, el resto del
+        grupo queda pendiente para la próxima sincronización: enviarlo dejaría
+        un hueco en la numeración.
+        """
+        # Renumerar todo el grupo en una sola transacción
+        with SessionLocal() as db:
+            for offset, f in enumerate(facturas):
+                numero = proximo_afip + offset
+                if int(f.get("numero") or 0) != numero:
+                    db.execute(
+                        text("UPDATE facturas SET numero = :num WHERE id = :id"),
+                        {"num": numero, "id": f["id"]},
                     )
+                    f["numero"] = numero
+            db.commit()
+
+        tamanio = max(int(getattr(self._wsfe, "MAX_REGISTROS_LOTE", ArcaWSFEClient.MAX_REGISTROS_LOTE)), 1)
 
-            # 4) Fallback local
-            if proximo_afip is None:
-                proximo_afip = max((int(f.get("numero") or 0) for f in facturas), default=0) + 1
-
-            # 5) Procesar cada factura del grupo
-            for f in facturas:
-                factura_id = f["id"]
-                num_local = int(f.get("numero") or 0)
-
-                # Ajustar numeración si hace falta — sesión corta, commit inmediato
-                if num_local != proximo_afip:
-                    with SessionLocal() as db:
-                        db.execute(
-                            text("UPDATE facturas SET numero = :num WHERE id = :id"),
-                            {"num": proximo_afip, "id": factura_id},
-                        )
-                        db.commit()
-                    f["numero"] = proximo_afip
-                    num_local = proximo_afip
-
-                # Pausa entre calls a AFIP para respetar el límite de requests
-                time.sleep(0.2)
-
-                # Autorizar — tiene su propia sesión interna
-                res = self.autorizar_en_arca(factura_id)
-                resumen["procesadas"] += 1
+        for inicio in range(0, len(facturas), tamanio):
+            lote = facturas[inicio:inicio + tamanio]
+            resultados = self._arca_authorization.autorizar_lote([f["id"] for f in lote])
 
+            aprobadas: List[int] = []
+            corte = False
+            for f, res in zip(lote, resultados):
+                self._registrar_resultado_sync(resumen, res, tipo_comprobante_id, pto_vta, int(f["numero"]))
+                progreso.avanzar(resumen["detalles"][-1])
                 if res.get("aprobada"):
-                    resumen["aprobadas"] += 1
-                    resumen["detalles"].append(
-                        f"Factura {factura_id} [{tipo_comprobante_id} {str(pto_vta).zfill(4)}-{num_local}] APROBADA."
-                    )
-                    # Efectos NC — sesión corta, commit propio
-                    with SessionLocal() as db:
+                    aprobadas.append(f["id"])
+                elif not res.get("rechazada"):
+                    corte = True
+
+            # Efectos NC de todo el lote — sesión corta, commit propio
+            if aprobadas:
+                with SessionLocal() as db:
+                    for factura_id in aprobadas:
                         self._procesar_nc_autorizada(db, factura_id)
-                        db.commit()
-                    proximo_afip += 1
+                    db.commit()
 
-                elif res.get("rechazada"):
-                    resumen["rechazadas"] += 1
+            if corte:
+                pendientes = len(facturas) - (inicio + len(lote))
+                if pendientes:
                     resumen["detalles"].append(
-                        f"Factura {factura_id} [{tipo_comprobante_id} {str(pto_vta).zfill(4)}-{num_local}] "
-                        f"RECHAZADA: {res.get('mensaje')}"
+                        f"[{tipo_comprobante_id} {pto_vta}] {pendientes} factura(s) quedan pendientes "
+                        "para la próxima sincronización."
                     )
-                    proximo_afip += 1
+                    progreso.avanzar(resumen["detalles"][-1], cantidad=pendientes)
+                break
 
-                else:
-                    resumen["error_comunicacion"] += 1
-                    resumen["detalles"].append(
-                        f"Factura {factura_id} [{tipo_comprobante_id} {str(pto_vta).zfill(4)}-{num_local}] "
-                        f"ERROR COMUNICACIÓN: {res.get('mensaje')}"
-                    )
+    @staticmethod
+    def _registrar_resultado_sync(
+        resumen: Dict[str, Any],
+        res: Dict[str, Any],
+        tipo_comprobante_id: int,
+        pto_vta: int,
+        numero: int,
+    ) -> None:
+        factura_id = res.get("factura_id")
+        etiqueta = f"Factura {factura_id} [{tipo_comprobante_id} {str(pto_vta).zfill(4)}-{numero}]"
 
-        return resumen
+        if res.get("no_enviada"):
+            resumen["detalles"].append(f"{etiqueta} NO ENVIADA: {res.get('mensaje')}")
+            return
+
+        resumen["procesadas"] += 1
+
+        if res.get("aprobada"):
+            resumen["aprobadas"] += 1
+            resumen["detalles"].append(f"{etiqueta} APROBADA.")
+        elif res.get("rechazada"):
+            resumen["rechazadas"] += 1
+            resumen["detalles"].append(f"{etiqueta} RECHAZADA: {res.get('mensaje')}")
+        else:
+            resumen["error_comunicacion"] += 1
+            resumen["detalles"].append(f"{etiqueta} ERROR COMUNICACIÓN: {res.get('mensaje')}")
 
     def consultar_comprobante_arca(
         self,
@@ -701,12 +944,7 @@ class FacturasService:
         }
 
     def get_codigo_tipo(self, tipo_id: int) -> Optional[str]:
-        db = SessionLocal()
-        try:
-            repo = self._repo(db)
-            return repo.get_codigo_tipo_comprobante(tipo_id)
-        finally:
-            db.close()
+        return self._catalogos.get_tipos_comprobante_catalogo().codigo(tipo_id)
 
     # -------------------- Método viejo (no se toca) --------------------
 
@@ -932,8 +1170,32 @@ class FacturasService:
     # Etapa 5: delegaciones temporales hacia FacturaNumberingService.
     # Los bloques antiguos quedan arriba hasta completar limpieza segura.
     # ------------------------------------------------------------------
-    def autorizar_en_arca(self, factura_id: int) -> Dict[str, Any]:
-        return self._arca_authorization.autorizar_factura(factura_id)
+    def autorizar_en_arca(self, factura_id: int, diferir_error_comunicacion: bool = False) -> Dict[str, Any]:
+        return self._arca_authorization.autorizar_factura(
+            factura_id, diferir_error_comunicacion=diferir_error_comunicacion
+        )
+
+    # -------------------- Cola de autorizaciones (arca_outbox) --------------------
+
+    def outbox_disponible(self) -> bool:
+        with SessionLocal() as db:
+            return self._outbox._has_outbox(db)
+
+    def procesar_outbox_arca(self, limite: int = 20) -> List[Dict[str, Any]]:
+        return self._outbox.procesar_pendientes(limite)
+
+    def liberar_outbox_huerfanas(self) -> int:
+        return self._outbox.liberar_huerfanas()
+
+    def conciliar_con_arca(
+        self,
+        desde: date,
+        hasta: date,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        reanudar: bool = True,
+    ) -> Dict[str, Any]:
+        """Compara las facturas con CAE del período contra FECompConsultar (ver ArcaConciliacionService)."""
+        return self._conciliacion.conciliar(desde, hasta, progress_callback=progress_callback, reanudar=reanudar)
 
     def generar_nota_credito(self, factura_id: int) -> Dict[str, Any]:
         return self._nota_credito_creator.generar_nota_credito(factura_id)
@@ -288,6 +288,8 @@ class ImportacionCertificadosService:
                     contexto={"importacion": "certificados_avanzada"},
                 )
 
+            if creados:
+                self._catalogos.registrar_cambio(db, "colores")
             db.commit()
             CatalogCache.get().invalidate("colores")
             return {"success": True, "creados": creados, "existentes": existentes}
@@ -636,6 +638,7 @@ class ImportacionCertificadosService:
             return
 
         color_ids: Dict[str, int] = {}
+        creado = False
         for color in selected_missing:
             existing = db.execute(
                 text(
@@ -666,6 +669,10 @@ class ImportacionCertificadosService:
                 datos_nuevos={"nombre": color.upper()},
                 contexto={"importacion": "certificados_avanzada"},
             )
+            creado = True
+
+        if creado:
+            self._catalogos.registrar_cambio(db, "colores")
 
         for row in rows:
             if not row.get("accion") or row.get("accion") == "OMITIR":
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from threading import RLock
+from typing import Any, Callable, Dict, List, Optional
+import time
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.domain_constants import EstadoStock
+from app.core.trigram_index import TrigramIndex, normalizar
+from app.data.database import ReadSessionLocal, SessionLocal
+from app.repositories.clientes_repository import ClientesRepository, es_documento, solo_digitos
+from app.repositories.vehiculos_repository import VehiculosRepository
+
+
+def _como_datetime(v: Any) -> Optional[datetime]:
+    if v is None or isinstance(v, datetime):
+        return v
+    try:
+        return datetime.fromisoformat(str(v))
+    except ValueError:
+        return None
+
+
+def _textos_cliente(r: Dict[str, Any]) -> List[Any]:
+    digitos = solo_digitos(r.get("nro_doc"))
+    # El DNI dentro de un CUIT/CUIL también se busca por prefijo
+    dni = digitos[2:10] if len(digitos) == 11 else ""
+    return [r.get("nombre"), r.get("apellido"), digitos, dni]
+
+
+def _textos_vehiculo(r: Dict[str, Any]) -> List[Any]:
+    textos = [r.get("marca"), r.get("modelo")]
+    for k in ("numero_motor", "numero_cuadro", "nro_certificado", "nro_dnrpa"):
+        v = r.get(k)
+        if v:
+            # Con y sin separadores: "JH125-ABC" se encuentra por "jh125abc" y por "abc"
+            textos += [v, normalizar(v).replace(" ", "")]
+    return textos
+
+
+class IndiceBusqueda:
+    """
+    Índice local (trigramas) de clientes o vehículos para los autocompletar.
+
+    reconstruir() carga la tabla entera; sincronizar() trae sólo las filas
+    con updated_at posterior al watermark (o, sin esa columna, las altas por
+    id). Las búsquedas se responden en memoria, sin ir a la base.
+
+    Las bajas no dejan rastro en updated_at: una fila borrada sigue en el
+    índice hasta la próxima reconstrucción (SEARCH_INDEX_REBUILD). La app no
+    borra clientes ni vehículos; sólo afecta a bajas hechas a mano en la base.
+    """
+
+    # Se relee un poco antes del watermark: cubre transacciones que
+    # confirmaron después de que otra más nueva ya se había leído
+    MARGEN_WATERMARK = timedelta(seconds=60)
+
+    def __init__(
+        self,
+        tabla: str,
+        repo_factory: Callable[[Session], Any],
+        textos: Callable[[Dict[str, Any]], List[Any]],
+        con_watermark: Callable[[Session], bool],
+    ) -> None:
+        self.tabla = tabla
+        self._repo_factory = repo_factory
+        self._textos = textos
+        self._con_watermark = con_watermark
+        self._indice = TrigramIndex()
+        self._watermark: Optional[datetime] = None
+        self._ultimo_id: Optional[int] = None
+        self._construido: Optional[float] = None
+        self._lock = RLock()
+
+    def listo(self) -> bool:
+        return self._construido is not None
+
+    def edad(self) -> Optional[float]:
+        """Segundos desde la última reconstrucción completa."""
+        return None if self._construido is None else time.time() - self._construido
+
+    def __len__(self) -> int:
+        return len(self._indice)
+
+    def buscar(
+        self,
+        q: Any,
+        limit: int = 20,
+        filtro: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> List[Dict[str, Any]]:
+        return self._indice.search(q, limit=limit, filtro=filtro)
+
+    def reconstruir(self) -> int:
+        """Carga la tabla completa en un índice nuevo y lo reemplaza de una vez."""
+        with self._lock:
+            db = ReadSessionLocal()
+            try:
+                con_wm = self._con_watermark(db)
+                rows = self._repo_factory(db).list_para_indice(con_watermark=con_wm)
+            finally:
+                db.close()
+
+            nuevo = TrigramIndex()
+            for r in rows:
+                self._agregar(nuevo, r)
+            self._indice = nuevo
+            self._watermark = self._max_watermark(rows) if con_wm else None
+            self._ultimo_id = max((int(r["id"]) for r in rows), default=0)
+            self._construido = time.time()
+            logger.debug(f"Índice de búsqueda '{self.tabla}': {len(rows)} filas")
+            return len(rows)
+
+    def sincronizar(self) -> int:
+        """
+        Aplica las filas nuevas o modificadas desde el watermark. Devuelve
+        cuántas. Lee de la principal: el delta es chico y recién confirmado,
+        la réplica puede no tenerlo todavía (p. ej. un vehículo recién vendido).
+        """
+        if not self.listo():
+            return self.reconstruir()
+
+        with self._lock:
+            db = SessionLocal()
+            try:
+                con_wm = self._con_watermark(db)
+                repo = self._repo_factory(db)
+                if con_wm and self._watermark is not None:
+                    rows = repo.list_para_indice(
+                        cambiados_desde=self._watermark - self.MARGEN_WATERMARK,
+                        con_watermark=True,
+                    )
+                else:
+                    rows = repo.list_para_indice(id_desde=self._ultimo_id or 0, con_watermark=con_wm)
+            finally:
+                db.close()
+
+            for r in rows:
+                self._agregar(self._indice, r)
+            if rows:
+                if con_wm:
+                    self._watermark = max(filter(None, (self._watermark, self._max_watermark(rows))))
+                self._ultimo_id = max([self._ultimo_id or 0, *(int(r["id"]) for r in rows)])
+            return len(rows)
+
+    # -------------------- Internos --------------------
+
+    def _agregar(self, indice: TrigramIndex, r: Dict[str, Any]) -> None:
+        r = dict(r)
+        r.pop("actualizado", None)
+        indice.upsert(r["id"], self._textos(r), r)
+
+    @staticmethod
+    def _max_watermark(rows: List[Dict[str, Any]]) -> Optional[datetime]:
+        return max(filter(None, (_como_datetime(r.get("actualizado")) for r in rows)), default=None)
+
+
+class SearchIndexService:
+    """
+    Índices de búsqueda locales compartidos por la aplicación (clientes y
+    vehículos). Se construyen en segundo plano al iniciar sesión y el
+    SearchIndexWorker los mantiene al día con deltas.
+    """
+    _instance: "SearchIndexService" = None
+    _lock = RLock()
+
+    # updated_at por tabla (migración 2026_10_17_05); None = sin verificar
+    _updated_at: Dict[str, bool] = {}
+
+    def __init__(self) -> None:
+        self.clientes = IndiceBusqueda(
+            "clientes", ClientesRepository, _textos_cliente,
+            lambda db: self._has_updated_at(db, "clientes"),
+        )
+        self.vehiculos = IndiceBusqueda(
+            "vehiculos", VehiculosRepository, _textos_vehiculo,
+            lambda db: self._has_updated_at(db, "vehiculos"),
+        )
+
+    @classmethod
+    def get(cls) -> "SearchIndexService":
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = SearchIndexService()
+            return cls._instance
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._instance = None
+
+    def indices(self) -> List[IndiceBusqueda]:
+        return [self.clientes, self.vehiculos]
+
+    def run_once(self) -> Dict[str, int]:
+        """Reconstruye los índices vencidos (o sin construir) y sincroniza el resto."""
+        cambios: Dict[str, int] = {}
+        for indice in self.indices():
+            try:
+                edad = indice.edad()
+                if edad is None or (settings.SEARCH_INDEX_REBUILD > 0 and edad >= settings.SEARCH_INDEX_REBUILD):
+                    cambios[indice.tabla] = indice.reconstruir()
+                else:
+                    cambios[indice.tabla] = indice.sincronizar()
+            except Exception as e:
+                logger.warning("Índice de búsqueda '{}': no se pudo actualizar: {}", indice.tabla, e)
+        return cambios
+
+    # -------------------- Búsquedas --------------------
+
+    def buscar_clientes(self, q: str, limit: int = 20) -> Optional[List[Dict[str, Any]]]:
+        """Clientes por nombre o documento; None si el índice todavía no está listo."""
+        if not self.clientes.listo():
+            return None
+        consulta = solo_digitos(q) if es_documento(q) else q
+        return self.clientes.buscar(consulta, limit=limit)
+
+    def buscar_vehiculos(
+        self,
+        q: str,
+        limit: int = 20,
+        solo_disponibles: bool = False,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Vehículos por marca, modelo, motor o cuadro; None si el índice no está listo."""
+        if not self.vehiculos.listo():
+            return None
+        filtro = (lambda v: v.get("estado_stock_id") == EstadoStock.DISPONIBLE) if solo_disponibles else None
+        return self.vehiculos.buscar(q, limit=limit, filtro=filtro)
+
+    # -------------------- Esquema --------------------
+
+    def _has_updated_at(self, db: Session, tabla: str) -> bool:
+        if tabla in SearchIndexService._updated_at:
+            return SearchIndexService._updated_at[tabla]
+
+        try:
+            exists = db.execute(
+                text(
+                    """
+                    SELECT 1
+                    FROM information_schema.columns
+                    WHERE table_schema = :schema
+                      AND table_name = :tabla
+                      AND column_name = 'updated_at'
+                    LIMIT 1
+                    """
+                ),
+                {"schema": settings.DB_NAME, "tabla": tabla},
+            ).first()
+        except Exception as e:
+            logger.debug("No se pudo verificar {}.updated_at: {}", tabla, e)
+            return False
+
+        SearchIndexService._updated_at[tabla] = bool(exists)
+        return SearchIndexService._updated_at[tabla]
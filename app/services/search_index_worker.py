@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, Optional
+from weakref import WeakSet
+
+import threading
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.count_cache import tabla_escrita
+
+# Tablas con índice de búsqueda local: escribir en ellas adelanta la sincronización
+TABLAS_INDEXADAS = ("clientes", "vehiculos")
+
+
+class SearchIndexWorker:
+    """
+    Hilo daemon que construye y mantiene los índices de búsqueda locales.
+
+    La primera pasada (al iniciar sesión) construye los índices completos;
+    después, cada `poll_seconds`, aplica sólo las filas cambiadas desde el
+    watermark. wake() adelanta la próxima pasada (altas/ediciones propias).
+    """
+
+    def __init__(
+        self,
+        actualizar: Callable[[], Dict[str, int]],
+        *,
+        poll_seconds: float = 20.0,
+    ) -> None:
+        self._actualizar = actualizar
+        self._poll = max(float(poll_seconds), 1.0)
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # -------- API --------
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="search-index", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def run_once(self) -> Dict[str, int]:
+        try:
+            return self._actualizar()
+        except Exception as e:
+            logger.warning("Índices de búsqueda: no se pudieron actualizar: {}", e)
+            return {}
+
+    # -------- Internos --------
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.run_once()
+            self._wake.wait(self._poll)
+            self._wake.clear()
+
+
+_worker: Optional[SearchIndexWorker] = None
+_worker_lock = threading.Lock()
+
+
+def start_search_index_worker() -> Optional[SearchIndexWorker]:
+    """Arranca (una sola vez por proceso) el worker de los índices de búsqueda."""
+    global _worker
+    if settings.SEARCH_INDEX_POLL <= 0:
+        return None
+    from app.data.database import engine  # lazy import
+
+    with _worker_lock:
+        if _worker is None:
+            from app.services.search_index_service import SearchIndexService  # lazy import
+
+            _worker = SearchIndexWorker(
+                SearchIndexService.get().run_once,
+                poll_seconds=settings.SEARCH_INDEX_POLL,
+            )
+        _worker.start()
+    wake_on_commit(engine)
+    return _worker
+
+
+def wake_search_index_worker() -> None:
+    """Pide una sincronización ya (después de un alta o edición local)."""
+    with _worker_lock:
+        worker = _worker
+    if worker:
+        worker.wake()
+
+
+_engines: "WeakSet[Engine]" = WeakSet()
+
+
+def wake_on_commit(engine: Engine) -> None:
+    """
+    Despierta el worker cuando se confirma una escritura en clientes o
+    vehiculos hecha por `engine`, venga de donde venga (ABM, facturación,
+    remitos, notas de crédito, importaciones). Es al confirmar y no al
+    escribir: antes del commit la sincronización todavía no vería el cambio.
+    """
+    with _worker_lock:
+        if engine in _engines:
+            return
+        _engines.add(engine)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+    event.listen(engine, "commit", _on_commit)
+    event.listen(engine, "rollback", _on_rollback)
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if tabla_escrita(statement) in TABLAS_INDEXADAS:
+        conn.info["_search_index_sucio"] = True
+
+
+def _on_commit(conn) -> None:
+    if conn.info.pop("_search_index_sucio", False):
+        wake_search_index_worker()
+
+
+def _on_rollback(conn) -> None:
+    conn.info.pop("_search_index_sucio", None)
+
+
+def stop_search_index_worker() -> None:
+    global _worker
+    with _worker_lock:
+        worker, _worker = _worker, None
+    if worker:
+        worker.stop(timeout=2.0)
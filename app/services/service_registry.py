@@ -0,0 +1,80 @@
+from __future__ import annotations
+from threading import RLock
+from typing import Any, Callable, Dict, Optional, Type, TypeVar, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.services.catalogos_service import CatalogosService
+    from app.services.comprobantes_service import ComprobantesService
+    from app.services.facturas_service import FacturasService
+
+T = TypeVar("T")
+
+
+class ServiceRegistry:
+    """
+    Registro de servicios compartidos a nivel aplicación.
+    - Cada servicio se crea la primera vez que se pide (lazy) y después se
+      reutiliza: páginas, PDFs y workers comparten la misma instancia
+    - Thread-safe (lock): dos hilos que piden el mismo servicio a la vez
+      obtienen el mismo objeto
+    - reset() descarta instancias (tests, cambio de base)
+    """
+    _instance: "ServiceRegistry" = None
+    _lock = RLock()
+
+    def __init__(self):
+        self._servicios: Dict[type, Any] = {}
+
+    @classmethod
+    def get(cls) -> "ServiceRegistry":
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = ServiceRegistry()
+            return cls._instance
+
+    def obtener(self, cls: Type[T], factory: Optional[Callable[[], T]] = None) -> T:
+        """Instancia compartida de `cls`; se crea con `factory` (o `cls()`) si todavía no existe."""
+        with self._lock:
+            svc = self._servicios.get(cls)
+            if svc is None:
+                svc = (factory or cls)()
+                self._servicios[cls] = svc
+            return svc
+
+    def registrar(self, cls: type, instancia: Any) -> None:
+        """Reemplaza la instancia compartida de `cls` (p. ej. con una ya configurada)."""
+        with self._lock:
+            self._servicios[cls] = instancia
+
+    def creados(self) -> list[type]:
+        with self._lock:
+            return list(self._servicios)
+
+    def reset(self, *clases: type) -> None:
+        with self._lock:
+            if not clases:
+                self._servicios.clear()
+            else:
+                for c in clases:
+                    self._servicios.pop(c, None)
+
+    # -------------------- Atajos --------------------
+
+    def facturas(self) -> "FacturasService":
+        from app.services.facturas_service import FacturasService  # lazy import
+
+        return self.obtener(FacturasService)
+
+    def catalogos(self) -> "CatalogosService":
+        from app.services.catalogos_service import CatalogosService  # lazy import
+
+        return self.obtener(CatalogosService)
+
+    def comprobantes(self) -> "ComprobantesService":
+        from app.services.comprobantes_service import ComprobantesService  # lazy import
+
+        return self.obtener(ComprobantesService)
+
+
+def servicios() -> ServiceRegistry:
+    return ServiceRegistry.get()
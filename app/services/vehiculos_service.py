@@ -4,11 +4,15 @@ from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
-from app.data.database import SessionLocal
+from app.core.config import settings
+from app.core.count_cache import CountCache
+from app.data.database import ReadSessionLocal, SessionLocal
+from app.repositories.statements import SeekPage
 from app.repositories.vehiculos_repository import VehiculosRepository
 from app.services.catalogos_service import CatalogosService
+from app.services.search_index_service import SearchIndexService
 from app.services.stock_service import StockService
-from app.core.domain_constants import TipoMovimientoStock
+from app.core.domain_constants import EstadoStock, TipoMovimientoStock
 
 
 class VehiculosService:
@@ -59,7 +63,8 @@ class VehiculosService:
         la compatibilidad del repositorio (detecta dict y mapea automáticamente),
         evitando olvidar campos nuevos en el futuro.
         """
-        db = SessionLocal()
+        # Listado: puede leerse de la réplica
+        db = ReadSessionLocal()
         try:
             repo = self._repo(db)
             # Pasamos 'filtros' directamente (el repo soporta dict como primer arg)
@@ -68,6 +73,58 @@ class VehiculosService:
         finally:
             db.close()
 
+    def search_seek(
+        self,
+        filtros: Dict[str, Any],
+        cursor: Optional[Dict[str, Any]] = None,
+        atras: bool = False,
+        page_size: int = 25,
+    ) -> Tuple[SeekPage, int]:
+        """
+        Página por clave (ver VehiculosRepository.search_seek) y total de la
+        búsqueda, cacheado en CountCache en vez de contarlo en cada página.
+        """
+        db = ReadSessionLocal()
+        try:
+            pagina = self._repo(db).search_seek(filtros, cursor=cursor, atras=atras, page_size=page_size)
+        finally:
+            db.close()
+
+        total = CountCache.get().total(
+            CountCache.clave("vehiculos", filtros),
+            lambda: self._contar(filtros),
+            ttl=settings.LIST_COUNT_TTL,
+            # Primera página: ver lo que hayan grabado otras PCs
+            refrescar=cursor is None,
+        )
+        return pagina, total
+
+    def buscar(self, q: str, limit: int = 20, solo_disponibles: bool = False) -> List[Dict[str, Any]]:
+        """
+        Sugerencias para los selectores de vehículo (marca, modelo, motor,
+        cuadro...). Se responde desde el índice local (SearchIndexService) y
+        sólo va a la base si todavía no está listo.
+        """
+        rows = SearchIndexService.get().buscar_vehiculos(q, limit=limit, solo_disponibles=solo_disponibles)
+        if rows is not None:
+            return rows
+
+        filtros: Dict[str, Any] = {"q": q}
+        if solo_disponibles:
+            filtros["estado_stock_id"] = EstadoStock.DISPONIBLE
+        db = ReadSessionLocal()
+        try:
+            return self._repo(db).search_seek(filtros, page_size=limit).rows
+        finally:
+            db.close()
+
+    def _contar(self, filtros: Dict[str, Any]) -> int:
+        db = ReadSessionLocal()
+        try:
+            return self._repo(db).count(filtros)
+        finally:
+            db.close()
+
     def get(self, vehiculo_id: int) -> Optional[Dict[str, Any]]:
         db = SessionLocal()
         try:
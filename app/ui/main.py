@@ -7,6 +7,7 @@ from typing import Optional, Dict, Any
 from PySide6.QtCore import QSettings, QObject
 from PySide6.QtWidgets import QDialog
 from PySide6.QtGui import QIcon
+from loguru import logger
 
 from app.core.logging_setup import setup_logging
 from app.core.config import settings
@@ -30,6 +31,11 @@ class ApplicationController(QObject):
         self._app = app
         self._main_window = None
         self._current_user: Optional[Dict[str, Any]] = None
+        self._ta_renewer_started = False
+        self._outbox_worker_started = False
+        self._profiler_dump_connected = False
+        self._catalog_poller_started = False
+        self._search_index_started = False
 
     def start(self) -> None:
         ok = db_config_completa()
@@ -73,6 +79,79 @@ class ApplicationController(QObject):
             on_logout=self._handle_logout
         )
         self._main_window.show()
+        self._start_arca_ticket_renewer()
+        self._start_arca_outbox_worker()
+        self._start_catalog_poller()
+        self._start_search_index_worker()
+        self._connect_sql_profiler_dump()
+
+    def _connect_sql_profiler_dump(self) -> None:
+        # Al cerrar se guarda el perfil de consultas de la sesión en logs/
+        if self._profiler_dump_connected or not settings.DB_PROFILER:
+            return
+        from app.data.query_profiler import QueryProfiler  # lazy import
+
+        def dump() -> None:
+            try:
+                QueryProfiler.get().dump_jsonl()
+            except Exception as e:
+                logger.warning("No se pudo guardar el perfil SQL: {}", e)
+
+        self._app.aboutToQuit.connect(dump)
+        self._profiler_dump_connected = True
+
+    def _start_arca_outbox_worker(self) -> None:
+        # Las facturas nuevas se autorizan en segundo plano desde arca_outbox
+        try:
+            from app.services.arca_outbox_worker import start_outbox_worker, stop_outbox_worker  # lazy import
+
+            worker = start_outbox_worker()
+            if not self._outbox_worker_started:
+                self._app.aboutToQuit.connect(stop_outbox_worker)
+                self._outbox_worker_started = True
+            self._main_window.attach_outbox_worker(worker)
+        except Exception as e:
+            logger.warning("No se pudo iniciar la cola de autorizaciones ARCA: {}", e)
+
+    def _start_arca_ticket_renewer(self) -> None:
+        # El TA se renueva en segundo plano apenas vence, así la primera factura
+        # posterior al vencimiento no espera a loginCms
+        if self._ta_renewer_started:
+            return
+        try:
+            from app.integrations.arca.wsaa_client import start_ticket_renewer, stop_ticket_renewer  # lazy import
+
+            start_ticket_renewer()
+            self._app.aboutToQuit.connect(stop_ticket_renewer)
+            self._ta_renewer_started = True
+        except Exception as e:
+            logger.warning("No se pudo iniciar la renovación del TA de ARCA: {}", e)
+
+    def _start_catalog_poller(self) -> None:
+        # Catálogos frescos entre terminales sin recargar todo
+        if self._catalog_poller_started:
+            return
+        try:
+            from app.services.catalog_version_poller import start_catalog_poller, stop_catalog_poller  # lazy import
+
+            start_catalog_poller()
+            self._app.aboutToQuit.connect(stop_catalog_poller)
+            self._catalog_poller_started = True
+        except Exception as e:
+            logger.warning("No se pudo iniciar el poller de catálogos: {}", e)
+
+    def _start_search_index_worker(self) -> None:
+        # Autocompletar de clientes/vehículos desde un índice local
+        if self._search_index_started:
+            return
+        try:
+            from app.services.search_index_worker import start_search_index_worker, stop_search_index_worker  # lazy import
+
+            start_search_index_worker()
+            self._app.aboutToQuit.connect(stop_search_index_worker)
+            self._search_index_started = True
+        except Exception as e:
+            logger.warning("No se pudo iniciar el índice de búsqueda local: {}", e)
 
     def _handle_logout(self) -> None:
         if self._main_window:
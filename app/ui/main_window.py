@@ -167,6 +167,7 @@ except Exception:
 # ==== Warmup de catálogos ====
 from app.services.catalogos_service import CatalogosService
 from app.core.catalog_cache import CatalogCache
+from app.core.domain_constants import EstadoFactura
 from app.core.permissions import (
     PERM_VER_CONFIGURACION,
     PERM_VER_FACTURACION,
@@ -200,6 +201,10 @@ class _WarmupTask(QRunnable):
                 pass
 
 
+class _OutboxSignals(QObject):
+    resultado = Signal(dict)
+
+
 class MainWindow(QMainWindow):
     """
     Ventana principal con Sidebar + QStackedWidget.
@@ -968,6 +973,37 @@ class MainWindow(QMainWindow):
             # IMPORTANTE: no romper el arranque por un error de update
             print("Error chequeando actualizaciones:", e)
 
+    # ---------------------------------------------------------------------
+    # Autorizaciones ARCA en segundo plano
+    # ---------------------------------------------------------------------
+    def attach_outbox_worker(self, worker):
+        """Muestra en esta ventana los resultados del worker de arca_outbox."""
+        self._outbox_signals = _OutboxSignals()
+        self._outbox_signals.resultado.connect(self._on_outbox_resultado)
+
+        def _listener(resultado: dict):
+            # Corre en el hilo del worker: cruzar a la UI con la Signal
+            try:
+                self._outbox_signals.resultado.emit(resultado)
+            except RuntimeError:
+                pass
+
+        worker.add_listener(_listener)
+        self.destroyed.connect(lambda *_: worker.remove_listener(_listener))
+
+    def _on_outbox_resultado(self, resultado: dict):
+        factura_id = resultado.get("factura_id")
+        if resultado.get("aprobada"):
+            self.notify(f"Factura {factura_id} autorizada en ARCA. CAE {resultado.get('cae') or ''}", "success")
+        elif resultado.get("rechazada"):
+            self.notify(f"Factura {factura_id} rechazada por ARCA: {resultado.get('mensaje') or ''}", "error")
+        elif resultado.get("outbox_estado") == "FALLIDA":
+            if resultado.get("estado_id") == EstadoFactura.ERROR_COMUNICACION:
+                detalle = "Quedó con error de comunicación; sincronizá más tarde."
+            else:
+                detalle = f"Quedó sin autorizar: {resultado.get('mensaje') or ''}"
+            self.notify(f"No se pudo autorizar la factura {factura_id} en ARCA. {detalle}", "warning")
+
     # ---------------------------------------------------------------------
     # Toast & Notify
     # ---------------------------------------------------------------------
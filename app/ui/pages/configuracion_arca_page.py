@@ -7,7 +7,7 @@ from PySide6.QtWidgets import (
     QHBoxLayout, QListView, QSizePolicy, QFrame, QMainWindow, QLineEdit
 )
 import app.ui.app_message as popUp
-from app.services.facturas_service import FacturasService
+from app.services.service_registry import ServiceRegistry
 from app.ui.widgets.loading_overlay import LoadingOverlay
 from app.ui.utils.loading_decorator import with_loading
 
@@ -28,7 +28,7 @@ class ConfiguracionArcaPage(QWidget):
         self.setObjectName("ConfiguracionArcaPage")
         self.main_window = main_window
 
-        self.service = FacturasService()
+        self.service = ServiceRegistry.get().facturas()
 
         root = QVBoxLayout(self)
         root.setContentsMargins(28, 24, 28, 28)
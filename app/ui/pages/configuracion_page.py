@@ -136,11 +136,21 @@ class ConfiguracionPage(QWidget):
         )
         card_updates.clicked_card.connect(self._check_updates)
 
+        # Card: Diagnóstico de consultas SQL
+        card_diagnostico = OptionCard(
+            "Diagnóstico SQL",
+            icon=QIcon.fromTheme("utilities-system-monitor"),
+            emoji="🩺",
+            icon_size= icon_sizes
+        )
+        card_diagnostico.clicked_card.connect(self._open_diagnostico_sql)
+
         grid.addWidget(card_users, 0, 0)
         grid.addWidget(card_general, 0, 1)
         grid.addWidget(card_updates, 0, 2)
         grid.addWidget(card_arca, 1, 0)
         grid.addWidget(card_importacion, 1, 1)
+        grid.addWidget(card_diagnostico, 1, 2)
         
         for col in range(4):
             grid.setColumnStretch(col, 1)
@@ -215,6 +225,18 @@ class ConfiguracionPage(QWidget):
             return
         self.open_page_requested.emit(page)
 
+    def _open_diagnostico_sql(self):
+        try:
+            from app.ui.pages.diagnostico_sql_page import DiagnosticoSqlPage
+            page = DiagnosticoSqlPage(parent=self, main_window=self.main_window)
+        except Exception as e:
+            popUp.toast(self, f"No pude abrir Diagnóstico SQL.\n\n{e}")
+            return
+
+        if self._try_navigate_in_main(page, object_name="DiagnosticoSqlPage"):
+            return
+        self.open_page_requested.emit(page)
+
     def _try_navigate_in_main(self, page: QWidget, object_name: str) -> bool:
         if not self.main_window:
             return False
@@ -0,0 +1,157 @@
+from __future__ import annotations
+from typing import Optional
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout, QTableWidget,
+    QTableWidgetItem, QHeaderView, QAbstractItemView, QMainWindow,
+)
+import app.ui.app_message as popUp
+from app.core.config import settings
+from app.data.pool_monitor import PoolHealthMonitor
+from app.data.query_profiler import QueryProfiler
+from app.ui.utils.table_utils import setup_compact_table
+
+
+class DiagnosticoSqlPage(QWidget):
+    """
+    Pantalla de diagnóstico de consultas SQL.
+
+    Muestra lo que acumuló QueryProfiler en esta sesión, ordenado por tiempo
+    total: sirve para ver qué consultas pesan en el puesto real.
+    """
+
+    COLUMNAS = [
+        ("sql", "Sentencia"),
+        ("count", "Llamadas"),
+        ("p50_ms", "p50 (ms)"),
+        ("p95_ms", "p95 (ms)"),
+        ("max_ms", "Máx (ms)"),
+        ("total_ms", "Total (ms)"),
+        ("rows", "Filas"),
+        ("llamador", "Llamado desde"),
+    ]
+
+    def __init__(self, parent=None, main_window: Optional[QMainWindow] = None) -> None:
+        super().__init__(parent)
+        self.setObjectName("DiagnosticoSqlPage")
+        self.main_window = main_window
+        self._profiler = QueryProfiler.get()
+
+        root = QVBoxLayout(self)
+        root.setContentsMargins(28, 24, 28, 28)
+        root.setSpacing(14)
+
+        title = QLabel("Diagnóstico SQL")
+        title.setObjectName("CfgH1")
+        subtitle = QLabel(
+            "Consultas ejecutadas desde que se abrió la aplicación, agrupadas por sentencia.\n"
+            "Al cerrar, el resumen se guarda en la carpeta logs (sql_profile_*.jsonl)."
+        )
+        subtitle.setObjectName("CfgMuted")
+        root.addWidget(title)
+        root.addWidget(subtitle)
+
+        if not settings.DB_PROFILER:
+            aviso = QLabel("El perfil de consultas está desactivado (db.profiler = false en config.json).")
+            aviso.setObjectName("CfgMuted")
+            root.addWidget(aviso)
+
+        # --- Acciones ---
+        btn_row = QHBoxLayout()
+        btn_row.setSpacing(10)
+        self.btn_actualizar = QPushButton("Actualizar")
+        self.btn_actualizar.clicked.connect(self.reload)
+        self.btn_reiniciar = QPushButton("Reiniciar contadores")
+        self.btn_reiniciar.clicked.connect(self.on_reiniciar)
+        self.btn_guardar = QPushButton("Guardar JSONL")
+        self.btn_guardar.clicked.connect(self.on_guardar)
+        self.lbl_resumen = QLabel("")
+        self.lbl_resumen.setObjectName("CfgMuted")
+
+        btn_row.addWidget(self.btn_actualizar)
+        btn_row.addWidget(self.btn_reiniciar)
+        btn_row.addWidget(self.btn_guardar)
+        btn_row.addStretch(1)
+        btn_row.addWidget(self.lbl_resumen)
+        root.addLayout(btn_row)
+
+        self.lbl_pool = QLabel("")
+        self.lbl_pool.setObjectName("CfgMuted")
+        root.addWidget(self.lbl_pool)
+
+        # --- Tabla ---
+        self.table = QTableWidget(0, len(self.COLUMNAS))
+        self.table.setHorizontalHeaderLabels([titulo for _key, titulo in self.COLUMNAS])
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        setup_compact_table(self.table)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Stretch)
+        for col in range(1, len(self.COLUMNAS)):
+            header.setSectionResizeMode(col, QHeaderView.ResizeToContents)
+        root.addWidget(self.table, 1)
+
+        self.setStyleSheet("""
+        QLabel#CfgH1 { font-size: 1.9em; font-weight: 800; color: #0F172A; margin-bottom: 2px; }
+        QLabel#CfgMuted { color: #6B7280; margin-bottom: 8px; }
+        """)
+
+        self.reload()
+
+    # --------- Acciones ----------
+    def reload(self):
+        filas = self._profiler.snapshot()
+        self.table.setRowCount(len(filas))
+
+        for row, fila in enumerate(filas):
+            llamadores = fila.get("llamadores") or []
+            valores = dict(fila)
+            valores["llamador"] = llamadores[0]["metodo"] if llamadores else ""
+
+            for col, (key, _titulo) in enumerate(self.COLUMNAS):
+                valor = valores.get(key, "")
+                item = QTableWidgetItem()
+                if isinstance(valor, (int, float)):
+                    item.setData(Qt.DisplayRole, valor)
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                else:
+                    item.setText(str(valor))
+                if key == "sql":
+                    item.setToolTip(str(valor))
+                elif key == "llamador" and llamadores:
+                    item.setToolTip("\n".join(f"{l['metodo']} ({l['count']})" for l in llamadores))
+                self.table.setItem(row, col, item)
+
+        total_ms = sum(f["total_ms"] for f in filas)
+        llamadas = sum(f["count"] for f in filas)
+        self.lbl_resumen.setText(f"{len(filas)} sentencias · {llamadas} llamadas · {total_ms / 1000:.2f} s en base")
+        self._reload_pool()
+
+    def _reload_pool(self):
+        pool = PoolHealthMonitor.get().stats()
+        if not pool.get("activo"):
+            self.lbl_pool.setText("Pool: monitor de conexiones desactivado (se usa ping en cada checkout).")
+            return
+        self.lbl_pool.setText(
+            f"Pool: {pool.get('checkedout', 0)} en uso · {pool.get('checkedin', 0)} libres"
+            f" (tamaño {pool.get('size', '?')}, overflow {pool.get('overflow', 0)}) · "
+            f"{pool['pings']} pings en {pool['revisiones']} revisiones · "
+            f"{pool['expulsadas'] + pool['reemplazadas_checkout']} conexiones caídas descartadas · "
+            f"{pool['reintentos']} reintentos"
+        )
+
+    def on_reiniciar(self):
+        self._profiler.reset()
+        self.reload()
+
+    def on_guardar(self):
+        try:
+            path = self._profiler.dump_jsonl()
+        except Exception as e:
+            popUp.toast(self, f"No se pudo guardar el perfil SQL.\n\n{e}")
+            return
+        if path is None:
+            popUp.toast(self, "Todavía no hay consultas registradas.")
+            return
+        popUp.info(self, "Diagnóstico SQL", f"Perfil guardado en:\n{path}")
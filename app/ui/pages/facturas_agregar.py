@@ -9,7 +9,8 @@ from PySide6.QtWidgets import (
     QMainWindow
 )
 import app.ui.app_message as popUp
-from app.services.facturas_service import FacturasService
+from app.services.service_registry import ServiceRegistry
+from app.services.arca_outbox_worker import get_outbox_worker
 from app.services.clientes_service import ClientesService
 from app.services.vehiculos_service import VehiculosService
 from app.domain.facturas_validaciones import validar_factura
@@ -115,7 +116,7 @@ class FacturasAgregarPage(QWidget):
         super().__init__(parent)
         self.setObjectName("FacturasAgregarPage")
 
-        self._svc_facturas = FacturasService()
+        self._svc_facturas = ServiceRegistry.get().facturas()
         self._svc_clientes = ClientesService()
         self._svc_vehiculos = VehiculosService()
 
@@ -1225,15 +1226,27 @@ class FacturasAgregarPage(QWidget):
                 popUp.toast(self, msg, kind="warning")
                 return
 
-            new_id = self._svc_facturas.create_factura_completa(cabecera, items)
+            # Con el worker corriendo, el CAE se pide en segundo plano y el
+            # mostrador no espera a AFIP; si no, se autoriza acá como antes.
+            worker = get_outbox_worker()
+            en_cola = worker is not None and self._svc_facturas.outbox_disponible()
 
-            # 🔥 ACÁ recién autorizás
-            autorizar = getattr(self._svc_facturas, "autorizar_en_arca", None)
-            if callable(autorizar):
-                autorizar(new_id)
+            new_id = self._svc_facturas.create_factura_completa(
+                cabecera, items, encolar_autorizacion=en_cola
+            )
+
+            if en_cola:
+                worker.notify()
+                mensaje = "Factura guardada. Se autoriza en ARCA en segundo plano."
+            else:
+                # 🔥 ACÁ recién autorizás
+                autorizar = getattr(self._svc_facturas, "autorizar_en_arca", None)
+                if callable(autorizar):
+                    autorizar(new_id)
+                mensaje = "Factura procesada correctamente."
 
             self._dirty = False
-            popUp.toast(self, "Factura procesada correctamente.", kind="success")
+            popUp.toast(self, mensaje, kind="success")
 
             if abrir_detalle:
                 self.go_to_detalle.emit(new_id)
@@ -15,11 +15,10 @@ from sqlalchemy import text as sql_text
 
 from app.domain.facturas_validaciones import validar_factura
 from app.ui.utils.table_utils import setup_compact_table
-from app.data.database import SessionLocal
-from app.services.facturas_service import FacturasService
+from app.data.database import SessionLocal, unit_of_work
+from app.services.service_registry import ServiceRegistry
 from app.services.clientes_service import ClientesService
 from app.services.vehiculos_service import VehiculosService
-from app.services.comprobantes_service import ComprobantesService
 from PySide6.QtGui import QColor
 from app.services.catalogos_service import CatalogosService
 from PySide6.QtWidgets import QListView, QAbstractItemView
@@ -246,14 +245,8 @@ class VehiculoSelectorCombo(QComboBox):
             self._popup.hide()
             return
 
-        filtros = {
-            "q": text,
-            "page": 1,
-            "page_size": 20,
-        }
-
         try:
-            rows, _ = self._svc.search(filtros, page=1, page_size=20)
+            rows = self._svc.buscar(text, limit=20)
         except Exception as ex:
             popUp.toast(self, f"Error al buscar vehículos: {ex}", kind="error")
             rows = []
@@ -346,10 +339,10 @@ class FacturasConsultarPage(QWidget):
         self.setObjectName("FacturasConsultarPage")
         self._catalogos = CatalogosService()
         self._factura_id = int(factura_id)
-        self._svc_facturas = FacturasService()
+        self._svc_facturas = ServiceRegistry.get().facturas()
         self._svc_clientes = ClientesService()
         self._svc_vehiculos = VehiculosService()
-        self._svc_comprobantes = ComprobantesService()
+        self._svc_comprobantes = ServiceRegistry.get().comprobantes()
         self._main_window = main_window
         self._return_to = return_to
         self._cliente_id = cliente_id
@@ -1152,8 +1145,8 @@ class FacturasConsultarPage(QWidget):
     # ---------------- Carga de datos ----------------
 
     def _load_data(self) -> None:
-        db = SessionLocal()
-        try:
+        # Una sola conexión y una foto consistente para toda la pantalla
+        with unit_of_work() as db:
             factura = self._svc_facturas.get(self._factura_id)
             if not factura:
                 popUp.toast(
@@ -1432,8 +1425,6 @@ class FacturasConsultarPage(QWidget):
             # NC button (visible/enabled/tooltip) según estado real
             self._update_nc_button_state()
 
-        finally:
-            db.close()
 
     # ---------------- Detalle (tabla) ----------------
 
@@ -1644,7 +1635,7 @@ class FacturasConsultarPage(QWidget):
         if len(textq) < 3:
             return
         try:
-            rows, _ = self._svc_clientes.search({"q": textq}, page=1, page_size=20)
+            rows = self._svc_clientes.buscar(textq, limit=20)
         except Exception:
             rows = []
 
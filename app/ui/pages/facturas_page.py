@@ -1,7 +1,7 @@
 from __future__ import annotations
 from typing import Any, Dict, List, Optional
 import app.ui.app_message as popUp
-from PySide6.QtCore import Qt, Signal, QSettings, QDate
+from PySide6.QtCore import Qt, Signal, QSettings, QDate, QObject, QRunnable, QThreadPool
 from PySide6.QtGui import QAction
 from PySide6.QtWidgets import (
     QWidget, QGridLayout, QLineEdit, QSizePolicy, QComboBox, QPushButton, QTableWidget,
@@ -13,10 +13,49 @@ from pathlib import Path
 from app.ui.utils.table_utils import setup_compact_table
 from PySide6.QtWidgets import QApplication
 ASSETS_DIR = Path(__file__).resolve().parents[2] / "assets"
+from app.repositories.statements import SeekPage
 from app.services.facturas_service import FacturasService
+from app.services.service_registry import ServiceRegistry
 from app.ui.utils.loading_decorator import with_loading
 
 
+class _SyncArcaSignals(QObject):
+    progress = Signal(int, int, str)
+    done = Signal(dict)
+    error = Signal(str)
+
+
+class _SyncArcaTask(QRunnable):
+    def __init__(self, service: FacturasService):
+        super().__init__()
+        self._service = service
+        self.signals = _SyncArcaSignals()
+
+    def _emit_progress(self, hechas: int, total: int, mensaje: str):
+        try:
+            self.signals.progress.emit(hechas, total, mensaje)
+        except RuntimeError:
+            pass
+
+    def run(self):
+        try:
+            resumen = self._service.sincronizar_borradores_con_arca(
+                en_lote=True,
+                progress_callback=self._emit_progress,
+            )
+            try:
+                self.signals.done.emit(resumen)
+            except RuntimeError:
+                pass
+        except Exception as e:
+            from loguru import logger
+            logger.exception("Error en sincronizar_borradores_con_arca")
+            try:
+                self.signals.error.emit(str(e))
+            except RuntimeError:
+                pass
+
+
 class FacturasPage(QWidget):
     open_detail = Signal(int)
     # Nueva signal para abrir la pantalla de alta de factura
@@ -46,7 +85,8 @@ class FacturasPage(QWidget):
         self.main_window: Optional[QMainWindow] = main_window
         self._already_shown_once = False
 
-        self.service = FacturasService()
+        self.service = ServiceRegistry.get().facturas()
+        self._sync_task: Optional[_SyncArcaTask] = None
         self.settings = QSettings("Gussoni", "SistemaFacturacion")
 
         # ---- Filtros ----
@@ -174,9 +214,12 @@ class FacturasPage(QWidget):
         if total_header_item:
             total_header_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
 
-        # ---- Paginación ----
+        # ---- Paginación (por clave: el cursor es la primera/última fila mostrada) ----
         self.page = 1
         self.total = 0
+        self._seek: Optional[SeekPage] = None
+        self._cursor: Optional[Dict[str, Any]] = None
+        self._atras = False
         self.page_size = int(self.settings.value(self.SETTINGS_PAGE_SIZE, 25))
         self.cmb_page_size = QComboBox()
         self.cmb_page_size.setObjectName("BtnGhost")
@@ -367,14 +410,21 @@ class FacturasPage(QWidget):
     def reload(self, reset_page: bool = False):
         if reset_page:
             self.page = 1
+            self._cursor, self._atras = None, False
         filtros = self.gather_filters()
-        rows, total = self.service.search(filtros, page=self.page, page_size=self.page_size)
+        pagina, total = self.service.search_seek(
+            filtros, cursor=self._cursor, atras=self._atras, page_size=self.page_size
+        )
+        self._seek = pagina
+        if not pagina.hay_anterior:
+            self.page = 1
         self.total = total
-        self.populate_table(rows)
-        pages = max((total + self.page_size - 1) // self.page_size, 1)
+        self.populate_table(pagina.rows)
+        # El total puede venir de caché: la página actual nunca queda fuera de rango
+        pages = max((total + self.page_size - 1) // self.page_size, self.page, 1)
         self.lbl_pages.setText(f"Página {self.page}/{pages}")
-        self.btn_prev.setEnabled(self.page > 1)
-        self.btn_next.setEnabled(self.page < pages)
+        self.btn_prev.setEnabled(pagina.hay_anterior)
+        self.btn_next.setEnabled(pagina.hay_siguiente)
 
     def populate_table(self, rows: List[Dict[str, Any]]):
         was_sorting = self.table.isSortingEnabled()
@@ -555,19 +605,49 @@ class FacturasPage(QWidget):
         except Exception:
             pass
 
-    @with_loading("Sincronizando con ARCA...")
     def on_sync_arca_clicked(self):
-        try:
-            resumen = self.service.sincronizar_borradores_con_arca()
-        except Exception as e:
-            from loguru import logger
-            logger.exception("Error en sincronizar_borradores_con_arca")
-            popUp.toast(
-                self,
-                "Ocurrió un error al sincronizar con ARCA. Por favor reintentá.",
-            )
+        if self._sync_task is not None:
             return
 
+        self.btn_sync_arca.setEnabled(False)
+        self._set_sync_overlay("Sincronizando con ARCA...", visible=True)
+
+        task = _SyncArcaTask(self.service)
+        task.signals.progress.connect(self._on_sync_arca_progress)
+        task.signals.done.connect(self._on_sync_arca_done)
+        task.signals.error.connect(self._on_sync_arca_error)
+        self._sync_task = task
+        QThreadPool.globalInstance().start(task)
+
+    def _set_sync_overlay(self, text: str, *, visible: Optional[bool] = None):
+        mw = getattr(self, "main_window", None) or self.window()
+        loading = getattr(mw, "loading", None)
+        if loading is None:
+            return
+        loading.lbl_text.setText(text)
+        if visible is True:
+            loading.show_overlay()
+        elif visible is False:
+            loading.hide_overlay()
+
+    def _on_sync_arca_progress(self, hechas: int, total: int, _mensaje: str):
+        self._set_sync_overlay(f"Sincronizando con ARCA... {hechas}/{total}")
+
+    def _finish_sync_arca(self):
+        self._sync_task = None
+        self.btn_sync_arca.setEnabled(True)
+        self._set_sync_overlay("Procesando...", visible=False)
+
+    def _on_sync_arca_error(self, _msg: str):
+        self._finish_sync_arca()
+        popUp.toast(
+            self,
+            "Ocurrió un error al sincronizar con ARCA. Por favor reintentá.",
+        )
+
+    def _on_sync_arca_done(self, resumen: dict):
+        self._finish_sync_arca()
+
         procesadas = resumen.get("procesadas", 0)
         aprobadas = resumen.get("aprobadas", 0)
         rechazadas = resumen.get("rechazadas", 0)
@@ -613,12 +693,13 @@ class FacturasPage(QWidget):
             self.reload(reset_page=True)
 
     def on_prev(self):
-        if self.page > 1:
-            self.page -= 1
+        if self._seek and self._seek.hay_anterior:
+            self.page = max(self.page - 1, 1)
+            self._cursor, self._atras = self._seek.primero, True
             self.reload()
 
     def on_next(self):
-        pages = max((self.total + self.page_size - 1) // self.page_size, 1)
-        if self.page < pages:
+        if self._seek and self._seek.hay_siguiente:
             self.page += 1
+            self._cursor, self._atras = self._seek.ultimo, False
             self.reload()
@@ -9,12 +9,12 @@ from PySide6.QtWidgets import (
 )
 
 from sqlalchemy import text as sql_text
-from app.data.database import SessionLocal
+from app.data.database import SessionLocal, unit_of_work
 from app.services.remitos_service import RemitosService
 from app.services.clientes_service import ClientesService
 from app.services.vehiculos_service import VehiculosService
 import app.ui.app_message as popUp
-from app.services.comprobantes_service import ComprobantesService
+from app.services.service_registry import ServiceRegistry
 import os
 
 def _vehiculo_label(v: Dict[str, Any]) -> str:
@@ -211,8 +211,8 @@ class RemitosDetailPage(QWidget):
     # =========================================================
 
     def _load_data(self) -> None:
-        db = SessionLocal()
-        try:
+        # Una sola conexión y una foto consistente para toda la pantalla
+        with unit_of_work() as db:
             remito = self._svc_remitos.get(self._remito_id)
             if not remito:
                 popUp.toast(self, "Remito no encontrado.", kind="error")
@@ -261,8 +261,6 @@ class RemitosDetailPage(QWidget):
 
                 self.tbl_detalle.setItem(row, 0, QTableWidgetItem(label))
             self.tbl_detalle.resizeRowsToContents()
-        finally:
-            db.close()
 
         self._apply_edit_visibility()
 
@@ -353,7 +351,7 @@ class RemitosDetailPage(QWidget):
         self._load_data()
     def _on_generar_pdf(self) -> None:
         try:
-            svc = ComprobantesService()
+            svc = ServiceRegistry.get().comprobantes()
             pdf_path = svc.generar_pdf_remito(self._remito_id)
 
             popUp.toast(self, "PDF generado correctamente.", kind="success")
@@ -11,21 +11,68 @@ from PySide6.QtWidgets import (
     QFileDialog,
     QFrame,
 )
-from PySide6.QtCore import Qt
-from datetime import datetime
+from PySide6.QtCore import Qt, Signal, QObject, QRunnable, QThreadPool
+from datetime import date, datetime
 from pathlib import Path
 import calendar
 import zipfile
+from loguru import logger
 from app.core.config import settings
 
+from app.reportes.conciliacion_arca import generar_xlsx_conciliacion_arca
 from app.reportes.iva_ventas import generar_txt_iva_ventas
 from app.reportes.iva_ventas_datos import generar_txt_iva_ventas_datos
 
 
+class _ConciliacionSignals(QObject):
+    progress = Signal(int, int, str)
+    done = Signal(dict)
+    error = Signal(str)
+
+
+class _ConciliacionTask(QRunnable):
+    """Corre la conciliación con ARCA fuera del hilo de la UI y arma el XLSX."""
+
+    def __init__(self, desde: date, hasta: date, carpeta: str):
+        super().__init__()
+        self._desde = desde
+        self._hasta = hasta
+        self._carpeta = carpeta
+        self.signals = _ConciliacionSignals()
+
+    def _emit_progress(self, hechas: int, total: int, mensaje: str):
+        try:
+            self.signals.progress.emit(hechas, total, mensaje)
+        except RuntimeError:
+            pass
+
+    def run(self):
+        try:
+            from app.services.service_registry import ServiceRegistry
+
+            resultado = ServiceRegistry.get().facturas().conciliar_con_arca(
+                self._desde,
+                self._hasta,
+                progress_callback=self._emit_progress,
+            )
+            resultado["path"] = generar_xlsx_conciliacion_arca(resultado, path_override=self._carpeta)
+            try:
+                self.signals.done.emit(resultado)
+            except RuntimeError:
+                pass
+        except Exception as e:
+            logger.exception("Error en conciliación con ARCA")
+            try:
+                self.signals.error.emit(str(e))
+            except RuntimeError:
+                pass
+
+
 class ReportesPage(QWidget):
     def __init__(self, parent=None, main_window=None):
         super().__init__(parent)
         self.main_window = main_window
+        self._conciliacion_task = None
         self._build_ui()
 
     # =====================================================
@@ -59,6 +106,8 @@ class ReportesPage(QWidget):
 
         self.cmb_reporte = QComboBox()
         self.cmb_reporte.addItem("Libro IVA Ventas", "iva_ventas")
+        self.cmb_reporte.addItem("Conciliación con ARCA", "conciliacion_arca")
+        self.cmb_reporte.currentIndexChanged.connect(self._on_reporte_changed)
 
         row_reporte.addWidget(lbl_rep)
         row_reporte.addWidget(self.cmb_reporte, 1)
@@ -77,12 +126,12 @@ class ReportesPage(QWidget):
         panel_layout.addLayout(row_periodo)
 
         # ===== Acción =====
-        btn_exportar = QPushButton("📦 Generar Libro IVA (ZIP)")
-        btn_exportar.setMinimumHeight(44)
-        btn_exportar.clicked.connect(self.on_exportar)
+        self.btn_exportar = QPushButton("📦 Generar Libro IVA (ZIP)")
+        self.btn_exportar.setMinimumHeight(44)
+        self.btn_exportar.clicked.connect(self.on_exportar)
 
         panel_layout.addSpacing(10)
-        panel_layout.addWidget(btn_exportar, alignment=Qt.AlignRight)
+        panel_layout.addWidget(self.btn_exportar, alignment=Qt.AlignRight)
 
         root.addWidget(panel)
         root.addStretch()
@@ -111,11 +160,31 @@ class ReportesPage(QWidget):
                 mes = 12
                 anio -= 1
 
+    def _on_reporte_changed(self, _idx: int):
+        if self.cmb_reporte.currentData() == "conciliacion_arca":
+            self.btn_exportar.setText("🔎 Conciliar con ARCA (XLSX)")
+        else:
+            self.btn_exportar.setText("📦 Generar Libro IVA (ZIP)")
+
+    def _set_overlay(self, text: str, *, visible: bool | None = None):
+        loading = getattr(self.main_window, "loading", None)
+        if loading is None:
+            return
+        loading.lbl_text.setText(text)
+        if visible is True:
+            loading.show_overlay()
+        elif visible is False:
+            loading.hide_overlay()
+
     # =====================================================
     # Acción principal
     # =====================================================
     def on_exportar(self):
         tipo_reporte = self.cmb_reporte.currentData()
+        if tipo_reporte == "conciliacion_arca":
+            self.on_conciliar_arca()
+            return
+
         if tipo_reporte != "iva_ventas":
             QMessageBox.warning(
                 self,
@@ -189,3 +258,64 @@ class ReportesPage(QWidget):
                 "Error",
                 f"Ocurrió un error al generar el reporte:\n{e}",
             )
+
+    # =====================================================
+    # Conciliación con ARCA
+    # =====================================================
+    def on_conciliar_arca(self):
+        if self._conciliacion_task is not None:
+            return
+
+        mes, anio = self.cmb_periodo.currentData()
+        desde = date(anio, mes, 1)
+        hasta = date(anio, mes, calendar.monthrange(anio, mes)[1])
+
+        carpeta = QFileDialog.getExistingDirectory(
+            self,
+            "Seleccionar carpeta de destino",
+            str(Path.home() / "Downloads"),
+        )
+        if not carpeta:
+            return
+
+        self.btn_exportar.setEnabled(False)
+        self._set_overlay("Conciliando con ARCA...", visible=True)
+
+        task = _ConciliacionTask(desde, hasta, carpeta)
+        task.signals.progress.connect(self._on_conciliacion_progress)
+        task.signals.done.connect(self._on_conciliacion_done)
+        task.signals.error.connect(self._on_conciliacion_error)
+        self._conciliacion_task = task
+        QThreadPool.globalInstance().start(task)
+
+    def _on_conciliacion_progress(self, hechas: int, total: int, _mensaje: str):
+        self._set_overlay(f"Conciliando con ARCA... {hechas}/{total}")
+
+    def _finish_conciliacion(self):
+        self._conciliacion_task = None
+        self.btn_exportar.setEnabled(True)
+        self._set_overlay("Procesando...", visible=False)
+
+    def _on_conciliacion_error(self, msg: str):
+        self._finish_conciliacion()
+        QMessageBox.critical(
+            self,
+            "Error",
+            f"Ocurrió un error al conciliar con ARCA:\n{msg}",
+        )
+
+    def _on_conciliacion_done(self, resultado: dict):
+        self._finish_conciliacion()
+
+        msg = (
+            f"Comprobantes con CAE: {resultado['total']}\n"
+            f"Revisados: {resultado['revisadas']}\n"
+            f"Coincidentes: {resultado['coincidentes']}\n"
+            f"Con diferencias: {len(resultado['diferencias'])}\n"
+            f"Sin respuesta de AFIP: {len(resultado['errores'])}\n\n"
+            f"Archivo:\n{resultado['path']}"
+        )
+        if not resultado["completa"]:
+            msg += "\n\nQuedaron comprobantes sin revisar. Volvé a conciliar el período para completarlo."
+
+        QMessageBox.information(self, "Conciliación con ARCA", msg)
@@ -10,6 +10,7 @@ from PySide6.QtWidgets import (
     QAbstractItemView, QListView, QMainWindow, QMenu
 )
 import app.ui.app_message as popUp
+from app.repositories.statements import SeekPage
 from app.services.vehiculos_service import VehiculosService
 from app.ui.pages.vehiculos_agregar import VehiculosAgregarPage
 from app.ui.utils.loading_decorator import with_loading
@@ -136,9 +137,12 @@ class VehiculosPage(QWidget):
         if price_header_item:
             price_header_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
 
-        # ---- Paginación ----
+        # ---- Paginación (por clave: el cursor es la primera/última fila mostrada) ----
         self.page = 1
         self.total = 0
+        self._seek: Optional[SeekPage] = None
+        self._cursor: Optional[Dict[str, Any]] = None
+        self._atras = False
         self.page_size = int(self.settings.value(self.SETTINGS_PAGE_SIZE, 25))
         self.cmb_page_size = QComboBox(); self.cmb_page_size.setObjectName("BtnGhost")
         for n in (10, 25, 50, 100): self.cmb_page_size.addItem(f"Mostrar: {n}", n)
@@ -268,14 +272,21 @@ class VehiculosPage(QWidget):
     def reload(self, reset_page: bool = False):
         if reset_page:
             self.page = 1
+            self._cursor, self._atras = None, False
         filtros = self.gather_filters()
-        rows, total = self.service.search(filtros, page=self.page, page_size=self.page_size)
+        pagina, total = self.service.search_seek(
+            filtros, cursor=self._cursor, atras=self._atras, page_size=self.page_size
+        )
+        self._seek = pagina
+        if not pagina.hay_anterior:
+            self.page = 1
         self.total = total
-        self.populate_table(rows)
-        pages = max((total + self.page_size - 1) // self.page_size, 1)
+        self.populate_table(pagina.rows)
+        # El total puede venir de caché: la página actual nunca queda fuera de rango
+        pages = max((total + self.page_size - 1) // self.page_size, self.page, 1)
         self.lbl_pages.setText(f"Página {self.page}/{pages}")
-        self.btn_prev.setEnabled(self.page > 1)
-        self.btn_next.setEnabled(self.page < pages)
+        self.btn_prev.setEnabled(pagina.hay_anterior)
+        self.btn_next.setEnabled(pagina.hay_siguiente)
 
     def populate_table(self, rows: List[Dict[str, Any]]):
         was_sorting = self.table.isSortingEnabled()
@@ -408,12 +419,13 @@ class VehiculosPage(QWidget):
             self.reload(reset_page=True)
 
     def on_prev(self):
-        if self.page > 1:
-            self.page -= 1
+        if self._seek and self._seek.hay_anterior:
+            self.page = max(self.page - 1, 1)
+            self._cursor, self._atras = self._seek.primero, True
             self.reload()
 
     def on_next(self):
-        pages = max((self.total + self.page_size - 1) // self.page_size, 1)
-        if self.page < pages:
+        if self._seek and self._seek.hay_siguiente:
             self.page += 1
+            self._cursor, self._atras = self._seek.ultimo, False
             self.reload()
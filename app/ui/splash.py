@@ -1,12 +1,78 @@
+from typing import Callable, List, Optional
+
+import threading
+
 from PySide6.QtWidgets import QSplashScreen
 from PySide6.QtGui import QPixmap
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt, QTimer, QObject, QRunnable, QThreadPool, Signal
+from loguru import logger
 
 from app.ui.utils.resources import resource_path
 from app.core.updater import check_for_update
+from app.core.db_state import db_config_completa
 import app.ui.utils.paths as paths
 
+
+class _StartupSignals(QObject):
+    done = Signal(str)
+
+
+class _StartupTask(QRunnable):
+    """Corre un paso del arranque fuera del hilo de la UI."""
+
+    def __init__(self, nombre: str, fn: Callable[[], None]):
+        super().__init__()
+        self._nombre = nombre
+        self._fn = fn
+        self.signals = _StartupSignals()
+
+    def run(self):
+        try:
+            self._fn()
+        except Exception as e:
+            logger.warning("Arranque: falló '{}': {}", self._nombre, e)
+        try:
+            self.signals.done.emit(self._nombre)
+        except RuntimeError:
+            pass
+
+
+def _buscar_actualizaciones():
+    update = check_for_update()
+    if update:
+        print("Hay una actualización disponible:", update["version"])
+    else:
+        print("La aplicación está actualizada")
+
+
+def _precalentar_pool():
+    from app.data.database import warm_up_pool  # lazy import: crea el engine
+
+    warm_up_pool()
+
+
+def _precargar_catalogos():
+    from app.services.catalogos_service import CatalogosService  # lazy import
+
+    svc = CatalogosService()
+    # Con snapshot de la sesión anterior las pantallas abren ya; lo que haya
+    # cambiado en la base se trae en segundo plano, sin demorar el login
+    if svc.cargar_snapshot():
+        threading.Thread(target=_revalidar_catalogos, args=(svc,), name="catalog-revalidate", daemon=True).start()
+    svc.warmup_all()
+
+
+def _revalidar_catalogos(svc):
+    try:
+        svc.revalidar_snapshot()
+    except Exception as e:
+        logger.warning("Arranque: no se pudieron revalidar los catálogos: {}", e)
+
+
 class SplashScreen(QSplashScreen):
+    # Tope de espera: si la base no responde, se sigue igual al login
+    TIMEOUT_MS = 15000
+
     def __init__(self):
         pixmap = QPixmap(str(paths.LOGO_GUSSONI))
         pixmap = pixmap.scaled(
@@ -22,22 +88,56 @@ class SplashScreen(QSplashScreen):
             Qt.AlignBottom | Qt.AlignCenter,
             Qt.white
         )
+        self._pendientes: List[str] = []
+        self._tasks: List[_StartupTask] = []
+        self._on_ready: Optional[Callable[[], None]] = None
 
-    def run_tasks(self):
+    def run_tasks(self, on_ready: Callable[[], None]):
         """
-        Acá va TODO lo que hoy está en run.py
-        y lo pesado que no querés en main()
+        Lanza en paralelo lo que conviene tener listo antes del login:
+        búsqueda de actualizaciones, conexiones del pool abiertas y catálogos
+        en CatalogCache. Llama a `on_ready` apenas terminan todas (o al
+        vencer TIMEOUT_MS), en vez de esperar un tiempo fijo.
         """
-        try:
-            self.showMessage(
-                "Buscando actualizaciones...",
-                Qt.AlignBottom | Qt.AlignCenter,
-                Qt.white
-            )
-            update = check_for_update()
-            if update:
-                print("Hay una actualización disponible:", update["version"])
-            else:
-                print("La aplicación está actualizada")
-        except Exception as e:
-            print("Error al buscar actualizaciones:", e)
+        self._on_ready = on_ready
+        pasos = [("Buscando actualizaciones...", _buscar_actualizaciones)]
+        if db_config_completa():
+            pasos.append(("Conectando con la base de datos...", _precalentar_pool))
+            pasos.append(("Cargando catálogos...", _precargar_catalogos))
+
+        self._pendientes = [nombre for nombre, _fn in pasos]
+        self._show_status()
+
+        pool = QThreadPool.globalInstance()
+        for nombre, fn in pasos:
+            task = _StartupTask(nombre, fn)
+            task.signals.done.connect(self._on_task_done)
+            self._tasks.append(task)
+            pool.start(task)
+
+        QTimer.singleShot(self.TIMEOUT_MS, self._ready)
+
+    def _show_status(self):
+        if not self._pendientes:
+            return
+        self.showMessage(
+            self._pendientes[0],
+            Qt.AlignBottom | Qt.AlignCenter,
+            Qt.white
+        )
+
+    def _on_task_done(self, nombre: str):
+        if nombre in self._pendientes:
+            self._pendientes.remove(nombre)
+        if self._pendientes:
+            self._show_status()
+        else:
+            self._ready()
+
+    def _ready(self):
+        on_ready, self._on_ready = self._on_ready, None
+        if on_ready is None:
+            return
+        if self._pendientes:
+            logger.warning("Arranque: se continúa sin esperar a {}", ", ".join(self._pendientes))
+        on_ready()
@@ -182,11 +182,7 @@ class ClienteSelectorCombo(QLineEdit):
             return
 
         try:
-            rows, _ = self._svc.search(
-                {"q": text},
-                page=1,
-                page_size=20
-            )
+            rows = self._svc.buscar(text, limit=20)
         except Exception as ex:
             popUp.toast(self, f"Error al buscar clientes: {ex}", kind="error")
             rows = []
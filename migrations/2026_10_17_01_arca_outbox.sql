@@ -0,0 +1,25 @@
+-- Etapa segura - Cola persistente de autorizaciones ARCA
+-- Base objetivo inicial: motoagency_desarrollo
+--
+-- Impacto:
+-- - Agrega la tabla arca_outbox: una fila por factura a autorizar en segundo plano.
+-- - No borra datos.
+-- - No modifica datos existentes.
+-- - No elimina ni renombra columnas/tablas.
+--
+-- Rollback, si hubiera que revertir esta mejora:
+-- DROP TABLE arca_outbox;
+
+CREATE TABLE IF NOT EXISTS arca_outbox (
+    id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+    factura_id BIGINT UNSIGNED NOT NULL,
+    estado VARCHAR(20) NOT NULL DEFAULT 'PENDIENTE',
+    intentos INT NOT NULL DEFAULT 0,
+    proximo_intento DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ultimo_error TEXT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (id),
+    UNIQUE KEY uq_arca_outbox_factura (factura_id),
+    KEY idx_arca_outbox_estado_proximo (estado, proximo_intento)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,152 @@
+-- Etapa segura - Versiones de catálogos para refrescar la caché entre terminales
+-- Base objetivo inicial: motoagency_desarrollo
+--
+-- Impacto:
+-- - Agrega la tabla catalog_versions: una fila por tabla de catálogo con un contador.
+-- - Agrega triggers AFTER INSERT/UPDATE/DELETE en las tablas de catálogo que suben
+--   ese contador, así también se detectan los cambios hechos fuera de la app.
+--   La app además sube la versión cuando ella misma modifica un catálogo, de modo
+--   que sin los triggers (falta de privilegio TRIGGER) sigue funcionando para esos casos.
+-- - No borra datos.
+-- - No modifica datos existentes.
+-- - No elimina ni renombra columnas/tablas.
+--
+-- Rollback, si hubiera que revertir esta mejora:
+-- DROP TRIGGER IF EXISTS trg_colores_version_ai; DROP TRIGGER IF EXISTS trg_colores_version_au; DROP TRIGGER IF EXISTS trg_colores_version_ad;
+-- DROP TRIGGER IF EXISTS trg_estados_version_ai; DROP TRIGGER IF EXISTS trg_estados_version_au; DROP TRIGGER IF EXISTS trg_estados_version_ad;
+-- DROP TRIGGER IF EXISTS trg_estados_stock_version_ai; DROP TRIGGER IF EXISTS trg_estados_stock_version_au; DROP TRIGGER IF EXISTS trg_estados_stock_version_ad;
+-- DROP TRIGGER IF EXISTS trg_forma_pago_version_ai; DROP TRIGGER IF EXISTS trg_forma_pago_version_au; DROP TRIGGER IF EXISTS trg_forma_pago_version_ad;
+-- DROP TRIGGER IF EXISTS trg_proveedores_version_ai; DROP TRIGGER IF EXISTS trg_proveedores_version_au; DROP TRIGGER IF EXISTS trg_proveedores_version_ad;
+-- DROP TRIGGER IF EXISTS trg_puntos_venta_version_ai; DROP TRIGGER IF EXISTS trg_puntos_venta_version_au; DROP TRIGGER IF EXISTS trg_puntos_venta_version_ad;
+-- DROP TRIGGER IF EXISTS trg_tipos_comprobante_version_ai; DROP TRIGGER IF EXISTS trg_tipos_comprobante_version_au; DROP TRIGGER IF EXISTS trg_tipos_comprobante_version_ad;
+-- DROP TRIGGER IF EXISTS trg_tipos_documento_version_ai; DROP TRIGGER IF EXISTS trg_tipos_documento_version_au; DROP TRIGGER IF EXISTS trg_tipos_documento_version_ad;
+-- DROP TABLE catalog_versions;
+
+CREATE TABLE IF NOT EXISTS catalog_versions (
+    catalogo VARCHAR(64) NOT NULL,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (catalogo)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+INSERT IGNORE INTO catalog_versions (catalogo, version) VALUES
+    ('colores', 1),
+    ('estados', 1),
+    ('estados_stock', 1),
+    ('forma_pago', 1),
+    ('proveedores', 1),
+    ('puntos_venta', 1),
+    ('tipos_comprobante', 1),
+    ('tipos_documento', 1);
+
+-- colores
+DROP TRIGGER IF EXISTS trg_colores_version_ai;
+CREATE TRIGGER trg_colores_version_ai AFTER INSERT ON colores FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('colores', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+DROP TRIGGER IF EXISTS trg_colores_version_au;
+CREATE TRIGGER trg_colores_version_au AFTER UPDATE ON colores FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('colores', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+DROP TRIGGER IF EXISTS trg_colores_version_ad;
+CREATE TRIGGER trg_colores_version_ad AFTER DELETE ON colores FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('colores', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+
+-- estados
+DROP TRIGGER IF EXISTS trg_estados_version_ai;
+CREATE TRIGGER trg_estados_version_ai AFTER INSERT ON estados FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('estados', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+DROP TRIGGER IF EXISTS trg_estados_version_au;
+CREATE TRIGGER trg_estados_version_au AFTER UPDATE ON estados FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('estados', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+DROP TRIGGER IF EXISTS trg_estados_version_ad;
+CREATE TRIGGER trg_estados_version_ad AFTER DELETE ON estados FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('estados', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+
+-- estados_stock
+DROP TRIGGER IF EXISTS trg_estados_stock_version_ai;
+CREATE TRIGGER trg_estados_stock_version_ai AFTER INSERT ON estados_stock FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('estados_stock', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+DROP TRIGGER IF EXISTS trg_estados_stock_version_au;
+CREATE TRIGGER trg_estados_stock_version_au AFTER UPDATE ON estados_stock FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('estados_stock', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+DROP TRIGGER IF EXISTS trg_estados_stock_version_ad;
+CREATE TRIGGER trg_estados_stock_version_ad AFTER DELETE ON estados_stock FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('estados_stock', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+
+-- forma_pago
+DROP TRIGGER IF EXISTS trg_forma_pago_version_ai;
+CREATE TRIGGER trg_forma_pago_version_ai AFTER INSERT ON forma_pago FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('forma_pago', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+DROP TRIGGER IF EXISTS trg_forma_pago_version_au;
+CREATE TRIGGER trg_forma_pago_version_au AFTER UPDATE ON forma_pago FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('forma_pago', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+DROP TRIGGER IF EXISTS trg_forma_pago_version_ad;
+CREATE TRIGGER trg_forma_pago_version_ad AFTER DELETE ON forma_pago FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('forma_pago', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+
+-- proveedores
+DROP TRIGGER IF EXISTS trg_proveedores_version_ai;
+CREATE TRIGGER trg_proveedores_version_ai AFTER INSERT ON proveedores FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('proveedores', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+DROP TRIGGER IF EXISTS trg_proveedores_version_au;
+CREATE TRIGGER trg_proveedores_version_au AFTER UPDATE ON proveedores FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('proveedores', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+DROP TRIGGER IF EXISTS trg_proveedores_version_ad;
+CREATE TRIGGER trg_proveedores_version_ad AFTER DELETE ON proveedores FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('proveedores', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+
+-- puntos_venta
+DROP TRIGGER IF EXISTS trg_puntos_venta_version_ai;
+CREATE TRIGGER trg_puntos_venta_version_ai AFTER INSERT ON puntos_venta FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('puntos_venta', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+DROP TRIGGER IF EXISTS trg_puntos_venta_version_au;
+CREATE TRIGGER trg_puntos_venta_version_au AFTER UPDATE ON puntos_venta FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('puntos_venta', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+DROP TRIGGER IF EXISTS trg_puntos_venta_version_ad;
+CREATE TRIGGER trg_puntos_venta_version_ad AFTER DELETE ON puntos_venta FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('puntos_venta', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+
+-- tipos_comprobante
+DROP TRIGGER IF EXISTS trg_tipos_comprobante_version_ai;
+CREATE TRIGGER trg_tipos_comprobante_version_ai AFTER INSERT ON tipos_comprobante FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('tipos_comprobante', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+DROP TRIGGER IF EXISTS trg_tipos_comprobante_version_au;
+CREATE TRIGGER trg_tipos_comprobante_version_au AFTER UPDATE ON tipos_comprobante FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('tipos_comprobante', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+DROP TRIGGER IF EXISTS trg_tipos_comprobante_version_ad;
+CREATE TRIGGER trg_tipos_comprobante_version_ad AFTER DELETE ON tipos_comprobante FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('tipos_comprobante', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+
+-- tipos_documento
+DROP TRIGGER IF EXISTS trg_tipos_documento_version_ai;
+CREATE TRIGGER trg_tipos_documento_version_ai AFTER INSERT ON tipos_documento FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('tipos_documento', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+DROP TRIGGER IF EXISTS trg_tipos_documento_version_au;
+CREATE TRIGGER trg_tipos_documento_version_au AFTER UPDATE ON tipos_documento FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('tipos_documento', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
+DROP TRIGGER IF EXISTS trg_tipos_documento_version_ad;
+CREATE TRIGGER trg_tipos_documento_version_ad AFTER DELETE ON tipos_documento FOR EACH ROW
+    INSERT INTO catalog_versions (catalogo, version) VALUES ('tipos_documento', 1)
+    ON DUPLICATE KEY UPDATE version = version + 1;
@@ -0,0 +1,50 @@
+-- Etapa segura - Índice para paginar el listado de facturas por clave
+-- Base objetivo inicial: motoagency_desarrollo
+--
+-- Impacto:
+-- - Agrega idx_facturas_fecha_id (fecha_emision, id): el listado pagina con
+--   "fecha_emision, id anteriores a la última fila mostrada" y el índice resuelve
+--   cada página leyendo sólo page_size filas, sin importar la profundidad.
+-- - Clientes y vehículos paginan por id (clave primaria): no necesitan índice nuevo.
+-- - No borra datos.
+-- - No modifica datos existentes.
+-- - No elimina ni renombra columnas/tablas.
+--
+-- Rollback, si hubiera que revertir esta mejora:
+-- DROP INDEX idx_facturas_fecha_id ON facturas;
+
+DELIMITER $$
+
+DROP PROCEDURE IF EXISTS add_index_if_missing $$
+CREATE PROCEDURE add_index_if_missing(
+    IN p_schema VARCHAR(64),
+    IN p_table VARCHAR(64),
+    IN p_index VARCHAR(64),
+    IN p_ddl TEXT
+)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM information_schema.statistics
+        WHERE table_schema = p_schema
+          AND table_name = p_table
+          AND index_name = p_index
+        LIMIT 1
+    ) THEN
+        SET @ddl = p_ddl;
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END $$
+
+DELIMITER ;
+
+CALL add_index_if_missing(
+    DATABASE(),
+    'facturas',
+    'idx_facturas_fecha_id',
+    'CREATE INDEX idx_facturas_fecha_id ON facturas (fecha_emision, id)'
+);
+
+DROP PROCEDURE IF EXISTS add_index_if_missing;
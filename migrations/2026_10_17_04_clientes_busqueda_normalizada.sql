@@ -0,0 +1,141 @@
+-- Etapa segura - Búsqueda indexada de clientes por documento y nombre
+-- Base objetivo inicial: motoagency_desarrollo
+--
+-- Impacto:
+-- - Agrega a clientes cuatro columnas generadas (STORED), cada una con su índice:
+--   nro_doc_digitos       nro_doc sólo con dígitos (sin . - / ni espacios)
+--   nro_doc_dni           el DNI dentro de un CUIT/CUIL de 11 dígitos (si no, igual a nro_doc_digitos)
+--   apellido_nombre_norm  "apellido nombre" en minúsculas
+--   nombre_completo_norm  "nombre apellido" en minúsculas
+-- - Las búsquedas de clientes y de facturas por cliente pasan a ser por prefijo sobre
+--   estas columnas (rango en el índice) en vez de LIKE '%...%' sobre expresiones.
+-- - La app detecta nombre_completo_norm (se agrega última); sin la migración sigue
+--   buscando como antes.
+-- - MySQL recalcula las columnas solo: la app no las escribe.
+-- - No borra datos.
+-- - No modifica datos existentes.
+-- - No elimina ni renombra columnas/tablas.
+--
+-- Rollback, si hubiera que revertir esta mejora:
+-- ALTER TABLE clientes DROP COLUMN nombre_completo_norm, DROP COLUMN apellido_nombre_norm,
+--     DROP COLUMN nro_doc_dni, DROP COLUMN nro_doc_digitos;
+
+DELIMITER $$
+
+DROP PROCEDURE IF EXISTS add_column_if_missing $$
+CREATE PROCEDURE add_column_if_missing(
+    IN p_schema VARCHAR(64),
+    IN p_table VARCHAR(64),
+    IN p_column VARCHAR(64),
+    IN p_ddl TEXT
+)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM information_schema.columns
+        WHERE table_schema = p_schema
+          AND table_name = p_table
+          AND column_name = p_column
+        LIMIT 1
+    ) THEN
+        SET @ddl = p_ddl;
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END $$
+
+DROP PROCEDURE IF EXISTS add_index_if_missing $$
+CREATE PROCEDURE add_index_if_missing(
+    IN p_schema VARCHAR(64),
+    IN p_table VARCHAR(64),
+    IN p_index VARCHAR(64),
+    IN p_ddl TEXT
+)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM information_schema.statistics
+        WHERE table_schema = p_schema
+          AND table_name = p_table
+          AND index_name = p_index
+        LIMIT 1
+    ) THEN
+        SET @ddl = p_ddl;
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END $$
+
+DELIMITER ;
+
+CALL add_column_if_missing(
+    DATABASE(),
+    'clientes',
+    'nro_doc_digitos',
+    'ALTER TABLE clientes ADD COLUMN nro_doc_digitos VARCHAR(32)
+        GENERATED ALWAYS AS (
+            REPLACE(REPLACE(REPLACE(REPLACE(COALESCE(nro_doc, ''''), ''-'', ''''), ''.'', ''''), '' '', ''''), ''/'', '''')
+        ) STORED AFTER nro_doc'
+);
+
+CALL add_column_if_missing(
+    DATABASE(),
+    'clientes',
+    'nro_doc_dni',
+    'ALTER TABLE clientes ADD COLUMN nro_doc_dni VARCHAR(32)
+        GENERATED ALWAYS AS (
+            CASE WHEN CHAR_LENGTH(nro_doc_digitos) = 11
+                 THEN SUBSTRING(nro_doc_digitos, 3, 8)
+                 ELSE nro_doc_digitos
+            END
+        ) STORED AFTER nro_doc_digitos'
+);
+
+CALL add_column_if_missing(
+    DATABASE(),
+    'clientes',
+    'apellido_nombre_norm',
+    'ALTER TABLE clientes ADD COLUMN apellido_nombre_norm VARCHAR(255)
+        GENERATED ALWAYS AS (LEFT(LOWER(CONCAT_WS('' '', apellido, nombre)), 255)) STORED'
+);
+
+CALL add_column_if_missing(
+    DATABASE(),
+    'clientes',
+    'nombre_completo_norm',
+    'ALTER TABLE clientes ADD COLUMN nombre_completo_norm VARCHAR(255)
+        GENERATED ALWAYS AS (LEFT(LOWER(CONCAT_WS('' '', nombre, apellido)), 255)) STORED'
+);
+
+CALL add_index_if_missing(
+    DATABASE(),
+    'clientes',
+    'idx_clientes_nro_doc_digitos',
+    'CREATE INDEX idx_clientes_nro_doc_digitos ON clientes (nro_doc_digitos)'
+);
+
+CALL add_index_if_missing(
+    DATABASE(),
+    'clientes',
+    'idx_clientes_nro_doc_dni',
+    'CREATE INDEX idx_clientes_nro_doc_dni ON clientes (nro_doc_dni)'
+);
+
+CALL add_index_if_missing(
+    DATABASE(),
+    'clientes',
+    'idx_clientes_apellido_nombre_norm',
+    'CREATE INDEX idx_clientes_apellido_nombre_norm ON clientes (apellido_nombre_norm)'
+);
+
+CALL add_index_if_missing(
+    DATABASE(),
+    'clientes',
+    'idx_clientes_nombre_completo_norm',
+    'CREATE INDEX idx_clientes_nombre_completo_norm ON clientes (nombre_completo_norm)'
+);
+
+DROP PROCEDURE IF EXISTS add_column_if_missing;
+DROP PROCEDURE IF EXISTS add_index_if_missing;
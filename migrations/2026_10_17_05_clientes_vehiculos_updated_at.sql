@@ -0,0 +1,99 @@
+-- Etapa segura - Marca de modificación en clientes y vehiculos
+-- Base objetivo inicial: motoagency_desarrollo
+--
+-- Impacto:
+-- - Agrega updated_at (DEFAULT/ON UPDATE CURRENT_TIMESTAMP) con índice a clientes y vehiculos.
+-- - El índice de búsqueda local de la app lo usa como watermark: cada pocos segundos
+--   trae sólo las filas modificadas desde la última lectura en vez de releer la tabla.
+--   Sin esta columna la app sólo incorpora altas y recoge ediciones al reconstruir.
+-- - Las filas existentes quedan con la fecha de la migración.
+-- - No borra datos.
+-- - No modifica datos existentes.
+-- - No elimina ni renombra columnas/tablas.
+--
+-- Rollback, si hubiera que revertir esta mejora:
+-- ALTER TABLE clientes DROP COLUMN updated_at;
+-- ALTER TABLE vehiculos DROP COLUMN updated_at;
+
+DELIMITER $$
+
+DROP PROCEDURE IF EXISTS add_column_if_missing $$
+CREATE PROCEDURE add_column_if_missing(
+    IN p_schema VARCHAR(64),
+    IN p_table VARCHAR(64),
+    IN p_column VARCHAR(64),
+    IN p_ddl TEXT
+)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM information_schema.columns
+        WHERE table_schema = p_schema
+          AND table_name = p_table
+          AND column_name = p_column
+        LIMIT 1
+    ) THEN
+        SET @ddl = p_ddl;
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END $$
+
+DROP PROCEDURE IF EXISTS add_index_if_missing $$
+CREATE PROCEDURE add_index_if_missing(
+    IN p_schema VARCHAR(64),
+    IN p_table VARCHAR(64),
+    IN p_index VARCHAR(64),
+    IN p_ddl TEXT
+)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM information_schema.statistics
+        WHERE table_schema = p_schema
+          AND table_name = p_table
+          AND index_name = p_index
+        LIMIT 1
+    ) THEN
+        SET @ddl = p_ddl;
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END $$
+
+DELIMITER ;
+
+CALL add_column_if_missing(
+    DATABASE(),
+    'clientes',
+    'updated_at',
+    'ALTER TABLE clientes ADD COLUMN updated_at DATETIME NOT NULL
+        DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'
+);
+
+CALL add_column_if_missing(
+    DATABASE(),
+    'vehiculos',
+    'updated_at',
+    'ALTER TABLE vehiculos ADD COLUMN updated_at DATETIME NOT NULL
+        DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'
+);
+
+CALL add_index_if_missing(
+    DATABASE(),
+    'clientes',
+    'idx_clientes_updated_at',
+    'CREATE INDEX idx_clientes_updated_at ON clientes (updated_at)'
+);
+
+CALL add_index_if_missing(
+    DATABASE(),
+    'vehiculos',
+    'idx_vehiculos_updated_at',
+    'CREATE INDEX idx_vehiculos_updated_at ON vehiculos (updated_at)'
+);
+
+DROP PROCEDURE IF EXISTS add_column_if_missing;
+DROP PROCEDURE IF EXISTS add_index_if_missing;
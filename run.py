@@ -12,12 +12,12 @@ if __name__ == "__main__":
     splash = SplashScreen()
     splash.show()
 
-    def run_startup():
-        splash.run_tasks()
+    def on_ready():
         splash.finish(None)
         start_main_app(app)
 
-    # 🔥 CLAVE: correr después de que arranca el event loop
-    QTimer.singleShot(2000, run_startup)
+    # 🔥 CLAVE: correr después de que arranca el event loop.
+    # El login aparece apenas terminan las tareas del splash.
+    QTimer.singleShot(0, lambda: splash.run_tasks(on_ready))
 
     sys.exit(app.exec())
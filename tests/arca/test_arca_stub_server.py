@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import text
+
+from app.integrations.arca import rate_limiter
+from tests.conftest import build_factura_payload
+from tests.fixtures.arca_stub_server import ArcaStubServer, clientes_contra_stub
+
+
+@pytest.fixture(autouse=True)
+def sin_limite_de_rps(monkeypatch):
+    monkeypatch.setitem(rate_limiter._limiters, "wsfe", rate_limiter.TokenBucket(rate=1000))
+
+
+def _borradores(svc, cliente_id, make_vehiculo, cantidad):
+    for i in range(cantidad):
+        cabecera, items = build_factura_payload(cliente_id, make_vehiculo(suffix=f"S{i}"))
+        cabecera["numero"] = i + 1
+        svc.create_factura_completa(cabecera, items)
+
+
+@pytest.mark.parametrize("en_lote", [False, True])
+def test_sincronizacion_real_contra_stub(db, cliente_id, make_vehiculo, factura_service_factory, tmp_path, en_lote):
+    with ArcaStubServer(ultimo_autorizado={(6, 2): 40}) as server:
+        wsaa, wsfe = clientes_contra_stub(server, tmp_path)
+        svc = factura_service_factory(wsfe=wsfe, wsaa=wsaa)
+        _borradores(svc, cliente_id, make_vehiculo, 3)
+
+        resumen = svc.sincronizar_borradores_con_arca(en_lote=en_lote, max_workers=1)
+
+        numeros = db.execute(text("SELECT numero FROM facturas ORDER BY numero")).scalars().all()
+        assert resumen["aprobadas"] == 3
+        assert numeros == [41, 42, 43]
+        assert server.ultimo_autorizado(6, 2) == 43
+        assert server.requests["loginCms"] == 1
+        assert server.requests["FECAESolicitar"] == (1 if en_lote else 3)
+
+
+def test_pagina_html_queda_como_error_sin_autorizar(db, cliente_id, vehiculo_id, factura_service_factory, tmp_path):
+    with ArcaStubServer(html_error_status=200) as server:
+        wsaa, wsfe = clientes_contra_stub(server, tmp_path)
+        wsaa.get_auth()
+        server.html_error_rate = 1.0
+        svc = factura_service_factory(wsfe=wsfe, wsaa=wsaa)
+        cabecera, items = build_factura_payload(cliente_id, vehiculo_id)
+        cabecera["numero"] = 1
+        factura_id = svc.create_factura_completa(cabecera, items)
+
+        resultado = svc.autorizar_en_arca(factura_id)
+
+        assert resultado["aprobada"] is False and resultado["rechazada"] is False
+        assert resultado["estado_id"] == svc.ESTADO_ERROR_COMUNICACION
+        assert resultado["cae"] is None
+        assert server.ultimo_autorizado(6, 2) == 0
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from app.integrations.arca.rate_limiter import TokenBucket
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_permite_rafaga_y_luego_espera_al_ritmo_configurado():
+    clock = _FakeClock()
+    bucket = TokenBucket(rate=5, capacity=2, clock=clock, sleep=clock.sleep)
+
+    for _ in range(4):
+        assert bucket.acquire() is True
+
+    assert clock.sleeps == [0.2, 0.2]
+    assert round(clock.now, 6) == 0.4
+
+
+def test_token_bucket_respeta_timeout():
+    clock = _FakeClock()
+    bucket = TokenBucket(rate=1, capacity=1, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire() is True
+    assert bucket.acquire(timeout=0.5) is False
+    assert round(clock.now, 6) == 0.5
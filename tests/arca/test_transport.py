@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import ssl
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.integrations.arca.transport import HttpConnectionPool, OperationPolicy
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    conexiones: set = set()
+
+    def setup(self):
+        super().setup()
+        type(self).conexiones.add(self.client_address)
+
+    def do_POST(self):
+        largo = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(largo)
+        status = 500 if self.path.endswith("/error") else 200
+        self.send_response(status)
+        self.send_header("Content-Type", "text/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def servidor():
+    _EchoHandler.conexiones = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_pool_reutiliza_la_conexion_keep_alive(servidor):
+    host, port = servidor.server_address
+    pool = HttpConnectionPool(f"http://{host}:{port}/wsfev1/service.asmx")
+
+    respuestas = [
+        pool.post(f"<x>{i}</x>".encode(), {"Content-Type": "text/xml"}, operation="FECompConsultar")
+        for i in range(3)
+    ]
+    pool.close()
+
+    assert [r[0] for r in respuestas] == [200, 200, 200]
+    assert respuestas[2][1] == b"<x>2</x>"
+    assert len(_EchoHandler.conexiones) == 1
+    assert pool.stats()["reutilizadas"] == 2
+
+
+def test_pool_devuelve_status_http_de_error(servidor):
+    host, port = servidor.server_address
+    pool = HttpConnectionPool(f"http://{host}:{port}/error")
+
+    status, body = pool.post(b"<x/>", {}, operation="FECAESolicitar")
+    pool.close()
+
+    assert status == 500
+    assert body == b"<x/>"
+
+
+def test_pool_no_reintenta_operaciones_no_idempotentes():
+    pool = HttpConnectionPool(
+        "http://127.0.0.1:9/",
+        policies={"FECAESolicitar": OperationPolicy(timeout=1.0, retries=3, idempotent=False)},
+    )
+
+    with pytest.raises(OSError):
+        pool.post(b"<x/>", {}, operation="FECAESolicitar")
+
+    assert pool.stats()["reintentos"] == 0
+
+
+def test_pool_no_reintenta_errores_de_certificado(monkeypatch):
+    pool = HttpConnectionPool(
+        "https://127.0.0.1:9/",
+        policies={"FECompConsultar": OperationPolicy(timeout=1.0, retries=3)},
+    )
+    intentos = []
+
+    def _handshake_fallido(self, *args, **kwargs):
+        intentos.append(1)
+        raise ssl.SSLCertVerificationError("certificate verify failed")
+
+    monkeypatch.setattr("http.client.HTTPSConnection.request", _handshake_fallido)
+
+    with pytest.raises(ssl.SSLCertVerificationError):
+        pool.post(b"<x/>", {}, operation="FECompConsultar")
+
+    assert intentos == [1]
+    assert pool.stats()["reintentos"] == 0
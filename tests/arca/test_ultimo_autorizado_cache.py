@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.integrations.arca.ultimo_autorizado_cache import UltimoAutorizadoCache
+from app.integrations.arca.wsfe_client import ArcaWSFEClient
+
+_RESPUESTA_ULTIMO = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+  <soap:Body>
+    <FECompUltimoAutorizadoResponse xmlns="http://ar.gov.afip.dif.FEV1/">
+      <FECompUltimoAutorizadoResult>
+        <PtoVta>2</PtoVta><CbteTipo>6</CbteTipo><CbteNro>41</CbteNro>
+      </FECompUltimoAutorizadoResult>
+    </FECompUltimoAutorizadoResponse>
+  </soap:Body>
+</soap:Envelope>"""
+
+
+@pytest.fixture()
+def cache(monkeypatch):
+    nuevo = UltimoAutorizadoCache()
+    monkeypatch.setattr(UltimoAutorizadoCache, "_instance", nuevo)
+    return nuevo
+
+
+@pytest.fixture()
+def cliente(cache):
+    client = ArcaWSFEClient.__new__(ArcaWSFEClient)
+    client._config = SimpleNamespace(mode="HOMOLOGACION")
+    client.llamadas = 0
+
+    def _call(soap, action):
+        client.llamadas += 1
+        return _RESPUESTA_ULTIMO
+
+    client._call_wsfe_action = _call
+    return client
+
+
+def _auth():
+    return SimpleNamespace(token="t", sign="s", cuit="20123456789")
+
+
+def test_cache_separa_por_ambiente_y_vence_por_ttl(cache, monkeypatch):
+    cache.set_numero(6, 2, "HOMOLOGACION", 10)
+
+    assert cache.get_numero(6, 2, "homologacion") == 10
+    assert cache.get_numero(6, 2, "PRODUCCION") is None
+
+    monkeypatch.setattr(cache, "_ttl", -1.0)
+    assert cache.get_numero(6, 2, "HOMOLOGACION") is None
+
+
+def test_registrar_autorizado_no_retrocede(cache):
+    cache.set_numero(6, 2, "HOMOLOGACION", 10)
+
+    cache.registrar_autorizado(6, 2, "HOMOLOGACION", 8)
+    assert cache.get_numero(6, 2, "HOMOLOGACION") == 10
+
+    cache.registrar_autorizado(6, 2, "HOMOLOGACION", 11)
+    assert cache.get_numero(6, 2, "HOMOLOGACION") == 11
+
+
+def test_cliente_consulta_afip_una_sola_vez(cliente):
+    primero = cliente.fe_comp_ultimo_autorizado(_auth(), cbte_tipo=6, pto_vta=2)
+    segundo = cliente.fe_comp_ultimo_autorizado(_auth(), cbte_tipo=6, pto_vta=2)
+
+    assert primero["cbte_nro"] == segundo["cbte_nro"] == 41
+    assert cliente.llamadas == 1
+
+
+def test_autorizacion_propia_avanza_y_rechazo_invalida(cliente, cache):
+    cliente.fe_comp_ultimo_autorizado(_auth(), cbte_tipo=6, pto_vta=2)
+
+    cliente._actualizar_ultimo_autorizado(6, 2, [42], [SimpleNamespace(aprobada=True, rechazada=False)])
+    assert cliente.fe_comp_ultimo_autorizado(_auth(), cbte_tipo=6, pto_vta=2)["cbte_nro"] == 42
+    assert cliente.llamadas == 1
+
+    cliente._actualizar_ultimo_autorizado(6, 2, [43], [SimpleNamespace(aprobada=False, rechazada=True)])
+    assert cache.get_numero(6, 2, "HOMOLOGACION") is None
+    cliente.fe_comp_ultimo_autorizado(_auth(), cbte_tipo=6, pto_vta=2)
+    assert cliente.llamadas == 2
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import base64
+import os
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.integrations.arca import wsaa_client
+
+x509 = pytest.importorskip("cryptography.x509")
+from cryptography.hazmat.primitives import hashes, serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import rsa  # noqa: E402
+from cryptography.x509.oid import NameOID  # noqa: E402
+
+
+@pytest.fixture()
+def config(tmp_path):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "test")])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(0x8123)
+        .not_valid_before(now)
+        .not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = tmp_path / "cert.pem"
+    key_path = tmp_path / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    return SimpleNamespace(cert_path=cert_path, key_path=key_path, key_password="")
+
+
+def test_signer_se_reutiliza_y_se_recarga_si_cambia_el_archivo(config):
+    primero = wsaa_client._get_signer(config)
+    assert wsaa_client._get_signer(config) is primero
+
+    stat = config.key_path.stat()
+    os.utime(config.key_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert wsaa_client._get_signer(config) is not primero
+
+
+def test_firma_genera_pkcs7_der(config):
+    cms = base64.b64decode(wsaa_client._get_signer(config).sign("<loginTicketRequest/>"))
+
+    assert cms[0] == 0x30
+    assert b"<loginTicketRequest/>" in cms
+    assert b"\x02\x03\x00\x81\x23" in cms
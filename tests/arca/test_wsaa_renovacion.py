@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.integrations.arca import wsaa_client
+from app.integrations.arca.wsaa_client import ArcaAuthData, ArcaWSAAClient, TicketRenewer
+
+
+def _cliente(tmp_path, vence_en: timedelta):
+    client = ArcaWSAAClient(SimpleNamespace(mode="HOMOLOGACION", cuit="20123456789"))
+    client.TA_PATH = tmp_path / "arca_ta_homo.xml"
+    client._store = wsaa_client._store_for(client.TA_PATH)
+    client.pedidos = 0
+
+    def _request_new_ticket():
+        client.pedidos += 1
+        time.sleep(0.05)
+        return ArcaAuthData(
+            token=f"token-{client.pedidos}",
+            sign="sign",
+            cuit="20123456789",
+            expires_at=datetime.now(timezone.utc) + vence_en,
+        )
+
+    client._request_new_ticket = _request_new_ticket
+    return client
+
+
+def test_llamadas_concurrentes_comparten_una_sola_renovacion(tmp_path):
+    client = _cliente(tmp_path, timedelta(hours=12))
+    tokens = []
+
+    hilos = [threading.Thread(target=lambda: tokens.append(client.get_auth().token)) for _ in range(5)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    assert client.pedidos == 1
+    assert tokens == ["token-1"] * 5
+    assert "token-1" in client.TA_PATH.read_text(encoding="utf-8")
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+def test_renovador_espera_al_vencimiento_y_renueva(tmp_path):
+    client = _cliente(tmp_path, timedelta(minutes=3))
+    client.get_auth()
+
+    espera = TicketRenewer(client, skew_seconds=5).run_once()
+    assert client.pedidos == 1
+    assert 170 < espera <= 185
+
+    client._store.auth.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    TicketRenewer(client, skew_seconds=5).run_once()
+    assert client.pedidos == 2
+    assert client.get_auth().token == "token-2"
+
+
+def test_already_authenticated_sigue_con_el_ta_vigente(tmp_path):
+    client = _cliente(tmp_path, timedelta(seconds=30))
+    assert client.get_auth().token == "token-1"
+
+    def _rechazo():
+        client.pedidos += 1
+        raise wsaa_client.WsaaAlreadyAuthenticated("coe.alreadyAuthenticated")
+
+    client._request_new_ticket = _rechazo
+
+    # Dentro del margen de get_auth: WSAA rechaza y se usa el TA actual
+    assert client.get_auth().token == "token-1"
+    espera = TicketRenewer(client, skew_seconds=5, retry_seconds=60).run_once()
+    assert client.pedidos == 2
+    assert 20 < espera <= 35
+
+
+def test_renovador_no_renueva_lejos_del_vencimiento(tmp_path):
+    client = _cliente(tmp_path, timedelta(hours=12))
+    client.get_auth()
+
+    espera = TicketRenewer(client).run_once()
+
+    assert client.pedidos == 1
+    assert 11 * 3600 < espera < 12 * 3600 + 10
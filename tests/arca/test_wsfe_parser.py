@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from app.integrations.arca.wsfe_client import ArcaWSFEClient
+
+
+def _detalle(numero: int, resultado: str = "A", obs: str = "") -> str:
+    cae = f"<CAE>7{numero:013d}</CAE><CAEFchVto>20301231</CAEFchVto>" if resultado == "A" else "<CAE></CAE>"
+    return (
+        "<FECAEDetResponse>"
+        "<Concepto>1</Concepto><DocTipo>80</DocTipo><DocNro>20111111112</DocNro>"
+        f"<CbteDesde>{numero}</CbteDesde><CbteHasta>{numero}</CbteHasta>"
+        f"<CbteFch>20261017</CbteFch><Resultado>{resultado}</Resultado>"
+        f"{obs}{cae}"
+        "</FECAEDetResponse>"
+    )
+
+
+def _respuesta(detalles: str, errores: str = "") -> str:
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+        "<soap:Body>"
+        '<FECAESolicitarResponse xmlns="http://ar.gov.afip.dif.FEV1/">'
+        "<FECAESolicitarResult>"
+        "<FeCabResp><Cuit>20111111112</Cuit><PtoVta>1</PtoVta><CbteTipo>1</CbteTipo>"
+        "<FchProceso>20261017101500</FchProceso><CantReg>1</CantReg><Resultado>A</Resultado></FeCabResp>"
+        f"<FeDetResp>{detalles}</FeDetResp>"
+        f"{errores}"
+        "</FECAESolicitarResult>"
+        "</FECAESolicitarResponse>"
+        "</soap:Body>"
+        "</soap:Envelope>"
+    )
+
+
+def test_parseo_individual_aprobada_con_observaciones():
+    obs = "<Observaciones><Obs><Code>10217</Code><Msg>Dato informado</Msg></Obs></Observaciones>"
+    res = ArcaWSFEClient()._parse_fe_cae_solicitar_response(_respuesta(_detalle(5, "A", obs)))
+
+    assert res.aprobada is True
+    assert res.cae == "70000000000005"
+    assert res.vto_cae == "20301231"
+    assert res.observaciones == ["10217 - Dato informado"]
+    assert res.errores == []
+
+
+def test_parseo_individual_errores_de_cabecera_sin_detalle():
+    errores = "<Errors><Err><Code>600</Code><Msg>No autorizado</Msg></Err></Errors>"
+    res = ArcaWSFEClient()._parse_fe_cae_solicitar_response(_respuesta("", errores))
+
+    assert res.aprobada is False and res.rechazada is False
+    assert res.errores == ["600 - No autorizado"]
+
+
+def test_parseo_lote_un_resultado_por_comprobante():
+    numeros = list(range(1, 251))
+    detalles = "".join(_detalle(n, "R" if n % 50 == 0 else "A") for n in reversed(numeros))
+
+    resultados = ArcaWSFEClient()._parse_fe_cae_solicitar_lote_response(_respuesta(detalles), numeros + [999])
+
+    assert len(resultados) == 251
+    assert resultados[0].cae == "70000000000001"
+    assert resultados[0].fecha_cae == "20261017101500"
+    assert [n for n, r in zip(numeros, resultados) if r.rechazada] == [50, 100, 150, 200, 250]
+    assert "999" in resultados[-1].errores[0]
+
+
+def test_parseo_respuesta_html():
+    res = ArcaWSFEClient()._parse_fe_cae_solicitar_response("<html><body>Service Unavailable")
+
+    assert res.aprobada is False
+    assert "no es XML" in res.mensaje
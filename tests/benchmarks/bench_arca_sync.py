@@ -0,0 +1,139 @@
+"""
+Benchmark de sincronización de borradores contra el stub local de ARCA.
+
+Crea N borradores en una base SQLite en archivo temporal, levanta ArcaStubServer y
+corre FacturasService.sincronizar_borradores_con_arca con los clientes WSAA /
+WSFE reales (SOAP + HTTP + parseo). No toca homologación.
+
+    python -m tests.benchmarks.bench_arca_sync --facturas 200 --latency 0.08 --en-lote
+
+Cada worker usa su propia conexión a la base (SQLite en archivo, modo WAL);
+SQLite serializa las escrituras, así que con --workers > 1 se mide sobre
+todo la concurrencia de red.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("APPDATA", tempfile.gettempdir())
+
+from tests.fixtures.arca_fakes import inyectar_clientes_arca  # noqa: E402
+from tests.fixtures.arca_stub_server import ArcaStubServer, clientes_contra_stub  # noqa: E402
+from tests.fixtures.db_factory import (  # noqa: E402
+    SESSION_LOCAL_MODULES,
+    insert_cliente,
+    insert_vehiculo,
+    make_sqlite_sessionmaker,
+)
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--facturas", type=int, default=100, help="borradores a sincronizar")
+    parser.add_argument("--puntos", type=int, default=1, help="puntos de venta (grupos en paralelo)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--en-lote", action="store_true", help="FECAESolicitar con varios comprobantes")
+    parser.add_argument("--latency", type=float, default=0.05, help="segundos por request")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--html-error-rate", type=float, default=0.0)
+    parser.add_argument("--lost-response-rate", type=float, default=0.0)
+    parser.add_argument("--max-rps", type=float, default=50.0, help="límite del cliente WSFE")
+    parser.add_argument("--seed", type=int, default=1234)
+    return parser.parse_args(argv)
+
+
+def _instalar_base(tmp: Path):
+    from app.services.arca_outbox_service import ArcaOutboxService
+    from app.services.audit_log_service import AuditLogService
+    from app.services.stock_service import StockService
+
+    session_factory = make_sqlite_sessionmaker(tmp, en_archivo=True)
+    for module_name in SESSION_LOCAL_MODULES:
+        try:
+            module = __import__(module_name, fromlist=["SessionLocal"])
+            setattr(module, "SessionLocal", session_factory)
+        except Exception:
+            pass
+
+    ArcaOutboxService._has_outbox = lambda self, db: True
+    AuditLogService._has_audit_log = lambda self, db: True
+    StockService._has_stock_movimientos = lambda self, db: True
+    return session_factory
+
+
+def _crear_borradores(svc, session_factory, cantidad: int, puntos: int) -> None:
+    from tests.conftest import build_factura_payload
+
+    with session_factory() as db:
+        cliente_id = insert_cliente(db)
+        for i in range(cantidad):
+            vehiculo_id = insert_vehiculo(db, suffix=f"B{i}")
+            pto_vta = 1 + (i % puntos)
+            cabecera, items = build_factura_payload(cliente_id, vehiculo_id, pto_vta=pto_vta)
+            cabecera["numero"] = i // puntos + 1
+            svc.create_factura_completa(cabecera, items)
+
+
+def main(argv=None) -> None:
+    args = _parse_args(argv)
+
+    from loguru import logger
+
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    from app.core.catalog_cache import CatalogCache
+    from app.integrations.arca.rate_limiter import set_rate_limit
+    from app.integrations.arca.transport import get_pool
+    from app.services.facturas_service import FacturasService
+
+    with tempfile.TemporaryDirectory() as tmp_dir, ArcaStubServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        html_error_rate=args.html_error_rate,
+        lost_response_rate=args.lost_response_rate,
+        seed=args.seed,
+    ) as server:
+        tmp = Path(tmp_dir)
+        session_factory = _instalar_base(tmp)
+        CatalogCache.get().invalidate()
+        set_rate_limit("wsfe", args.max_rps)
+
+        wsaa, wsfe = clientes_contra_stub(server, tmp)
+        svc = FacturasService()
+        inyectar_clientes_arca(svc, wsaa=wsaa, wsfe=wsfe)
+
+        _crear_borradores(svc, session_factory, args.facturas, max(args.puntos, 1))
+        wsaa.get_auth()
+
+        inicio = time.perf_counter()
+        resumen = svc.sincronizar_borradores_con_arca(en_lote=args.en_lote, max_workers=args.workers)
+        elapsed = time.perf_counter() - inicio
+
+        print(f"Facturas:        {args.facturas} en {args.puntos} punto(s) de venta")
+        print(f"Modo:            {'lote' if args.en_lote else 'una por request'}, {args.workers} worker(s)")
+        print(f"Tiempo:          {elapsed:.2f} s")
+        print(f"Throughput:      {resumen['procesadas'] / elapsed if elapsed else 0:.1f} facturas/s")
+        print(
+            "Resultado:       "
+            f"{resumen['aprobadas']} aprobadas, {resumen['rechazadas']} rechazadas, "
+            f"{resumen['error_comunicacion']} error comunicación"
+        )
+        print(f"Requests stub:   {dict(server.requests)}")
+        print(f"Fallas stub:     {dict(server.fallas)}")
+        print(f"Pool WSFE:       {get_pool(server.wsfe_url, profile='wsfe').stats()}")
+
+
+if __name__ == "__main__":
+    main()
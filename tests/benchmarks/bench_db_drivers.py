@@ -0,0 +1,104 @@
+"""
+Compara los drivers MySQL disponibles sobre consultas reales de los
+repositorios y del Libro IVA, contra la base configurada en config.json
+(usar una copia, no producción: sólo lee).
+
+    python -m tests.benchmarks.bench_db_drivers --repeat 5 --page-size 500
+
+Por cada driver instalado crea su propio engine (make_engine) y mide el
+tiempo de pared de cada consulta; el primer round es de calentamiento.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("APPDATA", tempfile.gettempdir())
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--drivers", default="mysqlclient,mysqlconnector,pymysql")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=500, help="filas por listado")
+    parser.add_argument("--mes", type=int, default=date.today().month)
+    parser.add_argument("--anio", type=int, default=date.today().year)
+    return parser.parse_args(argv)
+
+
+def _consultas(args):
+    from sqlalchemy import text
+
+    from app.reportes.iva_ventas import QUERY_CBTE, QUERY_DETALLE
+    from app.repositories.clientes_repository import ClientesRepository
+    from app.repositories.facturas_repository import FacturasRepository
+    from app.repositories.vehiculos_repository import VehiculosRepository
+
+    periodo = {"mes": args.mes, "anio": args.anio}
+    return {
+        "facturas.search": lambda db: FacturasRepository(db).search({}, page=1, page_size=args.page_size),
+        "clientes.search": lambda db: ClientesRepository(db).search(page=1, page_size=args.page_size),
+        "vehiculos.search": lambda db: VehiculosRepository(db).search(page=1, page_size=args.page_size),
+        "iva_ventas.cbte": lambda db: db.execute(text(QUERY_CBTE), periodo).mappings().all(),
+        "iva_ventas.detalle": lambda db: db.execute(text(QUERY_DETALLE), periodo).mappings().all(),
+    }
+
+
+def main(argv=None) -> None:
+    args = _parse_args(argv)
+
+    from loguru import logger
+
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    from sqlalchemy.orm import sessionmaker
+
+    from app.data.database import _driver_disponible, make_engine
+
+    consultas = _consultas(args)
+    resultados = {}
+
+    for driver in [d.strip() for d in args.drivers.split(",") if d.strip()]:
+        if not _driver_disponible(driver):
+            print(f"{driver:15} no instalado, se omite")
+            continue
+
+        engine = make_engine(driver, pool_size=1)
+        Session = sessionmaker(bind=engine, future=True)
+        tiempos = {nombre: [] for nombre in consultas}
+        try:
+            for ronda in range(args.repeat + 1):
+                with Session() as db:
+                    for nombre, fn in consultas.items():
+                        inicio = time.perf_counter()
+                        fn(db)
+                        if ronda:  # la ronda 0 calienta conexión y caché del servidor
+                            tiempos[nombre].append(time.perf_counter() - inicio)
+        finally:
+            engine.dispose()
+        resultados[driver] = tiempos
+
+    if not resultados:
+        print("Ningún driver disponible.")
+        return
+
+    drivers = list(resultados)
+    print(f"\n{'consulta':22}" + "".join(f"{d:>16}" for d in drivers) + "   (mediana, ms)")
+    for nombre in consultas:
+        fila = "".join(f"{statistics.median(resultados[d][nombre]) * 1000:16.1f}" for d in drivers)
+        print(f"{nombre:22}{fila}")
+
+
+if __name__ == "__main__":
+    main()
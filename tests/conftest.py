@@ -9,45 +9,55 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from tests.fixtures.arca_fakes import FakeWSAA, FakeWSFE
-from tests.fixtures.db_factory import make_sqlite_sessionmaker, insert_cliente, insert_vehiculo
+from tests.fixtures.arca_fakes import FakeWSAA, FakeWSFE, inyectar_clientes_arca
+from tests.fixtures.db_factory import SESSION_LOCAL_MODULES, make_sqlite_sessionmaker, insert_cliente, insert_vehiculo
 
 
 @pytest.fixture()
 def test_sessionmaker(tmp_path, monkeypatch):
-    SessionTesting = make_sqlite_sessionmaker(tmp_path)
+    from app.data.database import ScopedSessionFactory
+
+    SessionTesting = ScopedSessionFactory(make_sqlite_sessionmaker(tmp_path))
 
     from app.core.catalog_cache import CatalogCache
 
     CatalogCache.get().invalidate()
 
-    modules_to_patch = [
-        "app.data.database",
-        "app.services.facturas_service",
-        "app.services.factura_numbering_service",
-        "app.services.arca_authorization_service",
-        "app.services.nota_credito_creator",
-        "app.services.importacion_certificados_service",
-        "app.services.importacion_datos_service",
-        "app.services.comprobantes_service",
-        "app.services.catalogos_service",
-        "app.services.ventas_service",
-        "app.services.pagos_service",
-        "app.reportes.iva_ventas",
-        "app.reportes.iva_ventas_datos",
-    ]
-    for module_name in modules_to_patch:
+    from app.core.count_cache import CountCache
+
+    CountCache.get().invalidate()
+    CountCache.get().install(SessionTesting._maker.kw["bind"])
+
+    from app.services.facturas_service import FacturasService
+    from app.services.service_registry import ServiceRegistry
+
+    ServiceRegistry.get().reset()
+
+    from app.services.search_index_service import SearchIndexService
+
+    SearchIndexService.reset()
+    FacturasService.invalidar_estado_ids()
+    monkeypatch.setattr("app.services.catalogos_service._snapshot_path", lambda: tmp_path / "catalogos.json")
+
+    for module_name in SESSION_LOCAL_MODULES:
         try:
             module = __import__(module_name, fromlist=["SessionLocal"])
             monkeypatch.setattr(module, "SessionLocal", SessionTesting, raising=False)
         except Exception:
             pass
 
+    from app.repositories.clientes_repository import ClientesRepository
+    from app.services.arca_outbox_service import ArcaOutboxService
+    from app.services.catalogos_service import CatalogosService
     from app.services.audit_log_service import AuditLogService
     from app.services.stock_service import StockService
 
+    monkeypatch.setattr(ArcaOutboxService, "_has_outbox", lambda self, db: True)
     monkeypatch.setattr(AuditLogService, "_has_audit_log", lambda self, db: True)
+    monkeypatch.setattr(CatalogosService, "_has_catalog_versions", lambda self, db: True)
     monkeypatch.setattr(StockService, "_has_stock_movimientos", lambda self, db: True)
+    monkeypatch.setattr(ClientesRepository, "_has_busqueda_normalizada", lambda self: True)
+    monkeypatch.setattr(SearchIndexService, "_has_updated_at", lambda self, db, tabla: True)
     return SessionTesting
 
 
@@ -82,18 +92,13 @@ def make_vehiculo(db):
 def factura_service_factory(test_sessionmaker):
     from app.services.facturas_service import FacturasService
 
-    def _make(*, wsfe: FakeWSFE | None = None):
+    def _make(*, wsfe: FakeWSFE | None = None, wsaa=None):
         svc = FacturasService()
-        fake_wsaa = FakeWSAA()
-        fake_wsfe = wsfe or FakeWSFE(ultimo_autorizado=0, aprobada=True)
-        svc._wsaa = fake_wsaa
-        svc._wsfe = fake_wsfe
-        svc._numbering._wsaa = fake_wsaa
-        svc._numbering._wsfe = fake_wsfe
-        svc._arca_authorization._wsaa = fake_wsaa
-        svc._arca_authorization._wsfe = fake_wsfe
-        svc._nota_credito_creator._wsaa = fake_wsaa
-        svc._nota_credito_creator._wsfe = fake_wsfe
+        inyectar_clientes_arca(
+            svc,
+            wsaa=wsaa or FakeWSAA(),
+            wsfe=wsfe or FakeWSFE(ultimo_autorizado=0, aprobada=True),
+        )
         return svc
 
     return _make
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from app.repositories.clientes_repository import ClientesRepository, es_documento, filtros_nombre
+from app.repositories.facturas_repository import FacturasRepository
+from app.services.clientes_service import ClientesService
+from tests.fixtures.db_factory import insert_cliente
+
+
+def _nombres(rows):
+    return [f"{r['nombre']} {r['apellido']}" for r in rows]
+
+
+def test_normalizacion_de_la_consulta():
+    assert es_documento("30.123.456") and es_documento("20-30123456-7")
+    assert not es_documento("perez 2") and not es_documento("-")
+    assert filtros_nombre("  Perez   JUAN carlos ") == {"q_nombre": "perez%", "q_resto": "%juan%carlos%"}
+    assert filtros_nombre("ana", clave="cliente") == {"cliente_nombre": "ana%"}
+
+
+def test_documento_por_prefijo_tambien_dentro_del_cuit(db):
+    insert_cliente(db, nro_doc="30123456", nombre="Ana", apellido="Gomez")
+    insert_cliente(db, nro_doc="20-30999888-1", nombre="Bruno", apellido="Diaz")
+    insert_cliente(db, nro_doc="11301234", nombre="Carla", apellido="Ruiz")
+    repo = ClientesRepository(db)
+
+    rows, total = repo.search({"q": "30.12"})
+    assert total == 1 and _nombres(rows) == ["Ana Gomez"]
+
+    # DNI tipeado sobre un cliente cargado con CUIT
+    rows, _ = repo.search({"q": "30999"})
+    assert _nombres(rows) == ["Bruno Diaz"]
+
+    rows, _ = repo.search({"q": "2030999888"})
+    assert _nombres(rows) == ["Bruno Diaz"]
+
+
+def test_nombre_en_cualquier_orden(db):
+    insert_cliente(db, nro_doc="1", nombre="Juan Carlos", apellido="Perez")
+    insert_cliente(db, nro_doc="2", nombre="Juana", apellido="Lopez")
+    insert_cliente(db, nro_doc="3", nombre="Pedro", apellido="Juarez")
+    repo = ClientesRepository(db)
+
+    assert sorted(_nombres(repo.search({"q": "jua"})[0])) == ["Juan Carlos Perez", "Juana Lopez", "Pedro Juarez"]
+    assert _nombres(repo.search({"q": "perez juan"})[0]) == ["Juan Carlos Perez"]
+    assert _nombres(repo.search({"q": "JUAN perez"})[0]) == ["Juan Carlos Perez"]
+    assert repo.search({"q": "carlos"})[1] == 0
+
+
+def test_selector_y_facturas_usan_las_columnas_normalizadas(db, cliente_id):
+    insert_cliente(db, nro_doc="27111222", nombre="Maria", apellido="Sosa")
+    sugeridos = ClientesService().buscar("27111", limit=5)
+    assert _nombres(sugeridos) == ["Maria Sosa"]
+    assert "tipo_doc_label" in sugeridos[0]
+
+    from sqlalchemy import text
+
+    db.execute(
+        text(
+            "INSERT INTO facturas (tipo_comprobante_id, numero, fecha_emision, punto_venta, estado_id, cliente_id) "
+            "VALUES (2, 1, '2026-01-01', 2, 13, :c)"
+        ),
+        {"c": cliente_id},
+    )
+    db.commit()
+    repo = FacturasRepository(db)
+    assert repo.search({"cliente": "qa clie"})[1] == 1
+    assert repo.search({"documento": "9508"})[1] == 1
+    assert repo.search({"documento": "0831"})[1] == 0
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from sqlalchemy import event, text
+
+from app.core.catalog_cache import CatalogCache
+from app.services.catalogos_service import SNAPSHOT_KEYS, CatalogosService
+
+
+def _contar_consultas(test_sessionmaker):
+    consultas = []
+    engine = test_sessionmaker._maker.kw["bind"]
+    event.listen(engine, "before_cursor_execute", lambda *a: consultas.append(a[2]))
+    return consultas
+
+
+def test_warmup_guarda_y_el_arranque_siguiente_no_consulta_la_base(test_sessionmaker, tmp_path):
+    svc = CatalogosService()
+    svc.warmup_all()
+    assert (tmp_path / "catalogos.json").exists()
+
+    CatalogCache.get().invalidate()
+    consultas = _contar_consultas(test_sessionmaker)
+
+    assert sorted(svc.cargar_snapshot()) == sorted(SNAPSHOT_KEYS)
+    data = svc.warmup_all()
+
+    assert consultas == []
+    assert {c["nombre"] for c in data["colores"]} == {c["nombre"] for c in svc.get_colores()}
+
+
+def test_snapshot_de_otra_base_se_ignora(test_sessionmaker, monkeypatch):
+    svc = CatalogosService()
+    svc.warmup_all()
+    CatalogCache.get().invalidate()
+
+    monkeypatch.setattr("app.services.catalogos_service._snapshot_origen", lambda: "otra:3306/homologacion")
+    assert svc.cargar_snapshot() == []
+
+
+def test_snapshot_danado_se_ignora(test_sessionmaker, tmp_path):
+    (tmp_path / "catalogos.json").write_text("{no es json", encoding="utf-8")
+    assert CatalogosService().cargar_snapshot() == []
+
+
+def test_revalidar_trae_solo_lo_que_cambio_mientras_tanto(test_sessionmaker):
+    svc = CatalogosService()
+    svc.warmup_all()
+    CatalogCache.get().invalidate()
+
+    db = test_sessionmaker()
+    try:
+        db.execute(text("INSERT INTO colores (nombre) VALUES ('ROSA')"))
+        svc.registrar_cambio(db, "colores")
+        db.commit()
+    finally:
+        db.close()
+
+    svc.cargar_snapshot()
+    assert "ROSA" not in [c["nombre"] for c in svc.get_colores()]
+
+    assert svc.revalidar_snapshot() == ["colores"]
+    assert "ROSA" in [c["nombre"] for c in svc.get_colores()]
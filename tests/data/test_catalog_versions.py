@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import time
+
+from sqlalchemy import text
+
+from app.core.catalog_cache import CatalogCache
+from app.services.catalog_version_poller import CatalogVersionPoller
+from app.services.catalogos_service import CAT_KEYS, CatalogosService
+
+
+def _otra_terminal_agrega_color(test_sessionmaker, nombre):
+    db = test_sessionmaker()
+    try:
+        db.execute(text("INSERT INTO colores (nombre) VALUES (:n)"), {"n": nombre})
+        CatalogosService().registrar_cambio(db, "colores")
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_entrada_vencida_se_trata_como_ausente():
+    cache = CatalogCache()
+    cache.set("colores", [1], ttl=0.01)
+    cache.set("proveedores", [2])
+
+    assert cache.get_value("colores") == [1]
+    time.sleep(0.02)
+    assert cache.get_value("colores") is None
+    assert cache.missing(["colores", "proveedores"]) == ["colores"]
+    assert cache.get_value("proveedores") == [2]
+
+
+def test_warmup_recarga_solo_lo_que_falta(test_sessionmaker, monkeypatch):
+    svc = CatalogosService()
+    svc.warmup_all()
+
+    pedidos = []
+    original = CatalogosService.reload
+    monkeypatch.setattr(CatalogosService, "reload", lambda self, *k: pedidos.append(k) or original(self, *k))
+
+    CatalogCache.get().invalidate("colores")
+    data = svc.warmup_all()
+
+    assert pedidos == [("colores",)]
+    assert set(data) == set(CAT_KEYS)
+
+
+def test_poller_recarga_solo_los_catalogos_que_cambiaron(test_sessionmaker):
+    svc = CatalogosService()
+    svc.warmup_all()
+    assert svc.refrescar_cambiados() == []
+
+    _otra_terminal_agrega_color(test_sessionmaker, "VERDE AGUA")
+
+    poller = CatalogVersionPoller(svc.refrescar_cambiados, poll_seconds=30)
+    assert poller.run_once() == ["colores"]
+    assert "VERDE AGUA" in [c["nombre"] for c in svc.get_colores()]
+    assert svc.refrescar_cambiados() == []
+
+
+def test_refrescar_recarga_los_que_estan_por_vencer(test_sessionmaker):
+    svc = CatalogosService()
+    svc.warmup_all()
+    CatalogCache.get().set("proveedores", [], ttl=5)
+
+    assert svc.refrescar_cambiados(margen=10) == ["proveedores"]
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import app.data.database as database
+
+
+def test_driver_configurado_si_esta_instalado(monkeypatch):
+    monkeypatch.setattr(database, "_driver_disponible", lambda nombre: True)
+
+    assert database.resolver_driver("pymysql") == "pymysql"
+    assert database._mysql_url("mysqlclient").startswith("mysql+mysqldb://")
+
+
+def test_fallback_automatico_si_falta_el_driver(monkeypatch):
+    monkeypatch.setattr(database, "_driver_disponible", lambda nombre: nombre == "pymysql")
+
+    assert database.resolver_driver("mysqlclient") == "pymysql"
+    assert database.resolver_driver("auto") == "pymysql"
+    assert database.resolver_driver("inexistente") == "pymysql"
+
+
+def test_por_defecto_pymysql_aunque_haya_drivers_en_c(monkeypatch):
+    monkeypatch.setattr(database, "_driver_disponible", lambda nombre: True)
+    monkeypatch.setattr(database, "settings", SimpleNamespace(DB_DRIVER=""))
+
+    assert database.resolver_driver() == "pymysql"
+    assert database.resolver_driver("auto") == "mysqlclient"
+    assert database.resolver_driver("mysqlconnector") == "mysqlconnector"
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import time
+
+from sqlalchemy import bindparam, event, text
+
+from app.core.count_cache import CountCache
+from app.repositories.clientes_repository import ClientesRepository
+from app.repositories.facturas_repository import FacturasRepository
+from app.services.clientes_service import ClientesService
+from tests.fixtures.db_factory import insert_cliente
+
+
+def _insert_facturas(db, cliente_id, fechas):
+    for numero, fecha in enumerate(fechas, start=1):
+        db.execute(
+            text(
+                "INSERT INTO facturas (tipo_comprobante_id, numero, fecha_emision, punto_venta, estado_id, cliente_id) "
+                "VALUES (2, :n, :f, 2, 13, :c)"
+            ),
+            {"n": numero, "f": fecha, "c": cliente_id},
+        )
+    db.commit()
+
+
+def _recorrer(repo, filtros, page_size):
+    paginas, pagina = [], repo.search_seek(filtros, page_size=page_size)
+    paginas.append([r["id"] for r in pagina.rows])
+    while pagina.hay_siguiente:
+        pagina = repo.search_seek(filtros, cursor=pagina.ultimo, page_size=page_size)
+        paginas.append([r["id"] for r in pagina.rows])
+    return paginas, pagina
+
+
+def test_facturas_por_fecha_e_id_igual_que_offset(db, cliente_id):
+    # Varias facturas comparten fecha: el desempate es el id
+    fechas = ["2026-01-0%d 10:00:00" % (1 + i // 3) for i in range(11)]
+    _insert_facturas(db, cliente_id, fechas)
+    repo = FacturasRepository(db)
+
+    paginas, ultima = _recorrer(repo, {}, page_size=4)
+
+    por_offset = [[r["id"] for r in repo.search({}, page=p, page_size=4)[0]] for p in (1, 2, 3)]
+    assert paginas == por_offset
+    assert [len(p) for p in paginas] == [4, 4, 3]
+    assert ultima.hay_anterior and not ultima.hay_siguiente
+
+    anterior = repo.search_seek({}, cursor=ultima.primero, atras=True, page_size=4)
+    assert [r["id"] for r in anterior.rows] == paginas[1]
+    primera = repo.search_seek({}, cursor=anterior.primero, atras=True, page_size=4)
+    assert [r["id"] for r in primera.rows] == paginas[0]
+    assert not primera.hay_anterior and primera.hay_siguiente
+
+
+def test_seek_no_usa_offset_ni_cuenta(test_sessionmaker, db):
+    for i in range(7):
+        insert_cliente(db, nro_doc=str(30000000 + i), nombre=f"Cliente {i}")
+    repo = ClientesRepository(db)
+
+    consultas = []
+    engine = test_sessionmaker._maker.kw["bind"]
+    event.listen(engine, "before_cursor_execute", lambda *a: consultas.append(a[2]))
+
+    paginas, _ = _recorrer(repo, {"nombre": "cliente"}, page_size=3)
+
+    assert [len(p) for p in paginas] == [3, 3, 1]
+    assert sorted(sum(paginas, []), reverse=True) == sum(paginas, [])
+    assert not any("OFFSET" in c or "COUNT(" in c for c in consultas)
+    assert repo.count({"nombre": "cliente"}) == 7
+
+
+def test_total_se_cachea_y_se_invalida_con_altas(test_sessionmaker, db, monkeypatch):
+    svc = ClientesService()
+    contados = []
+    original = ClientesService._contar
+    monkeypatch.setattr(ClientesService, "_contar", lambda self, f: contados.append(f) or original(self, f))
+
+    insert_cliente(db)
+    pagina, total = svc.search_seek({}, page_size=10)
+    assert total == 1 and len(pagina.rows) == 1
+    svc.search_seek({}, cursor=pagina.ultimo, page_size=10)
+    assert len(contados) == 1
+
+    svc.create_cliente({"nro_doc": "20111222", "nombre": "Nuevo", "apellido": "QA", "tipo_doc_id": 96, "estado_id": 10})
+    _pagina, total = svc.search_seek({}, page_size=10)
+    assert total == 2
+    assert len(contados) == 2
+
+
+def test_total_vencido_se_recalcula_en_segundo_plano():
+    cache = CountCache()
+    clave = CountCache.clave("clientes", {"nombre": "x", "email": None})
+    assert clave == CountCache.clave("clientes", {"nombre": "x"})
+
+    assert cache.total(clave, lambda: 5, ttl=0.01) == 5
+    time.sleep(0.02)
+    assert cache.total(clave, lambda: 6, ttl=0.01) == 5
+
+    for _ in range(100):
+        if cache.total(clave, lambda: 6, ttl=60) == 6:
+            break
+        time.sleep(0.01)
+    assert cache.total(clave, lambda: 7, ttl=60) == 6
+
+
+def test_ediciones_y_bajas_invalidan_el_total(test_sessionmaker, db):
+    svc = ClientesService()
+    ids = [insert_cliente(db, nro_doc=str(40000000 + i), estado_id=10) for i in range(3)]
+    assert svc.search_seek({"estado_id": 10}, page_size=10)[1] == 3
+
+    svc.update(ids[0], {"estado_id": 11})
+    assert svc.search_seek({"estado_id": 10}, page_size=10)[1] == 2
+
+    db.execute(text("DELETE FROM clientes WHERE id = :id"), {"id": ids[1]})
+    db.commit()
+    assert svc.search_seek({"estado_id": 10}, page_size=10)[1] == 1
+
+    # Una escritura que se revierte no invalida nada
+    db.execute(text("DELETE FROM clientes WHERE id = :id"), {"id": ids[2]})
+    db.rollback()
+    assert CountCache.clave("clientes", {"estado_id": 10}) in CountCache.get()._data
+
+
+def test_las_banderas_de_pagina_salen_de_los_datos(db):
+    for i in range(6):
+        insert_cliente(db, nro_doc=str(50000000 + i), nombre=f"Cliente {i}")
+    repo = ClientesRepository(db)
+
+    primera = repo.search_seek({}, page_size=3)
+    segunda = repo.search_seek({}, cursor=primera.ultimo, page_size=3)
+    assert segunda.hay_anterior and not segunda.hay_siguiente
+
+    # Se borra todo lo de la primera página: volver atrás ya no tiene a dónde ir
+    db.execute(
+        text("DELETE FROM clientes WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+        {"ids": [r["id"] for r in primera.rows]},
+    )
+    db.commit()
+    segunda = repo.search_seek({}, cursor=primera.ultimo, page_size=3)
+    assert not segunda.hay_anterior
+
+    # Atrás desde una página cuyas filas siguientes se borraron
+    atras = repo.search_seek({}, cursor=segunda.primero, atras=True, page_size=3)
+    assert atras.rows == [] and not atras.hay_anterior and atras.hay_siguiente
+
+    # Adelante con filtros que ya no encuentran nada
+    vacia = repo.search_seek({"nombre": "nadie"}, cursor=segunda.ultimo, page_size=3)
+    assert vacia.rows == [] and not vacia.hay_anterior and not vacia.hay_siguiente
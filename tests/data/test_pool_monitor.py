@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.data.pool_monitor import PoolHealthMonitor, ReconnectingSession
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_size=3, pool_pre_ping=False)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def monitor(engine):
+    monitor = PoolHealthMonitor()
+    monitor.install(engine, interval=60, start=False)
+    yield monitor
+    monitor.uninstall()
+
+
+def _abrir(engine, n):
+    """Deja n conexiones ociosas en el pool y devuelve sus conexiones DBAPI."""
+    conns = [engine.pool.connect() for _ in range(n)]
+    dbapi = [c.dbapi_connection for c in conns]
+    for c in conns:
+        c.close()
+    return dbapi
+
+
+def test_revisar_descarta_las_conexiones_caidas(engine, monitor):
+    monitor.LOTE_REVISION = 3
+    dbapi = _abrir(engine, 3)
+    dbapi[1].close()
+
+    assert monitor.revisar() == 1
+
+    stats = monitor.stats()
+    assert stats["pings"] == 3
+    assert stats["expulsadas"] == 1
+    assert stats["checkedin"] == 3
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_revisar_toma_un_lote_acotado_por_pasada(engine, monitor):
+    _abrir(engine, 3)
+    monitor.LOTE_REVISION = 2
+
+    monitor.revisar()
+    assert monitor.stats()["pings"] == 2
+    assert monitor.stats()["checkedin"] == 3
+
+    monitor.revisar()
+    assert monitor.stats()["pings"] == 4
+
+
+def test_checkout_no_hace_ping_si_la_conexion_se_uso_hace_poco(engine, monitor):
+    _abrir(engine, 1)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert monitor.stats()["pings_checkout"] == 0
+
+
+def test_checkout_reemplaza_una_conexion_ociosa_caida(engine, monitor):
+    monitor._max_idle = 0.0
+    dbapi = _abrir(engine, 1)
+    dbapi[0].close()
+    time.sleep(0.01)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+    stats = monitor.stats()
+    assert stats["pings_checkout"] == 1
+    assert stats["reemplazadas_checkout"] == 1
+
+
+def test_session_reintenta_la_primera_sentencia_si_la_conexion_cayo(engine):
+    Session = sessionmaker(bind=engine, class_=ReconnectingSession, future=True)
+    dbapi = _abrir(engine, 1)
+    dbapi[0].close()
+
+    antes = PoolHealthMonitor.get().stats()["reintentos"]
+    with Session() as db:
+        assert db.execute(text("SELECT 1")).scalar() == 1
+    assert PoolHealthMonitor.get().stats()["reintentos"] == antes + 1
+
+
+def test_session_no_reintenta_en_medio_de_una_transaccion(engine):
+    Session = sessionmaker(bind=engine, class_=ReconnectingSession, future=True)
+    with Session() as db:
+        db.execute(text("SELECT 1"))
+        db.connection().connection.dbapi_connection.close()
+        with pytest.raises(Exception):
+            db.execute(text("SELECT 1"))
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import json
+
+from sqlalchemy import create_engine, text
+
+from app.data.query_profiler import QueryProfiler, normalizar_sql
+
+
+def test_normaliza_literales_parametros_y_listas():
+    a = normalizar_sql("SELECT * FROM facturas  WHERE id IN (1, 2, 3) AND numero LIKE '%12%' -- filtro")
+    b = normalizar_sql("SELECT * FROM facturas\nWHERE id IN (%(id_1)s, %(id_2)s) AND numero LIKE %(q)s")
+
+    assert a == b == "SELECT * FROM facturas WHERE id IN (?) AND numero LIKE ?"
+
+
+def _consultar(engine, valor):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT :v AS x UNION ALL SELECT :v"), {"v": valor}).all()
+
+
+def test_agrupa_por_sentencia_y_registra_llamador(tmp_path):
+    engine = create_engine("sqlite://")
+    profiler = QueryProfiler()
+    profiler.install(engine)
+    try:
+        for i in range(5):
+            _consultar(engine, i)
+    finally:
+        profiler.uninstall(engine)
+    _consultar(engine, 99)
+
+    filas = [f for f in profiler.snapshot() if "UNION ALL" in f["sql"]]
+    assert len(filas) == 1
+    fila = filas[0]
+    assert fila["count"] == 5
+    assert fila["p50_ms"] <= fila["p95_ms"] <= fila["max_ms"]
+    assert fila["llamadores"][0]["metodo"].endswith("test_query_profiler._consultar")
+
+    path = profiler.dump_jsonl(tmp_path / "perfil.jsonl")
+    lineas = [json.loads(l) for l in path.read_text(encoding="utf-8").splitlines()]
+    assert any(l["sql"] == fila["sql"] and l["count"] == 5 for l in lineas)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.data.database import unit_of_work
+from app.data.replica import ReplicaRouter
+
+
+def _engine(path, origen):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE origen (nombre TEXT)"))
+        conn.execute(text("INSERT INTO origen VALUES (:n)"), {"n": origen})
+    return engine
+
+
+@pytest.fixture()
+def engines(tmp_path):
+    primaria = _engine(tmp_path / "primaria.db", "primaria")
+    replica = _engine(tmp_path / "replica.db", "replica")
+    yield primaria, replica
+    primaria.dispose()
+    replica.dispose()
+
+
+def _origen(router):
+    with router() as db:
+        return db.execute(text("SELECT nombre FROM origen")).scalar()
+
+
+def _router(primaria, replica, **kw):
+    return ReplicaRouter(
+        primary=sessionmaker(bind=primaria, future=True),
+        primary_engine=primaria,
+        replica_engine=replica,
+        **kw,
+    )
+
+
+def test_sin_replica_lee_de_la_principal(engines):
+    primaria, _replica = engines
+    router = ReplicaRouter(primary=sessionmaker(bind=primaria, future=True))
+    assert _origen(router) == "primaria"
+
+
+def test_lecturas_van_a_la_replica(engines):
+    router = _router(*engines)
+    assert _origen(router) == "replica"
+    assert router.lecturas_replica == 1
+
+
+def test_despues_de_escribir_se_lee_de_la_principal(engines):
+    primaria, replica = engines
+    router = _router(primaria, replica, stale_s=60)
+
+    with primaria.begin() as conn:
+        conn.execute(text("UPDATE origen SET nombre = 'primaria'"))
+
+    assert _origen(router) == "primaria"
+
+    router.stale_s = router.max_lag = 0
+    assert _origen(router) == "replica"
+
+
+def test_la_ventana_despues_de_escribir_cubre_el_atraso_admitido(engines):
+    primaria, replica = engines
+    router = _router(primaria, replica, stale_s=5, max_lag=30)
+    router._ultima_escritura = time.monotonic() - 10
+
+    assert router.ventana_escritura() == 30
+    assert _origen(router) == "primaria"
+
+
+class _ConexionFalsa:
+    def __init__(self, respuestas):
+        self._respuestas = respuestas
+
+    def exec_driver_sql(self, sql):
+        respuesta = self._respuestas[sql]
+        if isinstance(respuesta, Exception):
+            raise respuesta
+        return SimpleNamespace(mappings=lambda: SimpleNamespace(first=lambda: respuesta))
+
+
+def test_atraso_distingue_no_replica_de_estado_ilegible():
+    sin_permiso = OperationalError("SHOW", {}, Exception("REPLICATION CLIENT"))
+    assert ReplicaRouter._atraso(_ConexionFalsa({"SHOW REPLICA STATUS": None})) == 0.0
+    assert ReplicaRouter._atraso(
+        _ConexionFalsa({"SHOW REPLICA STATUS": {"Seconds_Behind_Source": 12}})
+    ) == 12.0
+    assert ReplicaRouter._atraso(
+        _ConexionFalsa({"SHOW REPLICA STATUS": sin_permiso, "SHOW SLAVE STATUS": sin_permiso})
+    ) is None
+
+
+def test_replica_caida_vuelve_a_la_principal(engines, tmp_path):
+    primaria, _replica = engines
+
+    def _no_conecta():
+        raise OSError("réplica apagada")
+
+    caida = create_engine("sqlite://", creator=_no_conecta)
+    router = _router(primaria, caida)
+
+    assert _origen(router) == "primaria"
+    assert router.disponible() is False
+
+
+def test_dentro_de_una_unidad_de_trabajo_se_usa_la_principal(engines, monkeypatch):
+    import app.data.database as database
+
+    primaria, replica = engines
+    maker = sessionmaker(bind=primaria, future=True)
+    scoped = database.ScopedSessionFactory(maker)
+    monkeypatch.setattr(database, "SessionLocal", scoped)
+    router = ReplicaRouter(primary=lambda **kw: scoped(**kw), primary_engine=primaria, replica_engine=replica)
+
+    with unit_of_work():
+        assert _origen(router) == "primaria"
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from sqlalchemy import event, text
+
+from app.core.trigram_index import TrigramIndex
+from app.services.clientes_service import ClientesService
+from app.services.search_index_service import SearchIndexService
+from app.services.vehiculos_service import VehiculosService
+from tests.fixtures.db_factory import insert_cliente, insert_vehiculo
+
+
+def _nombres(rows):
+    return [f"{r['nombre']} {r['apellido']}" for r in rows]
+
+
+def test_ranking_prefijo_contiene_y_error_de_tipeo():
+    idx = TrigramIndex()
+    idx.upsert(1, ["Juan", "Pérez"], {"id": 1})
+    idx.upsert(2, ["Ana", "Juanes"], {"id": 2})
+    idx.upsert(3, ["Marcelo", "Gonzalez"], {"id": 3})
+
+    assert [r["id"] for r in idx.search("juan")] == [1, 2]
+    assert [r["id"] for r in idx.search("PEREZ juan")] == [1]
+    # Un error de tipeo todavía encuentra al cliente
+    assert [r["id"] for r in idx.search("gonzales")] == [3]
+    assert idx.search("zzz") == [] and idx.search("  ") == []
+
+    idx.remove(1)
+    assert [r["id"] for r in idx.search("juan")] == [2]
+
+
+def test_indice_de_clientes_construye_y_aplica_deltas(test_sessionmaker, db):
+    insert_cliente(db, nro_doc="20-30123456-7", nombre="Ana", apellido="Gómez")
+    b = insert_cliente(db, nro_doc="28111222", nombre="Bruno", apellido="Diaz")
+    svc = SearchIndexService.get()
+
+    assert svc.buscar_clientes("ana") is None  # todavía sin construir
+    assert svc.run_once() == {"clientes": 2, "vehiculos": 0}
+
+    # DNI dentro del CUIT y nombre sin acento
+    assert _nombres(svc.buscar_clientes("30.123")) == ["Ana Gómez"]
+    assert _nombres(svc.buscar_clientes("gomez")) == ["Ana Gómez"]
+
+    db.execute(
+        text("UPDATE clientes SET apellido = 'Dominguez', updated_at = '2099-01-01 00:00:00' WHERE id = :id"),
+        {"id": b},
+    )
+    db.commit()
+    insert_cliente(db, nro_doc="33444555", nombre="Carla", apellido="Ruiz")
+
+    assert svc.run_once()["clientes"] >= 2
+    assert _nombres(svc.buscar_clientes("doming")) == ["Bruno Dominguez"]
+    assert svc.buscar_clientes("diaz") == []
+    assert _nombres(svc.buscar_clientes("carla")) == ["Carla Ruiz"]
+
+
+def test_sin_updated_at_sincroniza_las_altas_por_id(test_sessionmaker, db, monkeypatch):
+    monkeypatch.setattr(SearchIndexService, "_has_updated_at", lambda self, db, tabla: False)
+    insert_cliente(db, nro_doc="1", nombre="Ana", apellido="Gomez")
+    svc = SearchIndexService.get()
+    svc.run_once()
+
+    insert_cliente(db, nro_doc="2", nombre="Bruno", apellido="Diaz")
+    assert svc.clientes.sincronizar() == 1
+    assert svc.clientes.sincronizar() == 0
+    assert _nombres(svc.buscar_clientes("bru")) == ["Bruno Diaz"]
+
+
+def test_los_selectores_no_consultan_la_base_con_el_indice_listo(test_sessionmaker, db):
+    insert_cliente(db, nro_doc="27111222", nombre="Maria", apellido="Sosa")
+    insert_vehiculo(db, suffix="A1", marca="Honda", modelo="Wave", numero_motor="JH125-ABC")
+    insert_vehiculo(db, suffix="B2", marca="Honda", modelo="CG Titan", estado_stock_id=2)
+    SearchIndexService.get().run_once()
+    clientes, vehiculos = ClientesService(), VehiculosService()
+    clientes.buscar("maria")  # carga el catálogo de tipos de documento
+
+    consultas = []
+    engine = test_sessionmaker._maker.kw["bind"]
+    event.listen(engine, "before_cursor_execute", lambda *a: consultas.append(a[2]))
+
+    assert _nombres(clientes.buscar("27111", limit=5)) == ["Maria Sosa"]
+    assert [v["modelo"] for v in vehiculos.buscar("honda")] == ["Wave", "CG Titan"]
+    assert [v["modelo"] for v in vehiculos.buscar("honda", solo_disponibles=True)] == ["Wave"]
+    assert [v["modelo"] for v in vehiculos.buscar("jh125abc")] == ["Wave"]
+    assert consultas == []
+
+
+def test_cambio_de_stock_confirmado_despierta_la_sincronizacion(test_sessionmaker, db, monkeypatch):
+    from app.services import search_index_worker
+    from app.services.stock_service import StockService
+
+    despertadas = []
+    monkeypatch.setattr(search_index_worker, "wake_search_index_worker", lambda: despertadas.append(1))
+    search_index_worker.wake_on_commit(test_sessionmaker._maker.kw["bind"])
+    vehiculo_id = insert_vehiculo(db, suffix="C3", marca="Zanella")
+    despertadas.clear()
+
+    StockService().cambiar_estado(
+        db, vehiculo_id=vehiculo_id, estado_nuevo_id=2, tipo_movimiento="VENTA"
+    )
+    assert despertadas == []
+    db.commit()
+    assert despertadas == [1]
+
+    db.execute(text("UPDATE vehiculos SET estado_stock_id = 1 WHERE id = :id"), {"id": vehiculo_id})
+    db.rollback()
+    db.execute(text("SELECT 1"))
+    db.commit()
+    assert despertadas == [1]
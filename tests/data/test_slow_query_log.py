@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import json
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.data.slow_query_log import SlowQueryLog
+
+
+def test_consulta_lenta_se_registra_con_su_plan(tmp_path):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE facturas (id INTEGER PRIMARY KEY, numero INTEGER)"))
+
+    log = SlowQueryLog()
+    log.install(engine, threshold_ms=0, log_dir=tmp_path)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT id FROM facturas WHERE numero = :n"), {"n": 7}).all()
+        log.flush()
+    finally:
+        log.uninstall()
+
+    lineas = [json.loads(l) for f in tmp_path.glob("slow_queries_*.jsonl") for l in f.read_text().splitlines()]
+    select = [l for l in lineas if l["sql_normalizada"] == "SELECT id FROM facturas WHERE numero = ?"]
+
+    assert len(select) == 1
+    assert select[0]["params"] == [7]
+    assert select[0]["plan"]
+    assert "plan_error" not in select[0]
+    assert all("EXPLAIN" not in l["sql"] for l in lineas)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import pytest
+
+from app.repositories.statements import StatementRegistry
+
+
+def test_estaticas_se_construyen_una_vez():
+    reg = StatementRegistry("prueba")
+    stmt = reg.add("uno", "SELECT 1")
+
+    assert reg["uno"] is stmt
+    assert "uno" in reg
+    with pytest.raises(KeyError):
+        reg.add("uno", "SELECT 2")
+
+
+def test_dinamica_reutiliza_el_mismo_text_por_combinacion():
+    reg = StatementRegistry("prueba")
+    dyn = reg.dynamic(
+        "search",
+        filtros={"a": "x.a = :a", "b": "x.b LIKE :b"},
+        count="SELECT COUNT(*) FROM x WHERE {where}",
+    )
+
+    ab = dyn.get("count", ["a", "b"])
+    assert dyn.get("count", ["b", "a"]) is ab
+    assert str(ab) == "SELECT COUNT(*) FROM x WHERE (1=1) AND x.a = :a AND x.b LIKE :b"
+    assert str(dyn.get("count")) == "SELECT COUNT(*) FROM x WHERE (1=1)"
+
+    dyn.get("count", ["a"])
+    dyn.get("count", ["b"])
+    assert dyn.cache_size() == 4
+
+    with pytest.raises(KeyError):
+        dyn.get("count", ["c"])
+
+
+def test_busqueda_de_clientes_no_crece_la_cache_con_los_valores(db, test_sessionmaker):
+    from app.repositories.clientes_repository import ClientesRepository, _SEARCH
+    from tests.fixtures.db_factory import insert_cliente
+
+    insert_cliente(db, nro_doc="20111222", nombre="Ana", apellido="Gomez")
+    insert_cliente(db, nro_doc="20333444", nombre="Bruno", apellido="Diaz")
+    repo = ClientesRepository(db)
+
+    antes = _SEARCH.cache_size()
+    for termino in ("ana", "gom", "2011", "bru", "diaz"):
+        repo.search({"q": termino}, page=1, page_size=20)
+    # Documento o nombre, cada uno con count y page: a lo sumo 4 sentencias
+    assert _SEARCH.cache_size() - antes <= 4
+
+    rows, total = repo.search({"q": "gomez"}, page=1, page_size=20)
+    assert total == 1
+    assert rows[0]["nombre"] == "Ana"
+
+    rows, total = repo.search({"nombre": "bru", "estado_id": 10})
+    assert total == 1
+    assert rows[0]["apellido"] == "Diaz"
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+import app.data.database as database
+from app.data.database import ScopedSessionFactory, unit_of_work
+
+
+@pytest.fixture()
+def factory(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'uow.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE notas (id INTEGER PRIMARY KEY, texto TEXT)"))
+
+    checkouts = []
+    event.listen(engine, "checkout", lambda *args: checkouts.append(1))
+
+    scoped = ScopedSessionFactory(sessionmaker(bind=engine, future=True))
+    monkeypatch.setattr(database, "SessionLocal", scoped)
+    scoped.checkouts = checkouts
+    return scoped
+
+
+def _contar(factory):
+    with factory() as db:
+        return db.execute(text("SELECT COUNT(*) FROM notas")).scalar()
+
+
+def _insertar(factory, texto):
+    db = factory()
+    try:
+        db.execute(text("INSERT INTO notas (texto) VALUES (:t)"), {"t": texto})
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_servicios_comparten_una_conexion_dentro_de_la_unidad(factory):
+    factory.checkouts.clear()
+    with unit_of_work() as db:
+        for _ in range(5):
+            _contar(factory)
+        assert factory()._session is db
+
+    assert len(factory.checkouts) == 1
+
+
+def test_commit_se_difiere_hasta_el_final(factory, tmp_path):
+    otro = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'uow.db'}"))
+
+    with unit_of_work():
+        _insertar(factory, "a")
+        with otro() as db:
+            assert db.execute(text("SELECT COUNT(*) FROM notas")).scalar() == 0
+
+    assert _contar(factory) == 1
+
+
+def test_excepcion_deshace_toda_la_unidad(factory):
+    with pytest.raises(RuntimeError):
+        with unit_of_work():
+            _insertar(factory, "a")
+            _insertar(factory, "b")
+            raise RuntimeError("falla")
+
+    assert _contar(factory) == 0
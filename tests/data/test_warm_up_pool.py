@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+
+import app.data.database as database
+
+
+def test_abre_conexiones_distintas_en_paralelo(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=4)
+    conectadas = []
+    event.listen(engine, "connect", lambda *args: conectadas.append(1))
+    monkeypatch.setattr(database, "engine", engine)
+
+    assert database.warm_up_pool(4) == 4
+    assert len(conectadas) == 4
+    assert engine.pool.checkedin() == 4
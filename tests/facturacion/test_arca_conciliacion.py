@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from datetime import date
+from types import SimpleNamespace
+
+from sqlalchemy import text
+
+from tests.conftest import build_factura_payload
+from tests.fixtures.arca_fakes import FakeWSFE
+
+
+def _crear_autorizadas(db, svc, cliente_id, make_vehiculo, cantidad):
+    ids = []
+    for i in range(cantidad):
+        cabecera, items = build_factura_payload(cliente_id, make_vehiculo(suffix=f"C{i}"))
+        factura_id = svc.create_factura_completa(cabecera, items)
+        svc.autorizar_en_arca(factura_id)
+        ids.append(factura_id)
+    numeros = dict(db.execute(text("SELECT id, numero FROM facturas")).all())
+    return [(fid, int(numeros[fid])) for fid in ids]
+
+
+def _afip(cae="71234567890123", vto="20301231", total="1000.00"):
+    return {"resultado": "A", "cae": cae, "vto_cae": vto, "imp_total": total, "errores": [], "observaciones": []}
+
+
+def test_conciliacion_reporta_diferencias(db, cliente_id, make_vehiculo, factura_service_factory, tmp_path):
+    wsfe = FakeWSFE(ultimo_autorizado=0, aprobada=True)
+    svc = factura_service_factory(wsfe=wsfe)
+    svc._conciliacion._progreso_dir = tmp_path
+    (ok, n_ok), (cae_mal, n_cae), (total_mal, n_total), (falta, n_falta) = _crear_autorizadas(
+        db, svc, cliente_id, make_vehiculo, 4
+    )
+    en_afip = {
+        n_ok: _afip(),
+        n_cae: _afip(cae="79999999999999"),
+        n_total: _afip(total="1500.00"),
+        n_falta: {"resultado": None, "cae": None, "errores": ["602 - No existen datos"]},
+    }
+    wsfe.fe_comp_consultar = lambda *, auth, cbte_tipo, pto_vta, cbte_nro: en_afip[cbte_nro]
+
+    hoy = date.today()
+    resultado = svc.conciliar_con_arca(hoy, hoy)
+
+    assert resultado["total"] == 4
+    assert resultado["coincidentes"] == 1
+    assert resultado["completa"] is True
+    campos = {d["factura_id"]: d["campos"] for d in resultado["diferencias"]}
+    assert campos == {cae_mal: ["cae"], total_mal: ["total"], falta: ["no_registrada"]}
+
+
+def test_conciliacion_retoma_desde_el_avance_guardado(
+    db, cliente_id, make_vehiculo, factura_service_factory, tmp_path
+):
+    wsfe = FakeWSFE(ultimo_autorizado=0, aprobada=True)
+    svc = factura_service_factory(wsfe=wsfe)
+    svc._conciliacion._progreso_dir = tmp_path
+    (_, n1), (_, n2), (_, n3) = _crear_autorizadas(db, svc, cliente_id, make_vehiculo, 3)
+    consultados = []
+
+    def fe_comp_consultar(*, auth, cbte_tipo, pto_vta, cbte_nro):
+        consultados.append(cbte_nro)
+        if cbte_nro == n3 and consultados.count(n3) == 1:
+            raise RuntimeError("Timeout FECompConsultar")
+        return _afip()
+
+    wsfe.fe_comp_consultar = fe_comp_consultar
+    hoy = date.today()
+
+    primera = svc.conciliar_con_arca(hoy, hoy)
+    segunda = svc.conciliar_con_arca(hoy, hoy)
+
+    assert primera["completa"] is False
+    assert len(primera["errores"]) == 1
+    assert segunda["completa"] is True
+    assert segunda["coincidentes"] == 3
+    assert sorted(consultados) == sorted([n1, n2, n3, n3])
+
+
+def test_conciliacion_no_retoma_el_avance_de_otro_ambiente(
+    db, cliente_id, make_vehiculo, factura_service_factory, tmp_path, monkeypatch
+):
+    from app.services import arca_conciliacion_service
+
+    wsfe = FakeWSFE(ultimo_autorizado=0, aprobada=True)
+    svc = factura_service_factory(wsfe=wsfe)
+    svc._conciliacion._progreso_dir = tmp_path
+    (_, n1), (_, n2) = _crear_autorizadas(db, svc, cliente_id, make_vehiculo, 2)
+    consultados = []
+
+    def fe_comp_consultar(*, auth, cbte_tipo, pto_vta, cbte_nro):
+        consultados.append(cbte_nro)
+        if cbte_nro == n2 and consultados.count(n2) == 1:
+            raise RuntimeError("Timeout FECompConsultar")
+        return _afip()
+
+    wsfe.fe_comp_consultar = fe_comp_consultar
+    hoy = date.today()
+    ambiente = dict(ARCA_SYNC_WORKERS=1, ARCA_PROD_CUIT="30-71234567-1", ARCA_HOMO_CUIT="20-11111111-2")
+
+    monkeypatch.setattr(arca_conciliacion_service, "settings", SimpleNamespace(ARCA_ENV="HOMOLOGACION", **ambiente))
+    assert svc.conciliar_con_arca(hoy, hoy)["completa"] is False
+
+    monkeypatch.setattr(arca_conciliacion_service, "settings", SimpleNamespace(ARCA_ENV="PRODUCCION", **ambiente))
+    assert svc.conciliar_con_arca(hoy, hoy)["completa"] is True
+
+    # Producción no reutiliza lo revisado en homologación
+    assert sorted(consultados) == sorted([n1, n2, n1, n2])
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        f"arca_homologacion_20111111112_{hoy:%Y%m%d}_{hoy:%Y%m%d}.json",
+        f"arca_produccion_30712345671_{hoy:%Y%m%d}_{hoy:%Y%m%d}.json",
+    ]
+
+
+def test_reporte_xlsx_de_conciliacion(tmp_path):
+    from openpyxl import load_workbook
+
+    from app.reportes.conciliacion_arca import generar_xlsx_conciliacion_arca
+
+    resultado = {
+        "desde": date(2026, 9, 1),
+        "hasta": date(2026, 9, 30),
+        "total": 2,
+        "revisadas": 2,
+        "coincidentes": 1,
+        "diferencias": [
+            {
+                "factura_id": 7,
+                "comprobante": "FB 0002-00000007",
+                "campos": ["cae"],
+                "local": {"cae": "1", "vto_cae": "20301231", "total": 100.0, "estado_id": 14},
+                "afip": {"resultado": "A", "cae": "2", "vto_cae": "20301231", "total": "100", "errores": []},
+            }
+        ],
+        "errores": [],
+        "completa": True,
+    }
+
+    path = generar_xlsx_conciliacion_arca(resultado, path_override=str(tmp_path))
+
+    ws = load_workbook(path)["Diferencias"]
+    assert ws.cell(row=2, column=2).value == "FB 0002-00000007"
+    assert ws.cell(row=2, column=3).value == "CAE distinto"
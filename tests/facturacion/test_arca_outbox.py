@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from tests.conftest import build_factura_payload
+from tests.fixtures.arca_fakes import FakeWSFE, FakeWSFEConError
+
+
+def _outbox(db, factura_id):
+    return db.execute(
+        text("SELECT estado, intentos, proximo_intento, ultimo_error FROM arca_outbox WHERE factura_id=:id"),
+        {"id": factura_id},
+    ).mappings().first()
+
+
+def _estado_factura(db, factura_id):
+    return db.execute(text("SELECT estado_id FROM facturas WHERE id=:id"), {"id": factura_id}).scalar()
+
+
+def test_factura_encolada_se_autoriza_desde_el_outbox(db, cliente_id, vehiculo_id, factura_service_factory):
+    wsfe = FakeWSFE(ultimo_autorizado=0, aprobada=True)
+    svc = factura_service_factory(wsfe=wsfe)
+    cabecera, items = build_factura_payload(cliente_id, vehiculo_id)
+
+    factura_id = svc.create_factura_completa(cabecera, items, encolar_autorizacion=True)
+
+    assert wsfe.solicitudes == []
+    assert _outbox(db, factura_id)["estado"] == "PENDIENTE"
+
+    resultados = svc.procesar_outbox_arca()
+
+    assert [r["factura_id"] for r in resultados] == [factura_id]
+    assert resultados[0]["aprobada"] is True
+    assert _outbox(db, factura_id)["estado"] == "COMPLETADA"
+    assert _estado_factura(db, factura_id) == svc.ESTADO_AUTORIZADA
+
+
+def test_error_comunicacion_reprograma_sin_marcar_la_factura(
+    db, cliente_id, vehiculo_id, factura_service_factory
+):
+    svc = factura_service_factory(wsfe=FakeWSFEConError("ARCA no responde"))
+    cabecera, items = build_factura_payload(cliente_id, vehiculo_id)
+    factura_id = svc.create_factura_completa(cabecera, items, encolar_autorizacion=True)
+    antes = datetime.now()
+
+    resultados = svc.procesar_outbox_arca()
+    fila = _outbox(db, factura_id)
+
+    assert resultados[0]["outbox_estado"] == "PENDIENTE"
+    assert fila["intentos"] == 1
+    assert "ARCA no responde" in fila["ultimo_error"]
+    assert str(fila["proximo_intento"]) > str(antes + timedelta(seconds=25))
+    assert _estado_factura(db, factura_id) == svc.ESTADO_BORRADOR
+    assert svc.procesar_outbox_arca() == []
+
+
+def test_ultimo_intento_aplica_el_error_de_comunicacion(db, cliente_id, vehiculo_id, factura_service_factory):
+    svc = factura_service_factory(wsfe=FakeWSFEConError("ARCA no responde"))
+    svc._outbox._max_intentos = 1
+    cabecera, items = build_factura_payload(cliente_id, vehiculo_id)
+    factura_id = svc.create_factura_completa(cabecera, items, encolar_autorizacion=True)
+
+    svc.procesar_outbox_arca()
+
+    assert _outbox(db, factura_id)["estado"] == "FALLIDA"
+    assert _estado_factura(db, factura_id) == svc.ESTADO_ERROR_COMUNICACION
+
+
+def test_reintento_recupera_cae_si_afip_ya_lo_habia_autorizado(
+    db, cliente_id, vehiculo_id, factura_service_factory
+):
+    wsfe = FakeWSFEConError("Timeout leyendo respuesta")
+    wsfe.fe_comp_consultar = lambda **kw: {"resultado": "A", "cae": "CAE-RECUPERADO", "vto_cae": "20301231"}
+    svc = factura_service_factory(wsfe=wsfe)
+    cabecera, items = build_factura_payload(cliente_id, vehiculo_id)
+    factura_id = svc.create_factura_completa(cabecera, items, encolar_autorizacion=True)
+
+    svc.procesar_outbox_arca()
+    svc._outbox._clock = lambda: datetime.now() + timedelta(hours=1)
+    resultados = svc.procesar_outbox_arca()
+
+    assert len(wsfe.solicitudes) == 1
+    assert resultados[0]["cae"] == "CAE-RECUPERADO"
+    assert _outbox(db, factura_id)["estado"] == "COMPLETADA"
+    assert _estado_factura(db, factura_id) == svc.ESTADO_AUTORIZADA
+
+
+def test_numero_tomado_por_otra_factura_se_renumera_y_reenvia(
+    db, cliente_id, vehiculo_id, factura_service_factory
+):
+    wsfe = FakeWSFE(ultimo_autorizado=0, aprobada=True)
+    svc = factura_service_factory(wsfe=wsfe)
+    cabecera, items = build_factura_payload(cliente_id, vehiculo_id, total=1000.0)
+    factura_id = svc.create_factura_completa(cabecera, items, encolar_autorizacion=True)
+    numero = db.execute(text("SELECT numero FROM facturas WHERE id=:id"), {"id": factura_id}).scalar()
+
+    def _timeout(**kw):
+        raise TimeoutError("Timeout leyendo respuesta")
+
+    wsfe.solicitar_cae = _timeout
+    svc.procesar_outbox_arca()
+    del wsfe.solicitar_cae
+
+    # Durante el backoff otra PC autorizó ese mismo número con otro importe
+    wsfe.ultimo_autorizado = numero
+    wsfe.fe_comp_consultar = lambda **kw: {"resultado": "A", "cae": "CAE-OTRA-PC", "imp_total": "55.00"}
+    svc._outbox._clock = lambda: datetime.now() + timedelta(hours=1)
+    resultados = svc.procesar_outbox_arca()
+
+    fila = db.execute(
+        text("SELECT numero, cae, estado_id FROM facturas WHERE id=:id"), {"id": factura_id}
+    ).mappings().first()
+    assert resultados[0]["aprobada"] is True
+    assert fila["numero"] == numero + 1
+    assert fila["cae"] != "CAE-OTRA-PC"
+    assert fila["estado_id"] == svc.ESTADO_AUTORIZADA
+
+
+def test_huerfana_liberada_consulta_afip_antes_de_reenviar(
+    db, cliente_id, vehiculo_id, factura_service_factory
+):
+    wsfe = FakeWSFE(ultimo_autorizado=0, aprobada=True)
+    wsfe.fe_comp_consultar = lambda **kw: {"resultado": "A", "cae": "CAE-RECUPERADO", "imp_total": "1000.00"}
+    svc = factura_service_factory(wsfe=wsfe)
+    cabecera, items = build_factura_payload(cliente_id, vehiculo_id, total=1000.0)
+    factura_id = svc.create_factura_completa(cabecera, items, encolar_autorizacion=True)
+    db.execute(
+        text("UPDATE arca_outbox SET estado='PROCESANDO', updated_at=:t WHERE factura_id=:id"),
+        {"t": datetime.now() - timedelta(hours=1), "id": factura_id},
+    )
+    db.commit()
+
+    assert svc.liberar_outbox_huerfanas() == 1
+    assert _outbox(db, factura_id)["intentos"] == 1
+    resultados = svc.procesar_outbox_arca()
+
+    assert wsfe.solicitudes == []
+    assert resultados[0]["cae"] == "CAE-RECUPERADO"
+
+
+def test_ultimo_intento_con_falla_de_wsaa_aplica_el_error_de_comunicacion(
+    db, cliente_id, vehiculo_id, factura_service_factory
+):
+    class _WSAACaido:
+        def get_auth(self):
+            raise ConnectionError("WSAA no responde")
+
+    svc = factura_service_factory(wsfe=FakeWSFE(ultimo_autorizado=0, aprobada=True))
+    svc._arca_authorization._wsaa = _WSAACaido()
+    svc._outbox._max_intentos = 1
+    cabecera, items = build_factura_payload(cliente_id, vehiculo_id)
+    factura_id = svc.create_factura_completa(cabecera, items, encolar_autorizacion=True)
+
+    resultados = svc.procesar_outbox_arca()
+
+    assert resultados[0]["outbox_estado"] == "FALLIDA"
+    assert _estado_factura(db, factura_id) == svc.ESTADO_ERROR_COMUNICACION
+
+
+def test_outbox_no_adelanta_numeros_mientras_el_anterior_espera(
+    db, cliente_id, make_vehiculo, factura_service_factory
+):
+    wsfe = FakeWSFE(ultimo_autorizado=0, aprobada=True)
+    svc = factura_service_factory(wsfe=wsfe)
+    encoladas = []
+    for i, (pto_vta, numero) in enumerate([(2, 1), (2, 2), (3, 1)]):
+        cabecera, items = build_factura_payload(cliente_id, make_vehiculo(suffix=f"O{i}"), pto_vta=pto_vta)
+        cabecera["numero"] = numero
+        encoladas.append(svc.create_factura_completa(cabecera, items, encolar_autorizacion=True))
+    primera, segunda, otro_punto = encoladas
+
+    def _solicitar(**kw):
+        if kw["factura"]["id"] == primera:
+            raise TimeoutError("Timeout leyendo respuesta")
+        return FakeWSFE.solicitar_cae(wsfe, **kw)
+
+    wsfe.solicitar_cae = _solicitar
+    resultados = svc.procesar_outbox_arca()
+
+    # La 2-00000002 espera a la 2-00000001; el punto 3 sigue su curso
+    assert {r["factura_id"]: r["outbox_estado"] for r in resultados} == {
+        primera: "PENDIENTE",
+        otro_punto: "COMPLETADA",
+    }
+    assert _outbox(db, segunda)["intentos"] == 0
+    assert _estado_factura(db, segunda) == svc.ESTADO_BORRADOR
+
+    del wsfe.solicitar_cae
+    wsfe.fe_comp_consultar = lambda **kw: {"resultado": None, "cae": None, "errores": ["602 - No existen datos"]}
+    svc._outbox._clock = lambda: datetime.now() + timedelta(hours=1)
+    resultados = svc.procesar_outbox_arca()
+
+    assert [r["factura_id"] for r in resultados] == [primera, segunda]
+    assert all(r["aprobada"] for r in resultados)
+    assert [s["factura"]["numero"] for s in wsfe.solicitudes] == [1, 1, 2]
+
+
+def test_facturas_seguidas_con_la_anterior_en_cola_toman_el_numero_siguiente(
+    db, cliente_id, make_vehiculo, factura_service_factory
+):
+    wsfe = FakeWSFE(ultimo_autorizado=7, aprobada=True)
+    svc = factura_service_factory(wsfe=wsfe)
+    encoladas = []
+    for i in range(2):
+        cabecera, items = build_factura_payload(cliente_id, make_vehiculo(suffix=f"Q{i}"))
+        encoladas.append(svc.create_factura_completa(cabecera, items, encolar_autorizacion=True))
+
+    numeros = [
+        db.execute(text("SELECT numero FROM facturas WHERE id=:id"), {"id": fid}).scalar() for fid in encoladas
+    ]
+    assert numeros == [8, 9]
+    assert svc.sugerir_proximo_numero(2, 2) == 10
+    assert svc.diagnosticar_proximo_numero(2, 2)["proximo"] == 10
+
+    resultados = svc.procesar_outbox_arca()
+
+    assert [r["factura_id"] for r in resultados] == encoladas
+    assert all(r["aprobada"] for r in resultados)
+    assert svc.sugerir_proximo_numero(2, 2) == 10
+
+
+def test_sincronizacion_no_toma_facturas_encoladas(db, cliente_id, vehiculo_id, factura_service_factory):
+    wsfe = FakeWSFE(ultimo_autorizado=0, aprobada=True)
+    svc = factura_service_factory(wsfe=wsfe)
+    cabecera, items = build_factura_payload(cliente_id, vehiculo_id)
+    svc.create_factura_completa(cabecera, items, encolar_autorizacion=True)
+
+    resumen = svc.sincronizar_borradores_con_arca(max_workers=1)
+
+    assert resumen["procesadas"] == 0
+    assert wsfe.solicitudes == []
+
+
+def test_worker_entrega_resultados_a_los_listeners():
+    from app.services.arca_outbox_worker import ArcaOutboxWorker
+
+    recibidos = []
+    worker = ArcaOutboxWorker(lambda: [{"factura_id": 7, "aprobada": True}])
+    worker.add_listener(recibidos.append)
+
+    assert worker.run_once() == 1
+    assert recibidos == [{"factura_id": 7, "aprobada": True}]
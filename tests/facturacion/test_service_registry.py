@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import threading
+
+from sqlalchemy import event
+
+from app.services.facturas_service import FacturasService
+from app.services.service_registry import ServiceRegistry
+
+
+def _consultas_a_estados(test_sessionmaker):
+    consultas = []
+    engine = test_sessionmaker._maker.kw["bind"]
+
+    def _anotar(conn, cursor, statement, *a):
+        if "FROM estados" in statement:
+            consultas.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _anotar)
+    return consultas
+
+
+def test_registro_crea_una_sola_instancia(test_sessionmaker):
+    registro = ServiceRegistry.get()
+    creadas = []
+
+    def _crear():
+        creadas.append(1)
+        return FacturasService()
+
+    hilos = [threading.Thread(target=lambda: registro.obtener(FacturasService, _crear)) for _ in range(8)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    assert creadas == [1]
+    assert registro.facturas() is registro.obtener(FacturasService)
+
+    registro.reset(FacturasService)
+    assert FacturasService not in registro.creados()
+
+
+def test_ids_de_estados_se_resuelven_una_vez_por_proceso(test_sessionmaker):
+    consultas = _consultas_a_estados(test_sessionmaker)
+
+    primera = FacturasService()
+    assert len(consultas) == 2
+
+    segunda = FacturasService()
+    assert len(consultas) == 2
+    assert segunda.ESTADO_VENTA_CANCELADA == primera.ESTADO_VENTA_CANCELADA
+    assert segunda.ESTADO_ANULADA_POR_NC == primera.ESTADO_ANULADA_POR_NC
+
+    FacturasService.invalidar_estado_ids()
+    FacturasService()
+    assert len(consultas) == 4
+
+
+def test_falla_al_resolver_no_queda_cacheada(test_sessionmaker, monkeypatch):
+    monkeypatch.setattr(FacturasService, "_resolver_estado_ids", lambda self: None)
+    svc = FacturasService()
+    assert svc.ESTADO_ANULADA == FacturasService.ESTADO_ANULADA
+    assert FacturasService._estado_ids_cache is None
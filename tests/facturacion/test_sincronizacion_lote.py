@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+
+from app.integrations.arca.wsfe_client import ArcaWSFEClient
+from tests.conftest import build_factura_payload
+from tests.fixtures.arca_fakes import FakeWSFE, FakeWSFEConError
+
+
+def _crear_borradores(svc, cliente_id, make_vehiculo, cantidad: int) -> list[int]:
+    ids = []
+    for i in range(cantidad):
+        vehiculo_id = make_vehiculo(suffix=f"L{i}")
+        cabecera, items = build_factura_payload(cliente_id, vehiculo_id)
+        cabecera["numero"] = i + 1
+        ids.append(svc.create_factura_completa(cabecera, items))
+    return ids
+
+
+def test_sincronizacion_en_lote_numera_consecutivo_y_autoriza_en_una_llamada(
+    db,
+    cliente_id,
+    make_vehiculo,
+    factura_service_factory,
+):
+    wsfe = FakeWSFE(ultimo_autorizado=22, aprobada=True, cae="CAE-LOTE")
+    svc = factura_service_factory(wsfe=wsfe)
+    ids = _crear_borradores(svc, cliente_id, make_vehiculo, 3)
+
+    resumen = svc.sincronizar_borradores_con_arca(en_lote=True)
+
+    facturas = db.execute(
+        text("SELECT id, numero, cae, estado_id FROM facturas ORDER BY id")
+    ).mappings().all()
+
+    assert wsfe.lotes == [[23, 24, 25]]
+    assert resumen["procesadas"] == 3
+    assert resumen["aprobadas"] == 3
+    assert [f["id"] for f in facturas] == ids
+    assert [f["numero"] for f in facturas] == [23, 24, 25]
+    assert all(f["cae"] == "CAE-LOTE" for f in facturas)
+    assert all(f["estado_id"] == svc.ESTADO_AUTORIZADA for f in facturas)
+
+
+def test_sincronizacion_en_lote_error_comunicacion_marca_todo_el_lote(
+    db,
+    cliente_id,
+    make_vehiculo,
+    factura_service_factory,
+):
+    svc = factura_service_factory(wsfe=FakeWSFEConError("ARCA no responde"))
+    _crear_borradores(svc, cliente_id, make_vehiculo, 2)
+
+    resumen = svc.sincronizar_borradores_con_arca(en_lote=True)
+
+    estados = db.execute(text("SELECT estado_id FROM facturas")).scalars().all()
+
+    assert resumen["error_comunicacion"] == 2
+    assert resumen["aprobadas"] == 0
+    assert estados == [svc.ESTADO_ERROR_COMUNICACION] * 2
+
+
+def test_parse_respuesta_lote_asocia_resultado_por_numero():
+    xml = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+  <soap:Body>
+    <FECAESolicitarResponse xmlns="http://ar.gov.afip.dif.FEV1/">
+      <FECAESolicitarResult>
+        <FeCabResp>
+          <Cuit>33717057479</Cuit><PtoVta>2</PtoVta><CbteTipo>6</CbteTipo>
+          <FchProceso>20260101120000</FchProceso><CantReg>2</CantReg><Resultado>P</Resultado>
+        </FeCabResp>
+        <FeDetResp>
+          <FECAEDetResponse>
+            <CbteDesde>11</CbteDesde><CbteHasta>11</CbteHasta><Resultado>R</Resultado>
+            <Observaciones><Obs><Code>10016</Code><Msg>Numero no correlativo</Msg></Obs></Observaciones>
+          </FECAEDetResponse>
+          <FECAEDetResponse>
+            <CbteDesde>10</CbteDesde><CbteHasta>10</CbteHasta><Resultado>A</Resultado>
+            <CAE>71000000000010</CAE><CAEFchVto>20260111</CAEFchVto>
+          </FECAEDetResponse>
+        </FeDetResp>
+      </FECAESolicitarResult>
+    </FECAESolicitarResponse>
+  </soap:Body>
+</soap:Envelope>"""
+
+    resultados = ArcaWSFEClient.__new__(ArcaWSFEClient)._parse_fe_cae_solicitar_lote_response(xml, [10, 11, 12])
+
+    assert resultados[0].aprobada is True
+    assert resultados[0].cae == "71000000000010"
+    assert resultados[0].fecha_cae == "20260101120000"
+    assert resultados[1].rechazada is True
+    assert resultados[1].observaciones == ["10016 - Numero no correlativo"]
+    assert resultados[2].aprobada is False and resultados[2].rechazada is False
+
+
+def test_sincronizacion_por_grupos_informa_progreso(
+    db,
+    cliente_id,
+    make_vehiculo,
+    factura_service_factory,
+):
+    svc = factura_service_factory(wsfe=FakeWSFE(ultimo_autorizado=0, aprobada=True))
+    for i, pto_vta in enumerate((2, 2, 3)):
+        cabecera, items = build_factura_payload(cliente_id, make_vehiculo(suffix=f"G{i}"), pto_vta=pto_vta)
+        cabecera["numero"] = 100 + i
+        svc.create_factura_completa(cabecera, items)
+    avances = []
+
+    resumen = svc.sincronizar_borradores_con_arca(
+        progress_callback=lambda hechas, total, _msg: avances.append((hechas, total)),
+        max_workers=1,
+    )
+
+    assert resumen["aprobadas"] == 3
+    assert avances == [(1, 3), (2, 3), (3, 3)]
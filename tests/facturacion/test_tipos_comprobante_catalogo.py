@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from sqlalchemy import event, text
+
+from app.core.catalog_cache import CatalogCache
+from app.core.tipos_comprobante import TIPOS_COMPROBANTE_KEY, TiposComprobanteCatalogo
+from app.repositories.facturas_repository import FacturasRepository
+from app.services.catalogos_service import CatalogosService
+
+
+def _contar_consultas(test_sessionmaker):
+    consultas = []
+    engine = test_sessionmaker._maker.kw["bind"]
+    event.listen(engine, "before_cursor_execute", lambda *a: consultas.append(a[2]))
+    return consultas
+
+
+def test_indices_por_id_codigo_y_letra():
+    cat = TiposComprobanteCatalogo([
+        {"id": 1, "codigo": "FA", "nombre": "Factura A", "letra": "A", "es_nota_credito": 0, "activo": 1},
+        {"id": 4, "codigo": "NCA", "nombre": "Nota de Crédito A", "letra": "A", "es_nota_credito": 1, "activo": 1},
+        {"id": 9, "codigo": "NCX", "nombre": "Vieja", "letra": "X", "es_nota_credito": 1, "activo": 0},
+    ])
+
+    assert cat.by_id("4")["codigo"] == "NCA"
+    assert cat.by_codigo(" nca ")["id"] == 4
+    assert cat.por_letra("a", es_nota_credito=True)["id"] == 4
+    assert cat.por_letra("A")["id"] == 1
+    # Los inactivos se encuentran por id pero no se ofrecen
+    assert cat.codigo(9) == "NCX"
+    assert cat.por_letra("X", es_nota_credito=True) is None
+    assert [t["id"] for t in cat.activos()] == [1, 4]
+
+    cat.by_id(1)["codigo"] = "ZZ"
+    assert cat.codigo(1) == "FA"
+
+
+def test_repositorio_consulta_la_tabla_una_sola_vez(test_sessionmaker):
+    db = test_sessionmaker()
+    try:
+        repo = FacturasRepository(db)
+        assert repo.get_codigo_tipo_comprobante(1) == "FA"
+
+        consultas = _contar_consultas(test_sessionmaker)
+        assert repo.get_tipo_comprobante_by_codigo("FB")["id"] == 2
+        assert repo.get_tipo_nota_credito_por_letra("A")["codigo"] == "NCA"
+        assert repo.es_nota_credito(5) is True
+        assert repo.es_nota_credito(1) is False
+        assert FacturasRepository(db).get_tipo_comprobante_by_id(3)["codigo"] == "FC"
+        assert consultas == []
+    finally:
+        db.close()
+
+
+def test_snapshot_vuelve_a_armar_los_indices(test_sessionmaker):
+    svc = CatalogosService()
+    svc.warmup_all()
+    CatalogCache.get().invalidate()
+
+    assert TIPOS_COMPROBANTE_KEY in svc.cargar_snapshot()
+    consultas = _contar_consultas(test_sessionmaker)
+
+    assert isinstance(CatalogCache.get().get_value(TIPOS_COMPROBANTE_KEY), TiposComprobanteCatalogo)
+    assert svc.get_tipo_comprobante_by_id(4)["codigo"] == "NCA"
+    assert consultas == []
+
+
+def test_cambio_en_tipos_comprobante_recarga_el_catalogo(test_sessionmaker):
+    svc = CatalogosService()
+    svc.warmup_all()
+
+    db = test_sessionmaker()
+    try:
+        db.execute(text("UPDATE tipos_comprobante SET nombre = 'Factura A (RG)' WHERE id = 1"))
+        svc.registrar_cambio(db, "tipos_comprobante")
+        db.commit()
+    finally:
+        db.close()
+
+    assert TIPOS_COMPROBANTE_KEY in svc.refrescar_cambiados()
+    assert svc.get_tipos_comprobante_catalogo().by_id(1)["nombre"] == "Factura A (RG)"
+
+
+def test_catalogo_vacio_no_vuelve_a_cargar_todo(test_sessionmaker, monkeypatch):
+    svc = CatalogosService()
+    svc.warmup_all()
+    CatalogCache.get().set(TIPOS_COMPROBANTE_KEY, TiposComprobanteCatalogo([]))
+
+    def _no_recargar(*a, **kw):
+        raise AssertionError("warmup_all no debería llamarse con el catálogo en cache")
+
+    monkeypatch.setattr(svc, "warmup_all", _no_recargar)
+
+    assert len(svc.get_tipos_comprobante_catalogo()) == 0
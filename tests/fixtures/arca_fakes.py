@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.integrations.arca.wsfe_client import ArcaWSFEResult
 
@@ -13,6 +13,20 @@ class FakeAuth:
     cuit: str = "33717057479"
 
 
+def inyectar_clientes_arca(svc, *, wsaa, wsfe) -> None:
+    """Reemplaza los clientes ARCA de FacturasService y de sus servicios internos."""
+    svc._wsaa = wsaa
+    svc._wsfe = wsfe
+    svc._numbering._wsaa = wsaa
+    svc._numbering._wsfe = wsfe
+    svc._arca_authorization._wsaa = wsaa
+    svc._arca_authorization._wsfe = wsfe
+    svc._nota_credito_creator._wsaa = wsaa
+    svc._nota_credito_creator._wsfe = wsfe
+    svc._conciliacion._wsaa = wsaa
+    svc._conciliacion._wsfe = wsfe
+
+
 class FakeWSAA:
     def get_auth(self) -> FakeAuth:
         return FakeAuth()
@@ -34,6 +48,7 @@ class FakeWSFE:
         self.vto_cae = vto_cae
         self.errores = errores or ["10016 - Rechazo de prueba"]
         self.solicitudes: List[Dict[str, Any]] = []
+        self.lotes: List[List[int]] = []
 
     def fe_comp_ultimo_autorizado(self, *, auth: Any, cbte_tipo: int, pto_vta: int) -> Dict[str, int]:
         return {"cbte_nro": self.ultimo_autorizado}
@@ -65,6 +80,15 @@ class FakeWSFE:
             mensaje="Resultado: R - Errores: " + "; ".join(self.errores),
         )
 
+    def solicitar_cae_lote(
+        self,
+        *,
+        auth: Any,
+        comprobantes: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]],
+    ) -> List[ArcaWSFEResult]:
+        self.lotes.append([int(factura.get("numero") or 0) for factura, _items in comprobantes])
+        return [self.solicitar_cae(auth=auth, factura=factura, items=items) for factura, items in comprobantes]
+
 
 class FakeWSFEConError(FakeWSFE):
     def __init__(self, mensaje: str = "Timeout ARCA de prueba") -> None:
@@ -74,3 +98,12 @@ class FakeWSFEConError(FakeWSFE):
     def solicitar_cae(self, *, auth: Any, factura: Dict[str, Any], items: List[Dict[str, Any]]) -> ArcaWSFEResult:
         self.solicitudes.append({"factura": dict(factura), "items": list(items)})
         raise TimeoutError(self.mensaje)
+
+    def solicitar_cae_lote(
+        self,
+        *,
+        auth: Any,
+        comprobantes: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]],
+    ) -> List[ArcaWSFEResult]:
+        self.lotes.append([int(factura.get("numero") or 0) for factura, _items in comprobantes])
+        raise TimeoutError(self.mensaje)
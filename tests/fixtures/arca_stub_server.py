@@ -0,0 +1,406 @@
+"""
+Servidor HTTP local que imita WSAA y WSFEv1 de AFIP.
+
+A diferencia de arca_fakes.py, los clientes reales (ArcaWSAAClient /
+ArcaWSFEClient) arman el SOAP, lo mandan por HTTP y parsean la respuesta, así
+que se ejercita todo el camino. Implementa loginCms, FECAESolicitar,
+FECompUltimoAutorizado y FECompConsultar con numeración correlativa real
+(10016 si el número no es el siguiente).
+
+Inyección de fallas (probabilidades 0..1, sorteadas por request):
+  - latency / jitter: segundos de demora antes de responder
+  - error_rate: SOAP Fault con HTTP 500 (el request no se procesa)
+  - html_error_rate: página HTML en vez de XML (como las de mantenimiento)
+  - lost_response_rate: FECAESolicitar se procesa pero se corta la conexión
+    sin responder (el caso "timeout después de enviar")
+
+Uso:
+    with ArcaStubServer(latency=0.05) as server:
+        server.wsfe_url, server.wsaa_url
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+_ARG = timezone(timedelta(hours=-3))
+
+_ENVELOPE = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+  <soap:Body>
+{body}
+  </soap:Body>
+</soap:Envelope>"""
+
+_HTML_ERROR = """<!DOCTYPE html>
+<html><head><title>Servicio no disponible</title></head>
+<body><h1>503 Service Unavailable</h1><p>El servicio se encuentra en mantenimiento.</p></body></html>"""
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _find(root: ET.Element, name: str) -> Optional[ET.Element]:
+    for el in root.iter():
+        if _local(el.tag) == name:
+            return el
+    return None
+
+
+def _text(root: ET.Element, name: str, default: str = "") -> str:
+    el = _find(root, name)
+    return (el.text or "").strip() if el is not None and el.text else default
+
+
+class ArcaStubServer:
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        html_error_rate: float = 0.0,
+        html_error_status: int = 503,
+        lost_response_rate: float = 0.0,
+        ultimo_autorizado: Optional[Dict[Tuple[int, int], int]] = None,
+        seed: Optional[int] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.latency = float(latency)
+        self.jitter = float(jitter)
+        self.error_rate = float(error_rate)
+        self.html_error_rate = float(html_error_rate)
+        self.html_error_status = int(html_error_status)
+        self.lost_response_rate = float(lost_response_rate)
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._ultimo: Dict[Tuple[int, int], int] = dict(ultimo_autorizado or {})
+        self._autorizados: Dict[Tuple[int, int, int], Dict[str, str]] = {}
+        self._cae_seq = 71000000000000
+        self.requests: Counter = Counter()
+        self.fallas: Counter = Counter()
+
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    # -------------------- Ciclo de vida --------------------
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def wsaa_url(self) -> str:
+        return f"{self.base_url}/ws/services/LoginCms"
+
+    @property
+    def wsfe_url(self) -> str:
+        return f"{self.base_url}/wsfev1/service.asmx"
+
+    def start(self) -> "ArcaStubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="arca-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "ArcaStubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def ultimo_autorizado(self, cbte_tipo: int, pto_vta: int) -> int:
+        with self._lock:
+            return self._ultimo.get((int(cbte_tipo), int(pto_vta)), 0)
+
+    # -------------------- Operaciones --------------------
+
+    def _login_cms(self, _req: ET.Element) -> str:
+        ahora = datetime.now(_ARG)
+        ticket = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<loginTicketResponse version="1.0">
+  <header>
+    <source>CN=wsaahomo, O=AFIP, C=AR</source>
+    <destination>SERIALNUMBER=CUIT 20123456789, CN=stub</destination>
+    <uniqueId>{int(ahora.timestamp())}</uniqueId>
+    <generationTime>{ahora.isoformat(timespec="seconds")}</generationTime>
+    <expirationTime>{(ahora + timedelta(hours=12)).isoformat(timespec="seconds")}</expirationTime>
+  </header>
+  <credentials>
+    <token>STUB-TOKEN-{int(ahora.timestamp())}</token>
+    <sign>STUB-SIGN</sign>
+  </credentials>
+</loginTicketResponse>"""
+        return f"""    <loginCmsResponse xmlns="http://wsaa.view.sua.dvadac.desein.afip.gov">
+      <loginCmsReturn>{escape(ticket)}</loginCmsReturn>
+    </loginCmsResponse>"""
+
+    def _ultimo_autorizado_op(self, req: ET.Element) -> str:
+        pto = int(_text(req, "PtoVta", "0"))
+        tipo = int(_text(req, "CbteTipo", "0"))
+        return f"""    <FECompUltimoAutorizadoResponse xmlns="http://ar.gov.afip.dif.FEV1/">
+      <FECompUltimoAutorizadoResult>
+        <PtoVta>{pto}</PtoVta><CbteTipo>{tipo}</CbteTipo><CbteNro>{self.ultimo_autorizado(tipo, pto)}</CbteNro>
+      </FECompUltimoAutorizadoResult>
+    </FECompUltimoAutorizadoResponse>"""
+
+    def _consultar(self, req: ET.Element) -> str:
+        tipo = int(_text(req, "CbteTipo", "0"))
+        pto = int(_text(req, "PtoVta", "0"))
+        nro = int(_text(req, "CbteNro", "0"))
+        with self._lock:
+            cbte = self._autorizados.get((tipo, pto, nro))
+
+        if cbte is None:
+            contenido = (
+                "<Errors><Err><Code>602</Code>"
+                "<Msg>No existen datos en nuestros registros para los parametros ingresados.</Msg>"
+                "</Err></Errors>"
+            )
+        else:
+            contenido = f"""<ResultGet>
+          <Concepto>1</Concepto><CbteDesde>{nro}</CbteDesde><CbteHasta>{nro}</CbteHasta>
+          <ImpTotal>{cbte["imp_total"]}</ImpTotal><Resultado>A</Resultado>
+          <CodAutorizacion>{cbte["cae"]}</CodAutorizacion><EmisionTipo>CAE</EmisionTipo>
+          <FchVto>{cbte["vto"]}</FchVto><FchProceso>{cbte["fch_proceso"]}</FchProceso>
+          <PtoVta>{pto}</PtoVta><CbteTipo>{tipo}</CbteTipo>
+        </ResultGet>"""
+
+        return f"""    <FECompConsultarResponse xmlns="http://ar.gov.afip.dif.FEV1/">
+      <FECompConsultarResult>
+        {contenido}
+      </FECompConsultarResult>
+    </FECompConsultarResponse>"""
+
+    def _solicitar(self, req: ET.Element) -> str:
+        cab = _find(req, "FeCabReq")
+        pto = int(_text(cab, "PtoVta", "0")) if cab is not None else 0
+        tipo = int(_text(cab, "CbteTipo", "0")) if cab is not None else 0
+        detalles = [el for el in req.iter() if _local(el.tag) == "FECAEDetRequest"]
+
+        ahora = datetime.now(_ARG)
+        fch_proceso = ahora.strftime("%Y%m%d%H%M%S")
+        vto = (ahora + timedelta(days=10)).strftime("%Y%m%d")
+        respuestas: List[str] = []
+        resultados: List[str] = []
+
+        with self._lock:
+            for det in detalles:
+                desde = int(_text(det, "CbteDesde", "0"))
+                siguiente = self._ultimo.get((tipo, pto), 0) + 1
+                if desde != siguiente:
+                    resultados.append("R")
+                    respuestas.append(f"""          <FECAEDetResponse>
+            <Concepto>1</Concepto><CbteDesde>{desde}</CbteDesde><CbteHasta>{desde}</CbteHasta>
+            <Resultado>R</Resultado><CAE></CAE><CAEFchVto></CAEFchVto>
+            <Observaciones><Obs><Code>10016</Code><Msg>El numero o fecha del comprobante no se corresponde con el proximo a autorizar. Consultar metodo FECompUltimoAutorizado.</Msg></Obs></Observaciones>
+          </FECAEDetResponse>""")
+                    continue
+
+                self._cae_seq += 1
+                cae = str(self._cae_seq)
+                self._ultimo[(tipo, pto)] = desde
+                self._autorizados[(tipo, pto, desde)] = {
+                    "cae": cae,
+                    "vto": vto,
+                    "fch_proceso": fch_proceso[:8],
+                    "imp_total": _text(det, "ImpTotal", "0"),
+                }
+                resultados.append("A")
+                respuestas.append(f"""          <FECAEDetResponse>
+            <Concepto>1</Concepto><CbteDesde>{desde}</CbteDesde><CbteHasta>{desde}</CbteHasta>
+            <Resultado>A</Resultado><CAE>{cae}</CAE><CAEFchVto>{vto}</CAEFchVto>
+          </FECAEDetResponse>""")
+
+        if all(r == "A" for r in resultados):
+            general = "A"
+        elif all(r == "R" for r in resultados):
+            general = "R"
+        else:
+            general = "P"
+
+        return f"""    <FECAESolicitarResponse xmlns="http://ar.gov.afip.dif.FEV1/">
+      <FECAESolicitarResult>
+        <FeCabResp>
+          <Cuit>20123456789</Cuit><PtoVta>{pto}</PtoVta><CbteTipo>{tipo}</CbteTipo>
+          <FchProceso>{fch_proceso}</FchProceso><CantReg>{len(detalles)}</CantReg><Resultado>{general}</Resultado>
+        </FeCabResp>
+        <FeDetResp>
+{chr(10).join(respuestas)}
+        </FeDetResp>
+      </FECAESolicitarResult>
+    </FECAESolicitarResponse>"""
+
+    # -------------------- HTTP --------------------
+
+    def _contar(self, contador: Counter, clave: str) -> None:
+        with self._lock:
+            contador[clave] += 1
+
+    def _sortear(self, probabilidad: float) -> bool:
+        if probabilidad <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < probabilidad
+
+    def _demora(self) -> float:
+        if self.jitter <= 0:
+            return self.latency
+        with self._lock:
+            return max(self.latency + self._random.uniform(-self.jitter, self.jitter), 0.0)
+
+    def _make_handler(self):
+        stub = self
+        operaciones = {
+            "loginCms": stub._login_cms,
+            "FECAESolicitar": stub._solicitar,
+            "FECompUltimoAutorizado": stub._ultimo_autorizado_op,
+            "FECompConsultar": stub._consultar,
+        }
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                largo = int(self.headers.get("Content-Length") or 0)
+                payload = self.rfile.read(largo)
+
+                try:
+                    root = ET.fromstring(payload)
+                    body = _find(root, "Body")
+                    req = next(iter(body)) if body is not None and len(body) else None
+                except ET.ParseError:
+                    req = None
+
+                operacion = _local(req.tag) if req is not None else ""
+                handler = operaciones.get(operacion)
+                stub._contar(stub.requests, operacion or "desconocida")
+
+                demora = stub._demora()
+                if demora:
+                    time.sleep(demora)
+
+                if handler is None:
+                    self._responder(500, self._fault("soap:Client", f"Operación no soportada: {operacion}"))
+                    return
+                if stub._sortear(stub.error_rate):
+                    stub._contar(stub.fallas, "soap_fault")
+                    self._responder(500, self._fault("soap:Server", "Error interno simulado"))
+                    return
+                if stub._sortear(stub.html_error_rate):
+                    stub._contar(stub.fallas, "html")
+                    self._responder(stub.html_error_status, _HTML_ERROR.encode(), "text/html; charset=utf-8")
+                    return
+
+                respuesta = _ENVELOPE.format(body=handler(req)).encode("utf-8")
+
+                if operacion == "FECAESolicitar" and stub._sortear(stub.lost_response_rate):
+                    # Procesado pero sin respuesta: el cliente ve la conexión cortada
+                    stub._contar(stub.fallas, "respuesta_perdida")
+                    self.close_connection = True
+                    return
+
+                self._responder(200, respuesta)
+
+            def _responder(self, status: int, data: bytes, content_type: str = "text/xml; charset=utf-8"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            @staticmethod
+            def _fault(code: str, mensaje: str) -> bytes:
+                body = f"""    <soap:Fault>
+      <faultcode>{code}</faultcode>
+      <faultstring>{escape(mensaje)}</faultstring>
+    </soap:Fault>"""
+                return _ENVELOPE.format(body=body).encode("utf-8")
+
+            def log_message(self, *args):
+                pass
+
+        return _Handler
+
+
+# -------------------- Helpers para apuntar los clientes reales --------------------
+
+
+def generar_certificado_prueba(directorio) -> Tuple["Path", "Path"]:
+    """Certificado autofirmado + clave RSA para que WSAA firme de verdad."""
+    from pathlib import Path
+
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID
+
+    directorio = Path(directorio)
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "arca-stub")])
+    ahora = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(ahora - timedelta(days=1))
+        .not_valid_after(ahora + timedelta(days=30))
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = directorio / "stub_cert.pem"
+    key_path = directorio / "stub_key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    return cert_path, key_path
+
+
+def clientes_contra_stub(server: ArcaStubServer, directorio, *, mode: str = "STUB"):
+    """
+    ArcaWSAAClient y ArcaWSFEClient reales apuntando al stub. `mode` separa
+    el caché de último autorizado del de homologación/producción.
+    """
+    from pathlib import Path
+    from types import SimpleNamespace
+
+    from app.integrations.arca.ultimo_autorizado_cache import UltimoAutorizadoCache
+    from app.integrations.arca.wsaa_client import ArcaWSAAClient
+    from app.integrations.arca.wsfe_client import ArcaWSFEClient
+
+    cert_path, key_path = generar_certificado_prueba(directorio)
+    wsaa = ArcaWSAAClient(
+        SimpleNamespace(
+            mode=mode,
+            cuit="20123456789",
+            cert_path=cert_path,
+            key_path=key_path,
+            key_password="",
+            wsaa_url=server.wsaa_url,
+        ),
+        ta_path=Path(directorio) / f"arca_ta_{mode.lower()}.xml",
+    )
+    wsfe = ArcaWSFEClient(SimpleNamespace(mode=mode, wsfe_url=server.wsfe_url))
+    UltimoAutorizadoCache.get().invalidate()
+    return wsaa, wsfe
@@ -8,21 +8,64 @@ from typing import Any, Dict
 
 from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool, StaticPool
 
 
-def make_sqlite_sessionmaker(tmp_path: Path):
+# Módulos que importan SessionLocal y hay que apuntar a la base de prueba
+SESSION_LOCAL_MODULES = [
+    "app.data.database",
+    "app.services.facturas_service",
+    "app.services.factura_numbering_service",
+    "app.services.arca_authorization_service",
+    "app.services.arca_outbox_service",
+    "app.services.arca_conciliacion_service",
+    "app.services.nota_credito_creator",
+    "app.services.importacion_certificados_service",
+    "app.services.importacion_datos_service",
+    "app.services.comprobantes_service",
+    "app.services.catalogos_service",
+    "app.services.ventas_service",
+    "app.services.pagos_service",
+    "app.services.clientes_service",
+    "app.services.search_index_service",
+    "app.services.vehiculos_service",
+    "app.reportes.iva_ventas",
+    "app.reportes.iva_ventas_datos",
+]
+
+
+def make_sqlite_sessionmaker(tmp_path: Path, *, en_archivo: bool = False):
+    """
+    Base SQLite de prueba con el esquema y los catálogos cargados.
+
+    Por defecto es en memoria con una única conexión compartida (StaticPool).
+    Con `en_archivo=True` la base vive en `tmp_path` y cada hilo toma su
+    propia conexión del pool: es lo que necesitan los benchmarks con varios
+    workers, que sobre una sola conexión compartida se bloquean.
+    """
     sqlite3.register_adapter(Decimal, float)
 
-    engine = create_engine(
-        "sqlite://",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        future=True,
-    )
+    if en_archivo:
+        engine = create_engine(
+            f"sqlite:///{Path(tmp_path) / 'pruebas.db'}",
+            connect_args={"check_same_thread": False, "timeout": 30},
+            poolclass=QueuePool,
+            future=True,
+        )
+    else:
+        engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+            future=True,
+        )
 
     @event.listens_for(engine, "connect")
     def _register_functions(dbapi_connection, _connection_record):
+        if en_archivo:
+            # Lectores y escritor concurrentes sin "database is locked"
+            dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
         def concat_ws(separator, *args):
             return str(separator).join(str(a) for a in args if a not in (None, ""))
 
@@ -40,6 +83,12 @@ def make_sqlite_sessionmaker(tmp_path: Path):
             month = month_index % 12 + 1
             return f"{year:04d}-{month:02d}-{min(base.day, 28):02d}"
 
+        def concat(*args):
+            if any(a is None for a in args):
+                return None
+            return "".join(str(a) for a in args)
+
+        dbapi_connection.create_function("CONCAT", -1, concat)
         dbapi_connection.create_function("CONCAT_WS", -1, concat_ws)
         dbapi_connection.create_function("DATE_ADD", 2, date_add)
 
@@ -63,7 +112,16 @@ def _create_schema(conn) -> None:
             direccion TEXT,
             observaciones TEXT,
             estado_id INTEGER DEFAULT 10,
-            tipo_doc_id INTEGER
+            tipo_doc_id INTEGER,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            nro_doc_digitos TEXT GENERATED ALWAYS AS (
+                REPLACE(REPLACE(REPLACE(REPLACE(COALESCE(nro_doc, ''), '-', ''), '.', ''), ' ', ''), '/', '')
+            ) STORED,
+            nro_doc_dni TEXT GENERATED ALWAYS AS (
+                CASE WHEN LENGTH(nro_doc_digitos) = 11 THEN SUBSTR(nro_doc_digitos, 3, 8) ELSE nro_doc_digitos END
+            ) STORED,
+            apellido_nombre_norm TEXT GENERATED ALWAYS AS (LOWER(apellido || ' ' || nombre)) STORED,
+            nombre_completo_norm TEXT GENERATED ALWAYS AS (LOWER(nombre || ' ' || apellido)) STORED
         )
         """,
         """
@@ -144,7 +202,8 @@ def _create_schema(conn) -> None:
             estado_moto_id INTEGER NOT NULL,
             proveedor_id INTEGER,
             observaciones TEXT,
-            cliente_id INTEGER
+            cliente_id INTEGER,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
         )
         """,
         """
@@ -230,6 +289,25 @@ def _create_schema(conn) -> None:
         )
         """,
         """
+        CREATE TABLE arca_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            factura_id INTEGER NOT NULL UNIQUE,
+            estado TEXT NOT NULL DEFAULT 'PENDIENTE',
+            intentos INTEGER NOT NULL DEFAULT 0,
+            proximo_intento DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            ultimo_error TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE catalog_versions (
+            catalogo TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
         CREATE TABLE plan_financiacion (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             venta_id INTEGER UNIQUE,